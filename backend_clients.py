@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP client layer for Copilot Bridge
+
+Every Ollama and Copilot call goes through one process-wide registry of
+pooled httpx clients, so keep-alive connections (and HTTP/2 streams to
+api.githubcopilot.com) are reused across requests instead of paying a
+new TCP/TLS handshake per call.
+
+- One pool per endpoint origin (scheme://host:port)
+- Sync (httpx.Client) and async (httpx.AsyncClient) flavours
+- Async pools are sharded: httpcore scans every connection for every
+  queued request, so N small pools cost far less CPU than one big one
+- Limits, keep-alive and HTTP/2 configurable per endpoint or via env
+- Closed automatically at interpreter exit (or explicitly via close())
+
+Usage:
+    from backend_clients import backends
+
+    r = backends.client(OLLAMA_BASE).post(f"{OLLAMA_BASE}/api/generate", json=..., timeout=60.0)
+    r = await backends.async_client(GITHUB_API).post(f"{GITHUB_API}/chat/completions", ...)
+
+Environment variables:
+    BRIDGE_MAX_CONNECTIONS   - Max connections per endpoint (default: 100)
+    BRIDGE_MAX_KEEPALIVE     - Idle keep-alive connections per endpoint (default: 100)
+    BRIDGE_KEEPALIVE_EXPIRY  - Seconds an idle connection is kept (default: 30)
+    BRIDGE_POOL_SHARDS       - Async pools per endpoint (default: 8)
+    BRIDGE_HTTP2_HOSTS       - Comma-separated hosts to use HTTP/2 with
+                               (default: api.githubcopilot.com; needs `h2`)
+"""
+import asyncio
+import atexit
+import itertools
+import os
+import socket
+import sys
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+try:
+    import h2  # noqa: F401  (httpx[http2] extra)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+@dataclass
+class PoolConfig:
+    """Connection pool settings for one endpoint."""
+    max_connections: int = int(os.getenv("BRIDGE_MAX_CONNECTIONS", "100"))
+    max_keepalive: int = int(os.getenv("BRIDGE_MAX_KEEPALIVE", "100"))
+    keepalive_expiry: float = float(os.getenv("BRIDGE_KEEPALIVE_EXPIRY", "30"))
+    shards: int = int(os.getenv("BRIDGE_POOL_SHARDS", "8"))
+    http2: bool = False
+
+    def limits(self, shards: int = 1) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=max(1, self.max_connections // shards),
+            max_keepalive_connections=max(1, self.max_keepalive // shards),
+            keepalive_expiry=self.keepalive_expiry
+        )
+
+
+@dataclass
+class _AsyncShards:
+    """Round-robin set of AsyncClients bound to one event loop."""
+    loop: asyncio.AbstractEventLoop
+    clients: List[httpx.AsyncClient]
+    cycle: itertools.cycle = field(init=False)
+
+    def __post_init__(self):
+        self.cycle = itertools.cycle(self.clients)
+
+
+async def _aclose_all(clients: List[httpx.AsyncClient]):
+    await asyncio.gather(*(c.aclose() for c in clients), return_exceptions=True)
+
+
+def _shutdown_sockets(client: httpx.AsyncClient):
+    """Shut down the pooled sockets of a client whose event loop is gone."""
+    pool = getattr(client._transport, "_pool", None)
+    for conn in list(getattr(pool, "connections", [])):
+        stream = getattr(getattr(conn, "_connection", None), "_network_stream", None)
+        sock = stream.get_extra_info("socket") if stream is not None else None
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+def _discard(shards: _AsyncShards):
+    """
+    Close a shard set that is being replaced.
+
+    aclose() has to run on the loop that owns the connections: schedule it
+    there if that loop is still running (another thread), otherwise shut
+    the sockets down directly so the backend sees them go away now rather
+    than whenever the transports are garbage collected.
+    """
+    loop = shards.loop
+    if loop.is_running() and not loop.is_closed():
+        asyncio.run_coroutine_threadsafe(_aclose_all(shards.clients), loop)
+        return
+    for client in shards.clients:
+        _shutdown_sockets(client)
+
+
+def origin(url: str) -> str:
+    """scheme://host:port of a URL (the pool key)."""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+class BackendClients:
+    """
+    Registry of pooled HTTP clients, one pool per backend endpoint.
+
+    Thread-safe; async pools are recreated if used from a different event
+    loop (e.g. successive asyncio.run() calls in CLI scripts).
+    """
+
+    def __init__(self, default: Optional[PoolConfig] = None):
+        self.default = default or PoolConfig()
+        self.http2_hosts = {
+            h.strip() for h in os.getenv("BRIDGE_HTTP2_HOSTS", "api.githubcopilot.com").split(",") if h.strip()
+        }
+        self._configs: Dict[str, PoolConfig] = {}
+        self._sync: Dict[str, httpx.Client] = {}
+        self._async: Dict[str, _AsyncShards] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, url: str, config: PoolConfig):
+        """Override pool settings for one endpoint (before first use)."""
+        self._configs[origin(url)] = config
+
+    def config_for(self, url: str) -> PoolConfig:
+        key = origin(url)
+        if key in self._configs:
+            return self._configs[key]
+        config = PoolConfig(**{**self.default.__dict__})
+        config.http2 = urlsplit(url).hostname in self.http2_hosts
+        return config
+
+    def _http2(self, config: PoolConfig) -> bool:
+        if config.http2 and not HTTP2_AVAILABLE:
+            print("⚠️  h2 not installed (pip install 'httpx[http2]'), using HTTP/1.1", file=sys.stderr)
+            config.http2 = False
+        return config.http2
+
+    def client(self, url: str) -> httpx.Client:
+        """Shared sync client for the endpoint serving `url`."""
+        key = origin(url)
+        client = self._sync.get(key)
+        if client is None:
+            with self._lock:
+                client = self._sync.get(key)
+                if client is None:
+                    config = self.config_for(url)
+                    client = httpx.Client(limits=config.limits(), http2=self._http2(config))
+                    self._sync[key] = client
+        return client
+
+    def async_client(self, url: str) -> httpx.AsyncClient:
+        """Shared async client (next shard) for the endpoint serving `url`."""
+        key = origin(url)
+        loop = asyncio.get_running_loop()
+        shards = self._async.get(key)
+        if shards is None or shards.loop is not loop:
+            with self._lock:
+                shards = self._async.get(key)
+                if shards is None or shards.loop is not loop:
+                    if shards is not None:
+                        _discard(shards)
+                    config = self.config_for(url)
+                    n = max(1, min(config.shards, config.max_connections))
+                    http2 = self._http2(config)
+                    shards = _AsyncShards(loop, [
+                        httpx.AsyncClient(limits=config.limits(n), http2=http2) for _ in range(n)
+                    ])
+                    self._async[key] = shards
+        return next(shards.cycle)
+
+    def close(self):
+        """Close all sync clients (async clients are closed by aclose())."""
+        with self._lock:
+            for client in self._sync.values():
+                client.close()
+            self._sync.clear()
+
+    async def aclose(self):
+        """Close all clients owned by the running loop, plus sync clients."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            owned = [k for k, s in self._async.items() if s.loop is loop]
+            shards = [self._async.pop(k) for k in owned]
+        for s in shards:
+            await asyncio.gather(*(c.aclose() for c in s.clients))
+        self.close()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Open pools per endpoint (for debugging / metrics)."""
+        return {
+            key: {
+                "sync": int(key in self._sync),
+                "async_shards": len(self._async[key].clients) if key in self._async else 0
+            }
+            for key in set(self._sync) | set(self._async)
+        }
+
+
+# Process-wide registry shared by every module
+backends = BackendClients()
+atexit.register(backends.close)
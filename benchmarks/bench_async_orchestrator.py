@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Benchmark: threaded vs asyncio draft + audit
+
+N concurrent audited requests (draft on the GPU 0 stub, audit on the
+GPU 1 stub, both at once) through:
+
+- threads: the previous generate_with_audit(concurrent=True), one
+  worker thread per request plus two threading.Threads for draft and
+  audit, sync pooled httpx client
+- asyncio: DualGPUOrchestrator.agenerate_with_audit, all requests as
+  tasks on one event loop with the shared AsyncClient pools
+
+Each mode runs in its own subprocess so peak RSS and thread counts are
+not mixed up. Scheduler limits are lifted so only the concurrency model
+differs.
+
+Usage:
+    python3 benchmarks/bench_async_orchestrator.py --requests 200
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import resource
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench_utils import add_repo_paths, print_table, summarize
+from stub_ollama import run_in_thread
+
+add_repo_paths()
+from backend_clients import backends  # noqa: E402
+from dual_gpu_orchestrator import DualGPUOrchestrator, TaskComplexity  # noqa: E402
+from scheduler import GPUScheduler, Priority  # noqa: E402
+
+AUDIT_MODEL = "qwen2.5-coder:1.5b"
+
+
+def make_orchestrator(gpu0: int, gpu1: int) -> DualGPUOrchestrator:
+    orchestrator = DualGPUOrchestrator(
+        gpu0_url=f"http://127.0.0.1:{gpu0}", gpu1_url=f"http://127.0.0.1:{gpu1}",
+        enable_metrics=False, load_aware=False
+    )
+    for gpu_id in orchestrator.schedulers:
+        orchestrator.schedulers[gpu_id] = GPUScheduler(f"gpu{gpu_id}", slots=1_000_000,
+                                                       deadlines={p: None for p in Priority})
+    return orchestrator
+
+
+def sync_generate(url: str, model: str, prompt: str) -> dict:
+    response = backends.client(url).post(
+        f"{url}/api/generate",
+        json={"model": model, "prompt": prompt, "stream": False, "options": {"num_ctx": 4096}},
+        timeout=180.0
+    )
+    return response.json()
+
+
+def threaded_generate_with_audit(orchestrator: DualGPUOrchestrator, prompt: str) -> float:
+    """The pre-asyncio concurrent path: a thread each for draft and audit, joined."""
+    t0 = time.perf_counter()
+    gpu, model, _ = orchestrator.select_gpu_and_model(TaskComplexity.COMPLEX)
+    draft, audit = {}, {}
+    t1 = threading.Thread(target=lambda: draft.update(sync_generate(gpu.url, model, prompt)))
+    t2 = threading.Thread(target=lambda: audit.update(sync_generate(orchestrator.gpu1.url, AUDIT_MODEL, prompt)))
+    t1.start()
+    t2.start()
+    t1.join()
+    t2.join()
+    assert draft.get("response") and audit.get("response")
+    return time.perf_counter() - t0
+
+
+class ThreadPeak:
+    """Samples threading.active_count() in the background."""
+
+    def __init__(self):
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(0.005):
+            self.peak = max(self.peak, threading.active_count())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+
+
+def run_mode(mode: str, requests: int, gpu0: int, gpu1: int) -> dict:
+    orchestrator = make_orchestrator(gpu0, gpu1)
+    prompt = "Implement a caching layer for this code"
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    with contextlib.redirect_stdout(io.StringIO()), ThreadPeak() as threads:
+        t0 = time.perf_counter()
+        if mode == "threads":
+            with ThreadPoolExecutor(max_workers=requests) as pool:
+                latencies = list(pool.map(lambda _: threaded_generate_with_audit(orchestrator, prompt),
+                                          range(requests)))
+        else:
+            async def one():
+                start = time.perf_counter()
+                response = await orchestrator.agenerate_with_audit(prompt, concurrent=True)
+                assert response.draft and not response.draft.startswith("ERROR")
+                return time.perf_counter() - start
+
+            async def main():
+                try:
+                    return await asyncio.gather(*(one() for _ in range(requests)))
+                finally:
+                    await backends.aclose()
+
+            latencies = asyncio.run(main())
+        wall = time.perf_counter() - t0
+
+    row = summarize(mode, latencies, wall)
+    row["peak_threads"] = threads.peak
+    row["rss_growth_mb"] = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_kb) / 1024
+    return row
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Threaded vs asyncio draft + audit")
+    parser.add_argument("--requests", type=int, default=200, help="Concurrent audited requests")
+    parser.add_argument("--delay", type=float, default=0.05, help="Stub time before first token (s)")
+    parser.add_argument("--mode", choices=("threads", "asyncio"), help=argparse.SUPPRESS)
+    parser.add_argument("--ports", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        gpu0, gpu1 = map(int, args.ports.split(","))
+        print(json.dumps(run_mode(args.mode, args.requests, gpu0, gpu1)))
+        sys.exit(0)
+
+    _, gpu0 = run_in_thread(delay=args.delay, tps=200.0, tokens=20)
+    _, gpu1 = run_in_thread(delay=args.delay, tps=200.0, tokens=20)
+
+    rows = []
+    for mode in ("threads", "asyncio"):
+        out = subprocess.run(
+            [sys.executable, __file__, "--mode", mode, "--requests", str(args.requests), "--ports", f"{gpu0},{gpu1}"],
+            capture_output=True, text=True, check=True
+        )
+        rows.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    print(f"\n{args.requests} concurrent draft + audit requests, stub delay {args.delay:g}s + 20 tokens @ 200 tok/s\n")
+    print_table(rows, ("name", "requests", "rps", "p50_ms", "p99_ms", "peak_threads", "rss_growth_mb"))
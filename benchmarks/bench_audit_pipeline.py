@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark: sequential vs pipelined vs concurrent draft + audit
+
+GPU 0 stub drafts --draft-tokens at --draft-tps, GPU 1 stub audits
+--audit-tokens at --audit-tps. Each mode runs the same requests one at
+a time through agenerate_with_audit (every audit runs to completion):
+
+- sequential: audit of the finished draft (latency = draft + audit)
+- pipelined: audit of the first --pipeline-chars of the streamed draft,
+  started while the draft is still generating
+- concurrent: audit of the request itself, from the start
+
+Reports end-to-end latency, when the audit started and how long both
+GPUs were generating at once (DualGPUResponse.audit_start / overlap_time).
+
+Usage:
+    python3 benchmarks/bench_audit_pipeline.py --requests 20
+"""
+import argparse
+import contextlib
+import io
+import statistics
+
+from bench_utils import add_repo_paths, percentile, print_table
+from stub_ollama import run_in_thread
+
+add_repo_paths()
+from audit_policy import AuditPolicy  # noqa: E402
+from dual_gpu_orchestrator import DualGPUOrchestrator  # noqa: E402
+
+MODES = {
+    "sequential": {"concurrent": False},
+    "pipelined": {"concurrent": False, "pipelined": True},
+    "concurrent": {"concurrent": True},
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Draft/audit pipelining benchmark")
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--draft-tokens", type=int, default=128)
+    parser.add_argument("--draft-tps", type=float, default=100.0)
+    parser.add_argument("--audit-tokens", type=int, default=64)
+    parser.add_argument("--audit-tps", type=float, default=64.0)
+    parser.add_argument("--pipeline-chars", type=int, default=200, help="Stub tokens are 4 characters")
+    args = parser.parse_args()
+
+    _, gpu0 = run_in_thread(delay=0.05, tps=args.draft_tps, tokens=args.draft_tokens)
+    _, gpu1 = run_in_thread(delay=0.05, tps=args.audit_tps, tokens=args.audit_tokens)
+    orchestrator = DualGPUOrchestrator(
+        gpu0_url=f"http://127.0.0.1:{gpu0}", gpu1_url=f"http://127.0.0.1:{gpu1}",
+        enable_metrics=False, load_aware=False
+    )
+    orchestrator.audit_policy = AuditPolicy(skip_tiers=frozenset(), min_draft_tokens=0, max_tokens=None, grace_s=None)
+    orchestrator.pipeline_chars = args.pipeline_chars
+
+    rows = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        orchestrator.generate_with_audit("Implement a caching layer")  # warm the pools
+        for name, kwargs in MODES.items():
+            responses = [orchestrator.generate_with_audit("Implement a caching layer", **kwargs)
+                         for _ in range(args.requests)]
+            totals = [r.total_time for r in responses]
+            rows.append({
+                "mode": name,
+                "p50_ms": percentile(totals, 50) * 1000,
+                "p99_ms": percentile(totals, 99) * 1000,
+                "draft_ms": statistics.mean(r.draft_time for r in responses) * 1000,
+                "audit_ms": statistics.mean(r.audit_time for r in responses) * 1000,
+                "audit_start_ms": statistics.mean(r.audit_start for r in responses) * 1000,
+                "overlap_ms": statistics.mean(r.overlap_time for r in responses) * 1000,
+            })
+
+    print(f"\n{args.requests} requests per mode; draft {args.draft_tokens} tok @ {args.draft_tps:g} tok/s, "
+          f"audit {args.audit_tokens} tok @ {args.audit_tps:g} tok/s, pipelined audit after "
+          f"{args.pipeline_chars} chars\n")
+    print_table(rows, ("mode", "p50_ms", "p99_ms", "draft_ms", "audit_ms", "audit_start_ms", "overlap_ms"))
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Simulation: always-audit vs adaptive audit policy
+
+GPU 1 (a slow stub serving one generation at a time) runs the audits
+and also serves SIMPLE requests of its own. A stream of audited requests
+(a mix of SIMPLE and COMPLEX prompts) runs next to a stream of plain
+SIMPLE requests, first with every audit run to completion and then
+with an adaptive AuditPolicy (skip SIMPLE, cancel on drafts under 32
+tokens, cap audits at 256 tokens and truncate audits that outlive the
+draft by --grace seconds).
+
+Reports audited request latency, the latency of the SIMPLE requests
+competing for GPU 1, audit outcomes and the GPU 1 seconds reclaimed.
+
+Usage:
+    python3 benchmarks/bench_audit_policy.py --audited 30 --background 10
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import random
+import time
+
+from bench_utils import add_repo_paths, percentile, print_table
+from stub_ollama import run_in_thread
+
+add_repo_paths()
+from audit_policy import AuditPolicy  # noqa: E402
+from backend_clients import backends  # noqa: E402
+from dual_gpu_orchestrator import DualGPUOrchestrator  # noqa: E402
+from scheduler import GPUScheduler, Priority  # noqa: E402
+
+PROMPTS = [
+    ("Write a docstring for this parser", 0.3),
+    ("Implement a caching layer for this service", 0.7),
+]
+
+
+async def run(orchestrator: DualGPUOrchestrator, audited: list, background: int, concurrency: int) -> dict:
+    audited_latencies, background_latencies = [], []
+    queue = list(audited)
+
+    async def audited_worker():
+        while queue:
+            prompt = queue.pop()
+            t0 = time.perf_counter()
+            await orchestrator.agenerate_with_audit(prompt, concurrent=True)
+            audited_latencies.append(time.perf_counter() - t0)
+
+    async def background_worker(n):
+        for _ in range(n):
+            t0 = time.perf_counter()
+            result = await orchestrator.asimple_generate("Add comments to this function")
+            assert result["success"], result.get("error")
+            background_latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    try:
+        await asyncio.gather(
+            *(audited_worker() for _ in range(concurrency)),
+            background_worker(background),
+        )
+    finally:
+        await backends.aclose()
+    stats = orchestrator.get_stats()["audit"]
+    return {
+        "wall_s": time.perf_counter() - t0,
+        "audited_p50_ms": percentile(audited_latencies, 50) * 1000,
+        "audited_p99_ms": percentile(audited_latencies, 99) * 1000,
+        "gpu1_simple_p50_ms": percentile(background_latencies, 50) * 1000,
+        "gpu1_simple_p99_ms": percentile(background_latencies, 99) * 1000,
+        "actions": ", ".join(f"{a}={n}" for a, n in stats["actions"].items() if n),
+        "reclaimed_s": stats["gpu1_reclaimed_s"],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Audit policy simulation")
+    parser.add_argument("--audited", type=int, default=30, help="Draft + audit requests")
+    parser.add_argument("--background", type=int, default=10, help="SIMPLE requests served by GPU 1 meanwhile")
+    parser.add_argument("--concurrency", type=int, default=4, help="Audited requests in flight")
+    parser.add_argument("--grace", type=float, default=0.5, help="Adaptive policy: audit time allowed past the draft")
+    args = parser.parse_args()
+
+    _, gpu0 = run_in_thread(delay=0.05, tps=200.0, tokens=64)
+    _, gpu1 = run_in_thread(delay=0.05, tps=64.0, tokens=64, parallel=1)
+
+    rng = random.Random(0)
+    audited = rng.choices([p for p, _ in PROMPTS], weights=[w for _, w in PROMPTS], k=args.audited)
+
+    rows = []
+    for name, policy in (
+        ("always-audit", AuditPolicy()),
+        ("adaptive", AuditPolicy(skip_tiers=frozenset({"SIMPLE"}), min_draft_tokens=32, max_tokens=256,
+                                 grace_s=args.grace)),
+    ):
+        orchestrator = DualGPUOrchestrator(
+            gpu0_url=f"http://127.0.0.1:{gpu0}", gpu1_url=f"http://127.0.0.1:{gpu1}",
+            enable_metrics=False, load_aware=False
+        )
+        orchestrator.audit_policy = policy
+        orchestrator.schedulers[1] = GPUScheduler("gpu1", slots=1, deadlines={p: None for p in Priority})
+        with contextlib.redirect_stdout(io.StringIO()):
+            row = asyncio.run(run(orchestrator, audited, args.background, args.concurrency))
+        rows.append({"name": name, **row})
+
+    print(f"\n{args.audited} audited requests ({args.concurrency} in flight) + {args.background} SIMPLE "
+          f"requests on GPU 1; GPU 1 serves one generation at a time (~1s each)\n")
+    print_table(rows, ("name", "wall_s", "audited_p50_ms", "audited_p99_ms",
+                       "gpu1_simple_p50_ms", "gpu1_simple_p99_ms", "reclaimed_s", "actions"))
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-request metrics overhead, JSON log hop vs embedded metrics
+
+Calls proxy_instrumented.log_request() for a realistic mix of requests
+(local ones with Ollama's gen_tps / prompt_tps / load_ms timings) in:
+
+- json → exporter: the JSON line per request to stderr (previous
+  behaviour), plus what exporter.py then spends re-parsing it
+  (process_log_batch, batches of 100, echo off)
+- embedded: bridge_metrics.record() in-process, no JSON log
+- embedded + 1% log: as above with BRIDGE_LOG_SAMPLE=0.01
+
+stderr goes to /dev/null, so the cost of a real pipe or terminal and of
+shipping the lines to the exporter is not included in the json column.
+
+Usage:
+    python3 benchmarks/bench_bridge_metrics.py --requests 100000
+"""
+import argparse
+import contextlib
+import json
+import os
+import random
+import time
+
+from bench_utils import add_repo_paths, print_table
+
+add_repo_paths()
+import bridge_metrics  # noqa: E402
+import exporter  # noqa: E402
+import proxy_instrumented  # noqa: E402
+
+
+def make_calls(n: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    calls = []
+    for _ in range(n):
+        route = rng.choices(("local", "cloud", "cache"), weights=(0.7, 0.2, 0.1))[0]
+        kwargs = {"task": rng.choice(("docstring", "comment", "refactor", "general"))}
+        if route == "local" and rng.random() < 0.5:
+            kwargs["ttft_ms"], kwargs["itl_ms"] = rng.randint(50, 500), round(rng.uniform(5, 40), 1)
+        if route == "local":
+            kwargs["timings"] = {"gen_tps": round(rng.uniform(20, 120), 2),
+                                 "prompt_tps": round(rng.uniform(200, 3000), 2),
+                                 "load_ms": round(rng.uniform(1, 20), 2)}
+        if route == "cache" or rng.random() < 0.3:
+            kwargs["cache"] = "hit" if route == "cache" else "miss"
+        model = "github-copilot-cloud" if route == "cloud" else "qwen2.5-coder:7b-instruct-q8_0"
+        calls.append(((route, rng.randint(100, 4000), rng.randint(20, 800), rng.randint(200, 8000), model), kwargs))
+    return calls
+
+
+def time_log_requests(calls: list, embedded: bool, sample: float) -> float:
+    bridge_metrics._embedded = embedded
+    bridge_metrics.LOG_SAMPLE = sample
+    with open(os.devnull, "w") as null, contextlib.redirect_stderr(null):
+        t0 = time.perf_counter()
+        for args, kwargs in calls:
+            proxy_instrumented.log_request(*args, **kwargs)
+        return time.perf_counter() - t0
+
+
+def exporter_cost(calls: list, batch: int = 100) -> float:
+    """Time exporter.py spends turning the same requests' JSON lines into metrics."""
+    lines = []
+    for (route, tokens_in, tokens_out, latency_ms, model), kwargs in calls:
+        entry = {"route": route, "tokens_in": tokens_in, "tokens_out": tokens_out,
+                 "total_tokens": tokens_in + tokens_out, "latency_ms": latency_ms, "model": model,
+                 "cost_saved_usd": 0.01, **kwargs.get("timings", {})}
+        entry.update((k, v) for k, v in kwargs.items() if k != "timings")
+        lines.append(json.dumps(entry).encode())
+    t0 = time.perf_counter()
+    for i in range(0, len(lines), batch):
+        exporter.process_log_batch(lines[i:i + batch], echo="off")
+    return time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bridge metrics overhead per request")
+    parser.add_argument("--requests", type=int, default=100_000)
+    args = parser.parse_args()
+
+    calls = make_calls(args.requests)
+    n = len(calls)
+    rows = []
+    bridge_s = time_log_requests(calls, embedded=False, sample=1.0)
+    exporter_s = exporter_cost(calls)
+    rows.append({"name": "json → exporter (previous)", "bridge_us": bridge_s / n * 1e6,
+                 "exporter_us": exporter_s / n * 1e6, "total_us": (bridge_s + exporter_s) / n * 1e6})
+    for name, sample in (("embedded", 0.0), ("embedded + 1% log", 0.01)):
+        bridge_s = time_log_requests(calls, embedded=True, sample=sample)
+        rows.append({"name": name, "bridge_us": bridge_s / n * 1e6, "exporter_us": 0.0,
+                     "total_us": bridge_s / n * 1e6})
+
+    print(f"\n{n:,} log_request() calls (local/cloud/cache mix); µs per request\n")
+    print_table(rows, ("name", "bridge_us", "exporter_us", "total_us"))
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: fresh httpx client per call vs shared backend_clients pools
+
+Fires batches of 100 concurrent /api/generate calls at a stub Ollama,
+both from asyncio (proxy.py style) and from threads (orchestrator style),
+and reports throughput, latency and how many TCP connections the stub saw.
+
+Usage:
+    python3 benchmarks/bench_connection_reuse.py --concurrency 100 --rounds 10
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+from bench_utils import add_repo_paths, print_table, summarize
+from stub_ollama import run_in_thread
+
+add_repo_paths()
+from backend_clients import BackendClients  # noqa: E402
+
+BODY = {"model": "qwen2.5-coder:7b-instruct-q8_0", "prompt": "Write a docstring", "stream": False}
+
+
+async def async_fresh(url: str, n: int, concurrency: int) -> list:
+    """Old pattern: `async with httpx.AsyncClient()` inside every call."""
+    sem = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with sem:
+            t0 = time.perf_counter()
+            async with httpx.AsyncClient(timeout=60.0) as client:
+                (await client.post(f"{url}/api/generate", json=BODY)).raise_for_status()
+            latencies.append(time.perf_counter() - t0)
+
+    await asyncio.gather(*(one() for _ in range(n)))
+    return latencies
+
+
+async def async_shared(url: str, n: int, concurrency: int, pools: BackendClients) -> list:
+    """New pattern: backends.async_client(url) shared across calls."""
+    sem = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with sem:
+            t0 = time.perf_counter()
+            r = await pools.async_client(url).post(f"{url}/api/generate", json=BODY, timeout=60.0)
+            r.raise_for_status()
+            latencies.append(time.perf_counter() - t0)
+
+    await asyncio.gather(*(one() for _ in range(n)))
+    await pools.aclose()
+    return latencies
+
+
+def threads(url: str, n: int, concurrency: int, pools=None) -> list:
+    """Thread pool of blocking calls, fresh httpx.Client each time unless pools is given."""
+    def one(_):
+        t0 = time.perf_counter()
+        if pools is None:
+            with httpx.Client(timeout=60.0) as client:
+                client.post(f"{url}/api/generate", json=BODY).raise_for_status()
+        else:
+            pools.client(url).post(f"{url}/api/generate", json=BODY, timeout=60.0).raise_for_status()
+        return time.perf_counter() - t0
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(one, range(n)))
+    if pools is not None:
+        pools.close()
+    return latencies
+
+
+def measure(name, stub, fn):
+    conns = stub.connections
+    t0 = time.perf_counter()
+    cpu0 = time.process_time()
+    latencies = fn()
+    row = summarize(name, latencies, time.perf_counter() - t0)
+    row["cpu_ms/req"] = (time.process_time() - cpu0) / len(latencies) * 1000
+    row["connections"] = stub.connections - conns
+    return row
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Connection reuse micro-benchmark")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=10, help="Batches of `concurrency` requests")
+    parser.add_argument("--delay", type=float, default=0.01, help="Stub Ollama latency (s)")
+    args = parser.parse_args()
+
+    stub, port = run_in_thread(delay=args.delay, tokens=0)
+    url = f"http://127.0.0.1:{port}"
+    n, c = args.concurrency * args.rounds, args.concurrency
+
+    rows = [
+        measure("async: client per call", stub, lambda: asyncio.run(async_fresh(url, n, c))),
+        measure("async: shared pools", stub, lambda: asyncio.run(async_shared(url, n, c, BackendClients()))),
+        measure("threads: client per call", stub, lambda: threads(url, n, c)),
+        measure("threads: shared pool", stub, lambda: threads(url, n, c, BackendClients())),
+    ]
+
+    print(f"\n{n} requests, {c} concurrent, stub delay={args.delay}s\n")
+    print_table(rows, ("name", "requests", "rps", "p50_ms", "p99_ms", "cpu_ms/req", "connections"))
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Simulation: fixed vs adaptive num_ctx
+
+A stub Ollama endpoint stands in for GPU 0. Like Ollama, it reloads a
+model whenever a request's num_ctx differs from the one it is loaded
+with (charging --load-time) and clips prompts to num_ctx; its
+prompt_eval_count (4 characters per token) plays the model's tokenizer.
+
+Prompts are slices of this repository's source, in sessions: a few
+requests of similar size in a row (a docstring, then a pasted module,
+then a whole-file refactor). Each goes through call_model with:
+
+- fixed 4096: the old call_model default
+- fixed 32768: the old generate_draft setting
+- adaptive: context_window.ContextSizer, always the smallest bucket
+  (BRIDGE_NUM_CTX_STICKY=0, BRIDGE_NUM_CTX_SHRINK_AFTER=1)
+- adaptive, sticky: the defaults (a loaded model keeps a context up to
+  one bucket larger than needed, and shrinks further only after 4
+  smaller requests in a row)
+
+Reported: truncated prompts, truncations the sizer reported (which also
+count answers that may be cut short, reason "output"), model reloads, mean KV cache reserved for
+the 7B model (placement.py footprint) and how much of the reserved
+context was used.
+
+Usage:
+    python3 benchmarks/bench_context_window.py --sessions 60 --load-time 0.2
+"""
+import argparse
+import glob
+import os
+import random
+import time
+
+from bench_utils import REPO_ROOT, add_repo_paths, percentile, print_table
+from stub_ollama import run_in_thread
+
+add_repo_paths()
+from context_window import ContextSizer  # noqa: E402
+from dual_gpu_orchestrator import DualGPUOrchestrator  # noqa: E402
+from placement import spec_footprint  # noqa: E402
+
+MODEL = "qwen2.5-coder:7b-instruct-q8_0"
+
+# Session size classes (lines of source per prompt) and their weights
+SIZES = [((5, 60), 0.6), ((150, 900), 0.3), ((1500, 4000), 0.1)]
+
+
+def workload(sessions: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    lines = []
+    for path in sorted(glob.glob(os.path.join(REPO_ROOT, "**", "*.py"), recursive=True)):
+        with open(path, encoding="utf-8", errors="replace") as f:
+            lines.extend(f.read().splitlines())
+    prompts = []
+    for _ in range(sessions):
+        low, high = rng.choices([s for s, _ in SIZES], weights=[w for _, w in SIZES])[0]
+        for _ in range(rng.randint(3, 8)):
+            n = rng.randint(low, high)
+            start = rng.randrange(0, len(lines) - n)
+            prompts.append("Review this code:\n" + "\n".join(lines[start:start + n]))
+    return prompts
+
+
+def run(name: str, sizer: ContextSizer, prompts: list, args) -> dict:
+    stub, port = run_in_thread(delay=0.005, tps=1000, tokens=20, load_time=args.load_time)
+    orchestrator = DualGPUOrchestrator(
+        gpu0_url=f"http://127.0.0.1:{port}",
+        gpu1_url=f"http://127.0.0.1:{port}",
+        enable_metrics=False
+    )
+    orchestrator.context = sizer
+    kv_gb_per_token = spec_footprint(MODEL).kv_gb_per_token
+
+    latencies, num_ctx, truncated = [], [], 0
+    for prompt in prompts:
+        start = time.perf_counter()
+        result = orchestrator.call_model(orchestrator.gpu0, MODEL, prompt)
+        assert result["success"], result.get("error")
+        latencies.append(time.perf_counter() - start)
+        num_ctx.append(result["num_ctx"])
+        # Ground truth from the stub's tokenizer, not the sizer's estimate
+        truncated += len(prompt) // 4 >= result["num_ctx"]
+
+    stats = sizer.stats()
+    return {
+        "name": name,
+        "requests": len(prompts),
+        "truncated": truncated,
+        "reported": sum(stats["truncations"].values()),
+        "reloads": stub.loads - 1,
+        "kv_gb_mean": sum(num_ctx) / len(num_ctx) * kv_gb_per_token,
+        "fill": f"{stats['fill']:.1%}",
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "mean_ms": sum(latencies) / len(latencies) * 1000,
+        "by_num_ctx": ", ".join(f"{b}={n}" for b, n in stats["by_num_ctx"].items()),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Context window sizing simulation")
+    parser.add_argument("--sessions", type=int, default=60)
+    parser.add_argument("--load-time", type=float, default=0.2, help="Model (re)load time (s)")
+    args = parser.parse_args()
+
+    prompts = workload(args.sessions)
+    rows = [
+        run("fixed 4096", ContextSizer(fixed=4096), prompts, args),
+        run("fixed 32768", ContextSizer(fixed=32768), prompts, args),
+        run("adaptive", ContextSizer(sticky=0, shrink_after=1), prompts, args),
+        run("adaptive, sticky", ContextSizer(), prompts, args),
+    ]
+
+    print(f"\n{len(prompts)} prompts in {args.sessions} sessions, {MODEL}, reload {args.load_time:g}s\n")
+    print_table(rows, ("name", "requests", "truncated", "reported", "reloads", "kv_gb_mean", "fill", "p50_ms", "mean_ms"))
+    print()
+    for row in rows:
+        print(f"  {row['name']}: {row['by_num_ctx']}")
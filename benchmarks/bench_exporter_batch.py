@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark: exporter log processing, per line vs batched
+
+Feeds the same NDJSON log lines (local/cloud/cache mix, some streamed)
+through:
+
+- per-line: the previous process_log_line loop (json.loads, dict.get
+  per field, .labels() per metric, print() per line)
+- batched: exporter.process_log_batch with json or orjson, and with
+  the console echo per line, per batch or off
+
+in POST-sized batches and reports lines/sec. Console output goes to
+/dev/null, so terminal rendering cost is not included.
+
+Usage:
+    python3 benchmarks/bench_exporter_batch.py --lines 200000 --batch 100
+"""
+import argparse
+import contextlib
+import json
+import os
+import random
+import sys
+import time
+
+from bench_utils import add_repo_paths, print_table
+
+add_repo_paths()
+import exporter  # noqa: E402
+from bridge_metrics import (  # noqa: E402
+    CACHE_LOOKUPS, CACHE_TOKENS_SAVED, COST_SAVED, INTER_TOKEN_LATENCY, LOCAL_LATENCY,
+    REQUESTS_BY_MODEL, REQUESTS_BY_ROUTE, REQUESTS_BY_TASK, TIME_TO_FIRST_TOKEN,
+    TOKENS_IN, TOKENS_OUT, TOKENS_SAVED,
+)
+
+
+def legacy_process_log_line(line: str):
+    """The pre-batching exporter.process_log_line."""
+    try:
+        data = json.loads(line)
+        route = data.get("route", "unknown")
+        tokens_in = data.get("tokens_in", 0)
+        tokens_out = data.get("tokens_out", 0)
+        total_tokens = data.get("total_tokens", 0)
+        latency_ms = data.get("latency_ms", 0)
+        model = data.get("model", "unknown")
+        task = data.get("task", "general")
+        cost_saved = data.get("cost_saved_usd", 0.0)
+        REQUESTS_BY_ROUTE.labels(route=route).inc()
+        REQUESTS_BY_MODEL.labels(model=model).inc()
+        REQUESTS_BY_TASK.labels(task=task).inc()
+        if route in ("local", "cache"):
+            TOKENS_SAVED.inc(total_tokens)
+            COST_SAVED.inc(cost_saved)
+        if route == "local":
+            LOCAL_LATENCY.observe(latency_ms)
+        cache = data.get("cache")
+        if cache:
+            CACHE_LOOKUPS.labels(result=cache).inc()
+            if cache in ("hit", "semantic_hit"):
+                CACHE_TOKENS_SAVED.inc(tokens_out)
+        ttft_ms = data.get("ttft_ms")
+        if ttft_ms is not None:
+            TIME_TO_FIRST_TOKEN.labels(route=route, model=model, gpu_id="").observe(ttft_ms)
+            itl_ms = data.get("itl_ms")
+            if itl_ms is not None:
+                INTER_TOKEN_LATENCY.labels(route=route, model=model, gpu_id="").observe(itl_ms)
+        TOKENS_IN.set(tokens_in)
+        TOKENS_OUT.set(tokens_out)
+        print(f"✓ Processed: {route} | {task} | {total_tokens} tokens | ${cost_saved:.4f} saved", flush=True)
+    except json.JSONDecodeError as e:
+        print(f"✗ Invalid JSON: {line[:100]}... | Error: {e}", file=sys.stderr, flush=True)
+    except Exception as e:
+        print(f"✗ Error processing line: {e}", file=sys.stderr, flush=True)
+
+
+def make_lines(n: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(n):
+        route = rng.choices(("local", "cloud", "cache"), weights=(0.7, 0.2, 0.1))[0]
+        entry = {
+            "ts": "2025-10-20T14:23:10Z", "route": route,
+            "tokens_in": rng.randint(100, 4000), "tokens_out": rng.randint(20, 800),
+            "latency_ms": rng.randint(200, 8000),
+            "model": rng.choice(("qwen2.5-coder:7b", "qwen2.5-coder:1.5b", "gpt-4o")),
+            "task": rng.choice(("docstring", "comment", "refactor", "general")),
+        }
+        entry["total_tokens"] = entry["tokens_in"] + entry["tokens_out"]
+        entry["cost_saved_usd"] = round(entry["total_tokens"] / 1000 * 0.02, 4) if route != "cloud" else 0.0
+        if route == "local" and rng.random() < 0.5:
+            entry["ttft_ms"], entry["itl_ms"] = rng.randint(50, 500), round(rng.uniform(5, 40), 1)
+        if route == "cache" or rng.random() < 0.3:
+            entry["cache"] = "hit" if route == "cache" else "miss"
+        lines.append(json.dumps(entry).encode())
+    return lines
+
+
+def run(name: str, batches: list, process) -> dict:
+    lines = sum(len(b) for b in batches)
+    with open(os.devnull, "w") as null, contextlib.redirect_stdout(null):
+        t0 = time.perf_counter()
+        for batch in batches:
+            process(batch)
+        wall = time.perf_counter() - t0
+    return {"name": name, "lines": lines, "lines_per_s": lines / wall, "us_per_line": wall / lines * 1e6}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporter per-line vs batched processing")
+    parser.add_argument("--lines", type=int, default=200_000)
+    parser.add_argument("--batch", type=int, default=100, help="Log lines per POST body")
+    args = parser.parse_args()
+
+    lines = make_lines(args.lines)
+    batches = [lines[i:i + args.batch] for i in range(0, len(lines), args.batch)]
+
+    def legacy(batch):
+        # The old do_POST decoded the body to str and split it into lines
+        for line in b"\n".join(batch).decode("utf-8").strip().split("\n"):
+            if line:
+                legacy_process_log_line(line)
+
+    rows = [run("per-line (previous)", batches, legacy)]
+    decoders = [("json", json.loads)]
+    if exporter.ORJSON_AVAILABLE:
+        decoders.append(("orjson", exporter.orjson.loads))
+    for decoder, loads in decoders:
+        exporter._loads = loads
+        for echo in ("line", "batch", "off"):
+            rows.append(run(f"batched {decoder}, echo={echo}", batches,
+                            lambda b, echo=echo: exporter.process_log_batch(b, echo=echo)))
+
+    print(f"\n{args.lines:,} log lines in batches of {args.batch}; console output to /dev/null\n")
+    print_table(rows, ("name", "lines", "lines_per_s", "us_per_line"))
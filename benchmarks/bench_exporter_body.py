@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark: exporter request bodies, read-all vs streaming reader
+
+POSTs one NDJSON body of each --sizes MB to an exporter subprocess and
+reports the exporter's peak RSS (VmHWM) and ingest time:
+
+- read-all: the previous handler (rfile.read(Content-Length), decode to
+  str, split into a list of lines, then process)
+- streaming: exporter.LogHandler (64 KiB reads, incremental line
+  splitting, bounded queue), sent as Content-Length and as one
+  chunked stream
+
+Every body runs in a fresh exporter process so peaks don't carry over.
+Console echo is off in both.
+
+Usage:
+    python3 benchmarks/bench_exporter_body.py --sizes 10,50,200
+"""
+import argparse
+import http.server
+import json
+import os
+import socket
+import socketserver
+import subprocess
+import sys
+import time
+
+from bench_utils import REPO_ROOT, add_repo_paths, print_table
+
+LOG_LINE = json.dumps({
+    "ts": "2025-10-20T14:23:10Z", "route": "local", "tokens_in": 1200, "tokens_out": 280,
+    "total_tokens": 1480, "latency_ms": 3500, "model": "qwen2.5-coder:7b", "task": "docstring",
+    "cost_saved_usd": 0.0296,
+}).encode() + b"\n"
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def serve(mode: str, port: int):
+    add_repo_paths()
+    import exporter
+
+    if mode == "read-all":
+        class ReadAllHandler(http.server.BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0))).decode('utf-8')
+                exporter.process_log_batch([line.encode() for line in body.strip().split('\n')], echo="off")
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        socketserver.TCPServer.allow_reuse_address = True
+        server = socketserver.TCPServer(("127.0.0.1", port), ReadAllHandler)
+    else:
+        server = exporter.start_ingestion(port, host="127.0.0.1")
+    server.serve_forever()
+
+
+def peak_rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def post(port: int, size_mb: int, chunked: bool):
+    """Send a size_mb body without holding it in memory on the client side."""
+    lines_per_piece = 1000
+    piece = LOG_LINE * lines_per_piece
+    pieces = max(1, size_mb * 1024 * 1024 // len(piece))
+    with socket.create_connection(("127.0.0.1", port)) as s:
+        if chunked:
+            s.sendall(b"POST / HTTP/1.1\r\nHost: x\r\nTransfer-Encoding: chunked\r\n\r\n")
+            frame = b"%x\r\n" % len(piece) + piece + b"\r\n"
+            for _ in range(pieces):
+                s.sendall(frame)
+            s.sendall(b"0\r\n\r\n")
+        else:
+            s.sendall(b"POST / HTTP/1.1\r\nHost: x\r\nContent-Length: %d\r\n\r\n" % (len(piece) * pieces))
+            for _ in range(pieces):
+                s.sendall(piece)
+        status = s.recv(1024).split(b"\r\n")[0]
+    assert b" 204 " in status, status
+    return pieces * lines_per_piece
+
+
+def run(mode: str, size_mb: int, chunked: bool) -> dict:
+    port = free_port()
+    env = dict(os.environ, EXPORTER_ECHO="off")
+    proc = subprocess.Popen([sys.executable, __file__, "--serve", mode, "--port", str(port)],
+                            stdout=subprocess.DEVNULL, cwd=REPO_ROOT, env=env)
+    try:
+        for _ in range(100):
+            try:
+                socket.create_connection(("127.0.0.1", port)).close()
+                break
+            except OSError:
+                time.sleep(0.1)
+        idle = peak_rss_mb(proc.pid)
+        t0 = time.perf_counter()
+        lines = post(port, size_mb, chunked)
+        wall = time.perf_counter() - t0
+        peak = peak_rss_mb(proc.pid)
+    finally:
+        proc.terminate()
+        proc.wait()
+    return {"name": mode + (" (chunked)" if chunked else ""), "body_mb": size_mb, "lines": lines,
+            "peak_rss_mb": peak, "growth_mb": peak - idle, "ingest_s": wall}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporter body memory benchmark")
+    parser.add_argument("--sizes", default="10,50,200", help="Body sizes in MB, comma-separated")
+    parser.add_argument("--serve", choices=("read-all", "streaming"), help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port)
+        sys.exit(0)
+
+    rows = []
+    for size in map(int, args.sizes.split(",")):
+        rows.append(run("read-all", size, chunked=False))
+        rows.append(run("streaming", size, chunked=False))
+        rows.append(run("streaming", size, chunked=True))
+
+    print(f"\nOne NDJSON body per run ({len(LOG_LINE)}-byte lines); peak RSS of the exporter process\n")
+    print_table(rows, ("name", "body_mb", "lines", "peak_rss_mb", "growth_mb", "ingest_s"))
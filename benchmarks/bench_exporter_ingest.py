@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Load benchmark: exporter.py log ingestion, single-threaded vs concurrent
+
+Runs the exporter in a subprocess (console output to /dev/null) as
+
+- legacy: the previous socketserver.TCPServer + HTTP/1.0 handler that
+  parses every line before answering, one request at a time
+- concurrent: exporter.start_ingestion() (thread per connection,
+  keep-alive, bounded queue, 503 backpressure)
+
+and pushes NDJSON batches from --clients connections at an offered rate
+of --rate lines/sec for --duration seconds (optionally gzip-compressed).
+Reports accepted, rejected (503) and processed lines/sec, plus exporter
+CPU use (from /proc). Processed lines are read back from /metrics.
+
+Client and exporter share the machine, so on few cores the client's own
+CPU use limits the offered load.
+
+Usage:
+    python3 benchmarks/bench_exporter_ingest.py --rate 100000 --clients 32 --duration 10
+"""
+import argparse
+import asyncio
+import gzip
+import http.server
+import json
+import os
+import socket
+import socketserver
+import subprocess
+import sys
+import time
+
+import httpx
+
+from bench_utils import REPO_ROOT, add_repo_paths, print_table
+
+LOG_LINE = json.dumps({
+    "ts": "2025-10-20T14:23:10Z", "route": "local", "tokens_in": 1200, "tokens_out": 280,
+    "total_tokens": 1480, "latency_ms": 3500, "model": "qwen2.5-coder:7b", "task": "docstring",
+    "cost_saved_usd": 0.0296,
+})
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def serve(mode: str, port: int, metrics_port: int):
+    """Exporter process for one mode (stdout is discarded by the parent)."""
+    add_repo_paths()
+    import exporter
+    from prometheus_client import start_http_server
+
+    start_http_server(metrics_port, addr="127.0.0.1")
+    if mode == "legacy":
+        class LegacyHandler(http.server.BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0))).decode('utf-8')
+                for line in body.strip().split('\n'):
+                    if line:
+                        exporter.process_log_line(line)
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        socketserver.TCPServer.allow_reuse_address = True
+        server = socketserver.TCPServer(("127.0.0.1", port), LegacyHandler)
+    else:
+        server = exporter.start_ingestion(port, host="127.0.0.1")
+    server.serve_forever()
+
+
+def cpu_seconds(pid: int) -> float:
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+async def push(port: int, clients: int, rate: float, duration: float, batch: int, compress: bool) -> dict:
+    payload = ("\n".join([LOG_LINE] * batch) + "\n").encode()
+    headers = "Content-Type: application/x-ndjson\r\n"
+    if compress:
+        payload = gzip.compress(payload, compresslevel=1)
+        headers += "Content-Encoding: gzip\r\n"
+    request = (f"POST / HTTP/1.1\r\nHost: 127.0.0.1\r\n{headers}"
+               f"Content-Length: {len(payload)}\r\n\r\n").encode() + payload
+    interval = batch * clients / rate
+    counts = {"accepted": 0, "rejected": 0, "errors": 0}
+    deadline = time.perf_counter() + duration
+
+    async def client():
+        reader = writer = None
+        next_send = time.perf_counter()
+        while time.perf_counter() < deadline:
+            await asyncio.sleep(max(0.0, next_send - time.perf_counter()))
+            next_send = max(next_send + interval, time.perf_counter() - interval)
+            try:
+                if writer is None:
+                    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(request)
+                status_line = await reader.readline()
+                status = int(status_line.split()[1])
+                keep_alive = status_line.startswith(b"HTTP/1.1")
+                length = 0
+                while (h := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    k, _, v = h.decode("latin-1").partition(":")
+                    if k.lower() == "content-length":
+                        length = int(v)
+                    elif k.lower() == "connection" and v.strip().lower() == "close":
+                        keep_alive = False
+                await reader.readexactly(length)
+            except (OSError, ValueError, IndexError, asyncio.IncompleteReadError):
+                counts["errors"] += 1
+                status, keep_alive = None, False
+            if status == 204:
+                counts["accepted"] += batch
+            elif status == 503:
+                counts["rejected"] += batch
+            if not keep_alive and writer is not None:
+                writer.close()
+                reader = writer = None
+        if writer is not None:
+            writer.close()
+
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return counts
+
+
+def processed_lines(metrics_port: int) -> int:
+    text = httpx.get(f"http://127.0.0.1:{metrics_port}/metrics").text
+    return int(sum(float(line.rsplit(" ", 1)[1]) for line in text.splitlines()
+                   if line.startswith("copilot_bridge_requests_by_route_total")))
+
+
+def run_mode(mode: str, args) -> dict:
+    port, metrics_port = free_port(), free_port()
+    proc = subprocess.Popen(
+        [sys.executable, __file__, "--serve", mode, "--ports", f"{port},{metrics_port}"],
+        stdout=subprocess.DEVNULL, cwd=REPO_ROOT
+    )
+    try:
+        for _ in range(100):
+            try:
+                processed_lines(metrics_port)
+                socket.create_connection(("127.0.0.1", port)).close()
+                break
+            except (OSError, httpx.TransportError):
+                time.sleep(0.1)
+        cpu0, t0 = cpu_seconds(proc.pid), time.perf_counter()
+        counts = asyncio.run(push(port, args.clients, args.rate, args.duration, args.batch, args.gzip))
+        send_wall = time.perf_counter() - t0
+
+        # Wait for the metrics worker to drain the queue
+        processed = processed_lines(metrics_port)
+        while processed < counts["accepted"] and time.perf_counter() - t0 < args.duration * 10:
+            time.sleep(0.05)
+            processed = processed_lines(metrics_port)
+        wall = time.perf_counter() - t0
+        cpu = cpu_seconds(proc.pid) - cpu0
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    return {
+        "name": mode,
+        "accepted_lps": counts["accepted"] / send_wall,
+        "rejected_lps": counts["rejected"] / send_wall,
+        "processed_lps": processed / wall,
+        "drain_s": wall - send_wall,
+        "errors": counts["errors"],
+        "exporter_cpu_pct": cpu / wall * 100,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exporter ingestion load benchmark")
+    parser.add_argument("--rate", type=float, default=100_000, help="Offered log lines/sec (all clients)")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--batch", type=int, default=100, help="Log lines per POST")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--gzip", action="store_true", help="gzip-compress request bodies (concurrent mode only)")
+    parser.add_argument("--serve", choices=("legacy", "concurrent"), help=argparse.SUPPRESS)
+    parser.add_argument("--ports", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, *map(int, args.ports.split(",")))
+        sys.exit(0)
+
+    modes = ("concurrent",) if args.gzip else ("legacy", "concurrent")
+    rows = [run_mode(mode, args) for mode in modes]
+    print(f"\n{args.clients} clients offering {args.rate:,.0f} lines/s in batches of {args.batch} "
+          f"for {args.duration:g}s{' (gzip)' if args.gzip else ''}\n")
+    print_table(rows, ("name", "accepted_lps", "rejected_lps", "processed_lps", "drain_s", "errors", "exporter_cpu_pct"))
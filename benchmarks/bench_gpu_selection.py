@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Simulation: static vs load-aware GPU selection
+
+Two stub Ollama endpoints stand in for the GPUs: a fast one (GPU 0) and a
+slow one (GPU 1). Each serves one generation at a time, like a real GPU.
+A closed-loop mix of SIMPLE / MODERATE / COMPLEX requests goes through
+DualGPUOrchestrator.select_gpu_and_model + call_model, first with the
+static tier mapping and then with load-aware selection.
+
+Usage:
+    python3 benchmarks/bench_gpu_selection.py --requests 300 --concurrency 16
+"""
+import argparse
+import random
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from bench_utils import add_repo_paths, print_table, summarize
+from stub_ollama import run_in_thread
+
+add_repo_paths()
+from dual_gpu_orchestrator import DualGPUOrchestrator, TaskComplexity  # noqa: E402
+
+MIX = [(TaskComplexity.SIMPLE, 0.6), (TaskComplexity.MODERATE, 0.3), (TaskComplexity.COMPLEX, 0.1)]
+
+
+def run(name: str, orchestrator: DualGPUOrchestrator, workload: list, concurrency: int) -> dict:
+    reasons = Counter()
+
+    def one(complexity):
+        t0 = time.perf_counter()
+        gpu, model, reason = orchestrator.select_gpu_and_model(complexity)
+        result = orchestrator.call_model(gpu, model, "benchmark prompt")
+        assert result["success"], result.get("error")
+        reasons[reason] += 1
+        return time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(one, workload))
+    row = summarize(name, latencies, time.perf_counter() - t0)
+    row["reasons"] = ", ".join(f"{r}={n}" for r, n in sorted(reasons.items()))
+    return row
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="GPU selection simulation")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--tokens", type=int, default=20, help="Tokens per generation")
+    parser.add_argument("--fast-tps", type=float, default=200.0, help="GPU 0 tokens/sec")
+    parser.add_argument("--slow-tps", type=float, default=50.0, help="GPU 1 tokens/sec")
+    args = parser.parse_args()
+
+    _, fast = run_in_thread(delay=0.01, tps=args.fast_tps, tokens=args.tokens, parallel=1)
+    _, slow = run_in_thread(delay=0.01, tps=args.slow_tps, tokens=args.tokens, parallel=1)
+
+    rng = random.Random(0)
+    workload = rng.choices([c for c, _ in MIX], weights=[w for _, w in MIX], k=args.requests)
+
+    rows = []
+    for name, load_aware in (("static", False), ("load-aware", True)):
+        orchestrator = DualGPUOrchestrator(
+            gpu0_url=f"http://127.0.0.1:{fast}",
+            gpu1_url=f"http://127.0.0.1:{slow}",
+            enable_metrics=False,
+            load_aware=load_aware
+        )
+        rows.append(run(name, orchestrator, workload, args.concurrency))
+
+    print(f"\n{args.requests} requests ({', '.join(f'{c.name} {w:.0%}' for c, w in MIX)}), "
+          f"{args.concurrency} concurrent; GPU 0 {args.fast_tps:g} tok/s, GPU 1 {args.slow_tps:g} tok/s\n")
+    print_table(rows, ("name", "requests", "rps", "p50_ms", "p99_ms", "reasons"))
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: per-keyword `any(kw in text.lower())` vs keyword_classifier
+
+Times the full set of routing checks made for one request (local/cloud,
+cheap, SIMPLE/COMPLEX) over ~32k-token prompts built like the one in
+examples/generate_mega_summary_32k.py:
+
+- "mega context": the project summary repeated to 32k tokens, request at the end
+- "no keywords": 32k tokens of code-like identifiers (every check scans it all)
+
+Usage:
+    python3 benchmarks/bench_keyword_classifier.py --tokens 32000 --repeat 50
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+from bench_utils import REPO_ROOT, add_repo_paths, percentile, print_table
+
+add_repo_paths()
+sys.path.insert(0, os.path.join(REPO_ROOT, "examples"))
+from generate_mega_summary_32k import FULL_CONTEXT  # noqa: E402
+from keyword_classifier import DEFAULT_CATEGORIES, KeywordClassifier  # noqa: E402
+from token_counter import count_tokens  # noqa: E402
+
+
+def old_checks(text: str) -> set:
+    """What the call sites did: one lower() and one any() loop per keyword list."""
+    return {name for name, keywords in DEFAULT_CATEGORIES.items()
+            if any(kw in text.lower() for kw in keywords)}
+
+
+def build(base: str, tokens: int, suffix: str) -> str:
+    parts, total = [], 0
+    while total < tokens:
+        parts.append(base)
+        total += count_tokens(base)
+    return "\n".join(parts) + suffix
+
+
+def timed(fn, text: str, repeat: int) -> list:
+    latencies = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(text)
+        latencies.append(time.perf_counter() - t0)
+    return latencies
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Keyword classifier micro-benchmark")
+    parser.add_argument("--tokens", type=int, default=32000, help="Prompt size")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    filler = " ".join(f"var_{rng.randrange(10**6)} = obj.attr_{rng.randrange(10**6)}()" for _ in range(200))
+    prompts = {
+        "mega context": build(FULL_CONTEXT, args.tokens, "\n\nSummarize the project above."),
+        "no keywords": build(filler, args.tokens, "\n\nWhy is this slow?"),
+    }
+
+    rows = []
+    for name, text in prompts.items():
+        new = KeywordClassifier(DEFAULT_CATEGORIES, memo_size=0)
+        memo = KeywordClassifier(DEFAULT_CATEGORIES)
+        assert new.classify(text) == old_checks(text)
+        for label, fn in (
+            ("any(kw in lower())", old_checks),
+            ("classifier", new.classify),
+            ("classifier (memoized)", memo.classify),
+        ):
+            latencies = timed(fn, text, args.repeat)
+            rows.append({
+                "prompt": name,
+                "method": label,
+                "chars": len(text),
+                "p50_ms": percentile(latencies, 50) * 1000,
+                "p99_ms": percentile(latencies, 99) * 1000,
+            })
+
+    print()
+    print_table(rows, ("prompt", "method", "chars", "p50_ms", "p99_ms"))
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: learned router vs keyword rules
+
+Synthesizes request logs as log_request would write them with
+BRIDGE_LOG_PROMPTS=true: prompts from several families (including the
+"explain" inside a long refactor prompt the rules send to the 1.5b
+model), served at the tier the rules picked, with a quality score that
+is high only when that tier was capable enough. A failed attempt is
+retried one tier up (as an audit-driven escalation would) and logged
+again. It trains the router on part of the prompts and compares it with
+the rules on the rest.
+
+Reports accuracy of the cheapest adequate tier, the confident subset
+(coverage at BRIDGE_ROUTER_MIN_CONFIDENCE), and predict() latency.
+
+Usage:
+    python3 benchmarks/bench_learned_router.py --prompts 4000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from bench_utils import add_repo_paths, percentile, print_table
+
+add_repo_paths()
+from keyword_classifier import classifier  # noqa: E402
+from learned_router import TIERS, LearnedRouter, evaluate, excerpt, load_examples, prompt_log_fields, train  # noqa: E402
+
+# (true tier, instruction templates, code lines)
+FAMILIES = [
+    ("SIMPLE", ["Write a docstring for this function", "Add comments to this snippet",
+                "Rename variable {v} to something clearer"], (3, 15)),
+    ("MODERATE", ["Fix the bug in this function, it fails on empty input",
+                  "Why does this raise KeyError? Debug it", "Add type hints and error handling"], (10, 40)),
+    ("COMPLEX", ["Refactor this module into classes and explain the design",
+                 "Explain how to split this into services, then rewrite it",
+                 "Implement a caching layer for this code"], (80, 250)),
+    ("CLOUD", ["Use the latest model to review this architecture end to end",
+               "Compare this with what gpt-4 would do and improve it"], (20, 80)),
+]
+
+
+def code_block(rng: random.Random, lines: int) -> str:
+    return "\n".join(
+        f"    {rng.choice(['x', 'val', 'item', 'row'])}_{rng.randrange(99)} = "
+        f"{rng.choice(['fetch', 'parse', 'load', 'merge'])}(data[{rng.randrange(9)}])"
+        for _ in range(lines)
+    )
+
+
+def rules_tier(prompt: str) -> str:
+    """What proxy_dual_gpu + classify_task decide from keywords."""
+    matched = classifier.classify(prompt)
+    if "cloud" in matched:
+        return "CLOUD"
+    if "simple" in matched:
+        return "SIMPLE"
+    if "complex" in matched:
+        return "COMPLEX"
+    return "MODERATE"
+
+
+def synth_logs(path: str, n: int, rng: random.Random) -> list:
+    truth = []
+    with open(path, "w") as f:
+        for _ in range(n):
+            tier, templates, (lo, hi) = rng.choice(FAMILIES)
+            instruction = rng.choice(templates).format(v=f"tmp{rng.randrange(99)}")
+            prompt = f"{instruction}:\n\ndef f():\n{code_block(rng, rng.randint(lo, hi))}"
+            served = TIERS.index(rules_tier(prompt))
+            while True:
+                ok = served >= TIERS.index(tier)
+                f.write(json.dumps({
+                    "route": "cloud" if TIERS[served] == "CLOUD" else "local",
+                    "complexity": None if TIERS[served] == "CLOUD" else TIERS[served],
+                    "tokens_in": len(prompt) // 4,
+                    **prompt_log_fields(prompt),
+                    "quality": round(rng.uniform(7, 10) if ok else rng.uniform(2, 6), 1),
+                }) + "\n")
+                if ok:
+                    break
+                served += 1
+            # Keyed by the logged excerpt (what load_examples returns)
+            truth.append((excerpt(prompt), (prompt, tier)))
+    return truth
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Learned router micro-benchmark")
+    parser.add_argument("--prompts", type=int, default=4000)
+    parser.add_argument("--holdout", type=float, default=0.25)
+    parser.add_argument("--min-confidence", type=float, default=0.7)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bridge.log")
+        truth = dict(synth_logs(path, args.prompts, rng))
+        examples = load_examples([path])
+
+    cut = int(len(examples) * (1 - args.holdout))
+    t0 = time.perf_counter()
+    router = train(examples[:cut])
+    train_s = time.perf_counter() - t0
+    router.min_confidence = args.min_confidence
+    test = examples[cut:]
+
+    stats = evaluate(router, test)
+    # Online, both routers see the whole prompt
+    rules_acc = sum(rules_tier(truth[p][0]) == truth[p][1] for p, *_ in test) / len(test)
+    model_acc = sum(router.predict(truth[p][0])[0] == truth[p][1] for p, *_ in test) / len(test)
+
+    latencies = []
+    for prompt, tokens_in, *_ in test:
+        fresh = LearnedRouter(router.weights, router.bias, router.classes, memo_size=0)
+        t0 = time.perf_counter()
+        fresh.predict(prompt, tokens_in)
+        latencies.append(time.perf_counter() - t0)
+
+    print(f"\n{len(examples)} labelled prompts, trained on {cut} in {train_s:.1f}s\n")
+    print_table([
+        {"router": "keyword rules", "accuracy_%": rules_acc * 100},
+        {"router": "learned", "accuracy_%": model_acc * 100,
+         "coverage_%": stats["coverage"] * 100, "confident_acc_%": stats["confident_accuracy"] * 100,
+         "p50_us": percentile(latencies, 50) * 1e6, "p99_us": percentile(latencies, 99) * 1e6},
+    ], ("router", "accuracy_%", "coverage_%", "confident_acc_%", "p50_us", "p99_us"))
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark: log analytics over millions of log_request lines, jq vs column store
+
+1. Writes --lines synthetic log_request entries (route/model/task mix,
+   some with prompt excerpts, interleaved with the bridge's non-JSON
+   stderr lines) to a temp file.
+2. Ingests them into a log_analytics.ColumnStore, appends 1% more lines
+   and re-ingests (only the new bytes should be read).
+3. Times each query on the store.
+4. Baseline: the jq pipelines from network-monitoring/monitoring-commands.sh
+   (total cost saved, average latency by route) over the first --jq-lines
+   lines. They slurp the whole file into memory (jq -s), so on a full
+   10M-line log they would need several GB of RAM.
+
+Usage:
+    python3 benchmarks/bench_log_analytics.py --lines 10000000 --jq-lines 1000000
+"""
+import argparse
+import os
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+
+from bench_utils import add_repo_paths, print_table
+
+add_repo_paths()
+import log_analytics  # noqa: E402
+
+ROUTES = ("local",) * 7 + ("cloud",) * 2 + ("cache",)
+MODELS = {"local": ("qwen2.5-coder:1.5b", "qwen2.5-coder:3b", "qwen2.5-coder:7b-instruct-q8_0"),
+          "cloud": ("github-copilot",), "cache": ("qwen2.5-coder:7b-instruct-q8_0",)}
+TASKS = ("docstring", "comment", "refactor", "explain", "general", "debug")
+DAY0 = 1_735_689_600  # 2025-01-01
+
+
+def write_log(path: str, lines: int, start: int = 0, seed: int = 0):
+    """lines entries spread over ~180 days, 1 in 50 followed by a non-JSON line."""
+    rng = random.Random(seed + start)
+    with open(path, "a") as f:
+        for i in range(start, start + lines):
+            route = rng.choice(ROUTES)
+            ts = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(DAY0 + i * 180 * 86400 // max(lines, 1)))
+            tokens_in, tokens_out = rng.randint(50, 4000), rng.randint(10, 800)
+            latency = rng.lognormvariate(7.5, 0.8) if route != "cache" else rng.uniform(0, 3)
+            cost = (tokens_in + tokens_out) / 1000 * 0.02 if route != "cloud" else 0.0
+            extra = f', "gpu_id": {rng.randint(0, 1)}, "gen_tps": {rng.uniform(20, 120):.2f}' if route == "local" else ""
+            if rng.random() < 0.1:
+                extra += f', "prompt": "Refactor module {i} to use async IO and add tests"'
+            f.write(f'{{"ts": "{ts}.{i % 1000000:06d}+00:00", "route": "{route}", "tokens_in": {tokens_in}, '
+                    f'"tokens_out": {tokens_out}, "total_tokens": {tokens_in + tokens_out}, '
+                    f'"latency_ms": {int(latency)}, "model": "{rng.choice(MODELS[route])}", '
+                    f'"task": "{rng.choice(TASKS)}", "cost_saved_usd": {cost:.4f}{extra}}}\n')
+            if i % 50 == 0:
+                f.write("✅ Dual-GPU orchestrator initialized\n")
+
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - t0, result
+
+
+def jq_baseline(log: str, n: int, tmp: str) -> list:
+    subset = os.path.join(tmp, "subset.jsonl")
+    with open(log, "rb") as src, open(subset, "wb") as dst:
+        taken = 0
+        for line in src:
+            if line.startswith(b"{"):
+                dst.write(line)
+                taken += 1
+                if taken >= n:
+                    break
+    rows = []
+    for name, program in (
+        ("jq: total cost saved", "map(.cost_saved_usd) | add"),
+        ("jq: avg latency by route",
+         "group_by(.route) | map({route: .[0].route, avg_latency_ms: (map(.latency_ms) | add / length)})"),
+    ):
+        t0 = time.perf_counter()
+        subprocess.run(["jq", "-s", program, subset], check=True, stdout=subprocess.DEVNULL)
+        rows.append({"name": f"{name} ({n:,} lines)", "ms": (time.perf_counter() - t0) * 1000})
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Log analytics benchmark")
+    parser.add_argument("--lines", type=int, default=10_000_000)
+    parser.add_argument("--jq-lines", type=int, default=1_000_000, help="Lines for the jq baseline (0 = skip)")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="bench-analytics-")
+    try:
+        log = os.path.join(tmp, "bridge.log")
+        gen_s, _ = timed(write_log, log, args.lines)
+        size_mb = os.path.getsize(log) / 1e6
+        print(f"📝 Wrote {args.lines:,} entries ({size_mb:,.0f} MB) in {gen_s:.0f}s")
+
+        store_dir = os.path.join(tmp, "store")
+        store = log_analytics.ColumnStore(store_dir)
+        ingest_s, stats = timed(store.ingest, [log])
+        store_mb = sum(os.path.getsize(os.path.join(store_dir, f)) for f in os.listdir(store_dir)) / 1e6
+
+        extra = args.lines // 100
+        write_log(log, extra, start=args.lines)
+        incr_s, incr = timed(store.ingest, [log])
+
+        rows = [
+            {"name": f"ingest {stats['rows_added']:,} rows", "ms": ingest_s * 1000},
+            {"name": f"incremental ingest (+{incr['rows_added']:,} rows, {incr['bytes_read'] / 1e6:,.1f} MB read)",
+             "ms": incr_s * 1000},
+        ]
+        store = log_analytics.ColumnStore(store_dir)  # fresh handle, as a CLI run would open it
+        local = log_analytics.select(store, route="local")
+        recent = log_analytics.select(store, since="2025-04-01", task="refactor")
+        for name, fn, kwargs in (
+            ("summary", log_analytics.summary, {}),
+            ("savings by day", log_analytics.savings, {"by": "day"}),
+            ("savings by model", log_analytics.savings, {"by": "model"}),
+            ("savings by task", log_analytics.savings, {"by": "task"}),
+            ("latency by route", log_analytics.latency, {"by": "route"}),
+            ("latency by model (route=local)", log_analytics.latency, {"by": "model", "mask": local}),
+            ("latency by day", log_analytics.latency, {"by": "day"}),
+            ("slow top 20", log_analytics.slow, {"top": 20}),
+            ("savings by day (task=refactor, since)", log_analytics.savings, {"by": "day", "mask": recent}),
+        ):
+            seconds, _ = timed(fn, store, **kwargs)
+            rows.append({"name": name, "ms": seconds * 1000})
+        seconds, _ = timed(log_analytics.select, store, since="2025-04-01", task="refactor")
+        rows.append({"name": "filter (since + task)", "ms": seconds * 1000})
+        if args.jq_lines:
+            rows.extend(jq_baseline(log, min(args.jq_lines, args.lines), tmp))
+
+        print(f"\nColumn store: {store.rows:,} rows, {store_mb:,.0f} MB ({size_mb:,.0f} MB of JSONL)\n")
+        print_table(rows, ("name", "ms"))
+    finally:
+        shutil.rmtree(tmp)
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Benchmark: log shipping cost on the request path, and delivery through an exporter outage
+
+1. Caller cost per log entry: JSON line to stderr (to /dev/null) vs
+   LogShipper.ship() (queue put; batching, gzip and POST happen on the
+   shipper thread).
+2. Outage: entries are shipped at --rate/sec for --duration seconds to
+   an exporter.py subprocess that is killed at 1/3 of the run and
+   restarted at 2/3. Reports ship() latency during the run, how many
+   entries were sent, spilled to disk, replayed and dropped, and checks
+   that every entry was either delivered or is still in the spill file.
+
+Usage:
+    python3 benchmarks/bench_log_shipper.py --rate 2000 --duration 9
+"""
+import argparse
+import contextlib
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from bench_utils import REPO_ROOT, add_repo_paths, percentile, print_table
+
+add_repo_paths()
+from log_shipper import LogShipper  # noqa: E402
+
+ENTRY = {
+    "ts": "2025-10-20T14:23:10Z", "route": "local", "tokens_in": 1200, "tokens_out": 280,
+    "total_tokens": 1480, "latency_ms": 3500, "model": "qwen2.5-coder:7b", "task": "docstring",
+    "cost_saved_usd": 0.0296,
+}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_exporter(port: int, metrics_port: int) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(REPO_ROOT, "exporter.py"), "--port", str(port), "--metrics-port", str(metrics_port)],
+        stdout=subprocess.DEVNULL, env=dict(os.environ, EXPORTER_ECHO="off")
+    )
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port)).close()
+            break
+        except OSError:
+            time.sleep(0.05)
+    return proc
+
+
+def caller_cost(n: int, url: str, spill_dir: str) -> list:
+    rows = []
+    with open(os.devnull, "w") as null, contextlib.redirect_stderr(null):
+        t0 = time.perf_counter()
+        for _ in range(n):
+            print(json.dumps(ENTRY), file=sys.stderr, flush=True)
+        rows.append({"name": "json to stderr", "us_per_entry": (time.perf_counter() - t0) / n * 1e6})
+
+    shipper = LogShipper(url, queue_size=n + 1, spill_path=os.path.join(spill_dir, "caller.ndjson"))
+    t0 = time.perf_counter()
+    for _ in range(n):
+        shipper.ship(ENTRY)
+    rows.append({"name": "LogShipper.ship()", "us_per_entry": (time.perf_counter() - t0) / n * 1e6})
+    shipper.close(timeout=60)
+    return rows
+
+
+def outage(rate: float, duration: float, spill_dir: str) -> dict:
+    port, metrics_port = free_port(), free_port()
+    url = f"http://127.0.0.1:{port}"
+    spill = os.path.join(spill_dir, "spill.ndjson")
+    shipper = LogShipper(url, flush_s=0.2, spill_path=spill)
+    exporter = start_exporter(port, metrics_port)
+
+    latencies = []
+    shipped = 0
+    killed = restarted = False
+    t0 = time.perf_counter()
+    while (elapsed := time.perf_counter() - t0) < duration:
+        if not killed and elapsed > duration / 3:
+            exporter.kill()
+            exporter.wait()
+            killed = True
+        if killed and not restarted and elapsed > 2 * duration / 3:
+            exporter = start_exporter(port, metrics_port)
+            restarted = True
+        s = time.perf_counter()
+        shipper.ship(ENTRY)
+        latencies.append(time.perf_counter() - s)
+        shipped += 1
+        time.sleep(max(0.0, t0 + shipped / rate - time.perf_counter()))
+
+    shipper.close(timeout=60)
+    text = httpx.get(f"http://127.0.0.1:{metrics_port}/metrics").text
+    exporter.terminate()
+    exporter.wait()
+    after_restart = int(sum(float(line.rsplit(" ", 1)[1]) for line in text.splitlines()
+                            if line.startswith("copilot_bridge_requests_by_route_total")))
+    still_spilled = sum(1 for _ in open(spill, "rb")) if os.path.exists(spill) else 0
+    stats = shipper.stats()
+    delivered = stats["sent"] + stats["replayed"]
+    return {
+        "shipped": shipped,
+        "ship_p99_us": percentile(latencies, 99) * 1e6,
+        "ship_max_us": max(latencies) * 1e6,
+        **stats,
+        "still_spilled": still_spilled,
+        "lost": shipped - delivered - still_spilled - stats["dropped"],
+        "counted_after_restart": after_restart,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Log shipper benchmark")
+    parser.add_argument("--entries", type=int, default=100_000, help="Entries for the caller-cost test")
+    parser.add_argument("--rate", type=float, default=2000.0, help="Entries/sec during the outage test")
+    parser.add_argument("--duration", type=float, default=9.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as spill_dir:
+        port, metrics_port = free_port(), free_port()
+        exporter = start_exporter(port, metrics_port)
+        try:
+            rows = caller_cost(args.entries, f"http://127.0.0.1:{port}", spill_dir)
+        finally:
+            exporter.terminate()
+            exporter.wait()
+        result = outage(args.rate, args.duration, spill_dir)
+
+    print(f"\nCaller cost per log entry ({args.entries:,} entries)\n")
+    print_table(rows, ("name", "us_per_entry"))
+    print(f"\nOutage: {args.rate:g} entries/s for {args.duration:g}s, exporter down from "
+          f"{args.duration / 3:g}s to {2 * args.duration / 3:g}s\n")
+    for key, value in result.items():
+        print(f"  {key:<22} {value:,.1f}" if isinstance(value, float) else f"  {key:<22} {value:,}")
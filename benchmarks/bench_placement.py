@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Simulation: VRAM-aware placement vs fixed placements over recorded traffic
+
+Replays a routing history (synthetic here, same JSONL shape as the
+orchestrator's GET /history) through placement.simulate() for two tier
+configurations:
+
+- default: the orchestrator's own candidates (small models only)
+- big models: MODERATE prefers qwen2.5-coder:14b and COMPLEX gpt-oss:20b,
+  both listed on GPU 0 (16 GB), which cannot hold them together
+
+and three placements per configuration:
+
+- planned: PlacementPlanner.solve() on the history's traffic mix
+- first choice: each tier's first model on the first GPU that lists it
+- GPUEndpoint.models: every listed model on its GPU
+
+Each is replayed at the recorded arrival rate (latency, model loads) and
+with every request queued at once (saturated throughput, in requests per
+minute), routed load-aware (earliest finish, so a model that is not
+resident is avoided when another one can serve the tier) and static
+(always the tier's preferred placed model). Service times are the
+planner's bandwidth-based priors; a load costs weights / 2 GB/s.
+
+Usage:
+    python3 benchmarks/bench_placement.py --requests 2000 --rate 0.15
+"""
+import argparse
+import math
+import random
+import time
+
+from bench_utils import add_repo_paths, print_table
+
+add_repo_paths()
+from dual_gpu_orchestrator import DualGPUOrchestrator  # noqa: E402
+from placement import PlacementPlanner, replay_requests, simulate, traffic_mix  # noqa: E402
+
+MIX = {"SIMPLE": 0.55, "MODERATE": 0.30, "COMPLEX": 0.15}
+BIG_TIERS = {
+    "SIMPLE": ["qwen2.5-coder:1.5b", "qwen2.5-coder:3b"],
+    "MODERATE": ["qwen2.5-coder:14b", "qwen2.5-coder:7b-instruct-q8_0", "qwen2.5-coder:3b"],
+    "COMPLEX": ["gpt-oss:20b", "qwen2.5-coder:14b"],
+}
+
+
+def history(n: int, rate: float, seed: int = 0) -> list:
+    """Routing history records: Poisson arrivals, half of them audited drafts."""
+    rng = random.Random(seed)
+    t, records = 1_760_000_000.0, []
+    for seq in range(n):
+        t += rng.expovariate(rate)
+        records.append({
+            "seq": seq, "timestamp": t,
+            "task_type": "draft_generation" if rng.random() < 0.5 else "simple_generation",
+            "complexity": rng.choices(list(MIX), weights=list(MIX.values()))[0],
+        })
+    return records
+
+
+def first_choice(planner: PlacementPlanner) -> dict:
+    placement = {g: [] for g in planner.gpus}
+    for tier, models in planner.tiers.items():
+        allowed = planner.tier_gpus.get(tier, planner.gpus)
+        gpu = next((g for g in allowed if models[0] in planner.gpus[g].models), min(allowed))
+        placement[gpu].append(models[0])
+    return {g: tuple(dict.fromkeys(models)) for g, models in placement.items()}
+
+
+def compare(label: str, planner: PlacementPlanner, records: list, audited) -> list:
+    t0 = time.perf_counter()
+    plan = planner.solve(traffic_mix(records, audited))
+    solve_ms = (time.perf_counter() - t0) * 1000
+    contenders = {
+        "planned": plan.placement,
+        "first choice": first_choice(planner),
+        "GPUEndpoint.models": {g: tuple(gpu.models) for g, gpu in planner.gpus.items()},
+    }
+    rows = []
+    for routing in ("load-aware", "static"):
+        for name, placement in contenders.items():
+            kwargs = {"load_aware": routing == "load-aware"}
+            recorded = simulate(planner, placement, replay_requests(records, audited),
+                                planner.prior_service_s, **kwargs)
+            saturated = simulate(planner, placement, replay_requests(records, audited, math.inf),
+                                 planner.prior_service_s, **kwargs)
+            fits = all(planner.fits(g, models) for g, models in placement.items())
+            rows.append({
+                "name": f"{label}, {routing}: {name}",
+                "fits": "yes" if fits else "no",
+                "saturated_rpm": saturated["throughput_rps"] * 60,
+                "p50_s": recorded["p50_s"],
+                "p99_s": recorded["p99_s"],
+                "loads": recorded["loads"],
+                "load_s": recorded["load_s"],
+                "placement": "; ".join(f"gpu{g}: {', '.join(m.split(':', 1)[-1] if m.startswith('qwen') else m for m in models)}"
+                                       for g, models in placement.items()),
+            })
+    print(f"  {label}: solved in {solve_ms:.1f} ms")
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Placement simulation")
+    parser.add_argument("--requests", type=int, default=2000, help="Recorded routing decisions")
+    parser.add_argument("--rate", type=float, default=0.15, help="Recorded arrivals per second")
+    args = parser.parse_args()
+
+    orchestrator = DualGPUOrchestrator(
+        gpu0_url="http://127.0.0.1:9", gpu1_url="http://127.0.0.1:9", enable_metrics=False
+    )
+    gpus, tiers, tier_gpus = orchestrator._planner_args()
+    records = history(args.requests, args.rate)
+    audited = orchestrator.audit_policy.should_start
+
+    rows = compare("default", PlacementPlanner(gpus, tiers, tier_gpus), records, audited)
+    rows += compare("big models", PlacementPlanner(gpus, {**BIG_TIERS, "AUDIT": tiers["AUDIT"]}, tier_gpus),
+                    records, audited)
+
+    print(f"\n{args.requests} recorded requests at {args.rate:g}/s "
+          f"({', '.join(f'{t} {w:.0%}' for t, w in MIX.items())}, half audited drafts)\n")
+    print_table(rows, ("name", "fits", "saturated_rpm", "p50_s", "p99_s", "loads", "load_s"))
+    print()
+    for row in rows:
+        if "load-aware" in row["name"]:
+            print(f"  {row['name'].replace(', load-aware', '')}: {row['placement']}")
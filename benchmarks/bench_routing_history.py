@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark: unbounded list of RoutingDecision vs RoutingHistory ring buffer
+
+Appends --decisions routing decisions to a RoutingHistory (default
+capacity) and measures memory held, append cost and get_stats()-style
+reads (O(1) counters + windowed percentiles). The previous
+List[RoutingDecision] history is measured at --list-decisions and
+extrapolated linearly to --decisions, since 10M dataclass instances do
+not fit in a small machine's memory; its get_stats() cost is the four
+linear scans it used to do.
+
+Usage:
+    python3 benchmarks/bench_routing_history.py --decisions 10000000
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+from bench_utils import add_repo_paths, print_table
+
+add_repo_paths()
+from dual_gpu_orchestrator import RoutingDecision, TaskComplexity  # noqa: E402
+from routing_history import RoutingHistory  # noqa: E402
+
+TIERS = [
+    (TaskComplexity.SIMPLE, 1, "qwen2.5-coder:1.5b", "simple_task_to_gpu1"),
+    (TaskComplexity.MODERATE, 0, "qwen2.5-coder:7b-instruct-q8_0", "moderate_task_to_gpu0"),
+    (TaskComplexity.COMPLEX, 0, "qwen2.5-coder:7b-instruct-q8_0", "complex_task_to_gpu0"),
+]
+
+
+def decisions(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    now = time.time() - n * 0.001
+    for k in range(n):
+        complexity, gpu, model, reason = TIERS[rng.randrange(3)]
+        yield RoutingDecision(
+            task_type="draft_generation", complexity=complexity, selected_gpu=gpu,
+            model=model, reason=reason, timestamp=now + k * 0.001
+        ), rng.uniform(0.5, 5.0)
+
+
+def list_stats(history: list) -> dict:
+    """The old get_stats(): a linear scan per counter."""
+    return {
+        "total_requests": len(history),
+        "gpu0_requests": sum(1 for r in history if r.selected_gpu == 0),
+        "gpu1_requests": sum(1 for r in history if r.selected_gpu == 1),
+        "complexity_breakdown": {
+            c.value: sum(1 for r in history if r.complexity == c) for c in TaskComplexity
+        },
+    }
+
+
+def append_cost_ns(history, sample: list) -> float:
+    """Untraced per-decision cost of recording a decision (and its latency for the ring)."""
+    t0 = time.perf_counter()
+    if isinstance(history, list):
+        for decision, _ in sample:
+            history.append(decision)
+    else:
+        for decision, latency in sample:
+            history.set_latency(history.append(decision), latency)
+    return (time.perf_counter() - t0) / len(sample) * 1e9
+
+
+def bench_list(n: int, sample: list) -> dict:
+    append_ns = append_cost_ns([], sample)
+    gc.collect()
+    tracemalloc.start()
+    history = [decision for decision, _ in decisions(n)]
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    t0 = time.perf_counter()
+    list_stats(history)
+    stats_s = time.perf_counter() - t0
+    return {"memory": memory, "append_ns": append_ns, "stats_s": stats_s}
+
+
+def bench_ring(n: int, sample: list) -> dict:
+    append_ns = append_cost_ns(RoutingHistory(), sample)
+    gc.collect()
+    tracemalloc.start()
+    history = RoutingHistory()
+    for decision, latency in decisions(n):
+        history.set_latency(history.append(decision), latency)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    t0 = time.perf_counter()
+    history.stats()
+    history.window_percentiles(300.0, now=history._timestamp[(n - 1) % history.capacity])
+    stats_s = time.perf_counter() - t0
+    return {"memory": memory, "append_ns": append_ns, "stats_s": stats_s,
+            "retained": len(history), "columns": history.memory_bytes()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Routing history memory benchmark")
+    parser.add_argument("--decisions", type=int, default=10_000_000)
+    parser.add_argument("--list-decisions", type=int, default=1_000_000,
+                        help="Decisions actually held by the list baseline (extrapolated to --decisions)")
+    args = parser.parse_args()
+
+    sample = list(decisions(min(200_000, args.decisions), seed=1))
+    measured = bench_list(min(args.list_decisions, args.decisions), sample)
+    scale = args.decisions / min(args.list_decisions, args.decisions)
+    ring = bench_ring(args.decisions, sample)
+
+    rows = [
+        {"name": "list[RoutingDecision]", "retained": args.decisions,
+         "memory_mb": measured["memory"] * scale / 1e6, "append_ns": measured["append_ns"],
+         "get_stats_ms": measured["stats_s"] * scale * 1000},
+        {"name": "RoutingHistory", "retained": ring["retained"],
+         "memory_mb": ring["memory"] / 1e6, "append_ns": ring["append_ns"],
+         "get_stats_ms": ring["stats_s"] * 1000},
+    ]
+    print(f"\n{args.decisions:,} routing decisions (list baseline measured at {args.list_decisions:,} "
+          f"and scaled x{scale:g}); ring columns {ring['columns'] / 1e3:.0f} kB\n")
+    print_table(rows, ("name", "retained", "memory_mb", "append_ns", "get_stats_ms"))
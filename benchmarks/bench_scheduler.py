@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Load test: GPU scheduler admission control under overload
+
+One stub Ollama endpoint stands in for a GPU that serves --slots
+generations at once. Open-loop Poisson arrivals at --overload times its
+capacity (a mix of interactive / chat / batch priorities) go through
+DualGPUOrchestrator.call_model twice:
+
+- unbounded: no admission control, every request is sent to the GPU and
+  waits in its queue, so latency keeps growing for as long as the
+  overload lasts
+- scheduled: GPUScheduler slots + priority queues + per-priority
+  deadlines; requests that cannot start in time are rejected at once
+  (429 / cloud redirect in the proxies)
+
+Latency is measured from the scheduled arrival time. p99 is reported
+for the first and second half of the run: stable admission control
+keeps them close, an unbounded queue does not.
+
+Usage:
+    python3 benchmarks/bench_scheduler.py --seconds 20 --overload 1.5
+"""
+import argparse
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench_utils import add_repo_paths, percentile, print_table
+from stub_ollama import run_in_thread
+
+add_repo_paths()
+from dual_gpu_orchestrator import DualGPUOrchestrator  # noqa: E402
+from scheduler import GPUScheduler, Priority  # noqa: E402
+
+MIX = [(Priority.INTERACTIVE, 0.3), (Priority.CHAT, 0.5), (Priority.BATCH, 0.2)]
+
+
+def run(orchestrator: DualGPUOrchestrator, arrivals: list, seconds: float) -> list:
+    """Fire each (offset, priority) at its time; returns (offset, priority, latency, ok, overloaded)."""
+    results = []
+    lock = threading.Lock()
+
+    def one(offset, priority, due):
+        result = orchestrator.call_model(orchestrator.gpu0, "qwen2.5-coder:7b-instruct-q8_0",
+                                         "benchmark prompt", priority=priority)
+        with lock:
+            results.append((offset, priority, time.perf_counter() - due,
+                            result["success"], bool(result.get("overloaded"))))
+
+    with ThreadPoolExecutor(max_workers=2048) as pool:
+        t0 = time.perf_counter()
+        for offset, priority in arrivals:
+            delay = t0 + offset - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(one, offset, priority, t0 + offset)
+    return results
+
+
+def rows_for(name: str, results: list, seconds: float) -> list:
+    rows = []
+    for priority in [None, *Priority]:
+        subset = [r for r in results if priority is None or r[1] == priority]
+        served = [r for r in subset if r[3]]
+        first = [r[2] for r in served if r[0] < seconds / 2]
+        second = [r[2] for r in served if r[0] >= seconds / 2]
+        rows.append({
+            "name": name,
+            "priority": "all" if priority is None else priority.name.lower(),
+            "requests": len(subset),
+            "served": len(served),
+            "rejected_%": 100.0 * sum(r[4] for r in subset) / max(1, len(subset)),
+            "p50_ms": percentile([r[2] for r in served], 50) * 1000,
+            "p99_1st_half_ms": percentile(first, 99) * 1000,
+            "p99_2nd_half_ms": percentile(second, 99) * 1000,
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scheduler overload load test")
+    parser.add_argument("--seconds", type=float, default=20.0, help="Duration of the arrival stream")
+    parser.add_argument("--overload", type=float, default=1.5, help="Arrival rate / GPU capacity")
+    parser.add_argument("--slots", type=int, default=2, help="Generations the stub GPU serves at once")
+    parser.add_argument("--tokens", type=int, default=20, help="Tokens per generation")
+    parser.add_argument("--tps", type=float, default=200.0, help="Stub tokens/sec")
+    parser.add_argument("--deadline-interactive", type=float, default=0.5)
+    parser.add_argument("--deadline-chat", type=float, default=2.0)
+    parser.add_argument("--deadline-batch", type=float, default=5.0)
+    args = parser.parse_args()
+
+    delay = 0.01
+    _, port = run_in_thread(delay=delay, tps=args.tps, tokens=args.tokens, parallel=args.slots)
+    url = f"http://127.0.0.1:{port}"
+
+    service_s = delay + args.tokens / args.tps
+    rate = args.overload * args.slots / service_s
+    rng = random.Random(0)
+    arrivals, t = [], rng.expovariate(rate)
+    while t < args.seconds:
+        arrivals.append((t, rng.choices([p for p, _ in MIX], weights=[w for _, w in MIX])[0]))
+        t += rng.expovariate(rate)
+
+    deadlines = {
+        Priority.INTERACTIVE: args.deadline_interactive,
+        Priority.CHAT: args.deadline_chat,
+        Priority.BATCH: args.deadline_batch,
+    }
+    rows = []
+    for name, scheduler in (
+        ("unbounded", GPUScheduler("gpu0", slots=1_000_000, deadlines={p: None for p in Priority})),
+        ("scheduled", GPUScheduler("gpu0", slots=args.slots, deadlines=deadlines, service_prior=service_s)),
+    ):
+        orchestrator = DualGPUOrchestrator(gpu0_url=url, gpu1_url=url, enable_metrics=False)
+        orchestrator.schedulers[0] = scheduler
+        rows += rows_for(name, run(orchestrator, arrivals, args.seconds), args.seconds)
+
+    print(f"\n{len(arrivals)} arrivals over {args.seconds:g}s at {rate:.1f}/s "
+          f"({args.overload:g}x capacity of {args.slots / service_s:.1f}/s); "
+          f"deadlines interactive {args.deadline_interactive:g}s, chat {args.deadline_chat:g}s, "
+          f"batch {args.deadline_batch:g}s\n")
+    print_table(rows, ("name", "priority", "requests", "served", "rejected_%",
+                       "p50_ms", "p99_1st_half_ms", "p99_2nd_half_ms"))
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: semantic cache hit rate and lookup latency
+
+Fills a SemanticCache with synthetic "docstring for this code" prompts,
+then queries it with near-duplicates (whitespace changes, a renamed
+identifier, a rephrased instruction) and with unseen prompts. Reports
+hit rate per variant, false hits on unseen prompts, lookup p50/p99 and
+index memory at each cache size.
+
+Embeddings come from a deterministic hashed bag-of-words (the same idea
+as stub_ollama's /api/embeddings), so lookup cost is measured without
+the embedding round-trip.
+
+Usage:
+    python3 benchmarks/bench_semantic_cache.py --sizes 10000 100000 --dim 384
+"""
+import argparse
+import random
+import time
+import zlib
+
+import numpy as np
+
+from bench_utils import add_repo_paths, percentile, print_table
+
+add_repo_paths()
+from semantic_cache import SemanticCache  # noqa: E402
+
+INSTRUCTIONS = [
+    ("Write a docstring for this function", "Add a docstring to the following function"),
+    ("Explain what this code does", "Describe what the code below does"),
+    ("Add comments to this snippet", "Comment the following snippet"),
+]
+
+
+def hashed_embedder(dim: int):
+    """Signed hashed bag-of-words, deterministic across runs."""
+    def embed(text: str) -> np.ndarray:
+        vec = np.zeros(dim, dtype=np.float32)
+        for word in text.lower().split():
+            h = zlib.crc32(word.encode())
+            vec[h % dim] += 1.0 if (h >> 31) & 1 else -1.0
+        return vec
+    return embed
+
+
+def make_prompt(rng: random.Random, vocab: list, words: int) -> tuple:
+    """Return (instruction index, code tokens)."""
+    return rng.randrange(len(INSTRUCTIONS)), [rng.choice(vocab) for _ in range(words)]
+
+
+def render(instruction: str, code: list, sep: str = " ") -> str:
+    return f"{instruction}:\n" + sep.join(code)
+
+
+def variants(rng: random.Random, vocab: list, item: tuple) -> dict:
+    idx, code = item
+    plain, rephrased = INSTRUCTIONS[idx]
+    renamed = list(code)
+    renamed[rng.randrange(len(renamed))] = rng.choice(vocab) + "_renamed"
+    return {
+        "whitespace": render(plain, code, sep="  \n    "),
+        "renamed identifier": render(plain, renamed),
+        "rephrased": render(rephrased, code),
+    }
+
+
+def run(size: int, dim: int, queries: int, words: int, seed: int) -> list:
+    rng = random.Random(seed)
+    vocab = [f"ident{i}" for i in range(20000)]
+    cache = SemanticCache(hashed_embedder(dim), capacity=size)
+
+    items = [make_prompt(rng, vocab, words) for _ in range(size)]
+    for idx, code in items:
+        cache.add(render(INSTRUCTIONS[idx][0], code), {"text": "cached"}, task="docstring", model="bench")
+
+    sample = rng.sample(items, min(queries, size))
+    cases = {name: [] for name in ("whitespace", "renamed identifier", "rephrased")}
+    for item in sample:
+        for name, prompt in variants(rng, vocab, item).items():
+            cases[name].append(prompt)
+    cases["unseen prompt"] = [
+        render(INSTRUCTIONS[i][0], code) for i, code in (make_prompt(rng, vocab, words) for _ in sample)
+    ]
+
+    rows = []
+    for name, prompts in cases.items():
+        vectors = [cache.embed(p) for p in prompts]
+        latencies, hits = [], 0
+        for prompt, vector in zip(prompts, vectors):
+            t0 = time.perf_counter()
+            value, _, _ = cache.lookup(prompt, task="docstring", model="bench", vector=vector)
+            latencies.append(time.perf_counter() - t0)
+            hits += value is not None
+        rows.append({
+            "entries": size,
+            "query": name,
+            "hit_rate": hits / len(prompts) * 100,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+            "index_mb": cache.memory_bytes() / 1e6,
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Semantic cache micro-benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimension")
+    parser.add_argument("--queries", type=int, default=500, help="Lookups per query type")
+    parser.add_argument("--words", type=int, default=40, help="Code tokens per prompt")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rows = []
+    for size in args.sizes:
+        rows.extend(run(size, args.dim, args.queries, args.words, args.seed))
+
+    print(f"\ndim={args.dim}, {args.words} code tokens/prompt, task=docstring "
+          f"(threshold {SemanticCache(lambda t: t).threshold_for('docstring')})\n")
+    print_table(rows, ("entries", "query", "hit_rate", "p50_ms", "p99_ms", "index_mb"))
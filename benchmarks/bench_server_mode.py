@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Load benchmark: proxy.py one-shot (process per request) vs --serve mode
+
+Starts a stub Ollama, then drives the same cheap (LOCAL-routed) payload
+through both modes with the same client concurrency and reports
+requests/sec and p50/p99 latency.
+
+Usage:
+    python3 benchmarks/bench_server_mode.py --requests 2000 --concurrency 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+import httpx
+
+from bench_utils import REPO_ROOT, closed_loop, print_table, summarize
+from stub_ollama import StubOllama
+
+PAYLOAD = {"messages": [{"role": "user", "content": "Write a docstring for this function"}]}
+
+
+async def bench_one_shot(env: dict, requests: int, concurrency: int) -> dict:
+    """Baseline: spawn `python3 proxy.py` per request, payload on stdin."""
+    sem = asyncio.Semaphore(concurrency)
+    latencies = []
+    data = json.dumps(PAYLOAD).encode()
+
+    async def one():
+        async with sem:
+            t0 = time.perf_counter()
+            proc = await asyncio.create_subprocess_exec(
+                sys.executable, os.path.join(REPO_ROOT, "proxy.py"),
+                stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL, env=env,
+            )
+            await proc.communicate(data)
+            latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return summarize("one-shot (process/request)", latencies, time.perf_counter() - t0)
+
+
+async def bench_server(env: dict, port: int, requests: int, concurrency: int) -> dict:
+    """Resident server: one proxy process, pooled upstream connections."""
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable, os.path.join(REPO_ROOT, "proxy.py"), "--serve",
+        "--host", "127.0.0.1", "--port", str(port),
+        stderr=asyncio.subprocess.DEVNULL, env=env,
+    )
+    try:
+        async with httpx.AsyncClient() as client:
+            for _ in range(100):
+                try:
+                    await client.get(f"http://127.0.0.1:{port}/health")
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.1)
+        latencies, wall, _ = await closed_loop("127.0.0.1", port, "/v1/chat/completions",
+                                               PAYLOAD, requests, concurrency)
+        return summarize("--serve (resident)", latencies, wall)
+    finally:
+        proc.terminate()
+        await proc.wait()
+
+
+async def run(args):
+    stub = StubOllama(delay=args.delay, tokens=args.tokens)
+    stub_port = await stub.start()
+    env = dict(os.environ, GITHUB_TOKEN=os.getenv("GITHUB_TOKEN", "bench"),
+               OLLAMA_BASE=f"http://127.0.0.1:{stub_port}")
+
+    rows = []
+    if not args.skip_one_shot:
+        rows.append(await bench_one_shot(env, min(args.requests, args.one_shot_requests), args.concurrency))
+        one_shot_conns = stub.connections
+    rows.append(await bench_server(env, args.port, args.requests, args.concurrency))
+
+    print(f"\nStub: delay={args.delay}s, {args.tokens} tokens; client concurrency={args.concurrency}\n")
+    print_table(rows)
+    if not args.skip_one_shot:
+        print(f"\nUpstream connections opened: one-shot={one_shot_conns}, "
+              f"server={stub.connections - one_shot_conns}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="proxy.py one-shot vs server-mode load test")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--one-shot-requests", type=int, default=200,
+                        help="Cap for the (slow) process-per-request baseline")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--delay", type=float, default=0.02, help="Stub Ollama latency (s)")
+    parser.add_argument("--tokens", type=int, default=20)
+    parser.add_argument("--port", type=int, default=11536, help="Port for the bridge under test")
+    parser.add_argument("--skip-one-shot", action="store_true")
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: token counting cost per prompt
+
+Builds typical bridge prompts ("write a docstring for <code>") from the
+repository's own Python files and the refactor test samples, then times
+token_counter on each: cold (first sight of the string) and memoized
+(the same prompt counted again for cache lookup / routing / logging).
+
+Also shows how far the old words x 1.3 and chars // 4 estimates drift
+from the counter, per prompt, as a mean absolute error.
+
+Usage:
+    python3 benchmarks/bench_token_counter.py --backends regex tiktoken
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+from bench_utils import REPO_ROOT, add_repo_paths, percentile, print_table
+
+add_repo_paths()
+sys.path.insert(0, os.path.join(REPO_ROOT, "refactor-quality-tests"))
+from test_samples import ALL_SAMPLES  # noqa: E402
+from token_counter import TokenCounter  # noqa: E402
+
+
+def build_prompts(max_chars: int) -> list:
+    prompts = [f"Refactor the following Python code:\n{s['code']}" for s in ALL_SAMPLES]
+    for path in sorted(glob.glob(os.path.join(REPO_ROOT, "**", "*.py"), recursive=True)):
+        with open(path, encoding="utf-8") as f:
+            source = f.read()
+        for i in range(0, len(source), max_chars):
+            prompts.append(f"Write a docstring for this code:\n{source[i:i + max_chars]}")
+    return prompts
+
+
+def run(backend: str, prompts: list) -> dict:
+    counter = TokenCounter(backend=backend)
+    counter.count("warm up")  # loads the tokenizer
+    if backend == "tiktoken" and not counter.backend.startswith("tiktoken"):
+        return None
+
+    cold, warm, counts = [], [], []
+    for prompt in prompts:
+        t0 = time.perf_counter()
+        counts.append(counter.count(prompt))
+        cold.append(time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        counter.count(prompt)
+        warm.append(time.perf_counter() - t0)
+
+    words = [int(len(p.split()) * 1.3) for p in prompts]
+    chars = [len(p) // 4 for p in prompts]
+    return {
+        "backend": counter.backend,
+        "prompts": len(prompts),
+        "avg_tokens": sum(counts) / len(counts),
+        "cold_p50_ms": percentile(cold, 50) * 1000,
+        "cold_p99_ms": percentile(cold, 99) * 1000,
+        "memo_p99_ms": percentile(warm, 99) * 1000,
+        "words*1.3_err%": _error(words, counts),
+        "chars/4_err%": _error(chars, counts),
+    }
+
+
+def _error(estimates: list, counts: list) -> float:
+    return sum(abs(e - c) / c for e, c in zip(estimates, counts) if c) / len(counts) * 100
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Token counter micro-benchmark")
+    parser.add_argument("--backends", nargs="+", default=["regex", "tiktoken"])
+    parser.add_argument("--max-chars", type=int, default=4000, help="Code chars per prompt")
+    args = parser.parse_args()
+
+    prompts = build_prompts(args.max_chars)
+    rows = [row for row in (run(b, prompts) for b in args.backends) if row]
+
+    print()
+    print_table(rows, ("backend", "prompts", "avg_tokens", "cold_p50_ms", "cold_p99_ms",
+                       "memo_p99_ms", "words*1.3_err%", "chars/4_err%"))
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark: tracing overhead per request
+
+Runs a request-shaped call tree with the same instrumentation as a
+dual-GPU request (process_request > route_decision, classify_task,
+select_gpu_and_model, call_model > queue_wait, generate > Ollama
+load / prompt_eval / eval, and the trace_id lookup in log_request),
+with functions that do no work, so the numbers are the tracing cost
+alone:
+
+- baseline: the same functions without decorators
+- off: BRIDGE_TRACE_SAMPLE=0 (the default)
+- 1% / 100% sampled, exported as OTLP/JSON lines to a temp file
+
+Usage:
+    python3 benchmarks/bench_tracing.py --requests 50000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from bench_utils import add_repo_paths, print_table
+
+add_repo_paths()
+import tracing  # noqa: E402
+
+OLLAMA_RESULT = {"load_duration": 2_000_000, "prompt_eval_count": 120, "prompt_eval_duration": 40_000_000,
+                 "eval_count": 200, "eval_duration": 2_500_000_000}
+
+
+def build(traced: bool):
+    """The call tree, decorated or not."""
+    wrap = tracing.traced if traced else (lambda name: (lambda fn: fn))
+
+    @wrap("route_decision")
+    def route_decision():
+        return "local"
+
+    @wrap("classify_task")
+    def classify_task():
+        return "SIMPLE"
+
+    @wrap("select_gpu_and_model")
+    def select_gpu_and_model():
+        if traced:
+            tracing.annotate(gpu_id=1, model="qwen2.5-coder:1.5b", reason="simple_task_to_gpu1")
+        return 1, "qwen2.5-coder:1.5b"
+
+    @wrap("call_model")
+    def call_model(gpu_id, model):
+        if traced:
+            tracing.annotate(gpu_id=gpu_id, model=model, priority="chat")
+            now = time.time_ns()
+            tracing.record("queue_wait", now, now)
+            tracing.record_generation(now, now + 2_600_000_000, OLLAMA_RESULT)
+        return "answer"
+
+    @wrap("process_request")
+    def process_request():
+        route_decision()
+        classify_task()
+        gpu_id, model = select_gpu_and_model()
+        answer = call_model(gpu_id, model)
+        entry = {"route": "local", "model": model}
+        if traced:
+            trace_id = tracing.current_trace_id()
+            if trace_id:
+                entry["trace_id"] = trace_id
+                tracing.annotate(route="local", model=model, task="docstring")
+        return answer
+
+    return process_request
+
+
+def run(n: int, traced: bool, sample: float, output: str) -> float:
+    tracing.configure(sample=sample, output=output)
+    process_request = build(traced)
+    t0 = time.perf_counter()
+    for _ in range(n):
+        process_request()
+    elapsed = time.perf_counter() - t0
+    tracing.configure(output=output)  # flush and close the file
+    return elapsed / n * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tracing overhead per request")
+    parser.add_argument("--requests", type=int, default=50_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, "traces.otlp.jsonl")
+        rows = []
+        baseline = run(args.requests, traced=False, sample=0.0, output=output)
+        for name, traced, sample in (("baseline (no decorators)", False, 0.0), ("off (sample 0)", True, 0.0),
+                                     ("1% sampled", True, 0.01), ("100% sampled", True, 1.0)):
+            if os.path.exists(output):
+                os.remove(output)
+            us = run(args.requests, traced, sample, output)
+            traces = sum(1 for _ in open(output)) if os.path.exists(output) else 0
+            size = os.path.getsize(output) / traces if traces else 0
+            rows.append({"name": name, "us_per_request": us, "overhead_us": us - baseline,
+                         "traces": traces, "bytes_per_trace": size})
+        with open(output) as f:
+            spans = json.loads(f.readline())["resourceSpans"][0]["scopeSpans"][0]["spans"]
+
+    print(f"\n{args.requests:,} request-shaped call trees ({len(spans)} spans each when sampled)\n")
+    print_table(rows, ("name", "us_per_request", "overhead_us", "traces", "bytes_per_trace"))
@@ -0,0 +1,105 @@
+"""
+Shared helpers for the benchmark scripts (percentiles, result tables).
+"""
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DUAL_GPU_DIR = os.path.join(REPO_ROOT, "dual-gpu-implementation")
+
+
+def add_repo_paths():
+    """Make the bridge modules importable from benchmarks/."""
+    for path in (REPO_ROOT, DUAL_GPU_DIR):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+
+def percentile(values, pct: float) -> float:
+    """Nearest-rank percentile of an unsorted sequence (0 if empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[k]
+
+
+def summarize(name: str, latencies_s, wall_s: float) -> dict:
+    """Build a result row from per-request latencies (seconds) and wall time."""
+    n = len(latencies_s)
+    return {
+        "name": name,
+        "requests": n,
+        "rps": n / wall_s if wall_s else 0.0,
+        "p50_ms": percentile(latencies_s, 50) * 1000,
+        "p99_ms": percentile(latencies_s, 99) * 1000,
+    }
+
+
+def print_table(rows, columns=("name", "requests", "rps", "p50_ms", "p99_ms")):
+    """Print result rows as an aligned table."""
+    widths = {c: max(len(c), *(len(_fmt(r.get(c))) for r in rows)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    print("  ".join("─" * widths[c] for c in columns))
+    for r in rows:
+        print("  ".join(_fmt(r.get(c)).ljust(widths[c]) for c in columns))
+
+
+def _fmt(value) -> str:
+    if isinstance(value, float):
+        return f"{value:,.1f}"
+    return str(value)
+
+
+async def _read_response(reader) -> tuple[int, bytes]:
+    """Read one HTTP/1.1 response (Content-Length or chunked body)."""
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while (h := await reader.readline()) not in (b"\r\n", b"\n", b""):
+        k, _, v = h.decode("latin-1").partition(":")
+        headers[k.strip().lower()] = v.strip()
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        body = bytearray()
+        while (size := int((await reader.readline()).strip(), 16)):
+            body += await reader.readexactly(size + 2)
+            del body[-2:]
+        await reader.readline()
+        return status, bytes(body)
+    return status, await reader.readexactly(int(headers.get("content-length", 0)))
+
+
+async def closed_loop(host: str, port: int, path: str, payload: dict,
+                      requests: int, concurrency: int) -> tuple[list, float, dict]:
+    """
+    Closed-loop load generator: `concurrency` keep-alive connections each
+    send requests back-to-back until `requests` have completed.
+
+    Deliberately bypasses httpx so the client is never the bottleneck.
+    Returns (latencies_s, wall_s, status_counts).
+    """
+    body = json.dumps(payload).encode()
+    request = (f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+               f"Content-Length: {len(body)}\r\n\r\n").encode() + body
+    remaining = [requests]
+    latencies, statuses = [], {}
+
+    async def worker():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                t0 = time.perf_counter()
+                writer.write(request)
+                status, _ = await _read_response(reader)
+                latencies.append(time.perf_counter() - t0)
+                statuses[status] = statuses.get(status, 0) + 1
+        finally:
+            writer.close()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - t0, statuses
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Simulation: cold starts with and without the warm pool
+
+Two stub Ollama endpoints stand in for the GPUs (16 GB and 8 GB of VRAM).
+Like Ollama, they unload a model once it has been idle for its keep_alive
+and charge --load-time to bring it back. Traffic comes in bursts (a
+developer working, then pausing) with idle gaps longer than the default
+keep_alive, routed through select_gpu_and_model + call_model with the
+static tier mapping (each tier has its own model) and with load-aware
+selection (which already avoids models that are not resident):
+
+- default: Ollama's keep_alive only, every burst starts cold
+- warm pool: warm_pool.WarmPool preloads the hot set and keeps it warm
+
+Time is scaled down: --keep-alive stands in for Ollama's 5 minutes and
+--gap for a pause of several minutes.
+
+Usage:
+    python3 benchmarks/bench_warm_pool.py --bursts 8 --burst-size 12 --load-time 0.5
+"""
+import argparse
+import random
+import time
+from collections import Counter
+
+from bench_utils import add_repo_paths, percentile, print_table
+from stub_ollama import run_in_thread
+
+add_repo_paths()
+from dual_gpu_orchestrator import DualGPUOrchestrator, TaskComplexity  # noqa: E402
+import warm_pool  # noqa: E402
+from warm_pool import WarmPool  # noqa: E402
+
+MIX = [(TaskComplexity.SIMPLE, 0.6), (TaskComplexity.MODERATE, 0.3), (TaskComplexity.COMPLEX, 0.1)]
+
+
+def run(name: str, args, load_aware: bool, warm: bool) -> dict:
+    stub0, port0 = run_in_thread(delay=0.01, tps=400, tokens=20, load_time=args.load_time,
+                                 keep_alive=args.keep_alive, vram_gb=16)
+    stub1, port1 = run_in_thread(delay=0.01, tps=200, tokens=20, load_time=args.load_time,
+                                 keep_alive=args.keep_alive, vram_gb=8)
+    orchestrator = DualGPUOrchestrator(
+        gpu0_url=f"http://127.0.0.1:{port0}",
+        gpu1_url=f"http://127.0.0.1:{port1}",
+        enable_metrics=False,
+        load_aware=load_aware
+    )
+    orchestrator.load.ps_ttl = args.keep_alive / 10
+    pool = None
+    if warm:
+        pool = WarmPool([orchestrator.gpu0, orchestrator.gpu1], orchestrator.load,
+                        interval=args.keep_alive / 6, window_s=args.gap * args.bursts * 2,
+                        keep_alive="1h", idle_s=args.keep_alive, ollama_keep_alive_s=args.keep_alive)
+        orchestrator.warm_pool = pool
+
+    rng = random.Random(0)
+    latencies, cold, models = [], 0, Counter()
+    t0 = time.perf_counter()
+    for burst in range(args.bursts):
+        for complexity in rng.choices([c for c, _ in MIX], weights=[w for _, w in MIX], k=args.burst_size):
+            start = time.perf_counter()
+            gpu, model, _ = orchestrator.select_gpu_and_model(complexity)
+            result = orchestrator.call_model(gpu, model, "benchmark prompt")
+            assert result["success"], result.get("error")
+            latencies.append(time.perf_counter() - start)
+            cold += warm_pool.is_cold(result["timings"].get("load_ms", 0) / 1000)
+            models[f"gpu{gpu.gpu_id}:{model.split(':')[-1]}"] += 1
+        if burst < args.bursts - 1:
+            time.sleep(args.gap)
+    wall = time.perf_counter() - t0
+    if pool:
+        pool.close()
+
+    stats = pool.stats() if pool else {}
+    return {
+        "name": name,
+        "requests": len(latencies),
+        "cold_starts": cold,
+        "cold_rate": f"{cold / len(latencies):.1%}",
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": sum(latencies) / len(latencies) * 1000,
+        "loads": stub0.loads + stub1.loads,
+        "load_s_saved": stats.get("load_s_saved", 0.0),
+        "busy_s": wall - args.gap * (args.bursts - 1),
+        "routed": ", ".join(f"{m}={n}" for m, n in sorted(models.items())),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Warm pool simulation")
+    parser.add_argument("--bursts", type=int, default=8)
+    parser.add_argument("--burst-size", type=int, default=12, help="Requests per burst")
+    parser.add_argument("--load-time", type=float, default=0.5, help="Model load time (s)")
+    parser.add_argument("--keep-alive", type=float, default=1.5, help="Stub's default keep_alive (s)")
+    parser.add_argument("--gap", type=float, default=2.0, help="Idle seconds between bursts")
+    args = parser.parse_args()
+    warm_pool.COLD_START_S = args.load_time / 2
+
+    rows = [run(f"{routing}, {'warm pool' if warm else 'default keep_alive'}", args, routing == "load-aware", warm)
+            for routing in ("static", "load-aware") for warm in (False, True)]
+
+    print(f"\n{args.bursts} bursts x {args.burst_size} requests "
+          f"({', '.join(f'{c.name} {w:.0%}' for c, w in MIX)}), {args.gap:g}s gaps; "
+          f"load {args.load_time:g}s, keep_alive {args.keep_alive:g}s\n")
+    print_table(rows, ("name", "requests", "cold_starts", "cold_rate", "p50_ms", "p99_ms", "mean_ms",
+                       "loads", "load_s_saved", "busy_s"))
+    for row in rows:
+        print(f"  {row['name']}: {row['routed']}")
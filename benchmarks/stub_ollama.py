@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Stub Ollama / Copilot server for benchmarks
+
+Speaks just enough of the Ollama HTTP API (and the OpenAI-style
+/chat/completions route) to load-test the bridge without a GPU:
+
+- POST /api/generate      (stream=false JSON or stream=true NDJSON)
+- POST /api/embeddings    (deterministic hashed vectors)
+- GET  /api/ps            (models loaded now, sized from their tag)
+- POST /api/show          (fake parameter sizes)
+- POST /chat/completions  (cloud stand-in)
+
+Every response carries the same timing fields real Ollama returns
+(eval_count, eval_duration, prompt_eval_count, load_duration, ...).
+Model residency follows Ollama's rules: keep_alive (per request, or the
+server default) unloads idle models, keep_alive 0 unloads right away, an
+empty prompt only loads the model, a request with a different num_ctx
+reloads it, and when vram_gb is set, loading a model that does not fit
+evicts the least recently used ones. Prompts count 4 characters per token
+and are clipped to num_ctx, as Ollama truncates them.
+
+Usage:
+    python3 benchmarks/stub_ollama.py --port 11434 --delay 0.05 --tps 200
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import threading
+import time
+
+REASONS = {200: "OK", 404: "Not Found", 400: "Bad Request"}
+
+# Ollama's context window when a request sets no num_ctx
+DEFAULT_NUM_CTX = 4096
+
+
+class StubOllama:
+    """
+    In-process stub server.
+
+    Args:
+        delay: fixed per-request latency in seconds (prompt processing)
+        tps: generated tokens per second
+        tokens: tokens generated per request
+        load_time: seconds added when a model that is not loaded is requested
+        parallel: generations served at once (0 = unlimited); like a GPU,
+            extra requests queue
+        keep_alive: default seconds an idle model stays loaded (0 = forever)
+        vram_gb: memory for loaded models (0 = unlimited); each takes
+            0.7 GB per billion parameters in its tag
+    """
+
+    def __init__(self, delay: float = 0.05, tps: float = 200.0, tokens: int = 20,
+                 load_time: float = 0.0, embed_dim: int = 64, parallel: int = 0,
+                 keep_alive: float = 0.0, vram_gb: float = 0.0):
+        self.delay = delay
+        self.parallel = parallel
+        self._slots = None
+        self.tps = tps
+        self.tokens = tokens
+        self.load_time = load_time
+        self.keep_alive = keep_alive
+        self.vram_gb = vram_gb
+        self.embed_dim = embed_dim
+        self.loaded = {}
+        self.expires = {}
+        self.num_ctx = {}
+        self.loads = 0
+        self.requests = 0
+        self.connections = 0
+        self.in_flight = 0
+        self.server = None
+
+    # ------------------------------------------------------------------
+    # Handlers
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _params_b(model: str) -> float:
+        size = "".join(c for c in model.split(":")[-1].split("-")[0] if c.isdigit() or c == ".")
+        return float(size) if size else 7.0
+
+    def _size_gb(self, model: str) -> float:
+        return 0.7 * self._params_b(model)
+
+    def _keep_alive_s(self, value) -> float:
+        """Ollama's keep_alive: seconds or a duration like "30m"; negative = forever."""
+        if value is None:
+            return self.keep_alive or math.inf
+        if isinstance(value, str):
+            units = {"s": 1, "m": 60, "h": 3600}
+            value = float(value[:-1]) * units[value[-1]] if value[-1] in units else float(value)
+        return math.inf if value < 0 else value
+
+    def _expire(self) -> None:
+        now = time.time()
+        for model in [m for m, until in self.expires.items() if until <= now]:
+            self.loaded.pop(model, None)
+            self.expires.pop(model, None)
+
+    def _load(self, model: str, keep_alive=None, num_ctx: int = DEFAULT_NUM_CTX) -> float:
+        self._expire()
+        now = time.time()
+        load = 0.0
+        if self.num_ctx.get(model) != num_ctx:
+            self.loaded.pop(model, None)
+        if model not in self.loaded:
+            if self.vram_gb:
+                # Evict least recently used models until this one fits
+                while self.loaded and sum(map(self._size_gb, self.loaded)) + self._size_gb(model) > self.vram_gb:
+                    lru = min(self.loaded, key=self.loaded.get)
+                    self.loaded.pop(lru)
+                    self.expires.pop(lru, None)
+            load = self.load_time
+            self.loads += 1
+            self.num_ctx[model] = num_ctx
+        self.loaded[model] = now
+        self.expires[model] = now + self._keep_alive_s(keep_alive)
+        return load
+
+    def _timings(self, prompt: str, load: float, gen: float, num_ctx: int = DEFAULT_NUM_CTX) -> dict:
+        return {
+            "done": True,
+            "total_duration": int((self.delay + load + gen) * 1e9),
+            "load_duration": int(load * 1e9),
+            "prompt_eval_count": min(max(1, len(prompt) // 4), num_ctx),
+            "prompt_eval_duration": int(self.delay * 1e9),
+            "eval_count": self.tokens,
+            "eval_duration": int(gen * 1e9),
+        }
+
+    async def generate(self, payload: dict, writer) -> None:
+        if not self.parallel:
+            await self._generate(payload, writer)
+        else:
+            if self._slots is None:
+                self._slots = asyncio.Semaphore(self.parallel)
+            async with self._slots:
+                await self._generate(payload, writer)
+        # Like Ollama, the keep_alive countdown starts when the request is done
+        model = payload.get("model", "stub")
+        if model in self.expires:
+            self.expires[model] = time.time() + self._keep_alive_s(payload.get("keep_alive"))
+
+    async def _generate(self, payload: dict, writer) -> None:
+        model = payload.get("model", "stub")
+        prompt = payload.get("prompt", "")
+        num_predict = payload.get("options", {}).get("num_predict")
+        num_ctx = payload.get("options", {}).get("num_ctx", DEFAULT_NUM_CTX)
+        tokens = min(self.tokens, num_predict) if num_predict else self.tokens
+        keep_alive = payload.get("keep_alive")
+        if not prompt and keep_alive is not None and self._keep_alive_s(keep_alive) == 0:
+            self.loaded.pop(model, None)
+            self.expires.pop(model, None)
+            await self._send(writer, 200, json.dumps({"model": model, "done": True, "done_reason": "unload"}).encode())
+            return
+        load = self._load(model, keep_alive, num_ctx)
+        await asyncio.sleep(self.delay + load if prompt else load)
+        if not prompt:
+            # Empty prompt: Ollama just loads the model
+            body = {"model": model, "response": "", "done": True, "done_reason": "load",
+                    "total_duration": int(load * 1e9), "load_duration": int(load * 1e9)}
+            await self._send(writer, 200, json.dumps(body).encode())
+            return
+        per_token = 1.0 / self.tps if self.tps else 0.0
+
+        if not payload.get("stream", True):
+            await asyncio.sleep(per_token * tokens)
+            body = {"model": model, "response": " ".join(["tok"] * tokens)}
+            body.update(self._timings(prompt, load, per_token * tokens, num_ctx))
+            body["eval_count"] = tokens
+            await self._send(writer, 200, json.dumps(body).encode())
+            return
+
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+                     b"Transfer-Encoding: chunked\r\n\r\n")
+        for _ in range(tokens):
+            await asyncio.sleep(per_token)
+            self._chunk(writer, json.dumps({"model": model, "response": "tok ", "done": False}) + "\n")
+            await writer.drain()
+        final = {"model": model, "response": ""}
+        final.update(self._timings(prompt, load, per_token * tokens, num_ctx))
+        final["eval_count"] = tokens
+        self._chunk(writer, json.dumps(final) + "\n")
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    def embed(self, payload: dict) -> dict:
+        text = payload.get("prompt", "")
+        vec = [0.0] * self.embed_dim
+        for word in text.lower().split():
+            h = int.from_bytes(hashlib.blake2b(word.encode(), digest_size=8).digest(), "little")
+            vec[h % self.embed_dim] += 1.0 if (h >> 32) & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+        return {"embedding": [v / norm for v in vec]}
+
+    def ps(self) -> dict:
+        self._expire()
+        return {"models": [
+            {"name": m, "model": m, "size": int(self._size_gb(m) * 1e9), "size_vram": int(self._size_gb(m) * 1e9)}
+            for m in self.loaded
+        ]}
+
+    def show(self, payload: dict) -> dict:
+        name = payload.get("name") or payload.get("model", "")
+        quant = "Q8_0" if name.lower().endswith("q8_0") else "Q4_K_M"
+        return {"details": {"parameter_size": f"{self._params_b(name):g}B", "quantization_level": quant}}
+
+    async def chat(self, payload: dict) -> dict:
+        await asyncio.sleep(self.delay + (self.tokens / self.tps if self.tps else 0.0))
+        return {"choices": [{"message": {"role": "assistant", "content": "cloud " * self.tokens}}],
+                "usage": {"prompt_tokens": 10, "completion_tokens": self.tokens}}
+
+    # ------------------------------------------------------------------
+    # HTTP plumbing
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _chunk(writer, text: str) -> None:
+        data = text.encode()
+        writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+
+    @staticmethod
+    async def _send(writer, status: int, body: bytes) -> None:
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS.get(status, 'OK')}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode()
+            + body
+        )
+        await writer.drain()
+
+    async def handle(self, reader, writer) -> None:
+        self.connections += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                method, path, _ = line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while (h := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    k, _, v = h.decode("latin-1").partition(":")
+                    headers[k.strip().lower()] = v.strip()
+                raw = await reader.readexactly(int(headers.get("content-length", 0)))
+                payload = json.loads(raw) if raw else {}
+                self.requests += 1
+                self.in_flight += 1
+                try:
+                    if path == "/api/generate":
+                        await self.generate(payload, writer)
+                    elif path == "/api/embeddings":
+                        await self._send(writer, 200, json.dumps(self.embed(payload)).encode())
+                    elif path == "/api/ps":
+                        await self._send(writer, 200, json.dumps(self.ps()).encode())
+                    elif path == "/api/show":
+                        await self._send(writer, 200, json.dumps(self.show(payload)).encode())
+                    elif path.endswith("/chat/completions"):
+                        await self._send(writer, 200, json.dumps(await self.chat(payload)).encode())
+                    else:
+                        await self._send(writer, 404, b'{"error": "not found"}')
+                finally:
+                    self.in_flight -= 1
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Start serving on the running loop; returns the bound port."""
+        self.server = await asyncio.start_server(self.handle, host, port, backlog=4096)
+        return self.server.sockets[0].getsockname()[1]
+
+
+def run_in_thread(**kwargs) -> tuple[StubOllama, int]:
+    """Start a StubOllama on its own event loop thread (for sync benchmarks)."""
+    stub = StubOllama(**kwargs)
+    ready = threading.Event()
+    port = []
+
+    def _run():
+        loop = asyncio.new_event_loop()
+        port.append(loop.run_until_complete(stub.start()))
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=_run, daemon=True).start()
+    ready.wait()
+    return stub, port[0]
+
+
+async def _serve(args):
+    stub = StubOllama(delay=args.delay, tps=args.tps, tokens=args.tokens, load_time=args.load_time,
+                      parallel=args.parallel, keep_alive=args.keep_alive, vram_gb=args.vram_gb)
+    port = await stub.start(args.host, args.port)
+    print(f"🧪 Stub Ollama on http://{args.host}:{port} "
+          f"(delay={args.delay}s, {args.tps} tok/s, {args.tokens} tokens)")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stub Ollama server for benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--delay", type=float, default=0.05, help="Per-request latency (s)")
+    parser.add_argument("--tps", type=float, default=200.0, help="Generated tokens per second")
+    parser.add_argument("--tokens", type=int, default=20, help="Tokens generated per request")
+    parser.add_argument("--load-time", type=float, default=0.0, help="Model load time (s)")
+    parser.add_argument("--keep-alive", type=float, default=0.0, help="Idle seconds before unloading (0 = never)")
+    parser.add_argument("--vram-gb", type=float, default=0.0, help="Memory for loaded models (0 = unlimited)")
+    parser.add_argument("--parallel", type=int, default=0, help="Concurrent generations (0 = unlimited)")
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Copilot Bridge request metrics (copilot_bridge_*)
+
+The Prometheus metrics for bridge requests, shared by two paths:
+
+- exporter.py: the bridge prints one JSON log line per request to
+  stderr; the exporter re-parses the lines and updates these metrics
+- embedded: with BRIDGE_METRICS_PORT set, the bridge process updates
+  the same metrics itself in log_request() and serves /metrics on that
+  port (with everything else in the default registry, e.g. the
+  dual_gpu_* orchestrator metrics)
+
+In embedded mode the JSON log becomes an optional side channel, sampled
+at BRIDGE_LOG_SAMPLE (default 0 with BRIDGE_METRICS_PORT set, else 1).
+Embedded mode needs a resident process; a one-shot CLI run exits before
+it could be scraped.
+
+Logged entries go to stderr, or with BRIDGE_LOG_URL set are shipped to
+exporter.py in the background by log_shipper.py.
+
+Environment variables:
+    BRIDGE_METRICS_PORT - Serve /metrics from the bridge process on this port (default: off)
+    BRIDGE_HOST         - Interface /metrics listens on (default: 127.0.0.1)
+    BRIDGE_LOG_SAMPLE   - Fraction of requests logged as JSON, 0-1 (default: see above)
+    BRIDGE_LOG_URL      - Ship logged entries to this exporter URL instead of stderr (see log_shipper.py)
+"""
+import json
+import math
+import os
+import random
+import sys
+from typing import Any, Dict, Optional
+
+try:
+    from prometheus_client import Counter, Gauge, Histogram, start_http_server
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+METRICS_PORT = int(os.getenv("BRIDGE_METRICS_PORT", "0"))
+LOG_SAMPLE = float(os.getenv("BRIDGE_LOG_SAMPLE", "0" if METRICS_PORT else "1"))
+
+# Background delivery to exporter.py (imported only when configured, the
+# exporter itself needs nothing beyond prometheus_client)
+shipper = None
+if os.getenv("BRIDGE_LOG_URL"):
+    from log_shipper import LogShipper
+    shipper = LogShipper.from_env()
+
+if PROMETHEUS_AVAILABLE:
+    TOKENS_SAVED = Counter(
+        'copilot_bridge_tokens_saved_total',
+        'Total tokens routed locally instead of cloud'
+    )
+
+    COST_SAVED = Counter(
+        'copilot_bridge_cost_saved_usd',
+        'Total USD saved by routing locally (baseline: $0.02/1K tokens)'
+    )
+
+    REQUESTS_BY_ROUTE = Counter(
+        'copilot_bridge_requests_by_route',
+        'Request count by routing decision',
+        ['route']
+    )
+
+    REQUESTS_BY_MODEL = Counter(
+        'copilot_bridge_requests_by_model',
+        'Request count by model',
+        ['model']
+    )
+
+    REQUESTS_BY_TASK = Counter(
+        'copilot_bridge_requests_by_task',
+        'Request count by task type',
+        ['task']
+    )
+
+    LOCAL_LATENCY = Histogram(
+        'copilot_bridge_local_latency_ms',
+        'Local inference latency in milliseconds',
+        buckets=[100, 500, 1000, 2000, 3000, 5000, 10000, 30000]
+    )
+
+    # Performance histograms, labelled route, model and gpu_id ("" when
+    # the request did not run on a known GPU, e.g. cloud or single-GPU)
+    TIME_TO_FIRST_TOKEN = Histogram(
+        'copilot_bridge_ttft_ms',
+        'Time to first streamed token in milliseconds',
+        ['route', 'model', 'gpu_id'],
+        buckets=[50, 100, 250, 500, 1000, 2000, 5000, 10000, 30000]
+    )
+
+    INTER_TOKEN_LATENCY = Histogram(
+        'copilot_bridge_inter_token_latency_ms',
+        'Mean gap between streamed tokens in milliseconds',
+        ['route', 'model', 'gpu_id'],
+        buckets=[5, 10, 20, 50, 100, 250, 500]
+    )
+
+    GENERATION_RATE = Histogram(
+        'copilot_bridge_generation_tokens_per_second',
+        'Output tokens per second (Ollama eval_count / eval_duration)',
+        ['route', 'model', 'gpu_id'],
+        buckets=[1, 2, 5, 10, 20, 40, 80, 160, 320]
+    )
+
+    PROMPT_EVAL_RATE = Histogram(
+        'copilot_bridge_prompt_eval_tokens_per_second',
+        'Prompt tokens per second (Ollama prompt_eval_count / prompt_eval_duration)',
+        ['route', 'model', 'gpu_id'],
+        buckets=[10, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+    )
+
+    MODEL_LOAD = Histogram(
+        'copilot_bridge_model_load_ms',
+        'Model load time reported by Ollama (load_duration) in milliseconds',
+        ['route', 'model', 'gpu_id'],
+        buckets=[1, 10, 100, 500, 1000, 2000, 5000, 10000, 30000]
+    )
+
+    QUEUE_WAIT = Histogram(
+        'copilot_bridge_queue_wait_ms',
+        'Time queued for a GPU slot in milliseconds',
+        ['route', 'model', 'gpu_id'],
+        buckets=[1, 10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+    )
+
+    CLOUD_LATENCY = Histogram(
+        'copilot_bridge_cloud_latency_ms',
+        'Cloud request latency in milliseconds',
+        ['route', 'model', 'gpu_id'],
+        buckets=[100, 250, 500, 1000, 2000, 3000, 5000, 10000, 30000]
+    )
+
+    # Log entry fields observed as-is (streaming.ollama_timings and the GPU queue)
+    _TIMING_FIELDS = (
+        ("gen_tps", GENERATION_RATE),
+        ("prompt_tps", PROMPT_EVAL_RATE),
+        ("load_ms", MODEL_LOAD),
+        ("queue_wait_ms", QUEUE_WAIT),
+    )
+
+    CACHE_LOOKUPS = Counter(
+        'copilot_bridge_cache_lookups_total',
+        'Response cache lookups by result',
+        ['result']
+    )
+
+    CACHE_TOKENS_SAVED = Counter(
+        'copilot_bridge_cache_tokens_saved_total',
+        'Tokens served from the response cache instead of re-running inference'
+    )
+
+    TOKENS_IN = Gauge(
+        'copilot_bridge_last_tokens_in',
+        'Last request input token count (last value only; see tokens_saved_total for totals)'
+    )
+
+    TOKENS_OUT = Gauge(
+        'copilot_bridge_last_tokens_out',
+        'Last request output token count (last value only; see tokens_saved_total for totals)'
+    )
+
+_embedded = False
+_children: Dict[tuple, Any] = {}
+
+# Latency/throughput fields observed by observe_performance
+TIMING_FIELDS = ("ttft_ms", "itl_ms", "gen_tps", "prompt_tps", "load_ms", "queue_wait_ms")
+
+
+def amount(entry: Dict[str, Any], field: str) -> float:
+    """A numeric log field (0 when absent); ValueError if non-numeric or negative."""
+    value = entry.get(field)
+    if value is None:
+        return 0
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 <= value < math.inf:
+        raise ValueError(f"{field}={value!r} is not a non-negative number")
+    return value
+
+
+def parse_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The values one log_request entry contributes to the metrics, shared by
+    record() and exporter.process_log_batch. Every numeric field (timings
+    included) is validated first, so a ValueError means nothing should be
+    counted for the entry.
+    """
+    counts = {
+        "route": entry.get("route", "unknown"),
+        "model": entry.get("model", "unknown"),
+        "task": entry.get("task", "general"),
+        "cache": entry.get("cache"),
+        "total_tokens": amount(entry, "total_tokens"),
+        "cost_saved": amount(entry, "cost_saved_usd"),
+        "latency_ms": amount(entry, "latency_ms"),
+        "tokens_in": amount(entry, "tokens_in"),
+        "tokens_out": amount(entry, "tokens_out"),
+    }
+    for field in TIMING_FIELDS:
+        amount(entry, field)
+    return counts
+
+
+def _child(metric, *values):
+    """metric.labels(*values), cached (labels() takes a lock and builds a key each call)."""
+    key = (metric, values)
+    child = _children.get(key)
+    if child is None:
+        child = _children[key] = metric.labels(*values)
+    return child
+
+
+def record(entry: Dict[str, Any]):
+    """Apply one log_request entry to the metrics; ValueError (nothing counted) if malformed."""
+    counts = parse_entry(entry)
+    route, model = counts["route"], counts["model"]
+
+    _child(REQUESTS_BY_ROUTE, route).inc()
+    _child(REQUESTS_BY_MODEL, model).inc()
+    _child(REQUESTS_BY_TASK, counts["task"]).inc()
+
+    if route in ("local", "cache"):
+        TOKENS_SAVED.inc(counts["total_tokens"])
+        COST_SAVED.inc(counts["cost_saved"])
+    if route == "local":
+        LOCAL_LATENCY.observe(counts["latency_ms"])
+
+    cache = counts["cache"]
+    if cache:
+        _child(CACHE_LOOKUPS, cache).inc()
+        if cache in ("hit", "semantic_hit"):
+            CACHE_TOKENS_SAVED.inc(counts["tokens_out"])
+
+    observe_performance(entry, route, model)
+
+    TOKENS_IN.set(counts["tokens_in"])
+    TOKENS_OUT.set(counts["tokens_out"])
+
+
+def observe_performance(entry: Dict[str, Any], route: str, model: str):
+    """
+    The per-request latency and throughput histograms for one entry (used
+    by record() and by exporter.process_log_batch). Each is observed only
+    when the entry carries its field.
+    """
+    gpu_id = entry.get("gpu_id")
+    labels = (route, model, "" if gpu_id is None else str(gpu_id))
+
+    ttft_ms = entry.get("ttft_ms")
+    if ttft_ms is not None:
+        _child(TIME_TO_FIRST_TOKEN, *labels).observe(ttft_ms)
+        itl_ms = entry.get("itl_ms")
+        if itl_ms is not None:
+            _child(INTER_TOKEN_LATENCY, *labels).observe(itl_ms)
+    for field, metric in _TIMING_FIELDS:
+        value = entry.get(field)
+        if value is not None:
+            _child(metric, *labels).observe(value)
+    if route == "cloud":
+        _child(CLOUD_LATENCY, *labels).observe(entry.get("latency_ms", 0))
+
+
+def serve(port: int, addr: Optional[str] = None) -> bool:
+    """
+    Switch to embedded mode: record every request in-process and serve
+    /metrics on addr (default BRIDGE_HOST, else localhost only).
+    """
+    global _embedded
+    addr = addr or os.getenv("BRIDGE_HOST", "127.0.0.1")
+    if not PROMETHEUS_AVAILABLE:
+        print("⚠️  prometheus_client not installed, embedded metrics disabled", file=sys.stderr)
+        return False
+    if not _embedded:
+        start_http_server(port, addr=addr)
+        _embedded = True
+        print(f"📊 Bridge metrics on {addr}:{port}/metrics", file=sys.stderr)
+    return True
+
+
+def serve_from_env() -> bool:
+    """serve(BRIDGE_METRICS_PORT) if it is set."""
+    return serve(METRICS_PORT) if METRICS_PORT else False
+
+
+def emit(entry: Dict[str, Any]):
+    """
+    Deliver one log_request entry: recorded in-process in embedded mode,
+    and for a LOG_SAMPLE fraction of requests shipped to the exporter (or
+    printed as JSON to stderr without BRIDGE_LOG_URL).
+    """
+    if _embedded:
+        try:
+            record(entry)
+        except ValueError as e:
+            print(f"⚠️  Metrics entry skipped: {e}", file=sys.stderr)
+    if LOG_SAMPLE >= 1.0 or (LOG_SAMPLE > 0.0 and random.random() < LOG_SAMPLE):
+        if shipper is not None:
+            shipper.ship(entry)
+        else:
+            print(json.dumps(entry), file=sys.stderr, flush=True)
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Adaptive context window (Ollama num_ctx) sizing for Copilot Bridge
+
+A fixed num_ctx is wrong both ways: 4096 silently truncates a long prompt
+(Ollama keeps the tail and logs a warning nobody reads), and 32768
+reserves the KV cache for 32K tokens when the prompt is a docstring
+request (on a 20B model that is ~1.5 GB of VRAM for nothing).
+
+ContextSizer picks num_ctx per request:
+
+    needed  = prompt tokens * model ratio * MARGIN + TEMPLATE_TOKENS
+              + output reserve (max_tokens, else BRIDGE_NUM_CTX_OUTPUT)
+    num_ctx = smallest bucket >= needed, capped by what fits on the GPU
+
+Prompt tokens are counted locally (token_counter.py); the per-model ratio
+is learnt from the prompt_eval_count Ollama reports, so counts converge on
+the model's own tokenizer. Sizes are rounded to BRIDGE_NUM_CTX_BUCKETS
+because Ollama reloads a model whenever num_ctx changes; for the same
+reason a model keeps the bucket it is loaded with while requests need up
+to BRIDGE_NUM_CTX_STICKY buckets less, and only shrinks further after
+BRIDGE_NUM_CTX_SHRINK_AFTER requests in a row would have fitted.
+
+When even the cap is smaller than needed the request is still sent (at
+the cap) and counted as a truncation: "prompt" if the prompt alone does
+not fit, "output" if the answer may be cut short, "observed" if Ollama's
+counts show it filled a context that was expected to suffice.
+
+Usage:
+    from context_window import context_sizer
+    size = context_sizer.size(prompt, model, max_tokens=512, cap=16384)
+    options = {"num_ctx": size.num_ctx}
+    ...
+    context_sizer.observe(size, model, prompt, ollama_response)
+
+Environment variables:
+    BRIDGE_NUM_CTX          - adaptive, or a fixed num_ctx for every request (default: adaptive)
+    BRIDGE_NUM_CTX_BUCKETS  - Allowed sizes (default: 2048,4096,8192,16384,32768)
+    BRIDGE_NUM_CTX_OUTPUT   - Tokens reserved for the answer without max_tokens (default: 1024)
+    BRIDGE_NUM_CTX_STICKY   - Buckets a loaded model may be oversized by before shrinking (default: 1)
+    BRIDGE_NUM_CTX_SHRINK_AFTER - Smaller requests in a row before shrinking further (default: 4)
+"""
+import os
+import sys
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+from token_counter import count_tokens
+
+DEFAULT_BUCKETS = (2048, 4096, 8192, 16384, 32768)
+
+# Chat template and system prompt tokens Ollama adds around the prompt
+TEMPLATE_TOKENS = 32
+MARGIN = 1.1
+
+# Calibration: weight of each new observation, and bounds on the ratio
+RATIO_ALPHA = 0.2
+RATIO_BOUNDS = (0.5, 2.0)
+
+
+@dataclass(frozen=True)
+class ContextSize:
+    """num_ctx chosen for one request and what it was sized for."""
+    num_ctx: int
+    prompt_tokens: int     # estimated, in the model's tokens
+    output_tokens: int     # reserved for the answer
+    cap: int               # largest num_ctx allowed for this model on this GPU
+    truncated: Optional[str] = None  # None, "prompt" or "output"
+
+
+def _parse_buckets(value: str) -> Tuple[int, ...]:
+    return tuple(sorted({int(b) for b in value.split(",") if b.strip()}))
+
+
+class ContextSizer:
+    """
+    Chooses num_ctx per request and keeps per-bucket and truncation counts.
+
+    Args:
+        buckets: allowed num_ctx values
+        output_tokens: answer reserve when the request has no max_tokens
+        fixed: always use this num_ctx (the old behaviour); still counted
+        sticky: buckets a loaded model may exceed the need by before shrinking
+        shrink_after: requests in a row that want a smaller bucket before shrinking further
+    """
+
+    def __init__(
+        self,
+        buckets: Iterable[int] = DEFAULT_BUCKETS,
+        output_tokens: int = 1024,
+        fixed: Optional[int] = None,
+        sticky: int = 1,
+        shrink_after: int = 4
+    ):
+        self.buckets = tuple(sorted(buckets))
+        self.output_tokens = output_tokens
+        self.fixed = fixed
+        self.sticky = sticky
+        self.shrink_after = shrink_after
+
+        self._lock = threading.Lock()
+        self._ratio: Dict[str, float] = {}
+        self._loaded: Dict[Hashable, int] = {}  # runner (e.g. (gpu_id, model)) -> num_ctx last sent
+        self._oversized: Dict[Hashable, int] = {}  # consecutive requests that wanted a smaller bucket
+        self.requests = 0
+        self.by_bucket: Counter = Counter()
+        self.truncations: Counter = Counter()
+        self.switches = 0
+        self.reserved_tokens = 0
+        self.used_tokens = 0
+
+    @classmethod
+    def from_env(cls) -> "ContextSizer":
+        mode = os.getenv("BRIDGE_NUM_CTX", "adaptive").lower()
+        return cls(
+            buckets=_parse_buckets(os.getenv("BRIDGE_NUM_CTX_BUCKETS", ",".join(map(str, DEFAULT_BUCKETS)))),
+            output_tokens=int(os.getenv("BRIDGE_NUM_CTX_OUTPUT", "1024")),
+            fixed=None if mode == "adaptive" else int(mode),
+            sticky=int(os.getenv("BRIDGE_NUM_CTX_STICKY", "1")),
+            shrink_after=int(os.getenv("BRIDGE_NUM_CTX_SHRINK_AFTER", "4"))
+        )
+
+    def prompt_tokens(self, prompt: str, model: str) -> int:
+        """Local token count scaled to the model's tokenizer."""
+        return round(count_tokens(prompt) * self._ratio.get(model, 1.0))
+
+    def bucket(self, tokens: int, cap: Optional[int] = None) -> int:
+        """Smallest bucket holding tokens, at most cap (and never below the smallest bucket)."""
+        allowed = [b for b in self.buckets if cap is None or b <= cap] or self.buckets[:1]
+        return next((b for b in allowed if b >= tokens), allowed[-1])
+
+    def size(
+        self,
+        prompt: str,
+        model: str,
+        max_tokens: Optional[int] = None,
+        cap: Optional[int] = None,
+        num_ctx: Optional[int] = None,
+        runner: Optional[Hashable] = None
+    ) -> ContextSize:
+        """
+        num_ctx for a request.
+
+        cap bounds the choice (GPU memory, the model's trained context);
+        num_ctx (or BRIDGE_NUM_CTX) overrides it. runner identifies the
+        loaded model instance, e.g. (gpu_id, model), so a request that fits
+        the context it is already loaded with does not force a reload.
+        """
+        prompt_tokens = self.prompt_tokens(prompt, model)
+        output_tokens = max_tokens or self.output_tokens
+        needed = int(prompt_tokens * MARGIN) + TEMPLATE_TOKENS + output_tokens
+        cap = cap or self.buckets[-1]
+
+        chosen = num_ctx or self.fixed
+        if not chosen:
+            chosen = self.bucket(needed, cap)
+            loaded = self._loaded.get(runner)
+            if loaded and chosen < loaded <= cap and loaded in self.buckets:
+                with self._lock:
+                    streak = self._oversized[runner] = self._oversized.get(runner, 0) + 1
+                if (self.buckets.index(loaded) - self.buckets.index(chosen) <= self.sticky
+                        or streak < self.shrink_after):
+                    chosen = loaded
+            if chosen != loaded:
+                self._oversized.pop(runner, None)
+
+        truncated = None
+        if prompt_tokens + TEMPLATE_TOKENS >= chosen:
+            truncated = "prompt"
+        elif needed > chosen:
+            truncated = "output"
+
+        with self._lock:
+            if runner is not None:
+                if self._loaded.get(runner, chosen) != chosen:
+                    self.switches += 1
+                self._loaded[runner] = chosen
+            self.requests += 1
+            self.by_bucket[chosen] += 1
+            if truncated:
+                self.truncations[truncated] += 1
+        if truncated == "prompt":
+            print(f"⚠️  Prompt of ~{prompt_tokens} tokens truncated to num_ctx {chosen} for {model}",
+                  file=sys.stderr)
+        return ContextSize(chosen, prompt_tokens, output_tokens, cap, truncated)
+
+    def observe(self, size: ContextSize, model: str, prompt: str, result: Optional[Dict[str, Any]]) -> Optional[str]:
+        """
+        Account Ollama's counts for a finished request: calibrates the
+        model's token ratio and returns "observed" when the context filled
+        up although the sizing expected it to fit (else size.truncated).
+        """
+        result = result or {}
+        prompt_eval = result.get("prompt_eval_count") or 0
+        generated = result.get("eval_count") or 0
+        local = count_tokens(prompt)
+        with self._lock:
+            self.reserved_tokens += size.num_ctx
+            self.used_tokens += min(prompt_eval + generated, size.num_ctx)
+            # prompt_eval_count is short when Ollama reused a cached prefix,
+            # and clipped when the prompt was truncated: skip those
+            if not size.truncated and local >= TEMPLATE_TOKENS and prompt_eval > local * RATIO_BOUNDS[0]:
+                ratio = min(max(prompt_eval / local, RATIO_BOUNDS[0]), RATIO_BOUNDS[1])
+                previous = self._ratio.get(model)
+                self._ratio[model] = ratio if previous is None else previous + RATIO_ALPHA * (ratio - previous)
+            if not size.truncated and prompt_eval and prompt_eval + generated >= size.num_ctx:
+                self.truncations["observed"] += 1
+                return "observed"
+        return size.truncated
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-bucket usage, truncations and calibration, for get_stats()."""
+        return {
+            "mode": f"fixed {self.fixed}" if self.fixed else "adaptive",
+            "requests": self.requests,
+            "by_num_ctx": {str(b): n for b, n in sorted(self.by_bucket.items())},
+            "truncations": dict(self.truncations),
+            "num_ctx_switches": self.switches,
+            "fill": round(self.used_tokens / self.reserved_tokens, 4) if self.reserved_tokens else 0.0,
+            "token_ratio": {m: round(r, 3) for m, r in self._ratio.items()},
+        }
+
+
+context_sizer = ContextSizer.from_env()
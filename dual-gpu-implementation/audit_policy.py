@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Adaptive audit policy for DualGPUOrchestrator
+
+The audit on GPU 1 is only worth its GPU time when the draft is
+substantial. The policy decides, per request:
+
+- skip      audit never started (caller opted out, or the tier is in
+            BRIDGE_AUDIT_SKIP, e.g. SIMPLE docstring/comment requests)
+- cancel    draft failed or came back trivially short: the in-flight
+            audit is cancelled and its Ollama stream closed
+- truncate  audit still running BRIDGE_AUDIT_GRACE seconds after the
+            draft finished: stopped there, keeping the text so far
+- full      audit ran to completion
+
+Every audit is also capped at BRIDGE_AUDIT_MAX_TOKENS (Ollama num_predict).
+
+The defaults change nothing: every audit runs to completion, uncapped,
+and is only cancelled when the draft failed. Opt in per setting, e.g.
+BRIDGE_AUDIT_SKIP=simple BRIDGE_AUDIT_MIN_DRAFT_TOKENS=32
+BRIDGE_AUDIT_MAX_TOKENS=256 BRIDGE_AUDIT_GRACE=10.
+
+GPU-1 time reclaimed by skip / cancel / truncate is estimated as the
+audit model's expected service time (from GPULoadTracker) minus what it
+actually ran.
+
+Environment variables:
+    BRIDGE_AUDIT_SKIP              - Tiers never audited, comma-separated (default: none)
+    BRIDGE_AUDIT_MIN_DRAFT_TOKENS  - Drafts shorter than this cancel the audit (default: 0)
+    BRIDGE_AUDIT_MAX_TOKENS        - Audit output cap, 0 = none (default: 0)
+    BRIDGE_AUDIT_GRACE             - Seconds the audit may run past the draft, 0 = no limit (default: 0)
+"""
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Optional
+
+SKIP = "skip"
+CANCEL = "cancel"
+TRUNCATE = "truncate"
+FULL = "full"
+ACTIONS = (FULL, SKIP, CANCEL, TRUNCATE)
+
+
+@dataclass
+class AuditPolicy:
+    """When to run, stop early, or drop the GPU 1 audit."""
+    skip_tiers: FrozenSet[str] = field(default_factory=frozenset)
+    min_draft_tokens: int = 0
+    max_tokens: Optional[int] = None
+    grace_s: Optional[float] = None
+
+    @classmethod
+    def from_env(cls) -> "AuditPolicy":
+        max_tokens = int(os.getenv("BRIDGE_AUDIT_MAX_TOKENS", "0"))
+        grace = float(os.getenv("BRIDGE_AUDIT_GRACE", "0"))
+        return cls(
+            skip_tiers=frozenset(
+                t.strip().upper() for t in os.getenv("BRIDGE_AUDIT_SKIP", "").split(",") if t.strip()
+            ),
+            min_draft_tokens=int(os.getenv("BRIDGE_AUDIT_MIN_DRAFT_TOKENS", "0")),
+            max_tokens=max_tokens if max_tokens > 0 else None,
+            grace_s=grace if grace > 0 else None,
+        )
+
+    def should_start(self, tier: str, wanted: bool = True) -> bool:
+        """Whether to launch the audit at all."""
+        return wanted and tier.upper() not in self.skip_tiers
+
+    def after_draft(self, draft: Dict[str, Any]) -> Optional[str]:
+        """CANCEL if the audit is not worth finishing, else None (let it run up to grace_s)."""
+        if not draft.get("success"):
+            return CANCEL
+        tokens = draft.get("tokens") or len(draft.get("text", "").split())
+        if tokens < self.min_draft_tokens:
+            return CANCEL
+        return None
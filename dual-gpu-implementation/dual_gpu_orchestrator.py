@@ -7,15 +7,73 @@ Routes requests across two GPUs for maximum throughput:
 - GPU 1 (Quadro M4000): Small auditing/meta-reasoning models
 
 Supports both sequential and concurrent execution modes.
+
+The orchestrator is asyncio-based (agenerate_with_audit, asimple_generate,
+acall_model); the sync methods are thin wrappers that run the coroutine on
+one shared background event loop.
+
+Environment variables:
+    BRIDGE_DRAFT_TIMEOUT  - Draft / single generation limit, seconds (default: 180)
+    BRIDGE_AUDIT_TIMEOUT  - Audit generation limit, seconds (default: 60)
+    BRIDGE_AUDIT_*        - When to skip, cancel or truncate the audit (see audit_policy.py)
+    BRIDGE_PIPELINE_CHARS - Draft characters the pipelined audit starts from (default: 500)
+    BRIDGE_HISTORY_SIZE   - Routing decisions kept for stats/export (see routing_history.py)
+    BRIDGE_STATS_PORT     - Serve /stats and /history on this port (default: off)
+    BRIDGE_TRACE_*        - Trace classify / select / call_model / audit spans (see tracing.py)
+    BRIDGE_WARM_*         - Preload / keep warm / evict models by demand (see warm_pool.py)
+    BRIDGE_PLACEMENT*     - Which models are resident on which GPU, within VRAM (see placement.py)
+    BRIDGE_NUM_CTX*       - Per-request context window sizing (see context_window.py)
 """
-import httpx
+import asyncio
+import inspect
 import json
+import os
+import re
+import sys
 import time
 import threading
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Callable, Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend_clients import backends
+from keyword_classifier import classifier
+from learned_router import router
+from gpu_load import GPULoadTracker
+from scheduler import GPUScheduler, Overloaded, Priority
+from audit_policy import ACTIONS, CANCEL, FULL, SKIP, TRUNCATE, AuditPolicy
+from routing_history import RoutingHistory
+from streaming import ollama_timings
+from warm_pool import WarmPool, is_cold
+from placement import Plan, PlacementPlanner, max_num_ctx, spec_footprint, traffic_mix
+from context_window import ContextSizer
+import tracing
+
+# "Relevance (1-10): 8", "1. **Relevance**: 8/10", ... in the audit's answer
+_RELEVANCE = re.compile(r"relevance(?:\s*\(1\s*-\s*10\))?[^\w\n(]{0,12}(\d+(?:\.\d+)?)", re.IGNORECASE)
+
+
+def audit_score(text: str) -> Optional[float]:
+    """The Relevance (1-10) grade an audit gave the draft, or None if it gave none."""
+    match = _RELEVANCE.search(text or "")
+    if match is None:
+        return None
+    score = float(match.group(1))
+    return score if 0 <= score <= 10 else None
+
+
+class OllamaError(RuntimeError):
+    """Ollama answered with an HTTP error or an {"error": ...} body."""
+
+
+def _check_ollama(status: int, body: Any) -> Dict[str, Any]:
+    """body if it is a successful Ollama generation, else OllamaError with its message."""
+    if status < 400 and isinstance(body, dict) and not body.get("error"):
+        return body
+    message = body.get("error") if isinstance(body, dict) else body
+    raise OllamaError(f"Ollama HTTP {status}: {str(message)[:300]}")
+
 
 class TaskComplexity(Enum):
     """Complexity level determines GPU routing."""
@@ -33,6 +91,7 @@ class GPUEndpoint:
     port: int
     models: List[str]  # Models to prefer on this GPU
     max_vram_gb: float
+    mem_bandwidth_gbps: float = 0.0  # Decode speed prior for placement (0 = unknown)
     
     def __str__(self):
         return f"{self.name} (GPU {self.gpu_id}) @ {self.url}"
@@ -62,6 +121,9 @@ class DualGPUResponse:
     tokens_generated: int
     routing_decision: RoutingDecision
     concurrent: bool
+    pipelined: bool = False
+    audit_start: Optional[float] = None  # seconds after the draft started (None if no audit ran)
+    overlap_time: float = 0.0            # seconds draft and audit were both generating
 
 
 class DualGPUOrchestrator:
@@ -74,16 +136,25 @@ class DualGPUOrchestrator:
     
     Supports:
     - Automatic routing based on task complexity
-    - Concurrent execution (draft on GPU 0, audit on GPU 1)
+    - Load-aware GPU selection (in-flight requests, tokens/sec, loaded models)
+    - VRAM-aware placement: only (GPU, model) pairs that fit together are routed to
+    - Warm pool: demand-driven preloading, keep_alive and eviction per GPU
+    - Per-request num_ctx sized from the prompt's tokens, in buckets capped by VRAM
+    - Bounded concurrency per GPU with priority queues and admission control
+    - Concurrent execution (draft on GPU 0, audit on GPU 1) as asyncio tasks
+    - Per-stage timeouts and cancellation
+    - Adaptive audit policy (skip / cancel / truncate) to free GPU 1 early
     - Sequential fallback if one GPU is unavailable
     - Prometheus metrics for monitoring
+    - Bounded routing history with O(1) stats and JSONL/CSV export
     """
     
     def __init__(
         self,
         gpu0_url: str = "http://localhost:11434",
         gpu1_url: str = "http://localhost:11435",
-        enable_metrics: bool = True
+        enable_metrics: bool = True,
+        load_aware: Optional[bool] = None
     ):
         # Configure GPU endpoints
         self.gpu0 = GPUEndpoint(
@@ -96,7 +167,8 @@ class DualGPUOrchestrator:
                 "qwen2.5-coder:14b",
                 "qwen2.5-coder:7b-instruct-q8_0"
             ],
-            max_vram_gb=16.0
+            max_vram_gb=16.0,
+            mem_bandwidth_gbps=736.0
         )
         
         self.gpu1 = GPUEndpoint(
@@ -109,15 +181,62 @@ class DualGPUOrchestrator:
                 "qwen2.5-coder:3b",
                 "phi3.5:3.8b"
             ],
-            max_vram_gb=8.0
+            max_vram_gb=8.0,
+            mem_bandwidth_gbps=192.0
         )
         
+        # Candidate (GPU, model) pairs per tier, in order of preference.
+        # Load-aware selection picks the lowest expected completion time;
+        # the static policy always takes the first.
+        self.candidates = {
+            TaskComplexity.SIMPLE: [(self.gpu1, "qwen2.5-coder:1.5b"), (self.gpu0, "qwen2.5-coder:7b-instruct-q8_0")],
+            TaskComplexity.MODERATE: [(self.gpu0, "qwen2.5-coder:7b-instruct-q8_0"), (self.gpu1, "qwen2.5-coder:3b")],
+            TaskComplexity.COMPLEX: [(self.gpu0, "qwen2.5-coder:7b-instruct-q8_0")],
+        }
+        if load_aware is None:
+            load_aware = os.getenv("BRIDGE_LOAD_AWARE", "true").lower() == "true"
+        self.load_aware = load_aware
+        self.load = GPULoadTracker()
+        self.audit_model = "qwen2.5-coder:1.5b"
+        
+        # Placement: the candidates above, restricted to what fits in VRAM
+        # together for the observed traffic mix (re-planned periodically)
+        self.planner = PlacementPlanner.from_env(*self._planner_args())
+        self.plan: Optional[Plan] = None
+        self._placed: Dict[TaskComplexity, List[Tuple[GPUEndpoint, str]]] = {}
+        self._planned_at = 0.0
+        self._plan_lock = threading.Lock()
+        
+        # Bounded concurrency per GPU: excess requests queue by priority and
+        # are rejected (Overloaded) when their projected wait exceeds the deadline
+        self.schedulers = {gpu.gpu_id: GPUScheduler(f"gpu{gpu.gpu_id}") for gpu in (self.gpu0, self.gpu1)}
+        
+        self.draft_timeout = float(os.getenv("BRIDGE_DRAFT_TIMEOUT", "180"))
+        self.audit_timeout = float(os.getenv("BRIDGE_AUDIT_TIMEOUT", "60"))
+        self.audit_policy = AuditPolicy.from_env()
+        self.context = ContextSizer.from_env()
+        self.pipeline_chars = int(os.getenv("BRIDGE_PIPELINE_CHARS", "500"))
+        self.audit_actions = {action: 0 for action in ACTIONS}
+        self.audit_reclaimed_s = 0.0
+        
+        # Background event loop for the sync API (started on first use)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+        
         self.enable_metrics = enable_metrics
-        self.routing_history: List[RoutingDecision] = []
+        self.routing_history = RoutingHistory()
         
         # Initialize metrics if enabled
         if enable_metrics:
             self._init_metrics()
+        
+        self.warm_pool = WarmPool.from_env([self.gpu0, self.gpu1], self.load)
+        if self.warm_pool and self.enable_metrics:
+            self.warm_pool.on_event = self._observe_warm_pool
+        
+        stats_port = int(os.getenv("BRIDGE_STATS_PORT", "0"))
+        if stats_port:
+            self.serve_stats(stats_port)
     
     def _init_metrics(self):
         """Initialize Prometheus metrics."""
@@ -147,11 +266,113 @@ class DualGPUOrchestrator:
                 ['gpu_id', 'reason']
             )
             
+            self.time_to_first_token = Histogram(
+                'dual_gpu_time_to_first_token_seconds',
+                'Time to first streamed token by GPU',
+                ['gpu_id', 'model'],
+                buckets=[0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30]
+            )
+            
+            self.inter_token_latency = Histogram(
+                'dual_gpu_inter_token_latency_seconds',
+                'Mean gap between streamed tokens by GPU',
+                ['gpu_id', 'model'],
+                buckets=[0.005, 0.01, 0.02, 0.05, 0.1, 0.25, 0.5]
+            )
+            
+            self.generation_rate = Histogram(
+                'dual_gpu_generation_tokens_per_second',
+                'Output tokens per second of generation (Ollama eval_count / eval_duration)',
+                ['gpu_id', 'model'],
+                buckets=[1, 2, 5, 10, 20, 40, 80, 160, 320]
+            )
+            
+            self.prompt_eval_rate = Histogram(
+                'dual_gpu_prompt_eval_tokens_per_second',
+                'Prompt tokens per second of prefill (Ollama prompt_eval_count / prompt_eval_duration)',
+                ['gpu_id', 'model'],
+                buckets=[10, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+            )
+            
+            self.model_load = Histogram(
+                'dual_gpu_model_load_seconds',
+                'Model load time reported by Ollama (load_duration; near zero when resident)',
+                ['gpu_id', 'model'],
+                buckets=[0.01, 0.1, 0.5, 1, 2, 5, 10, 30, 60]
+            )
+            
+            self.model_starts = Counter(
+                'dual_gpu_model_starts_total',
+                'Generations by whether Ollama had to load the model first (start="cold") or not',
+                ['gpu_id', 'model', 'start']
+            )
+            
+            self.warm_pool_actions = Counter(
+                'dual_gpu_warm_pool_actions_total',
+                'Warm pool preloads and evictions',
+                ['gpu_id', 'model', 'action']
+            )
+            
+            self.load_time_saved = Counter(
+                'dual_gpu_load_seconds_saved_total',
+                'Load time of warm pool preloads that a later request found resident',
+                ['gpu_id', 'model']
+            )
+            
+            self.context_requests = Counter(
+                'dual_gpu_num_ctx_requests_total',
+                'Generations by the context window (num_ctx) they were sent with',
+                ['gpu_id', 'model', 'num_ctx']
+            )
+            
+            self.context_truncations = Counter(
+                'dual_gpu_context_truncations_total',
+                'Generations whose prompt (reason="prompt") or answer ("output", "observed") did not fit num_ctx',
+                ['gpu_id', 'model', 'reason']
+            )
+            
+            self.queue_depth = Gauge(
+                'dual_gpu_queue_depth',
+                'Requests waiting for a GPU slot',
+                ['gpu_id', 'priority']
+            )
+            for gpu_id, scheduler in self.schedulers.items():
+                for priority in Priority:
+                    self.queue_depth.labels(gpu_id=gpu_id, priority=priority.name.lower()).set_function(
+                        lambda s=scheduler, p=priority: s.depth(p)
+                    )
+            
+            self.queue_wait = Histogram(
+                'dual_gpu_queue_wait_seconds',
+                'Time spent queued for a GPU slot',
+                ['gpu_id', 'priority'],
+                buckets=[0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60]
+            )
+            
+            self.queue_rejections = Counter(
+                'dual_gpu_queue_rejections_total',
+                'Requests rejected because the projected wait exceeded their deadline',
+                ['gpu_id', 'priority']
+            )
+            
+            self.audit_decisions = Counter(
+                'dual_gpu_audit_actions_total',
+                'Audit policy outcomes (full, skip, cancel, truncate)',
+                ['action']
+            )
+            
+            self.audit_reclaimed = Counter(
+                'dual_gpu_audit_reclaimed_seconds_total',
+                'Estimated GPU 1 seconds freed by skipping, cancelling or truncating audits',
+                ['action']
+            )
+            
         except ImportError:
             print("⚠️  prometheus_client not installed, metrics disabled")
             self.enable_metrics = False
     
-    def classify_task(self, prompt: str, context: str = "") -> TaskComplexity:
+    @tracing.traced("classify_task")
+    def classify_task(self, prompt: str, context: str = "", task: Optional[str] = None) -> TaskComplexity:
         """
         Classify task complexity based on prompt analysis.
         
@@ -159,28 +380,27 @@ class DualGPUOrchestrator:
         - SIMPLE: Docstrings, comments, linting, renaming, explanations
         - MODERATE: Refactoring, small features, debugging
         - COMPLEX: New features, architecture, large refactors
-        """
-        text = (prompt + " " + context).lower()
         
-        # Simple task keywords
-        simple_keywords = [
-            "docstring", "comment", "lint", "rename", "explain",
-            "document", "format", "style", "what does", "summarize"
-        ]
+        A trained learned_router overrides the keyword rules when it is
+        confident (a CLOUD prediction is left to the caller's cloud check).
+        Pass the request's task type: the router is trained with it.
+        """
+        if router is not None:
+            tier = router.decide(prompt + "\n" + context if context else prompt, task=task)
+            if tier in TaskComplexity.__members__:
+                return TaskComplexity[tier]
         
-        # Complex task keywords
-        complex_keywords = [
-            "implement", "create", "build", "design", "architect",
-            "refactor all", "rewrite", "optimize", "algorithm"
-        ]
+        # SIMPLE_KEYWORDS / COMPLEX_KEYWORDS, matched in one pass
+        matched = classifier.classify(prompt, context)
         
-        if any(kw in text for kw in simple_keywords):
+        if "simple" in matched:
             return TaskComplexity.SIMPLE
-        elif any(kw in text for kw in complex_keywords):
+        elif "complex" in matched:
             return TaskComplexity.COMPLEX
         else:
             return TaskComplexity.MODERATE
     
+    @tracing.traced("select_gpu_and_model")
     def select_gpu_and_model(
         self,
         complexity: TaskComplexity,
@@ -189,9 +409,88 @@ class DualGPUOrchestrator:
         """
         Select GPU and model based on task complexity.
         
+        With load_aware (BRIDGE_LOAD_AWARE, default on) every candidate for
+        the tier is scored by expected completion time (queue + service +
+        cold load, see gpu_load.py). The reason is "<tier>_task_to_gpuN"
+        for the preferred pair and "<tier>_spill_to_gpuN" when load moved
+        the request elsewhere.
+        
         Returns:
             (gpu_endpoint, model_name, reason)
         """
+        if self.load_aware:
+            gpu, model, reason = self._select_by_load(complexity)
+        else:
+            gpu, model, reason = self._select_static(complexity)
+        
+        if self.enable_metrics:
+            self.gpu_selection.labels(gpu_id=gpu.gpu_id, reason=reason).inc()
+        tracing.annotate(complexity=complexity.name, gpu_id=gpu.gpu_id, model=model, reason=reason)
+        
+        return gpu, model, reason
+    
+    def _select_by_load(self, complexity: TaskComplexity) -> Tuple[GPUEndpoint, str, str]:
+        candidates = self._tier_candidates(complexity)
+        best = min(
+            range(len(candidates)),
+            key=lambda i: self.load.estimate(candidates[i][0].gpu_id, candidates[i][0].url, candidates[i][1])["eta"]
+        )
+        gpu, model = candidates[best]
+        kind = "task_to" if best == 0 else "spill_to"
+        return gpu, model, f"{complexity.value}_{kind}_gpu{gpu.gpu_id}"
+    
+    # ------------------------------------------------------------------
+    # Placement
+    # ------------------------------------------------------------------
+    
+    def _planner_args(self) -> Tuple[List[GPUEndpoint], Dict[str, List[str]], Dict[str, set]]:
+        """GPUs, tier → usable models (from the candidates) and GPU restrictions for PlacementPlanner."""
+        tiers = {c.name: list(dict.fromkeys(m for _, m in pairs)) for c, pairs in self.candidates.items()}
+        tiers["AUDIT"] = [self.audit_model]
+        return [self.gpu0, self.gpu1], tiers, {"AUDIT": {self.gpu1.gpu_id}}
+    
+    def _service_s(self, gpu_id: int, model: str) -> float:
+        """Observed seconds per generation, or the planner's bandwidth-based prior."""
+        if self.load.samples(gpu_id, model):
+            return self.load.service_time(gpu_id, model)
+        return self.planner.prior_service_s(gpu_id, model, self.load.expected_tokens)
+    
+    def replan(self) -> Optional[Plan]:
+        """Re-solve the placement for the traffic mix in the routing history (see placement.py)."""
+        mix = traffic_mix(self.routing_history.records(), self.audit_policy.should_start)
+        plan = self.planner.solve(mix or {tier: 1.0 for tier in self.planner.tiers}, self._service_s)
+        if plan is None:
+            print("⚠️  No model placement fits every tier; using the fixed candidates", file=sys.stderr)
+            self._placed = dict(self.candidates)
+            return None
+        gpus = {gpu.gpu_id: gpu for gpu in (self.gpu0, self.gpu1)}
+        self._placed = {
+            c: [(gpus[g], m) for g, m in self.planner.candidates(plan, c.name, [(gpu.gpu_id, m) for gpu, m in pairs])]
+            for c, pairs in self.candidates.items()
+        }
+        if self.plan is None or plan.placement != self.plan.placement:
+            placed = "; ".join(f"GPU {g}: {', '.join(models) or '-'}" for g, models in plan.placement.items())
+            print(f"🧩 Model placement: {placed} ({plan.throughput_rps:.2f} req/s at saturation)", file=sys.stderr)
+        self.plan = plan
+        return plan
+    
+    def _tier_candidates(self, complexity: TaskComplexity) -> List[Tuple[GPUEndpoint, str]]:
+        """Candidates for load-aware selection: placed pairs only, re-planned when stale."""
+        if self.planner is None:
+            return self.candidates[complexity]
+        if not self._placed or time.monotonic() - self._planned_at >= self.planner.interval:
+            # The first request plans; later ones keep routing on the old plan meanwhile
+            if self._plan_lock.acquire(blocking=not self._placed):
+                try:
+                    if not self._placed or time.monotonic() - self._planned_at >= self.planner.interval:
+                        self._planned_at = time.monotonic()
+                        self.replan()
+                finally:
+                    self._plan_lock.release()
+        return self._placed.get(complexity) or self.candidates[complexity]
+    
+    def _select_static(self, complexity: TaskComplexity) -> Tuple[GPUEndpoint, str, str]:
+        """Original fixed tier → GPU mapping."""
         if complexity == TaskComplexity.SIMPLE:
             # Small tasks → GPU 1 (Quadro M4000)
             gpu = self.gpu1
@@ -205,69 +504,327 @@ class DualGPUOrchestrator:
             reason = "complex_task_to_gpu0"
             
         else:  # MODERATE
-            # Balance between GPUs based on availability
-            gpu = self.gpu0  # Default to more powerful GPU
+            # Always the more powerful GPU (load-aware selection balances)
+            gpu = self.gpu0
             model = "qwen2.5-coder:7b-instruct-q8_0"
             reason = "moderate_task_to_gpu0"
         
         return gpu, model, reason
     
+    # ------------------------------------------------------------------
+    # Event loop behind the sync API
+    # ------------------------------------------------------------------
+    
+    def _run(self, coro):
+        """
+        Run a coroutine on the orchestrator's background event loop and
+        wait for it. All sync callers share that loop, so they share one
+        set of pooled AsyncClients instead of a thread + client per call.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            coro.close()
+            raise RuntimeError("sync DualGPUOrchestrator API called inside an event loop; await the a* method instead")
+        
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="dual-gpu-loop", daemon=True).start()
+                self._loop = loop
+        return asyncio.run_coroutine_threadsafe(tracing.bind(coro), self._loop).result()
+    
     def call_model(
         self,
         gpu: GPUEndpoint,
         model: str,
         prompt: str,
-        num_ctx: int = 4096
+        num_ctx: Optional[int] = None,
+        on_token: Optional[Callable[[str], None]] = None,
+        priority: Priority = Priority.CHAT,
+        timeout: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Sync wrapper for acall_model() (on_token is called on the orchestrator's loop thread)."""
+        return self._run(self.acall_model(gpu, model, prompt, num_ctx, on_token, priority, timeout, max_tokens))
+    
+    @tracing.traced("call_model")
+    async def acall_model(
+        self,
+        gpu: GPUEndpoint,
+        model: str,
+        prompt: str,
+        num_ctx: Optional[int] = None,
+        on_token: Optional[Callable[[str], Any]] = None,
+        priority: Priority = Priority.CHAT,
+        timeout: Optional[float] = None,
+        max_tokens: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Call a model on a specific GPU endpoint.
         
+        If on_token is given, the generation is streamed and on_token(text)
+        is called per chunk as it arrives (it may be a coroutine function);
+        the result then also carries "ttft" (time to first token) and "itl"
+        (mean inter-token gap), in seconds.
+        
+        The call first waits for a slot on the GPU's scheduler. If the
+        projected wait exceeds the priority's deadline, it fails fast with
+        success False and "overloaded" set to the Overloaded error.
+        
+        timeout bounds the generation itself (not the queue wait); when it
+        expires the request is cancelled and success is False. Cancelling
+        the awaiting task frees the GPU slot and closes the connection.
+        max_tokens caps the output (Ollama num_predict).
+        
+        num_ctx defaults to the adaptive size (context_window.py): the
+        prompt's tokens plus max_tokens (or the output reserve), rounded up
+        to a bucket that fits next to the models placed on the GPU.
+        
         Returns:
-            Response with text, timing, and metadata
+            Response with text, timing, and metadata ("queue_wait" in seconds,
+            "timings" with Ollama's gen_tps / prompt_tps / load_ms, see
+            streaming.ollama_timings, "num_ctx", and "truncated" when the
+            prompt or answer did not fit)
         """
-        start = time.time()
+        result = None
+        scheduler = self.schedulers[gpu.gpu_id]
+        # Counted while queued too, so load-aware selection sees the backlog
+        self.load.start(gpu.gpu_id)
+        tracing.annotate(gpu_id=gpu.gpu_id, model=model, priority=priority.name.lower(), stream=on_token is not None)
+        queued_ns = time.time_ns()
         
         try:
-            with httpx.Client(timeout=180.0) as client:
-                response = client.post(
-                    f"{gpu.url}/api/generate",
-                    json={
-                        "model": model,
-                        "prompt": prompt,
-                        "stream": False,
-                        "options": {"num_ctx": num_ctx}
-                    }
-                )
-                result = response.json()
+            waited = await scheduler.aacquire(priority)
+        except BaseException as e:
+            self.load.finish(gpu.gpu_id, model)
+            if not isinstance(e, Overloaded):
+                raise
+            tracing.current().fail(str(e))
+            if self.enable_metrics:
+                self.queue_rejections.labels(gpu_id=gpu.gpu_id, priority=priority.name.lower()).inc()
+            return {
+                "text": f"ERROR: {e}",
+                "time": 0.0,
+                "model": model,
+                "gpu": gpu.gpu_id,
+                "tokens": 0,
+                "success": False,
+                "error": str(e),
+                "overloaded": e,
+                "retry_after": e.retry_after
+            }
+        if self.enable_metrics:
+            self.queue_wait.labels(gpu_id=gpu.gpu_id, priority=priority.name.lower()).observe(waited)
+        tracing.record("queue_wait", queued_ns, time.time_ns())
+        
+        context = self.context.size(prompt, model, max_tokens, self._context_cap(gpu, model), num_ctx,
+                                    (gpu.gpu_id, model))
+        options = {"num_ctx": context.num_ctx}
+        if max_tokens:
+            options["num_predict"] = max_tokens
+        if self.enable_metrics:
+            self.context_requests.labels(gpu_id=gpu.gpu_id, model=model, num_ctx=context.num_ctx).inc()
+        tracing.annotate(num_ctx=context.num_ctx)
+        keep_alive = None
+        if self.warm_pool:
+            keep_alive = self.warm_pool.keep_alive(gpu.gpu_id, model)
+            self.warm_pool.touch(gpu.gpu_id, model, context.num_ctx)
+        
+        start = time.time()
+        try:
+            if on_token:
+                request = self._astream_model(gpu, model, prompt, options, on_token, start, keep_alive)
+            else:
+                request = self._agenerate(gpu, model, prompt, options, keep_alive)
+            result = await asyncio.wait_for(request, timeout)
             
             elapsed = time.time() - start
             
-            return {
+            output = {
                 "text": result.get("response", ""),
                 "time": elapsed,
                 "model": model,
                 "gpu": gpu.gpu_id,
                 "tokens": result.get("eval_count", 0),
+                "prompt_tokens": result.get("prompt_eval_count", 0),
+                "queue_wait": waited,
+                "timings": ollama_timings(result),
+                "num_ctx": context.num_ctx,
                 "success": True
             }
+            truncated = self.context.observe(context, model, prompt, result)
+            if truncated:
+                output["truncated"] = truncated
+                if self.enable_metrics:
+                    self.context_truncations.labels(gpu_id=gpu.gpu_id, model=model, reason=truncated).inc()
+            cold = self.warm_pool.record(gpu.gpu_id, model, result) if self.warm_pool else (
+                is_cold(result.get("load_duration", 0) / 1e9)
+            )
+            if self.enable_metrics:
+                self._observe_timings(gpu.gpu_id, model, output["timings"])
+                self.model_starts.labels(gpu_id=gpu.gpu_id, model=model, start="cold" if cold else "warm").inc()
+            tracing.record_generation(int(start * 1e9), time.time_ns(), result)
+            if on_token:
+                output["ttft"] = result["ttft"]
+                output["itl"] = result["itl"]
+                if self.enable_metrics and result["ttft"] is not None:
+                    self.time_to_first_token.labels(gpu_id=gpu.gpu_id, model=model).observe(result["ttft"])
+                    if result["itl"] is not None:
+                        self.inter_token_latency.labels(gpu_id=gpu.gpu_id, model=model).observe(result["itl"])
+            return output
             
         except Exception as e:
             elapsed = time.time() - start
+            error = f"timed out after {timeout:g}s" if isinstance(e, asyncio.TimeoutError) else str(e)
+            tracing.current().fail(error)
             return {
-                "text": f"ERROR: {str(e)}",
+                "text": f"ERROR: {error}",
                 "time": elapsed,
                 "model": model,
                 "gpu": gpu.gpu_id,
                 "tokens": 0,
                 "success": False,
-                "error": str(e)
+                "error": error
             }
+        finally:
+            scheduler.release(time.time() - start)
+            self.load.finish(gpu.gpu_id, model, result, time.time() - start)
+    
+    def _context_cap(self, gpu: GPUEndpoint, model: str) -> int:
+        """Largest num_ctx bucket the model can get on this GPU (placement.py footprints)."""
+        if self.planner is not None:
+            return self.planner.context_cap(gpu.gpu_id, model, self.context.buckets, self.plan)
+        return max_num_ctx(spec_footprint(model), gpu.max_vram_gb, self.context.buckets)
+    
+    def _observe_timings(self, gpu_id: int, model: str, timings: Dict[str, float]):
+        """Record Ollama's own throughput and load time for one generation."""
+        if "gen_tps" in timings:
+            self.generation_rate.labels(gpu_id=gpu_id, model=model).observe(timings["gen_tps"])
+        if "prompt_tps" in timings:
+            self.prompt_eval_rate.labels(gpu_id=gpu_id, model=model).observe(timings["prompt_tps"])
+        if "load_ms" in timings:
+            self.model_load.labels(gpu_id=gpu_id, model=model).observe(timings["load_ms"] / 1000)
+    
+    def _observe_warm_pool(self, action: str, gpu_id: int, model: str, seconds: float):
+        """Warm pool callback (runs on the pool's thread)."""
+        if action == "saved":
+            self.load_time_saved.labels(gpu_id=gpu_id, model=model).inc(seconds)
+        else:
+            self.warm_pool_actions.labels(gpu_id=gpu_id, model=model, action=action).inc()
+    
+    async def _agenerate(
+        self,
+        gpu: GPUEndpoint,
+        model: str,
+        prompt: str,
+        options: Dict[str, Any],
+        keep_alive: Optional[str] = None
+    ) -> Dict[str, Any]:
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "stream": False,
+            "options": options
+        }
+        if keep_alive:
+            payload["keep_alive"] = keep_alive
+        response = await backends.async_client(gpu.url).post(
+            f"{gpu.url}/api/generate",
+            json=payload,
+            timeout=180.0
+        )
+        try:
+            body = response.json()
+        except ValueError:
+            body = response.text
+        return _check_ollama(response.status_code, body)
+    
+    async def _astream_model(
+        self,
+        gpu: GPUEndpoint,
+        model: str,
+        prompt: str,
+        options: Dict[str, Any],
+        on_token: Callable[[str], Any],
+        start: float,
+        keep_alive: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Stream NDJSON from Ollama; returns the final chunk with joined text and token timings."""
+        parts = []
+        first = last = None
+        final: Dict[str, Any] = {}
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "stream": True,
+            "options": options
+        }
+        if keep_alive:
+            payload["keep_alive"] = keep_alive
+        
+        async with backends.async_client(gpu.url).stream(
+            "POST",
+            f"{gpu.url}/api/generate",
+            json=payload,
+            timeout=180.0
+        ) as response:
+            if response.status_code >= 400:
+                body = (await response.aread()).decode("utf-8", "replace")
+                try:
+                    body = json.loads(body)
+                except ValueError:
+                    pass
+                _check_ollama(response.status_code, body)
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                chunk = _check_ollama(response.status_code, json.loads(line))
+                if chunk.get("response"):
+                    last = time.time()
+                    first = first or last
+                    parts.append(chunk["response"])
+                    if inspect.isawaitable(ack := on_token(chunk["response"])):
+                        await ack
+                if chunk.get("done"):
+                    final = chunk
+        
+        final["response"] = "".join(parts)
+        final["ttft"] = first - start if first else None
+        final["itl"] = (last - first) / (len(parts) - 1) if len(parts) > 1 else None
+        return final
     
     def generate_with_audit(
         self,
         prompt: str,
         context: str = "",
-        concurrent: bool = True
+        concurrent: bool = True,
+        priority: Priority = Priority.CHAT,
+        draft_timeout: Optional[float] = None,
+        audit_timeout: Optional[float] = None,
+        audit: bool = True,
+        pipelined: bool = False,
+        task: Optional[str] = None
+    ) -> DualGPUResponse:
+        """Sync wrapper for agenerate_with_audit()."""
+        return self._run(self.agenerate_with_audit(
+            prompt, context, concurrent, priority, draft_timeout, audit_timeout, audit, pipelined, task
+        ))
+    
+    @tracing.traced("generate_with_audit")
+    async def agenerate_with_audit(
+        self,
+        prompt: str,
+        context: str = "",
+        concurrent: bool = True,
+        priority: Priority = Priority.CHAT,
+        draft_timeout: Optional[float] = None,
+        audit_timeout: Optional[float] = None,
+        audit: bool = True,
+        pipelined: bool = False,
+        task: Optional[str] = None
     ) -> DualGPUResponse:
         """
         Generate draft + audit using both GPUs.
@@ -278,21 +835,47 @@ class DualGPUOrchestrator:
         3. Generate audit on GPU 1 (small model) - concurrent if enabled
         4. Return combined response
         
+        Modes:
+        - concurrent: the audit assesses the request itself, in parallel
+        - pipelined: the draft is streamed and the audit reviews its first
+          pipeline_chars (BRIDGE_PIPELINE_CHARS) while the rest generates,
+          so latency approaches max(draft, head + audit) instead of the sum
+        - sequential: the audit reviews the finished draft
+        
         Args:
             prompt: User's request
             context: Additional context
             concurrent: Run draft + audit in parallel (default: True)
+            priority: Queue priority on both GPUs
+            draft_timeout / audit_timeout: Per-stage generation limits in
+                seconds (default: BRIDGE_DRAFT_TIMEOUT / BRIDGE_AUDIT_TIMEOUT)
+            audit: False when the caller only needs the draft
+            pipelined: Stream the draft into the audit (overrides concurrent)
+            task: The request's task type, for the learned router
+        
+        self.audit_policy decides whether the audit runs at all, and in
+        concurrent / pipelined mode cancels it when the draft fails or is trivially
+        short, or truncates it once it outlives the draft by grace_s.
+        The outcome is in audit["action"] and audit["reclaimed_s"]; an
+        audit that GPU 1 rejected, failed or timed out counts as cancelled.
         
         Returns:
             DualGPUResponse with draft, audit, and timing data
+        
+        Raises:
+            Overloaded: the draft's GPU queue was past its deadline (the
+                audit is cancelled), so the caller can return 429 or fall
+                back to the cloud
         """
         start_time = time.time()
+        draft_timeout = self.draft_timeout if draft_timeout is None else draft_timeout
+        audit_timeout = self.audit_timeout if audit_timeout is None else audit_timeout
         
         # Step 1: Classify task
-        complexity = self.classify_task(prompt, context)
+        complexity = self.classify_task(prompt, context, task)
         
-        # Step 2: Select GPU and model for draft
-        draft_gpu, draft_model, reason = self.select_gpu_and_model(complexity)
+        # Step 2: Select GPU and model for draft (may query /api/ps, so off the loop)
+        draft_gpu, draft_model, reason = await asyncio.to_thread(self.select_gpu_and_model, complexity)
         
         # Record routing decision
         routing = RoutingDecision(
@@ -303,35 +886,76 @@ class DualGPUOrchestrator:
             reason=reason,
             timestamp=start_time
         )
-        self.routing_history.append(routing)
-        
-        # Track metrics
-        if self.enable_metrics:
-            self.gpu_selection.labels(
-                gpu_id=draft_gpu.gpu_id,
-                reason=reason
-            ).inc()
+        seq = self.routing_history.append(routing)
         
         # Step 3: Generate draft
         full_prompt = f"{context}\n\n{prompt}" if context else prompt
         
-        print(f"🎭 Dual-GPU Execution ({'CONCURRENT' if concurrent else 'SEQUENTIAL'})")
+        mode = "PIPELINED" if pipelined else "CONCURRENT" if concurrent else "SEQUENTIAL"
+        tracing.annotate(mode=mode.lower(), complexity=complexity.name)
+        print(f"🎭 Dual-GPU Execution ({mode})")
         print(f"   Draft: {draft_model} on {draft_gpu.name}")
-        print(f"   Audit: qwen2.5-coder:1.5b on {self.gpu1.name}")
+        print(f"   Audit: {self.audit_model} on {self.gpu1.name}")
         print()
         
-        if concurrent:
-            # Concurrent execution: draft and audit in parallel
-            draft_result = {}
-            audit_result = {}
+        audit_model = self.audit_model
+        policy = self.audit_policy
+        run_audit = policy.should_start(complexity.name, audit)
+        # GPU 1 time a full audit would take: what skip / cancel / truncate reclaim
+        expected_audit_s = self.load.service_time(self.gpu1.gpu_id, audit_model, policy.max_tokens)
+        audit_started = None
+        partial: List[str] = []
+        # Wall-clock stage boundaries, for the overlap timings
+        marks: Dict[str, float] = {}
+        
+        def mark_done(name: str):
+            return lambda _task: marks.setdefault(name, time.time())
+        
+        if concurrent or pipelined:
+            draft_parts: List[str] = []
+            draft_chars = 0
+            head_ready = asyncio.Event()
             
-            def generate_draft():
-                draft_result.update(self.call_model(
-                    draft_gpu, draft_model, full_prompt
-                ))
+            def on_draft_token(text: str):
+                nonlocal draft_chars
+                draft_parts.append(text)
+                draft_chars += len(text)
+                if draft_chars >= self.pipeline_chars:
+                    head_ready.set()
             
-            def generate_audit():
-                audit_prompt = f"""Analyze this coding request and provide a quality assessment:
+            marks["draft_start"] = time.time()
+            draft_task = asyncio.ensure_future(self.acall_model(
+                draft_gpu, draft_model, full_prompt, priority=priority, timeout=draft_timeout,
+                on_token=on_draft_token if pipelined else None
+            ))
+            draft_task.add_done_callback(mark_done("draft_end"))
+            audit_task = None
+            try:
+                if pipelined:
+                    # Pipelined: audit the first pipeline_chars of the draft while the rest generates
+                    head_task = asyncio.ensure_future(head_ready.wait())
+                    await asyncio.wait({draft_task, head_task}, return_when=asyncio.FIRST_COMPLETED)
+                    head_task.cancel()
+                    if draft_task.done() and policy.after_draft(draft_task.result()) == CANCEL:
+                        run_audit = False
+                    head = "".join(draft_parts)[:self.pipeline_chars]
+                    audit_prompt = f"""Analyze the beginning of this draft response for quality:
+
+ORIGINAL REQUEST: {prompt}
+
+DRAFT RESPONSE (first {len(head)} characters{"" if draft_task.done() else ", still generating"}):
+{head}...
+
+Evaluate:
+1. Relevance (1-10)
+2. Correctness
+3. Completeness
+4. Suggestions for improvement
+
+Be brief and specific."""
+                else:
+                    # Concurrent execution: draft and audit in parallel
+                    audit_prompt = f"""Analyze this coding request and provide a quality assessment:
 
 REQUEST: {prompt}
 
@@ -344,25 +968,45 @@ Evaluate:
 
 Provide brief, actionable guidance."""
                 
-                audit_result.update(self.call_model(
-                    self.gpu1, "qwen2.5-coder:1.5b", audit_prompt
-                ))
-            
-            # Run both in parallel
-            thread1 = threading.Thread(target=generate_draft)
-            thread2 = threading.Thread(target=generate_audit)
-            
-            thread1.start()
-            thread2.start()
-            thread1.join()
-            thread2.join()
+                if run_audit:
+                    # Streamed, so a truncated audit keeps what it has produced
+                    audit_started = marks["audit_start"] = time.time()
+                    audit_task = asyncio.ensure_future(self.acall_model(
+                        self.gpu1, audit_model, audit_prompt, on_token=partial.append,
+                        priority=priority, timeout=audit_timeout, max_tokens=policy.max_tokens
+                    ))
+                    audit_task.add_done_callback(mark_done("audit_end"))
+                
+                draft_result = await draft_task
+                if audit_task is None:
+                    action = SKIP
+                elif draft_result.get("overloaded"):
+                    action = CANCEL
+                elif audit_task.done():
+                    action = FULL
+                elif policy.after_draft(draft_result) == CANCEL:
+                    action = CANCEL
+                else:
+                    done, _ = await asyncio.wait({audit_task}, timeout=policy.grace_s)
+                    action = FULL if done else TRUNCATE
+                audit_result = audit_task.result() if action == FULL else None
+            finally:
+                # No-op once finished; closes the audit stream when stopped early or we were cancelled
+                draft_task.cancel()
+                if audit_task is not None:
+                    audit_task.cancel()
+                    marks.setdefault("audit_end", time.time())
             
             if self.enable_metrics:
                 self.concurrent_executions.inc()
             
         else:
             # Sequential execution: draft first, then audit
-            draft_result = self.call_model(draft_gpu, draft_model, full_prompt)
+            marks["draft_start"] = time.time()
+            draft_result = await self.acall_model(
+                draft_gpu, draft_model, full_prompt, priority=priority, timeout=draft_timeout
+            )
+            marks["draft_end"] = time.time()
             
             audit_prompt = f"""Analyze this draft response for quality:
 
@@ -379,11 +1023,39 @@ Evaluate:
 
 Be brief and specific."""
             
-            audit_result = self.call_model(
-                self.gpu1, "qwen2.5-coder:1.5b", audit_prompt
-            )
+            if run_audit and policy.after_draft(draft_result) != CANCEL:
+                action = FULL
+                marks["audit_start"] = time.time()
+                audit_result = await self.acall_model(
+                    self.gpu1, audit_model, audit_prompt, priority=priority,
+                    timeout=audit_timeout, max_tokens=policy.max_tokens
+                )
+                marks["audit_end"] = time.time()
+            else:
+                action, audit_result = SKIP, None
+        
+        if audit_result is not None and not audit_result["success"]:
+            # Rejected, failed or timed out on GPU 1: there is no audit to serve
+            action, audit_result = CANCEL, None
+        if audit_result is None:
+            audit_result = self._stopped_audit(action, audit_model, partial, audit_started, expected_audit_s)
+        else:
+            audit_result["reclaimed_s"] = 0.0
+            self._record_audit(FULL, 0.0)
+        
+        if draft_result.get("overloaded"):
+            # GPU 0's queue is past its deadline: nothing to serve, the caller falls back
+            raise draft_result["overloaded"]
         
         total_time = time.time() - start_time
+        self.routing_history.set_latency(seq, total_time)
+        
+        # Overlap: how long both GPUs were busy with this request at once
+        draft_start = marks["draft_start"]
+        audit_start = overlap = None
+        if "audit_start" in marks:
+            audit_start = marks["audit_start"] - draft_start
+            overlap = min(marks["draft_end"], marks["audit_end"]) - max(draft_start, marks["audit_start"])
         
         # Track metrics
         if self.enable_metrics:
@@ -393,23 +1065,24 @@ Be brief and specific."""
                 task_type="draft"
             ).inc()
             
-            self.requests_total.labels(
-                gpu_id=self.gpu1.gpu_id,
-                model="qwen2.5-coder:1.5b",
-                task_type="audit"
-            ).inc()
-            
             self.inference_duration.labels(
                 gpu_id=draft_gpu.gpu_id,
                 model=draft_model,
-                concurrent=str(concurrent)
+                concurrent=str(concurrent or pipelined)
             ).observe(draft_result['time'])
             
-            self.inference_duration.labels(
-                gpu_id=self.gpu1.gpu_id,
-                model="qwen2.5-coder:1.5b",
-                concurrent=str(concurrent)
-            ).observe(audit_result['time'])
+            if action == FULL:
+                self.requests_total.labels(
+                    gpu_id=self.gpu1.gpu_id,
+                    model=audit_model,
+                    task_type="audit"
+                ).inc()
+                
+                self.inference_duration.labels(
+                    gpu_id=self.gpu1.gpu_id,
+                    model=audit_model,
+                    concurrent=str(concurrent or pipelined)
+                ).observe(audit_result['time'])
         
         # Build response
         return DualGPUResponse(
@@ -417,7 +1090,11 @@ Be brief and specific."""
             audit={
                 "text": audit_result['text'],
                 "model": audit_result['model'],
-                "tokens": audit_result['tokens']
+                "tokens": audit_result['tokens'],
+                "action": action,
+                "reclaimed_s": audit_result['reclaimed_s'],
+                # Grades the draft (pipelined / sequential audits); None otherwise
+                "score": audit_score(audit_result['text'])
             },
             draft_time=draft_result['time'],
             audit_time=audit_result['time'],
@@ -426,17 +1103,81 @@ Be brief and specific."""
             audit_gpu=self.gpu1.gpu_id,
             tokens_generated=draft_result['tokens'] + audit_result['tokens'],
             routing_decision=routing,
-            concurrent=concurrent
+            concurrent=concurrent or pipelined,
+            pipelined=pipelined,
+            audit_start=audit_start,
+            overlap_time=max(0.0, overlap or 0.0)
         )
     
-    def simple_generate(self, prompt: str, context: str = "") -> Dict[str, Any]:
+    def _stopped_audit(
+        self,
+        action: str,
+        model: str,
+        partial: List[str],
+        started: Optional[float],
+        expected_s: float
+    ) -> Dict[str, Any]:
+        """Audit result for a skipped / cancelled / truncated audit, recording the GPU 1 time reclaimed."""
+        ran = time.time() - started if started else 0.0
+        reclaimed = max(0.0, expected_s - ran)
+        self._record_audit(action, reclaimed)
+        text = "".join(partial) if action == TRUNCATE else ""
+        return {
+            "text": f"{text}\n[audit truncated]" if text else text,
+            "model": model,
+            "time": ran,
+            "tokens": len(partial) if action == TRUNCATE else 0,
+            "success": action == TRUNCATE,
+            "reclaimed_s": reclaimed
+        }
+    
+    def _record_audit(self, action: str, reclaimed: float):
+        self.audit_actions[action] += 1
+        self.audit_reclaimed_s += reclaimed
+        tracing.annotate(audit_action=action, audit_reclaimed_s=round(reclaimed, 3))
+        if self.enable_metrics:
+            self.audit_decisions.labels(action=action).inc()
+            if reclaimed:
+                self.audit_reclaimed.labels(action=action).inc(reclaimed)
+    
+    def simple_generate(
+        self,
+        prompt: str,
+        context: str = "",
+        on_token: Optional[Callable[[str], None]] = None,
+        priority: Priority = Priority.CHAT,
+        task: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Sync wrapper for asimple_generate()."""
+        return self._run(self.asimple_generate(prompt, context, on_token, priority, task=task))
+    
+    async def asimple_generate(
+        self,
+        prompt: str,
+        context: str = "",
+        on_token: Optional[Callable[[str], Any]] = None,
+        priority: Priority = Priority.CHAT,
+        timeout: Optional[float] = None,
+        task: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Simple generation without audit (single GPU).
         
-        Routes to appropriate GPU based on complexity.
+        Routes to appropriate GPU based on complexity (task is the request's
+        task type, for the learned router). Pass on_token to stream the
+        answer as it is generated.
         """
-        complexity = self.classify_task(prompt, context)
-        gpu, model, reason = self.select_gpu_and_model(complexity)
+        start_time = time.time()
+        complexity = self.classify_task(prompt, context, task)
+        gpu, model, reason = await asyncio.to_thread(self.select_gpu_and_model, complexity)
+        seq = self.routing_history.append(RoutingDecision(
+            task_type="simple_generation",
+            complexity=complexity,
+            selected_gpu=gpu.gpu_id,
+            model=model,
+            reason=reason,
+            timestamp=start_time
+        ))
         
         full_prompt = f"{context}\n\n{prompt}" if context else prompt
         
@@ -444,7 +1185,11 @@ Be brief and specific."""
         print(f"   Model: {model} on {gpu.name}")
         print()
         
-        result = self.call_model(gpu, model, full_prompt)
+        result = await self.acall_model(
+            gpu, model, full_prompt, on_token=on_token, priority=priority,
+            timeout=self.draft_timeout if timeout is None else timeout
+        )
+        self.routing_history.set_latency(seq, time.time() - start_time)
         
         if self.enable_metrics:
             self.requests_total.labels(
@@ -455,19 +1200,76 @@ Be brief and specific."""
         
         return result
     
-    def get_stats(self) -> Dict[str, Any]:
-        """Get orchestrator statistics."""
+    def get_stats(self, window_s: float = 300.0) -> Dict[str, Any]:
+        """Get orchestrator statistics (latency percentiles over the last window_s seconds)."""
+        history = self.routing_history.stats()
         return {
-            "total_requests": len(self.routing_history),
-            "gpu0_requests": sum(1 for r in self.routing_history if r.selected_gpu == 0),
-            "gpu1_requests": sum(1 for r in self.routing_history if r.selected_gpu == 1),
+            "total_requests": history["total"],
+            "gpu0_requests": self.routing_history.by_gpu[0],
+            "gpu1_requests": self.routing_history.by_gpu[1],
             "complexity_breakdown": {
-                "simple": sum(1 for r in self.routing_history if r.complexity == TaskComplexity.SIMPLE),
-                "moderate": sum(1 for r in self.routing_history if r.complexity == TaskComplexity.MODERATE),
-                "complex": sum(1 for r in self.routing_history if r.complexity == TaskComplexity.COMPLEX)
-            }
+                c.value: self.routing_history.by_complexity[c.name] for c in TaskComplexity
+            },
+            "history": {
+                "retained": history["retained"],
+                "capacity": history["capacity"],
+                "by_reason": history["by_reason"],
+                "latency": self.routing_history.window_percentiles(window_s)
+            },
+            "load": self.load.snapshot(),
+            "scheduler": {f"gpu{gpu_id}": s.stats() for gpu_id, s in self.schedulers.items()},
+            "audit": {
+                "actions": dict(self.audit_actions),
+                "gpu1_reclaimed_s": round(self.audit_reclaimed_s, 3)
+            },
+            "warm_pool": self.warm_pool.stats() if self.warm_pool else None,
+            "placement": self.plan.to_dict() if self.plan else None,
+            "context": self.context.stats()
         }
 
+    
+    def serve_stats(self, port: int, host: str = "127.0.0.1"):
+        """
+        Serve stats and the routing history over HTTP from a daemon thread.
+        
+            GET /stats[?window=300]                  get_stats() as JSON
+            GET /history[?format=jsonl|csv&limit=N]  retained routing decisions
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from urllib.parse import parse_qs, urlsplit
+        
+        orchestrator = self
+        
+        class StatsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlsplit(self.path)
+                query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+                if url.path == "/stats":
+                    body = json.dumps(orchestrator.get_stats(float(query.get("window", 300))), default=str)
+                    content_type = "application/json"
+                elif url.path == "/history":
+                    fmt = query.get("format", "jsonl")
+                    limit = int(query["limit"]) if "limit" in query else None
+                    body = orchestrator.routing_history.export(fmt, limit)
+                    content_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode()
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            
+            def log_message(self, *args):
+                pass
+        
+        server = ThreadingHTTPServer((host, port), StatsHandler)
+        threading.Thread(target=server.serve_forever, name="dual-gpu-stats", daemon=True).start()
+        print(f"📊 Orchestrator stats on http://{host}:{server.server_port}/stats", file=sys.stderr)
+        return server
+
 
 # Demo / Testing
 if __name__ == "__main__":
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Per-GPU load tracking for DualGPUOrchestrator
+
+Feeds load-aware select_gpu_and_model():
+- In-flight generations per GPUEndpoint (incremented around call_model)
+- Recent tokens/sec, fixed overhead and output length per (GPU, model),
+  as exponentially weighted averages of Ollama's own timing fields
+- Models currently loaded and their VRAM size, from Ollama /api/ps
+  (cached for a few seconds; warm_pool.py updates it as it loads and
+  evicts models)
+
+estimate() turns these into an expected completion time for sending one
+more request to a (GPU, model) pair:
+
+    queue   = in_flight * service            (one GPU works through its backlog)
+    service = overhead + tokens / tokens_per_sec
+    cold    = load_time if the model is not loaded, else 0
+
+Environment variables:
+    BRIDGE_PS_TTL           - Seconds to cache /api/ps results (default: 5)
+    BRIDGE_EXPECTED_TOKENS  - Output length assumed before any data (default: 256)
+"""
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Set, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend_clients import backends
+
+# Weight of the newest observation in the moving averages
+EWMA_ALPHA = 0.2
+
+# Priors used until a (GPU, model) pair has been observed
+DEFAULT_TOKENS_PER_SEC = 50.0
+DEFAULT_OVERHEAD_S = 0.5
+DEFAULT_LOAD_TIME_S = 10.0
+
+
+@dataclass
+class ModelStats:
+    """Moving averages for one model on one GPU."""
+    tokens_per_sec: float = DEFAULT_TOKENS_PER_SEC
+    overhead_s: float = DEFAULT_OVERHEAD_S
+    output_tokens: float = 256.0
+    load_time_s: float = DEFAULT_LOAD_TIME_S
+    samples: int = 0
+
+
+def _ewma(old: float, new: float, first: bool) -> float:
+    return new if first else (1 - EWMA_ALPHA) * old + EWMA_ALPHA * new
+
+
+class GPULoadTracker:
+    """
+    Thread-safe load state shared by all requests of one orchestrator.
+
+    GPUs are keyed by their gpu_id (with the URL used for /api/ps).
+    """
+
+    def __init__(self, ps_ttl: Optional[float] = None, expected_tokens: Optional[int] = None):
+        self.ps_ttl = float(os.getenv("BRIDGE_PS_TTL", "5")) if ps_ttl is None else ps_ttl
+        self.expected_tokens = (
+            int(os.getenv("BRIDGE_EXPECTED_TOKENS", "256")) if expected_tokens is None else expected_tokens
+        )
+        self._lock = threading.Lock()
+        self._in_flight: Dict[int, int] = {}
+        self._stats: Dict[Tuple[int, str], ModelStats] = {}
+        self._loaded: Dict[int, Tuple[float, Optional[Set[str]]]] = {}
+        self._vram_gb: Dict[Tuple[int, str], float] = {}
+
+    # ------------------------------------------------------------------
+    # Request accounting
+    # ------------------------------------------------------------------
+
+    def start(self, gpu_id: int):
+        with self._lock:
+            self._in_flight[gpu_id] = self._in_flight.get(gpu_id, 0) + 1
+
+    def finish(self, gpu_id: int, model: str, result: Optional[Dict] = None, elapsed: Optional[float] = None):
+        """Release an in-flight slot and learn from Ollama's timing fields."""
+        with self._lock:
+            self._in_flight[gpu_id] = max(0, self._in_flight.get(gpu_id, 0) - 1)
+            if not result or not result.get("eval_count"):
+                return
+            stats = self._stats.setdefault((gpu_id, model), ModelStats(output_tokens=self.expected_tokens))
+            first = stats.samples == 0
+            eval_s = result.get("eval_duration", 0) / 1e9
+            load_s = result.get("load_duration", 0) / 1e9
+            total_s = result.get("total_duration", 0) / 1e9 or (elapsed or 0.0)
+            if eval_s > 0:
+                stats.tokens_per_sec = _ewma(stats.tokens_per_sec, result["eval_count"] / eval_s, first)
+            stats.overhead_s = _ewma(stats.overhead_s, max(0.0, total_s - eval_s - load_s), first)
+            stats.output_tokens = _ewma(stats.output_tokens, result["eval_count"], first)
+            if load_s > 1.0:
+                stats.load_time_s = load_s
+            stats.samples += 1
+            # A model that just answered is resident now
+            cached = self._loaded.get(gpu_id)
+            if cached and cached[1] is not None:
+                cached[1].add(model)
+
+    def in_flight(self, gpu_id: int) -> int:
+        return self._in_flight.get(gpu_id, 0)
+
+    def samples(self, gpu_id: int, model: str) -> int:
+        """Generations of (gpu, model) observed so far (0 = estimates are priors)."""
+        stats = self._stats.get((gpu_id, model))
+        return stats.samples if stats else 0
+
+    # ------------------------------------------------------------------
+    # Loaded models (/api/ps)
+    # ------------------------------------------------------------------
+
+    def loaded_models(self, gpu_id: int, url: str, refresh: bool = False) -> Optional[Set[str]]:
+        """Models Ollama reports as loaded (None if the endpoint did not answer)."""
+        now = time.monotonic()
+        cached = self._loaded.get(gpu_id)
+        if cached and now - cached[0] < self.ps_ttl and not refresh:
+            return cached[1]
+        try:
+            response = backends.client(url).get(f"{url}/api/ps", timeout=1.0)
+            response.raise_for_status()
+            running = response.json().get("models", [])
+            models: Optional[Set[str]] = {m.get("name") or m.get("model") for m in running}
+        except Exception:
+            running, models = [], None
+        with self._lock:
+            self._loaded[gpu_id] = (now, models)
+            for m in running:
+                if m.get("size_vram"):
+                    self._vram_gb[(gpu_id, m.get("name") or m.get("model"))] = m["size_vram"] / 1e9
+        return models
+
+    def set_loaded(self, gpu_id: int, model: str, loaded: bool):
+        """Record a load or unload we caused, without waiting for the next /api/ps."""
+        with self._lock:
+            cached = self._loaded.get(gpu_id)
+            if not cached or cached[1] is None:
+                return
+            if loaded:
+                cached[1].add(model)
+            else:
+                cached[1].discard(model)
+
+    def vram_gb(self, gpu_id: int, model: str) -> Optional[float]:
+        """VRAM the model occupied when /api/ps last listed it (None if never seen loaded)."""
+        return self._vram_gb.get((gpu_id, model))
+
+    # ------------------------------------------------------------------
+    # Estimation
+    # ------------------------------------------------------------------
+
+    def service_time(self, gpu_id: int, model: str, max_tokens: Optional[int] = None) -> float:
+        """Expected seconds one generation of (gpu, model) runs once started."""
+        stats = self._stats.get((gpu_id, model)) or ModelStats(output_tokens=self.expected_tokens)
+        tokens = min(stats.output_tokens, max_tokens) if max_tokens else stats.output_tokens
+        return stats.overhead_s + tokens / stats.tokens_per_sec
+
+    def estimate(self, gpu_id: int, url: str, model: str) -> Dict[str, float]:
+        """Expected seconds until one more request to (gpu, model) completes."""
+        stats = self._stats.get((gpu_id, model)) or ModelStats(output_tokens=self.expected_tokens)
+        service = self.service_time(gpu_id, model)
+        loaded = self.loaded_models(gpu_id, url)
+        cold = stats.load_time_s if loaded is not None and model not in loaded else 0.0
+        queue = self.in_flight(gpu_id) * service
+        return {"eta": queue + service + cold, "queue": queue, "service": service, "cold": cold}
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Current state, for get_stats()."""
+        with self._lock:
+            return {
+                "in_flight": dict(self._in_flight),
+                "models": {
+                    f"gpu{gpu_id}:{model}": {
+                        "tokens_per_sec": round(s.tokens_per_sec, 1),
+                        "overhead_s": round(s.overhead_s, 3),
+                        "output_tokens": round(s.output_tokens, 1),
+                        "samples": s.samples,
+                    }
+                    for (gpu_id, model), s in self._stats.items()
+                },
+            }
@@ -0,0 +1,530 @@
+#!/usr/bin/env python3
+"""
+VRAM-aware model placement for DualGPUOrchestrator
+
+Decides which models should be resident on which GPU, so routing never
+asks a card to hold more than fits (a 16 GB card alternating between a
+20B and a 14B model reloads one of them on almost every request).
+
+Footprint of a loaded model, in GB:
+
+    weights  = parameters * bits_per_weight / 8
+    kv_cache = 2 (K and V) * layers * kv_heads * head_dim * 2 bytes (f16)
+               * num_ctx * OLLAMA_NUM_PARALLEL
+    total    = weights + kv_cache + OVERHEAD_GB (CUDA context, compute graph)
+
+The architecture comes from Ollama /api/show (model_info and
+quantization_level) when the endpoint answers, else from MODEL_SPECS,
+else from the parameter count in the tag.
+
+The planner enumerates every set of models per GPU that fits in
+max_vram_gb (minus BRIDGE_VRAM_RESERVE_GB) from the models the tiers can
+use (plus GPUEndpoint.models), keeps the combinations that give every
+tier at least one resident model, and scores each by the busiest GPU's
+seconds of work per request of the observed traffic mix (each tier's
+share spread over its resident models so the GPUs finish together).
+The best combination maximises saturated throughput; ties go to the one
+using less VRAM. select_gpu_and_model() then only chooses among placed
+pairs, and context_cap() bounds each request's num_ctx by the VRAM left
+next to the other models placed on its GPU (see context_window.py).
+
+Usage:
+    python3 placement.py footprints [--num-ctx 8192]
+    python3 placement.py plan --history history.jsonl
+    python3 placement.py simulate --history history.jsonl --speedup 20
+
+history.jsonl is the orchestrator's routing history
+(GET /history?format=jsonl, see routing_history.py).
+
+Environment variables:
+    BRIDGE_PLACEMENT          - auto (plan from traffic) or off (fixed candidates) (default: auto)
+    BRIDGE_PLACEMENT_INTERVAL - Seconds between re-plans (default: 600)
+    BRIDGE_PLACEMENT_NUM_CTX  - Context the footprints are sized for (default: 4096)
+    BRIDGE_VRAM_RESERVE_GB    - VRAM kept free per GPU (default: 0.5)
+    OLLAMA_NUM_PARALLEL       - Ollama's parallel slots per model; multiplies the KV cache (default: 1)
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+import sys
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend_clients import backends
+
+DEFAULT_NUM_CTX = 4096
+
+# Parameters (B), bits per weight, layers, KV heads, head dim
+MODEL_SPECS = {
+    "gpt-oss:20b": (20.9, 5.0, 24, 8, 64),
+    "qwen2.5-coder:14b": (14.8, 4.85, 48, 8, 128),
+    "qwen2.5-coder:7b-instruct-q8_0": (7.6, 8.5, 28, 4, 128),
+    "phi3.5:3.8b": (3.8, 4.5, 32, 32, 96),
+    "qwen2.5-coder:3b": (3.1, 4.85, 36, 2, 128),
+    "qwen2.5-coder:1.5b": (1.5, 4.85, 28, 2, 128),
+}
+
+# Effective bits per weight of Ollama quantization levels
+QUANT_BITS = {
+    "Q4_0": 4.5, "Q4_1": 5.0, "Q4_K_S": 4.6, "Q4_K_M": 4.85, "Q5_0": 5.5, "Q5_K_M": 5.7,
+    "Q6_K": 6.6, "Q8_0": 8.5, "F16": 16.0, "BF16": 16.0, "MXFP4": 5.0,
+}
+
+# Unknown architecture: KV cache per token per billion parameters (GQA-sized models)
+KV_BYTES_PER_TOKEN_PER_B = 12_000
+OVERHEAD_GB = 0.4
+
+# Decode is memory-bound: tokens/sec ~ bandwidth / weights * efficiency
+DECODE_EFFICIENCY = 0.6
+DEFAULT_TOKENS_PER_SEC = 50.0
+DEFAULT_OVERHEAD_S = 0.5
+
+# Disk / PCIe throughput for loading weights, GB/s (simulator cold starts)
+LOAD_GB_PER_S = 2.0
+
+# Tier shares are split into this many slices when balancing GPUs
+SLICES = 20
+
+
+@dataclass(frozen=True)
+class Footprint:
+    """Memory of one model: fixed weights plus KV cache per context token."""
+    weights_gb: float
+    kv_gb_per_token: float
+    source: str
+    context_length: int = 0  # trained context (0 = unknown)
+
+    def gb(self, num_ctx: int = DEFAULT_NUM_CTX, parallel: int = 1) -> float:
+        return self.weights_gb + self.kv_gb_per_token * num_ctx * parallel + OVERHEAD_GB
+
+
+def _kv_gb_per_token(layers: int, kv_heads: int, head_dim: int) -> float:
+    return 2 * layers * kv_heads * head_dim * 2 / 1e9
+
+
+def _params_from_tag(model: str) -> Optional[float]:
+    tag = model.split(":")[-1].split("-")[0].lower()
+    try:
+        return float(tag.rstrip("b"))
+    except ValueError:
+        return None
+
+
+def spec_footprint(model: str) -> Footprint:
+    """Footprint from MODEL_SPECS, else estimated from the tag (Q4_K_M assumed)."""
+    if model in MODEL_SPECS:
+        params, bits, layers, kv_heads, head_dim = MODEL_SPECS[model]
+        return Footprint(params * bits / 8, _kv_gb_per_token(layers, kv_heads, head_dim), "table")
+    params = _params_from_tag(model) or 7.0
+    return Footprint(params * QUANT_BITS["Q4_K_M"] / 8, params * KV_BYTES_PER_TOKEN_PER_B / 1e9, "tag")
+
+
+def footprint_gb(model: str, num_ctx: int = DEFAULT_NUM_CTX) -> float:
+    """VRAM estimate without asking Ollama (MODEL_SPECS or the tag)."""
+    return spec_footprint(model).gb(num_ctx, int(os.getenv("OLLAMA_NUM_PARALLEL", "1")))
+
+
+def show_footprint(show: Dict[str, Any], model: str) -> Footprint:
+    """Footprint from an /api/show response, filling gaps from spec_footprint()."""
+    fallback = spec_footprint(model)
+    details = show.get("details") or {}
+    info = show.get("model_info") or {}
+    arch = info.get("general.architecture", "")
+
+    params = info.get("general.parameter_count")
+    if not params and details.get("parameter_size"):
+        size = details["parameter_size"].upper()
+        scale = {"B": 1e9, "M": 1e6}.get(size[-1], 1.0)
+        try:
+            params = float(size.rstrip("BM")) * scale
+        except ValueError:
+            params = None
+    bits = QUANT_BITS.get(str(details.get("quantization_level", "")).upper())
+    if not params or not bits:
+        return fallback
+    weights_gb = params * bits / 8 / 1e9
+
+    layers = info.get(f"{arch}.block_count")
+    heads = info.get(f"{arch}.attention.head_count")
+    kv_heads = info.get(f"{arch}.attention.head_count_kv") or heads
+    head_dim = info.get(f"{arch}.attention.key_length") or (
+        info[f"{arch}.embedding_length"] // heads if heads and info.get(f"{arch}.embedding_length") else None
+    )
+    context_length = info.get(f"{arch}.context_length") or 0
+    if layers and kv_heads and head_dim:
+        return Footprint(weights_gb, _kv_gb_per_token(layers, kv_heads, head_dim), "api/show", context_length)
+    return Footprint(weights_gb, fallback.kv_gb_per_token, "api/show", context_length)
+
+
+def max_num_ctx(footprint: Footprint, free_gb: float, sizes: Iterable[int], parallel: int = 1) -> int:
+    """Largest of sizes that fits in free_gb and the model's trained context (0 if none)."""
+    return max((n for n in sizes
+                if footprint.gb(n, parallel) <= free_gb
+                and (not footprint.context_length or n <= footprint.context_length)), default=0)
+
+
+class Footprints:
+    """
+    Per-model footprints: from /api/show once per model (cached), else the
+    table. A failed /api/show is retried after SHOW_RETRY_S, not on every call.
+    """
+
+    SHOW_RETRY_S = 300.0
+
+    def __init__(self):
+        self._cache: Dict[str, Footprint] = {}
+        self._tried: Dict[str, float] = {}
+
+    def get(self, model: str, url: Optional[str] = None) -> Footprint:
+        cached = self._cache.get(model)
+        if cached is not None and (cached.source == "api/show" or url is None
+                                   or time.monotonic() - self._tried.get(model, 0.0) < self.SHOW_RETRY_S):
+            return cached
+        footprint = None
+        if url:
+            self._tried[model] = time.monotonic()
+            try:
+                response = backends.client(url).post(f"{url}/api/show", json={"model": model}, timeout=2.0)
+                response.raise_for_status()
+                footprint = show_footprint(response.json(), model)
+            except Exception:
+                footprint = None
+        footprint = footprint or spec_footprint(model)
+        self._cache[model] = footprint
+        return footprint
+
+
+@dataclass
+class Plan:
+    """One placement: resident models per GPU and how it scores on a traffic mix."""
+    placement: Dict[int, Tuple[str, ...]]
+    bottleneck_s: float              # busiest GPU's seconds of work per request of the mix
+    used_gb: Dict[int, float]
+    mix: Dict[str, float] = field(default_factory=dict)
+    share: Dict[Tuple[int, str], float] = field(default_factory=dict)  # traffic share per placed pair
+
+    @property
+    def throughput_rps(self) -> float:
+        """Saturated requests/sec of the mix (one generation at a time per GPU)."""
+        return 1.0 / self.bottleneck_s if self.bottleneck_s > 0 else math.inf
+
+    def pairs(self) -> List[Tuple[int, str]]:
+        return [(gpu_id, model) for gpu_id, models in self.placement.items() for model in models]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "placement": {f"gpu{gpu_id}": list(models) for gpu_id, models in self.placement.items()},
+            "used_gb": {f"gpu{gpu_id}": round(gb, 2) for gpu_id, gb in self.used_gb.items()},
+            "throughput_rps": round(self.throughput_rps, 3),
+            "mix": {tier: round(share, 3) for tier, share in self.mix.items()},
+            "share": {f"gpu{g}:{m}": round(s, 3) for (g, m), s in self.share.items() if s},
+        }
+
+
+class PlacementPlanner:
+    """
+    Solves the placement for a set of GPUs (GPUEndpoints) and tiers.
+
+    tiers maps a tier name to the models that may serve it, in order of
+    preference; tier_gpus optionally restricts a tier to some GPUs (the
+    audit always runs on GPU 1).
+    """
+
+    def __init__(
+        self,
+        gpus: List[Any],
+        tiers: Dict[str, List[str]],
+        tier_gpus: Optional[Dict[str, Set[int]]] = None,
+        num_ctx: int = DEFAULT_NUM_CTX,
+        reserve_gb: float = 0.5,
+        parallel: int = 1,
+        interval: float = 600.0,
+        footprints: Optional[Footprints] = None
+    ):
+        self.gpus = {gpu.gpu_id: gpu for gpu in gpus}
+        self.tiers = tiers
+        self.tier_gpus = tier_gpus or {}
+        self.num_ctx = num_ctx
+        self.reserve_gb = reserve_gb
+        self.parallel = parallel
+        self.interval = interval
+        self.footprints = footprints or Footprints()
+
+    @classmethod
+    def from_env(cls, gpus: List[Any], tiers: Dict[str, List[str]],
+                 tier_gpus: Optional[Dict[str, Set[int]]] = None,
+                 force: bool = False) -> Optional["PlacementPlanner"]:
+        """A planner unless BRIDGE_PLACEMENT is off (force: build one anyway, e.g. for the CLI)."""
+        if not force and os.getenv("BRIDGE_PLACEMENT", "auto").lower() == "off":
+            return None
+        return cls(
+            gpus, tiers, tier_gpus,
+            num_ctx=int(os.getenv("BRIDGE_PLACEMENT_NUM_CTX", str(DEFAULT_NUM_CTX))),
+            reserve_gb=float(os.getenv("BRIDGE_VRAM_RESERVE_GB", "0.5")),
+            parallel=int(os.getenv("OLLAMA_NUM_PARALLEL", "1")),
+            interval=float(os.getenv("BRIDGE_PLACEMENT_INTERVAL", "600"))
+        )
+
+    # ------------------------------------------------------------------
+    # Memory
+    # ------------------------------------------------------------------
+
+    def capacity_gb(self, gpu_id: int) -> float:
+        return self.gpus[gpu_id].max_vram_gb - self.reserve_gb
+
+    def model_gb(self, gpu_id: int, model: str, num_ctx: Optional[int] = None) -> float:
+        footprint = self.footprints.get(model, self.gpus[gpu_id].url)
+        return footprint.gb(num_ctx or self.num_ctx, self.parallel)
+
+    def context_cap(self, gpu_id: int, model: str, sizes: Iterable[int], plan: Optional[Plan] = None) -> int:
+        """Largest num_ctx in sizes for model on a GPU, next to the other models placed there."""
+        # Cached footprints only (no /api/show): this runs on the request path
+        others = [m for m in (plan.placement.get(gpu_id, ()) if plan else ()) if m != model]
+        free = self.capacity_gb(gpu_id) - sum(self.footprints.get(m).gb(self.num_ctx, self.parallel) for m in others)
+        return max_num_ctx(self.footprints.get(model), free, sizes, self.parallel)
+
+    def fits(self, gpu_id: int, models: Iterable[str]) -> bool:
+        return sum(self.model_gb(gpu_id, m) for m in models) <= self.capacity_gb(gpu_id)
+
+    def domain(self, gpu_id: int) -> List[str]:
+        """Models worth considering on a GPU: those some tier can use here, that fit alone."""
+        models = []
+        for tier, tier_models in self.tiers.items():
+            if gpu_id in self.tier_gpus.get(tier, self.gpus):
+                models.extend(tier_models)
+        models.extend(self.gpus[gpu_id].models)
+        unique = list(dict.fromkeys(models))
+        return [m for m in unique if self.fits(gpu_id, [m])]
+
+    # ------------------------------------------------------------------
+    # Solving
+    # ------------------------------------------------------------------
+
+    def prior_service_s(self, gpu_id: int, model: str, tokens: int = 256) -> float:
+        """Seconds per generation before any is observed: decode is bandwidth-bound."""
+        bandwidth = getattr(self.gpus[gpu_id], "mem_bandwidth_gbps", 0.0)
+        weights = self.footprints.get(model).weights_gb
+        tps = bandwidth / weights * DECODE_EFFICIENCY if bandwidth and weights else DEFAULT_TOKENS_PER_SEC
+        return DEFAULT_OVERHEAD_S + tokens / tps
+
+    def evaluate(
+        self,
+        placement: Dict[int, Tuple[str, ...]],
+        mix: Dict[str, float],
+        service: Callable[[int, str], float]
+    ) -> Optional[Plan]:
+        """Score a placement on a mix (None if some tier in the mix has no resident model)."""
+        busy = {gpu_id: 0.0 for gpu_id in self.gpus}
+        share: Dict[Tuple[int, str], float] = {}
+        for tier, weight in sorted(mix.items(), key=lambda kv: -kv[1]):
+            allowed = self.tier_gpus.get(tier, self.gpus)
+            pairs = [(g, m) for g, models in placement.items() if g in allowed
+                     for m in models if m in self.tiers.get(tier, ())]
+            if not pairs:
+                return None
+            if weight <= 0:
+                continue
+            cost = {pair: service(*pair) for pair in pairs}
+            piece = weight / SLICES
+            for _ in range(SLICES):
+                g, m = min(pairs, key=lambda p: busy[p[0]] + piece * cost[p])
+                busy[g] += piece * cost[(g, m)]
+                share[(g, m)] = share.get((g, m), 0.0) + piece
+        used = {g: sum(self.model_gb(g, m) for m in models) for g, models in placement.items()}
+        return Plan(dict(placement), max(busy.values()), used, dict(mix), share)
+
+    def options(self, gpu_id: int) -> List[Tuple[str, ...]]:
+        """Every set of domain models that fits on the GPU together."""
+        domain = self.domain(gpu_id)
+        return [combo for size in range(len(domain) + 1) for combo in itertools.combinations(domain, size)
+                if self.fits(gpu_id, combo)]
+
+    def solve(self, mix: Dict[str, float], service: Optional[Callable[[int, str], float]] = None) -> Optional[Plan]:
+        """Best placement for the mix (tiers missing from it still get a resident model)."""
+        service = service or self.prior_service_s
+        total = sum(mix.get(tier, 0.0) for tier in self.tiers) or 1.0
+        full_mix = {tier: mix.get(tier, 0.0) / total for tier in self.tiers}
+        gpu_ids = list(self.gpus)
+        best = None
+        for combo in itertools.product(*(self.options(g) for g in gpu_ids)):
+            plan = self.evaluate(dict(zip(gpu_ids, combo)), full_mix, service)
+            if plan is None:
+                continue
+            key = (round(plan.bottleneck_s, 6), sum(plan.used_gb.values()))
+            if best is None or key < best[0]:
+                best = (key, plan)
+        return best[1] if best else None
+
+    def candidates(self, plan: Plan, tier: str, preferred: List[Tuple[int, str]]) -> List[Tuple[int, str]]:
+        """Placed (gpu_id, model) pairs for a tier: preferred order first, then the rest."""
+        placed = [p for p in plan.pairs() if p[1] in self.tiers.get(tier, ())
+                  and p[0] in self.tier_gpus.get(tier, self.gpus)]
+        return [p for p in preferred if p in placed] + [p for p in placed if p not in preferred]
+
+
+# ----------------------------------------------------------------------
+# Traffic replay
+# ----------------------------------------------------------------------
+
+def traffic_mix(records: Iterable[Dict[str, Any]], audited: Optional[Callable[[str], bool]] = None) -> Dict[str, float]:
+    """Share of requests per tier in routing history records (audits counted as tier AUDIT)."""
+    counts: Counter = Counter()
+    for r in records:
+        counts[r["complexity"]] += 1
+        if audited and r.get("task_type") == "draft_generation" and audited(r["complexity"]):
+            counts["AUDIT"] += 1
+    total = sum(counts.values())
+    return {tier: n / total for tier, n in counts.items()} if total else {}
+
+
+def replay_requests(records: Iterable[Dict[str, Any]], audited: Optional[Callable[[str], bool]] = None,
+                    speedup: float = 1.0) -> List[Tuple[float, str]]:
+    """(arrival_s, tier) per generation, relative to the first record, time divided by speedup."""
+    rows = sorted(records, key=lambda r: r["timestamp"])
+    if not rows:
+        return []
+    t0 = rows[0]["timestamp"]
+    requests = []
+    for r in rows:
+        at = (r["timestamp"] - t0) / speedup if speedup != math.inf else 0.0
+        requests.append((at, r["complexity"]))
+        if audited and r.get("task_type") == "draft_generation" and audited(r["complexity"]):
+            requests.append((at, "AUDIT"))
+    return requests
+
+
+def simulate(
+    planner: PlacementPlanner,
+    placement: Dict[int, Tuple[str, ...]],
+    requests: List[Tuple[float, str]],
+    service: Callable[[int, str], float],
+    load_s: Optional[Callable[[int, str], float]] = None,
+    load_aware: bool = True
+) -> Dict[str, Any]:
+    """
+    Replay requests against a placement: one generation at a time per GPU,
+    each request routed to the placed pair that would finish it first
+    (load_aware) or to the tier's most preferred placed model (static).
+    Listed models start resident in order while they fit; a model that is
+    not resident is loaded (load_s, default weights / LOAD_GB_PER_S) after
+    evicting the least recently used ones, as Ollama does.
+    """
+    load_s = load_s or (lambda g, m: planner.footprints.get(m).weights_gb / LOAD_GB_PER_S)
+    free_at = {g: 0.0 for g in planner.gpus}
+    resident: Dict[int, "OrderedDict[str, None]"] = {}
+    for g in planner.gpus:
+        resident[g] = OrderedDict()
+        for m in placement.get(g, ()):
+            if planner.fits(g, list(resident[g]) + [m]):
+                resident[g][m] = None
+
+    latencies, finished, loads, load_total, unserved = [], [], 0, 0.0, 0
+    for arrival, tier in requests:
+        allowed = planner.tier_gpus.get(tier, planner.gpus)
+        pairs = [(g, m) for g, models in placement.items() if g in allowed
+                 for m in models if m in planner.tiers.get(tier, ())]
+        if not pairs:
+            unserved += 1
+            continue
+
+        def finish(pair):
+            g, m = pair
+            cold = 0.0 if m in resident[g] else load_s(g, m)
+            return max(arrival, free_at[g]) + cold + service(g, m), cold
+
+        if load_aware:
+            g, m = min(pairs, key=lambda p: finish(p)[0])
+        else:
+            g, m = min(pairs, key=lambda p: (planner.tiers[tier].index(p[1]), p[1] not in planner.gpus[p[0]].models, p[0]))
+        done, cold = finish((g, m))
+        if cold:
+            loads += 1
+            load_total += cold
+            while resident[g] and not planner.fits(g, list(resident[g]) + [m]):
+                resident[g].popitem(last=False)
+            resident[g][m] = None
+        resident[g].move_to_end(m)
+        free_at[g] = done
+        latencies.append(done - arrival)
+        finished.append(done)
+
+    latencies.sort()
+    span = (max(finished) - requests[0][0]) if finished else 0.0
+
+    def pct(p):
+        return latencies[max(0, math.ceil(p / 100 * len(latencies)) - 1)] if latencies else 0.0
+
+    return {
+        "requests": len(latencies),
+        "unserved": unserved,
+        "throughput_rps": len(latencies) / span if span else 0.0,
+        "p50_s": pct(50),
+        "p99_s": pct(99),
+        "loads": loads,
+        "load_s": load_total,
+    }
+
+
+def _load_history(path: str) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _orchestrator_planner():
+    from dual_gpu_orchestrator import DualGPUOrchestrator
+    orchestrator = DualGPUOrchestrator(enable_metrics=False)
+    return orchestrator, orchestrator.planner or PlacementPlanner.from_env(*orchestrator._planner_args(), force=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="VRAM-aware model placement")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_fp = sub.add_parser("footprints", help="Footprint of every known model")
+    p_fp.add_argument("--num-ctx", type=int, default=DEFAULT_NUM_CTX)
+    for name, text in (("plan", "Best placement for a recorded traffic mix"),
+                       ("simulate", "Replay recorded traffic against candidate placements")):
+        p = sub.add_parser(name, help=text)
+        p.add_argument("--history", required=True, help="Routing history JSONL (GET /history)")
+    p_sim = sub.choices["simulate"]
+    p_sim.add_argument("--speedup", type=float, default=1.0, help="Replay this much faster (inf = all at once)")
+    p_sim.add_argument("--static", action="store_true", help="Route to the preferred model, not the earliest finish")
+    args = parser.parse_args()
+
+    orchestrator, planner = _orchestrator_planner()
+    if args.command == "footprints":
+        for model in sorted(set(MODEL_SPECS) | {m for g in planner.gpus.values() for m in g.models}):
+            fp = planner.footprints.get(model, None)
+            print(f"{model:34} {fp.gb(args.num_ctx, planner.parallel):6.2f} GB "
+                  f"(weights {fp.weights_gb:.2f}, KV {fp.kv_gb_per_token * args.num_ctx * 1000:.0f} MB "
+                  f"at num_ctx {args.num_ctx}, {fp.source})")
+        sys.exit(0)
+
+    records = _load_history(args.history)
+    audited = orchestrator.audit_policy.should_start
+    mix = traffic_mix(records, audited)
+    plan = planner.solve(mix)
+    if plan is None:
+        sys.exit("❌ No placement fits every tier")
+    if args.command == "plan":
+        print(json.dumps(plan.to_dict(), indent=2))
+        sys.exit(0)
+
+    requests = replay_requests(records, audited, args.speedup)
+    listed = {g: [m for pairs in orchestrator.candidates.values() for gpu, m in pairs if gpu.gpu_id == g]
+              for g in planner.gpus}
+    listed[orchestrator.gpu1.gpu_id].append(orchestrator.audit_model)
+    contenders = {
+        "planned": plan.placement,
+        "candidates": {g: tuple(dict.fromkeys(models)) for g, models in listed.items()},
+        "GPUEndpoint.models": {g: tuple(gpu.models) for g, gpu in planner.gpus.items()},
+    }
+    print(f"{len(requests)} generations, mix {json.dumps({k: round(v, 3) for k, v in mix.items()})}\n")
+    for name, placement in contenders.items():
+        result = simulate(planner, placement, requests, planner.prior_service_s, load_aware=not args.static)
+        print(f"{name:20} {json.dumps({k: round(v, 3) if isinstance(v, float) else v for k, v in result.items()})}")
+        print(f"{'':20} {json.dumps({f'gpu{g}': list(m) for g, m in placement.items()})}")
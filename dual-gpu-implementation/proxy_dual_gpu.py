@@ -10,16 +10,26 @@ Features:
 - Automatic complexity detection and routing
 - Concurrent draft + audit execution
 - Prometheus metrics for both GPUs
-- Fallback to cloud if local fails
+- Fallback to cloud if local fails or the GPU queues are overloaded
+- Audited requests are logged as JSON with the audit's Relevance grade
+  (audit_score), the quality label learned_router.py trains on
+
+Environment variables:
+    BRIDGE_LOG_PROMPTS - Include prompt excerpts in request logs (default: false)
 """
 import os
 import json
-import httpx
 import asyncio
 import sys
 import time
+from datetime import datetime, timezone
 from typing import Dict, Any, Optional
-from dual_gpu_orchestrator import DualGPUOrchestrator, TaskComplexity
+from dual_gpu_orchestrator import DualGPUOrchestrator, DualGPUResponse, TaskComplexity
+import bridge_metrics
+from backend_clients import backends
+from keyword_classifier import classifier
+from learned_router import log_prompts_enabled, prompt_log_fields
+from token_counter import count_tokens
 
 # Configuration
 LOCAL_GPU0 = os.getenv("OLLAMA_GPU0_URL", "http://192.168.1.138:11434")
@@ -30,6 +40,10 @@ GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 # Thresholds
 MAX_LOCAL_TOKENS = 8192  # Context limit for local models
 CLOUD_FALLBACK_ENABLED = os.getenv("CLOUD_FALLBACK", "true").lower() == "true"
+# Task type of every request here (what the log entries and the learned router see)
+TASK = "general"
+# Non-concurrent audits stream the draft into the audit instead of waiting for it
+PIPELINED_AUDIT = os.getenv("BRIDGE_PIPELINED_AUDIT", "true").lower() == "true"
 
 # Initialize dual-GPU orchestrator
 orchestrator = DualGPUOrchestrator(
@@ -50,22 +64,13 @@ def should_route_to_cloud(payload: Dict[str, Any]) -> tuple[bool, str]:
     if not messages:
         return False, "no_messages"
     
-    last_msg = messages[-1].get("content", "")
-    
-    # Count approximate tokens (rough estimate: 1 token ≈ 4 chars)
-    total_chars = sum(len(m.get("content", "")) for m in messages)
-    approx_tokens = total_chars // 4
+    total_tokens = sum(count_tokens(m.get("content", "")) for m in messages)
     
-    if approx_tokens > MAX_LOCAL_TOKENS:
-        return True, f"context_too_large_{approx_tokens}_tokens"
+    if total_tokens > MAX_LOCAL_TOKENS:
+        return True, f"context_too_large_{total_tokens}_tokens"
     
-    # Check for cloud-only keywords
-    cloud_keywords = [
-        "gpt-4", "claude", "latest model", "most advanced",
-        "proprietary", "openai"
-    ]
-    
-    if any(kw in last_msg.lower() for kw in cloud_keywords):
+    # Check for cloud-only keywords (CLOUD_KEYWORDS)
+    if "cloud" in classifier.classify(messages[-1].get("content", "")):
         return True, "cloud_specific_request"
     
     return False, "can_handle_locally"
@@ -80,32 +85,59 @@ async def route_to_cloud(payload: Dict[str, Any]) -> str:
     
     t0 = time.time()
     
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                f"{GITHUB_API}/chat/completions",
-                headers={"Authorization": f"Bearer {GITHUB_TOKEN}"},
-                json=payload,
-                timeout=60.0
-            )
-            elapsed = int((time.time() - t0) * 1000)
-            
-            print(f"☁️  CLOUD route: {elapsed}ms", file=sys.stderr)
-            return response.text
-            
-        except Exception as e:
-            return json.dumps({
-                "error": f"Cloud routing failed: {str(e)}"
-            })
-
-
-def route_to_local_dual_gpu(
+    try:
+        response = await backends.async_client(GITHUB_API).post(
+            f"{GITHUB_API}/chat/completions",
+            headers={"Authorization": f"Bearer {GITHUB_TOKEN}"},
+            json=payload,
+            timeout=60.0
+        )
+        elapsed = int((time.time() - t0) * 1000)
+        
+        print(f"☁️  CLOUD route: {elapsed}ms", file=sys.stderr)
+        return response.text
+        
+    except Exception as e:
+        return json.dumps({
+            "error": f"Cloud routing failed: {str(e)}"
+        })
+
+
+def log_audited(prompt: str, response: DualGPUResponse, latency_ms: int):
+    """
+    Emit a log_request-style JSON entry for an audited request. The audit's
+    Relevance grade goes in audit_score, so with BRIDGE_LOG_PROMPTS=true the
+    entry is a labelled training example for learned_router.py.
+    """
+    tokens_in = count_tokens(prompt)
+    tokens_out = count_tokens(response.draft)
+    log_entry = {
+        "ts": datetime.now(timezone.utc).isoformat(),
+        "route": "local",
+        "tokens_in": tokens_in,
+        "tokens_out": tokens_out,
+        "total_tokens": tokens_in + tokens_out,
+        "latency_ms": latency_ms,
+        "model": response.routing_decision.model,
+        "task": TASK,
+        "complexity": response.routing_decision.complexity.name,
+        "gpu_id": response.draft_gpu,
+        "audit_action": response.audit["action"]
+    }
+    if response.audit["score"] is not None:
+        log_entry["audit_score"] = response.audit["score"]
+    if log_prompts_enabled():
+        log_entry.update(prompt_log_fields(prompt))
+    bridge_metrics.emit(log_entry)
+
+
+async def route_to_local_dual_gpu(
     prompt: str,
     use_audit: bool = False,
     concurrent: bool = True
 ) -> Dict[str, Any]:
     """
-    Route request to local dual-GPU setup.
+    Route request to local dual-GPU setup (on the event loop, no worker threads).
     
     Args:
         prompt: User's request
@@ -118,27 +150,36 @@ def route_to_local_dual_gpu(
     t0 = time.time()
     
     if use_audit:
-        # Use dual-GPU orchestrator for draft + audit
-        response = orchestrator.generate_with_audit(
+        # Use dual-GPU orchestrator for draft + audit (raises Overloaded when
+        # GPU 0's queue is past its deadline: main() falls back to cloud)
+        response = await orchestrator.agenerate_with_audit(
             prompt=prompt,
-            concurrent=concurrent
+            concurrent=concurrent,
+            pipelined=PIPELINED_AUDIT and not concurrent,
+            task=TASK
         )
         
         # Format as OpenAI-compatible response
-        content = f"{response.draft}\n\n---\n**Meta-Analysis:**\n{response.audit['text']}"
+        content = response.draft
+        if response.audit['text']:
+            content += f"\n\n---\n**Meta-Analysis:**\n{response.audit['text']}"
         
         elapsed = int((time.time() - t0) * 1000)
         print(
             f"🎭 DUAL-GPU route: {elapsed}ms "
             f"(draft={response.draft_time:.1f}s on GPU{response.draft_gpu}, "
-            f"audit={response.audit_time:.1f}s on GPU{response.audit_gpu}, "
-            f"concurrent={concurrent})",
+            f"audit={response.audit_time:.1f}s on GPU{response.audit_gpu} ({response.audit['action']}), "
+            f"concurrent={concurrent}, pipelined={response.pipelined}, overlap={response.overlap_time:.1f}s)",
             file=sys.stderr
         )
+        log_audited(prompt, response, elapsed)
         
     else:
         # Simple single-GPU generation
-        result = orchestrator.simple_generate(prompt)
+        result = await orchestrator.asimple_generate(prompt, task=TASK)
+        if result.get("overloaded"):
+            # GPU queue is past its deadline: let main() fall back to cloud
+            raise result["overloaded"]
         content = result['text']
         
         elapsed = int((time.time() - t0) * 1000)
@@ -182,7 +223,7 @@ async def main():
         return
     
     # Step 2: Classify task complexity for local routing
-    complexity = orchestrator.classify_task(last_msg)
+    complexity = orchestrator.classify_task(last_msg, task=TASK)
     
     # Step 3: Determine if we should use meta-reasoning audit
     use_audit = complexity in [TaskComplexity.MODERATE, TaskComplexity.COMPLEX]
@@ -192,7 +233,7 @@ async def main():
     
     # Step 4: Route to local dual-GPU
     try:
-        result = route_to_local_dual_gpu(
+        result = await route_to_local_dual_gpu(
             prompt=last_msg,
             use_audit=use_audit,
             concurrent=concurrent
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Bounded routing history for DualGPUOrchestrator
+
+The last `capacity` routing decisions are kept in a ring buffer of
+array-backed columns (~19 bytes per decision instead of a dataclass
+instance each), so a long-running bridge holds a fixed amount of memory.
+Lifetime counters per GPU, complexity, task type and reason are updated
+on append, making get_stats() O(1). Latency percentiles are computed
+over a recent time window of the buffer.
+
+String fields (task type, complexity, model, reason) are interned into a
+small symbol table and stored as 16-bit ids.
+
+Environment variables:
+    BRIDGE_HISTORY_SIZE - Decisions kept for windowed stats and export (default: 10000)
+"""
+import csv
+import io
+import json
+import math
+import os
+import threading
+import time
+from array import array
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+
+def _name(value: Any) -> str:
+    return getattr(value, "name", None) or str(value)
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a sorted list."""
+    k = max(0, min(len(ordered) - 1, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[k]
+
+
+class RoutingHistory:
+    """
+    Fixed-capacity ring buffer of routing decisions with O(1) aggregates.
+
+    append() takes a RoutingDecision (anything with task_type, complexity,
+    selected_gpu, model, reason, timestamp) and returns a sequence number
+    for set_latency() once the request has finished.
+    """
+
+    COLUMNS = ("seq", "timestamp", "task_type", "complexity", "gpu", "model", "reason", "latency_s")
+
+    def __init__(self, capacity: Optional[int] = None):
+        self.capacity = capacity or int(os.getenv("BRIDGE_HISTORY_SIZE", "10000"))
+        n = self.capacity
+        self._timestamp = array("d", bytes(8 * n))
+        self._latency = array("f", [math.nan]) * n
+        self._gpu = array("b", bytes(n))
+        self._task = array("H", bytes(2 * n))
+        self._complexity = array("H", bytes(2 * n))
+        self._model = array("H", bytes(2 * n))
+        self._reason = array("H", bytes(2 * n))
+        self._symbols: List[str] = []
+        self._symbol_ids: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        self.total = 0
+        self.by_gpu: Counter = Counter()
+        self.by_complexity: Counter = Counter()
+        self.by_task: Counter = Counter()
+        self.by_reason: Counter = Counter()
+
+    def _intern(self, value: str) -> int:
+        sid = self._symbol_ids.get(value)
+        if sid is None:
+            sid = self._symbol_ids[value] = len(self._symbols)
+            self._symbols.append(value)
+        return sid
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def append(self, decision) -> int:
+        complexity = _name(decision.complexity)
+        with self._lock:
+            seq = self.total
+            i = seq % self.capacity
+            self._timestamp[i] = decision.timestamp
+            self._latency[i] = math.nan
+            self._gpu[i] = decision.selected_gpu
+            self._task[i] = self._intern(decision.task_type)
+            self._complexity[i] = self._intern(complexity)
+            self._model[i] = self._intern(decision.model)
+            self._reason[i] = self._intern(decision.reason)
+            self.total += 1
+            self.by_gpu[decision.selected_gpu] += 1
+            self.by_complexity[complexity] += 1
+            self.by_task[decision.task_type] += 1
+            self.by_reason[decision.reason] += 1
+        return seq
+
+    def set_latency(self, seq: int, seconds: float):
+        """Attach the end-to-end latency to a decision (ignored if already evicted)."""
+        with self._lock:
+            if self.total - seq <= self.capacity:
+                self._latency[seq % self.capacity] = seconds
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        """Decisions currently retained (at most capacity)."""
+        return min(self.total, self.capacity)
+
+    def _indices(self, limit: Optional[int] = None) -> range:
+        """Sequence numbers of retained decisions, oldest first (last `limit` only)."""
+        count = len(self) if limit is None else min(limit, len(self))
+        return range(self.total - count, self.total)
+
+    def records(self, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Retained decisions as dicts, oldest first."""
+        with self._lock:
+            rows = []
+            for seq in self._indices(limit):
+                i = seq % self.capacity
+                latency = self._latency[i]
+                rows.append({
+                    "seq": seq,
+                    "timestamp": self._timestamp[i],
+                    "task_type": self._symbols[self._task[i]],
+                    "complexity": self._symbols[self._complexity[i]],
+                    "gpu": self._gpu[i],
+                    "model": self._symbols[self._model[i]],
+                    "reason": self._symbols[self._reason[i]],
+                    "latency_s": None if math.isnan(latency) else round(latency, 4),
+                })
+        return iter(rows)
+
+    def window_percentiles(
+        self,
+        window_s: float = 300.0,
+        pcts: Sequence[float] = (50, 90, 99),
+        now: Optional[float] = None
+    ) -> Dict[str, Dict[str, float]]:
+        """Latency percentiles over decisions from the last window_s seconds, overall and per GPU."""
+        cutoff = (now or time.time()) - window_s
+        groups: Dict[str, List[float]] = {"all": []}
+        with self._lock:
+            for seq in reversed(self._indices()):
+                i = seq % self.capacity
+                if self._timestamp[i] < cutoff:
+                    break
+                latency = self._latency[i]
+                if not math.isnan(latency):
+                    groups["all"].append(latency)
+                    groups.setdefault(f"gpu{self._gpu[i]}", []).append(latency)
+        result = {}
+        for key, values in groups.items():
+            values.sort()
+            result[key] = {"count": len(values)}
+            if values:
+                result[key].update({f"p{p:g}": round(_percentile(values, p), 4) for p in pcts})
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Lifetime counters (O(1) in the number of decisions)."""
+        with self._lock:
+            return {
+                "total": self.total,
+                "retained": len(self),
+                "capacity": self.capacity,
+                "by_gpu": {f"gpu{g}": n for g, n in sorted(self.by_gpu.items())},
+                "by_complexity": {c.lower(): n for c, n in self.by_complexity.items()},
+                "by_task": dict(self.by_task),
+                "by_reason": dict(self.by_reason),
+            }
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the column arrays."""
+        columns = (self._timestamp, self._latency, self._gpu, self._task,
+                   self._complexity, self._model, self._reason)
+        return sum(c.buffer_info()[1] * c.itemsize for c in columns)
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+
+    def export(self, fmt: str = "jsonl", limit: Optional[int] = None) -> str:
+        """Retained decisions as JSON lines or CSV."""
+        if fmt == "csv":
+            out = io.StringIO()
+            writer = csv.DictWriter(out, fieldnames=self.COLUMNS)
+            writer.writeheader()
+            writer.writerows(self.records(limit))
+            return out.getvalue()
+        return "".join(json.dumps(r) + "\n" for r in self.records(limit))
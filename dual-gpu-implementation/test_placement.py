@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Quick test of the VRAM-aware placement planner.
+
+Checks footprint estimates, which model sets fit on a GPU, and that
+solve() returns a placement that fits, serves every tier on its allowed
+GPUs and has the lowest bottleneck of all the placements that do.
+Footprints come from MODEL_SPECS (no /api/show), so no Ollama needed.
+"""
+import itertools
+import math
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from placement import (
+    OVERHEAD_GB, MODEL_SPECS, PlacementPlanner, max_num_ctx, show_footprint, spec_footprint,
+)
+
+Q1 = "qwen2.5-coder:1.5b"
+Q3 = "qwen2.5-coder:3b"
+Q7 = "qwen2.5-coder:7b-instruct-q8_0"
+Q14 = "qwen2.5-coder:14b"
+OSS = "gpt-oss:20b"
+
+TIERS = {"SIMPLE": [Q1, Q3], "COMPLEX": [OSS, Q14, Q7], "AUDIT": [Q7, Q3]}
+COST = {Q1: 1.0, Q3: 2.0, Q7: 3.0, Q14: 5.0, OSS: 4.0}
+
+
+def check(name, ok):
+    print(f"  {'✓' if ok else '✗'} {name}")
+    return ok
+
+
+def header(title):
+    print("\n" + "═"*78)
+    print(title)
+    print("═"*78)
+
+
+def gpu(gpu_id, vram_gb, bandwidth):
+    return SimpleNamespace(gpu_id=gpu_id, url=None, max_vram_gb=vram_gb, models=[], mem_bandwidth_gbps=bandwidth)
+
+
+def planner():
+    # 16 GB and 8 GB cards; audits only on GPU 1
+    return PlacementPlanner([gpu(0, 16.0, 448.0), gpu(1, 8.0, 288.0)], TIERS, {"AUDIT": {1}})
+
+
+def service(gpu_id, model):
+    return COST[model]
+
+
+def test_footprints():
+    header("TEST 1: Footprints")
+    params, bits, layers, kv_heads, head_dim = MODEL_SPECS[Q1]
+    expected = params * bits / 8 + 2 * layers * kv_heads * head_dim * 2 / 1e9 * 4096 + OVERHEAD_GB
+    fp = spec_footprint(Q1)
+    show = {
+        "details": {"parameter_size": "7.6B", "quantization_level": "Q4_K_M"},
+        "model_info": {"general.architecture": "qwen2", "qwen2.block_count": 28,
+                       "qwen2.attention.head_count": 28, "qwen2.attention.head_count_kv": 4,
+                       "qwen2.embedding_length": 3584, "qwen2.context_length": 32768},
+    }
+    shown = show_footprint(show, "qwen2.5-coder:7b")
+    return all([
+        check("table footprint: weights + KV cache + overhead", math.isclose(fp.gb(4096), expected)),
+        check("KV cache grows with num_ctx and parallel slots",
+              math.isclose(fp.gb(8192, 2) - fp.gb(4096), fp.kv_gb_per_token * (16384 - 4096))),
+        check("unknown model estimated from its tag",
+              spec_footprint("mystery:13b").source == "tag" and spec_footprint("mystery:13b").weights_gb > fp.weights_gb),
+        check("/api/show architecture used", shown.source == "api/show"
+              and math.isclose(shown.kv_gb_per_token, 2 * 28 * 4 * 128 * 2 / 1e9)),
+        check("max_num_ctx: largest size that fits", max_num_ctx(fp, fp.gb(8192), [2048, 4096, 8192, 16384]) == 8192),
+        check("max_num_ctx: capped by trained context", max_num_ctx(shown, 100.0, [16384, 32768, 65536]) == 32768),
+        check("max_num_ctx: 0 when nothing fits", max_num_ctx(fp, 0.1, [2048]) == 0),
+    ])
+
+
+def test_fit():
+    header("TEST 2: What fits")
+    p = planner()
+    options = {g: p.options(g) for g in p.gpus}
+    return all([
+        check("reserve taken off the card", p.capacity_gb(0) == 15.5),
+        check("20B and 14B never together on 16 GB", not any(OSS in o and Q14 in o for o in options[0])),
+        check("every option fits", all(p.fits(g, o) for g in options for o in options[g])),
+        check("models too big alone are out of the domain", p.domain(1) == [Q1, Q3]),
+        check("GPU 0 considers every model a tier allowed there can use",
+              set(p.domain(0)) == {Q1, Q3, Q7, Q14, OSS}),
+    ])
+
+
+def brute_force_best(p, mix):
+    best = math.inf
+    for combo in itertools.product(*(p.options(g) for g in p.gpus)):
+        plan = p.evaluate(dict(zip(p.gpus, combo)), mix, service)
+        if plan is not None:
+            best = min(best, plan.bottleneck_s)
+    return best
+
+
+def test_solve():
+    header("TEST 3: Solve")
+    p = planner()
+    simple_only = p.solve({"SIMPLE": 1.0}, service)
+    mix = {"SIMPLE": 0.5, "COMPLEX": 0.3, "AUDIT": 0.2}
+    plan = p.solve(mix, service)
+    served = {tier: p.candidates(plan, tier, []) for tier in TIERS}
+    return all([
+        check("simple-only traffic split over both GPUs",
+              math.isclose(simple_only.bottleneck_s, 0.5) and all(Q1 in m for m in simple_only.placement.values())),
+        check("tiers missing from the mix still get a model", all(p.candidates(simple_only, t, []) for t in TIERS)),
+        check("every tier served", all(served.values())),
+        check("AUDIT only on GPU 1", all(g == 1 for g, _ in served["AUDIT"])),
+        check("placement fits", all(p.fits(g, models) for g, models in plan.placement.items())),
+        check("shares add up to the mix", math.isclose(sum(plan.share.values()), 1.0)),
+        check(f"GPUs balanced (bottleneck {plan.bottleneck_s:.2f}s)", math.isclose(plan.bottleneck_s, 0.9)),
+        check("lowest bottleneck of every valid placement",
+              math.isclose(plan.bottleneck_s, brute_force_best(p, mix))),
+        check("no valid placement without a tier's model",
+              p.evaluate({0: (Q1,), 1: (Q1,)}, mix, service) is None),
+    ])
+
+
+def test_context_cap():
+    header("TEST 4: Context cap next to placed models")
+    p = planner()
+    plan = p.solve({"SIMPLE": 0.5, "COMPLEX": 0.3, "AUDIT": 0.2}, service)
+    sizes = [2048, 4096, 8192, 16384, 32768, 65536, 131072]
+    alone = p.context_cap(1, Q3, sizes)
+    shared = p.context_cap(1, Q3, sizes, plan)
+    return all([
+        check(f"alone on GPU 1: {alone}", alone > 0),
+        check(f"next to {', '.join(m for m in plan.placement[1] if m != Q3)}: {shared}", 0 < shared <= alone),
+    ])
+
+
+if __name__ == "__main__":
+    print("╔" + "═"*76 + "╗")
+    print("║" + " "*27 + "PLACEMENT TEST SUITE" + " "*29 + "║")
+    print("╚" + "═"*76 + "╝")
+
+    results = [
+        ("Footprints", test_footprints()),
+        ("What fits", test_fit()),
+        ("Solve", test_solve()),
+        ("Context cap", test_context_cap()),
+    ]
+
+    print("\n" + "═"*78)
+    print("SUMMARY")
+    print("═"*78)
+    for name, passed in results:
+        print(f"{'✓ PASS' if passed else '✗ FAIL'}: {name}")
+
+    passed_count = sum(1 for _, p in results if p)
+    print(f"\nResults: {passed_count}/{len(results)} tests passed")
+    sys.exit(0 if passed_count == len(results) else 1)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Quick test of the bounded routing history.
+
+Checks the ring buffer after it wraps around: retained records and their
+order, lifetime counters, latencies attached to live vs evicted slots,
+windowed percentiles and export. No Ollama needed.
+"""
+import csv
+import io
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dual_gpu_orchestrator import RoutingDecision, TaskComplexity
+from routing_history import RoutingHistory
+
+COMPLEXITIES = [TaskComplexity.SIMPLE, TaskComplexity.MODERATE, TaskComplexity.COMPLEX]
+
+
+def check(name, ok):
+    print(f"  {'✓' if ok else '✗'} {name}")
+    return ok
+
+
+def header(title):
+    print("\n" + "═"*78)
+    print(title)
+    print("═"*78)
+
+
+def decision(n):
+    return RoutingDecision(
+        task_type="docstring" if n % 2 else "refactor",
+        complexity=COMPLEXITIES[n % 3],
+        selected_gpu=n % 2,
+        model=f"model-{n % 4}",
+        reason="load" if n % 5 == 0 else "tier",
+        timestamp=1000.0 + n
+    )
+
+
+def filled(capacity, count):
+    history = RoutingHistory(capacity)
+    for n in range(count):
+        seq = history.append(decision(n))
+        history.set_latency(seq, 0.1 * (n + 1))
+    return history
+
+
+def test_wraparound():
+    header("TEST 1: Wraparound")
+    empty = RoutingHistory(5).memory_bytes()
+    history = filled(5, 12)
+    records = list(history.records())
+    expected = [decision(n) for n in range(7, 12)]
+    return all([
+        check("keeps the last `capacity` decisions", len(history) == 5 and len(records) == 5),
+        check("oldest first, with their sequence numbers", [r["seq"] for r in records] == [7, 8, 9, 10, 11]),
+        check("fields read back from the right slots", all(
+            r["gpu"] == d.selected_gpu and r["model"] == d.model and r["task_type"] == d.task_type
+            and r["complexity"] == d.complexity.name and r["reason"] == d.reason and r["timestamp"] == d.timestamp
+            for r, d in zip(records, expected)
+        )),
+        check("latencies stay with their decisions",
+              [r["latency_s"] for r in records] == [round(0.1 * (n + 1), 4) for n in range(7, 12)]),
+        check("limit returns the newest", [r["seq"] for r in history.records(2)] == [10, 11]),
+        check("memory does not grow", history.memory_bytes() == empty),
+    ])
+
+
+def test_lifetime_counters():
+    header("TEST 2: Lifetime counters after wraparound")
+    history = filled(5, 12)
+    stats = history.stats()
+    return all([
+        check("total counts every decision", stats["total"] == 12 and stats["retained"] == 5),
+        check("per GPU", stats["by_gpu"] == {"gpu0": 6, "gpu1": 6}),
+        check("per complexity", stats["by_complexity"] == {"simple": 4, "moderate": 4, "complex": 4}),
+        check("per task", stats["by_task"] == {"refactor": 6, "docstring": 6}),
+        check("per reason", stats["by_reason"] == {"load": 3, "tier": 9}),
+    ])
+
+
+def test_latency_slots():
+    header("TEST 3: Latency of evicted decisions")
+    history = RoutingHistory(3)
+    first = history.append(decision(0))
+    for n in range(1, 4):
+        history.append(decision(n))           # overwrites seq 0's slot
+    history.set_latency(first, 9.0)           # seq 0 is gone
+    slot_owner = [r for r in history.records() if r["seq"] == 3][0]
+    return all([
+        check("late latency for an evicted decision is ignored", slot_owner["latency_s"] is None),
+        check("no record shows it", all(r["latency_s"] is None for r in history.records())),
+    ])
+
+
+def test_window_and_export():
+    header("TEST 4: Window percentiles and export")
+    history = filled(10, 25)                  # retains n = 15..24, timestamps 1015..1024
+    window = history.window_percentiles(window_s=4.5, now=1024.0)  # n = 20..24
+    latencies = [round(0.1 * (n + 1), 4) for n in range(20, 25)]
+    jsonl = history.export("jsonl", limit=3).splitlines()
+    rows = list(csv.DictReader(io.StringIO(history.export("csv"))))
+    return all([
+        check("window counts only recent decisions", window["all"]["count"] == 5),
+        check("nearest-rank p50 / p99", window["all"]["p50"] == latencies[2] and window["all"]["p99"] == latencies[4]),
+        check("split per GPU", window["gpu0"]["count"] + window["gpu1"]["count"] == 5),
+        check("JSON lines export honours limit", [json.loads(line)["seq"] for line in jsonl] == [22, 23, 24]),
+        check("CSV export has every retained decision", [int(r["seq"]) for r in rows] == list(range(15, 25))),
+    ])
+
+
+if __name__ == "__main__":
+    print("╔" + "═"*76 + "╗")
+    print("║" + " "*24 + "ROUTING HISTORY TEST SUITE" + " "*26 + "║")
+    print("╚" + "═"*76 + "╝")
+
+    results = [
+        ("Wraparound", test_wraparound()),
+        ("Lifetime counters", test_lifetime_counters()),
+        ("Latency slots", test_latency_slots()),
+        ("Window and export", test_window_and_export()),
+    ]
+
+    print("\n" + "═"*78)
+    print("SUMMARY")
+    print("═"*78)
+    for name, passed in results:
+        print(f"{'✓ PASS' if passed else '✗ FAIL'}: {name}")
+
+    passed_count = sum(1 for _, p in results if p)
+    print(f"\nResults: {passed_count}/{len(results)} tests passed")
+    sys.exit(0 if passed_count == len(results) else 1)
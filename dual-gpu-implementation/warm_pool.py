@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Warm pool: keeps the models in demand loaded on each GPU
+
+The first call after Ollama unloads a model (its keep_alive ran out,
+5 minutes by default, or another model needed the VRAM) pays the whole
+load_duration, seconds to tens of seconds on the larger models. WarmPool
+counts requests per (GPU, model) and, every BRIDGE_WARM_INTERVAL seconds:
+
+- ranks each GPU's models by requests in the last BRIDGE_WARM_WINDOW
+  seconds; the hot set is the busiest ones (at least
+  BRIDGE_WARM_MIN_REQUESTS) that fit in the GPU's max_vram_gb together
+- evicts (keep_alive 0) resident models outside the hot set that have
+  been idle for BRIDGE_WARM_IDLE seconds, to make room
+- preloads hot models that are not resident (an empty-prompt
+  /api/generate, which loads the model without generating) with
+  keep_alive BRIDGE_WARM_KEEP_ALIVE, and refreshes that keep_alive on
+  resident ones
+
+Preloads use the num_ctx the model's last request was sent with (Ollama
+reloads a model whose num_ctx changes). Requests for hot models carry the
+same keep_alive, and the load tracker's view of resident models
+(gpu_load.py) is updated after every preload and eviction, so load-aware
+routing prefers the models that are warm.
+
+Footprints come from /api/ps (size_vram) once a model has been seen
+loaded, else from placement.footprint_gb() (MODEL_SPECS or the tag).
+
+A call counts as a cold start when Ollama reports a load_duration above
+BRIDGE_WARM_COLD_S. Load time saved is only counted from measurements:
+the load_duration of a preload that a later request found resident, and
+the last measured load time of a hot model whose request found it warm
+after an idle gap longer than Ollama's default keep_alive (so it would
+have been unloaded without the pool).
+
+Environment variables:
+    BRIDGE_WARM_POOL         - Enable the controller (default: false)
+    BRIDGE_WARM_INTERVAL     - Seconds between planning rounds (default: 30)
+    BRIDGE_WARM_WINDOW       - Demand window in seconds (default: 900)
+    BRIDGE_WARM_MIN_REQUESTS - Requests in the window that make a model hot (default: 2)
+    BRIDGE_WARM_KEEP_ALIVE   - keep_alive for hot models (default: 30m)
+    BRIDGE_WARM_IDLE         - Idle seconds before a cold model may be evicted (default: 120)
+    BRIDGE_WARM_COLD_S       - load_duration (s) above which a call is a cold start (default: 0.5)
+"""
+import atexit
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend_clients import backends
+from placement import footprint_gb
+
+COLD_START_S = float(os.getenv("BRIDGE_WARM_COLD_S", "0.5"))
+
+PRELOAD_TIMEOUT_S = 300.0
+
+# Ollama's default keep_alive (OLLAMA_KEEP_ALIVE), seconds
+OLLAMA_KEEP_ALIVE_S = 300.0
+
+
+def is_cold(load_s: float) -> bool:
+    """Whether a call whose Ollama load_duration was load_s seconds was a cold start."""
+    return load_s > COLD_START_S
+
+
+def _duration_s(keep_alive: str) -> float:
+    """Seconds of an Ollama keep_alive duration ("30m", "1h", "90s" or a number)."""
+    units = {"s": 1, "m": 60, "h": 3600}
+    if keep_alive and keep_alive[-1] in units:
+        return float(keep_alive[:-1]) * units[keep_alive[-1]]
+    return float(keep_alive)
+
+
+class WarmPool:
+    """
+    Demand-driven preload / keep_alive / eviction controller.
+
+    gpus are the orchestrator's GPUEndpoints (gpu_id, url, max_vram_gb);
+    load is its GPULoadTracker. on_event(action, gpu_id, model, seconds)
+    is called for "preload", "evict" and "saved" (e.g. to count metrics).
+    """
+
+    def __init__(
+        self,
+        gpus: List[Any],
+        load: Any,
+        interval: float = 30.0,
+        window_s: float = 900.0,
+        min_requests: int = 2,
+        keep_alive: str = "30m",
+        idle_s: float = 120.0,
+        ollama_keep_alive_s: float = OLLAMA_KEEP_ALIVE_S,
+        on_event: Optional[Callable[[str, int, str, float], None]] = None
+    ):
+        self.gpus = {gpu.gpu_id: gpu for gpu in gpus}
+        self.load = load
+        self.interval = interval
+        self.window_s = window_s
+        self.min_requests = min_requests
+        self.keep_alive_value = keep_alive
+        self._keep_alive_s = _duration_s(keep_alive)
+        self.idle_s = idle_s
+        self.ollama_keep_alive_s = ollama_keep_alive_s
+        self.on_event = on_event
+
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._demand: Dict[Tuple[int, str], Deque[float]] = {}
+        self._last_used: Dict[Tuple[int, str], float] = {}
+        self._kept: Dict[Tuple[int, str], float] = {}       # when we last set the long keep_alive
+        self._preloaded: Dict[Tuple[int, str], float] = {}  # preload load_duration, until first use
+        self._finished: Dict[Tuple[int, str], float] = {}   # last request completion
+        self._load_s: Dict[Tuple[int, str], float] = {}     # last measured load time
+        self._num_ctx: Dict[Tuple[int, str], int] = {}      # num_ctx of the last request
+        self._hot: Dict[int, List[str]] = {}
+
+        self.requests = 0
+        self.cold_starts = 0
+        self.cold_load_s = 0.0
+        self.load_s_saved = 0.0
+        self.preloads = 0
+        self.refreshes = 0
+        self.evictions = 0
+        self.errors = 0
+
+        self._stop = threading.Event()
+        self._thread = None
+        if interval > 0:
+            self._thread = threading.Thread(target=self._run, name="warm-pool", daemon=True)
+            self._thread.start()
+
+    @classmethod
+    def from_env(cls, gpus: List[Any], load: Any) -> Optional["WarmPool"]:
+        """A running pool when BRIDGE_WARM_POOL is true, else None."""
+        if os.getenv("BRIDGE_WARM_POOL", "false").lower() != "true":
+            return None
+        pool = cls(
+            gpus, load,
+            interval=float(os.getenv("BRIDGE_WARM_INTERVAL", "30")),
+            window_s=float(os.getenv("BRIDGE_WARM_WINDOW", "900")),
+            min_requests=int(os.getenv("BRIDGE_WARM_MIN_REQUESTS", "2")),
+            keep_alive=os.getenv("BRIDGE_WARM_KEEP_ALIVE", "30m"),
+            idle_s=float(os.getenv("BRIDGE_WARM_IDLE", "120"))
+        )
+        atexit.register(pool.close)
+        print(f"🔥 Warm pool: planning every {pool.interval:g}s, keep_alive {pool.keep_alive_value}", file=sys.stderr)
+        return pool
+
+    def close(self):
+        self._stop.set()
+
+    # ------------------------------------------------------------------
+    # Request path
+    # ------------------------------------------------------------------
+
+    def keep_alive(self, gpu_id: int, model: str) -> Optional[str]:
+        """keep_alive to send with a request: the long one for hot models, else Ollama's default."""
+        hot = self._hot  # replaced, never mutated, by tick()
+        if model in hot.get(gpu_id, ()):
+            return self.keep_alive_value
+        return None
+
+    def touch(self, gpu_id: int, model: str, num_ctx: Optional[int] = None):
+        """Count one request (call when it is sent)."""
+        now = time.monotonic()
+        key = (gpu_id, model)
+        with self._lock:
+            self._demand.setdefault(key, deque()).append(now)
+            self._last_used[key] = now
+            if num_ctx:
+                self._num_ctx[key] = num_ctx
+            if model in self._hot.get(gpu_id, ()):
+                self._kept[key] = now
+
+    def record(self, gpu_id: int, model: str, result: Optional[Dict[str, Any]]) -> bool:
+        """Account a finished request from Ollama's load_duration; True if it was a cold start."""
+        load_s = (result or {}).get("load_duration", 0) / 1e9
+        key = (gpu_id, model)
+        cold = is_cold(load_s)
+        now = time.monotonic()
+        with self._lock:
+            self._last_used[key] = now
+            idle = now - self._finished.get(key, now)
+            self._finished[key] = now
+            self.requests += 1
+            saved = self._preloaded.pop(key, None)
+            if cold:
+                self.cold_starts += 1
+                self.cold_load_s += load_s
+                self._load_s[key] = load_s
+                saved = None
+            elif saved is None and idle > self.ollama_keep_alive_s and key in self._kept:
+                # Only still resident because of our keep_alive
+                saved = self._load_s.get(key)
+            if saved:
+                self.load_s_saved += saved
+        if saved and self.on_event:
+            self.on_event("saved", gpu_id, model, saved)
+        return cold
+
+    # ------------------------------------------------------------------
+    # Planning
+    # ------------------------------------------------------------------
+
+    def footprint(self, gpu_id: int, model: str) -> float:
+        return self.load.vram_gb(gpu_id, model) or footprint_gb(model)
+
+    def plan(self) -> Dict[int, List[str]]:
+        """Hot set per GPU: busiest models first, skipping any that no longer fit."""
+        cutoff = time.monotonic() - self.window_s
+        with self._lock:
+            counts: Dict[int, Dict[str, int]] = {}
+            for (gpu_id, model), times in list(self._demand.items()):
+                while times and times[0] < cutoff:
+                    times.popleft()
+                if not times:
+                    del self._demand[(gpu_id, model)]
+                elif len(times) >= self.min_requests:
+                    counts.setdefault(gpu_id, {})[model] = len(times)
+        hot = {}
+        for gpu_id, gpu in self.gpus.items():
+            chosen, used = [], 0.0
+            demand = counts.get(gpu_id, {})
+            for model in sorted(demand, key=demand.get, reverse=True):
+                size = self.footprint(gpu_id, model)
+                if used + size <= gpu.max_vram_gb:
+                    chosen.append(model)
+                    used += size
+            hot[gpu_id] = chosen
+        return hot
+
+    def tick(self):
+        """One planning round: update the hot set, then evict, preload and refresh."""
+        hot = self.plan()
+        with self._lock:
+            self._hot = hot
+        now = time.monotonic()
+        for gpu_id, gpu in self.gpus.items():
+            resident = self.load.loaded_models(gpu_id, gpu.url, refresh=True)
+            if resident is None:
+                continue
+            keep: Set[str] = set()
+            for model in sorted(resident):
+                idle = now - self._last_used.get((gpu_id, model), self._started)
+                if model not in hot[gpu_id] and idle >= self.idle_s:
+                    self._send(gpu, model, 0)
+                else:
+                    keep.add(model)
+            free = gpu.max_vram_gb - sum(self.footprint(gpu_id, m) for m in keep)
+            for model in hot[gpu_id]:
+                key = (gpu_id, model)
+                if model in keep:
+                    if now - self._kept.get(key, 0.0) > self._keep_alive_s / 2:
+                        self._send(gpu, model, self.keep_alive_value)
+                elif self.footprint(gpu_id, model) <= free:
+                    if self._send(gpu, model, self.keep_alive_value):
+                        free -= self.footprint(gpu_id, model)
+
+    def _send(self, gpu: Any, model: str, keep_alive: Any) -> bool:
+        """Empty-prompt /api/generate: loads (or refreshes) with keep_alive, or unloads with 0."""
+        key = (gpu.gpu_id, model)
+        resident = keep_alive != 0 and model in (self.load.loaded_models(gpu.gpu_id, gpu.url) or ())
+        payload = {"model": model, "prompt": "", "keep_alive": keep_alive, "stream": False}
+        num_ctx = self._num_ctx.get(key) if keep_alive != 0 else None
+        if num_ctx:
+            payload["options"] = {"num_ctx": num_ctx}
+        try:
+            response = backends.client(gpu.url).post(
+                f"{gpu.url}/api/generate",
+                json=payload,
+                timeout=PRELOAD_TIMEOUT_S
+            )
+            response.raise_for_status()
+            load_s = response.json().get("load_duration", 0) / 1e9
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+            print(f"⚠️  Warm pool: {model} on GPU {gpu.gpu_id} failed: {e}", file=sys.stderr)
+            return False
+
+        with self._lock:
+            if keep_alive == 0:
+                self.evictions += 1
+                self._kept.pop(key, None)
+                self._preloaded.pop(key, None)
+            else:
+                self._kept[key] = time.monotonic()
+                if resident:
+                    self.refreshes += 1
+                else:
+                    self.preloads += 1
+                    if is_cold(load_s):
+                        self._preloaded[key] = load_s
+                        self._load_s[key] = load_s
+        self.load.set_loaded(gpu.gpu_id, model, keep_alive != 0)
+        if self.on_event and (keep_alive == 0 or not resident):
+            self.on_event("evict" if keep_alive == 0 else "preload", gpu.gpu_id, model, load_s)
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.tick()
+            except Exception as e:
+                with self._lock:
+                    self.errors += 1
+                print(f"⚠️  Warm pool round failed: {e}", file=sys.stderr)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hot sets and counters, for get_stats()."""
+        return {
+            "hot": {f"gpu{gpu_id}": list(models) for gpu_id, models in self._hot.items()},
+            "requests": self.requests,
+            "cold_starts": self.cold_starts,
+            "cold_start_rate": round(self.cold_starts / self.requests, 4) if self.requests else 0.0,
+            "cold_load_s": round(self.cold_load_s, 3),
+            "load_s_saved": round(self.load_s_saved, 3),
+            "preloads": self.preloads,
+            "refreshes": self.refreshes,
+            "evictions": self.evictions,
+            "errors": self.errors,
+        }
@@ -23,6 +23,7 @@ from datetime import datetime
 # Configuration
 OLLAMA_BASE = "http://192.168.1.138:11434"
 MODEL = "qwen2.5-coder:7b-instruct-q8_0"
+STREAM = False  # set by --stream: print tokens as they arrive
 
 # ANSI color codes for pretty output
 GREEN = "\033[92m"
@@ -37,6 +38,9 @@ async def call_local_model(prompt: str, model: str = MODEL) -> tuple[str, float]
     import time
     t0 = time.time()
     
+    if STREAM:
+        return await stream_local_model(prompt, model, t0)
+    
     async with httpx.AsyncClient(timeout=60.0) as client:
         response = await client.post(
             f"{OLLAMA_BASE}/api/generate",
@@ -51,6 +55,35 @@ async def call_local_model(prompt: str, model: str = MODEL) -> tuple[str, float]
     result = response.json()
     return result.get("response", ""), elapsed
 
+async def stream_local_model(prompt: str, model: str, t0: float) -> tuple[str, float]:
+    """Stream tokens to the terminal as Ollama generates them."""
+    import time
+    parts = []
+    ttft = None
+    
+    print(f"{GREEN}Response:{RESET}")
+    async with httpx.AsyncClient(timeout=60.0) as client:
+        async with client.stream(
+            "POST",
+            f"{OLLAMA_BASE}/api/generate",
+            json={
+                "model": model,
+                "prompt": prompt,
+                "stream": True
+            }
+        ) as response:
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                text = json.loads(line).get("response", "")
+                if text:
+                    ttft = ttft or time.time() - t0
+                    parts.append(text)
+                    print(text, end="", flush=True)
+    
+    print(f"\n\n{YELLOW}⚡ First token: {ttft or 0:.2f}s{RESET}")
+    return "".join(parts), time.time() - t0
+
 def print_header(title: str):
     """Print a fancy section header."""
     print(f"\n{BOLD}{BLUE}{'='*70}{RESET}")
@@ -59,7 +92,8 @@ def print_header(title: str):
 
 def print_result(response: str, elapsed: float):
     """Print the model response with timing info."""
-    print(f"{GREEN}Response:{RESET}\n{response}")
+    if not STREAM:  # streamed responses were already printed live
+        print(f"{GREEN}Response:{RESET}\n{response}")
     print(f"\n{YELLOW}⏱️  Time: {elapsed:.2f}s | Cost: $0.00 | Model: {MODEL}{RESET}")
 
 async def demo_1_docstring():
@@ -331,6 +365,11 @@ async def interactive_mode():
 def main():
     """Main entry point."""
     import sys
+    global STREAM
+    
+    if "--stream" in sys.argv:
+        STREAM = True
+        sys.argv.remove("--stream")
     
     if len(sys.argv) > 1:
         if sys.argv[1] == "--all":
@@ -339,10 +378,11 @@ def main():
             demo_num = int(sys.argv[1])
             asyncio.run(run_single_demo(demo_num))
         else:
-            print(f"Usage: {sys.argv[0]} [--all | 1-8]")
+            print(f"Usage: {sys.argv[0]} [--stream] [--all | 1-8]")
             print(f"  No args: Interactive mode")
             print(f"  --all: Run all demos")
             print(f"  1-8: Run specific demo")
+            print(f"  --stream: Print tokens as they are generated")
     else:
         asyncio.run(interactive_mode())
 
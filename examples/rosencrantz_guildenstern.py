@@ -13,12 +13,17 @@ Two-stage local inference with quality audit:
 
 The audit provides meta-commentary on the draft's strengths/weaknesses.
 """
-import httpx
 import json
+import os
+import sys
 import time
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from dataclasses import dataclass, asdict
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend_clients import backends
+from context_window import context_sizer
+
 
 @dataclass
 class AuditReport:
@@ -57,21 +62,23 @@ class RosencrantzGuildenstern:
         self.audit_model = audit_model
         self.ollama_url = ollama_url
         
-    def _call_model(self, model: str, prompt: str, num_ctx: int = 4096) -> Dict[str, Any]:
-        """Call Ollama model, return response + metadata."""
+    def _call_model(self, model: str, prompt: str, num_ctx: Optional[int] = None) -> Dict[str, Any]:
+        """Call Ollama model, return response + metadata (num_ctx sized to the prompt by default)."""
         start = time.time()
+        context = context_sizer.size(prompt, model, num_ctx=num_ctx, runner=(self.ollama_url, model))
         
-        with httpx.Client(timeout=180.0) as client:
-            response = client.post(
-                f"{self.ollama_url}/api/generate",
-                json={
-                    "model": model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {"num_ctx": num_ctx}
-                }
-            )
-            result = response.json()
+        response = backends.client(self.ollama_url).post(
+            f"{self.ollama_url}/api/generate",
+            json={
+                "model": model,
+                "prompt": prompt,
+                "stream": False,
+                "options": {"num_ctx": context.num_ctx}
+            },
+            timeout=180.0
+        )
+        result = response.json()
+        truncated = context_sizer.observe(context, model, prompt, result)
         
         elapsed = time.time() - start
         
@@ -79,7 +86,9 @@ class RosencrantzGuildenstern:
             "text": result.get("response", ""),
             "time": elapsed,
             "model": model,
-            "tokens": result.get("eval_count", 0)
+            "tokens": result.get("eval_count", 0),
+            "num_ctx": context.num_ctx,
+            "truncated": truncated
         }
     
     def generate_draft(self, prompt: str, context: str = "") -> Dict[str, Any]:
@@ -99,14 +108,12 @@ class RosencrantzGuildenstern:
         print(f"   Model: {self.large_model}")
         print()
         
-        draft = self._call_model(
-            self.large_model,
-            full_prompt,
-            num_ctx=32768  # Use large context window
-        )
+        draft = self._call_model(self.large_model, full_prompt)
         
         print(f"✅ Draft generated in {draft['time']:.1f}s")
-        print(f"   Tokens: {draft['tokens']}")
+        print(f"   Tokens: {draft['tokens']} (num_ctx {draft['num_ctx']})")
+        if draft["truncated"]:
+            print(f"⚠️  Context truncated ({draft['truncated']})")
         print()
         
         return draft
@@ -156,11 +163,7 @@ Respond ONLY with valid JSON, no other text."""
         print(f"   Model: {self.audit_model}")
         print()
         
-        audit_result = self._call_model(
-            self.audit_model,
-            audit_prompt,
-            num_ctx=8192  # Smaller context for audit
-        )
+        audit_result = self._call_model(self.audit_model, audit_prompt)
         
         print(f"✅ Audit completed in {audit_result['time']:.1f}s")
         print()
@@ -7,69 +7,126 @@ Lightweight HTTP server that:
 2. Updates Prometheus metrics
 3. Exposes metrics on :8000/metrics
 
-Zero external dependencies beyond prometheus_client.
+Ingestion is concurrent: one thread per connection, HTTP/1.1 keep-alive,
+and request bodies may be chunked (Transfer-Encoding: chunked) and/or
+gzip-compressed (Content-Encoding: gzip). Bodies are read and split into
+lines incrementally in 64 KiB chunks, so a client may stream logs
+continuously over one chunked POST and memory stays flat regardless of
+body size. The lines of each piece read from the wire go through a
+bounded queue (in batches of at most EXPORTER_BATCH_LINES) to a single
+metrics worker, so a slow stream is counted as it arrives. A POST arriving while
+the queue is full is answered with 503 + Retry-After; once a body is
+being read, a full queue stalls the reader instead (TCP backpressure).
+Lines over EXPORTER_MAX_LINE bytes are dropped and counted; bodies over
+EXPORTER_MAX_BODY bytes (after gunzip) are cut off with 413.
+
+Each batch is decoded in one parser call (orjson if installed, else
+json) and its counts are aggregated locally before touching the
+Prometheus metrics. Console output is one summary line per batch by
+default; the old per-line echo is EXPORTER_ECHO=line.
+
+The metric definitions live in bridge_metrics.py, which the bridge can
+also update in-process (BRIDGE_METRICS_PORT) instead of going through
+this exporter.
+
+Zero external dependencies beyond prometheus_client (orjson optional).
+
+Environment variables:
+    EXPORTER_QUEUE_SIZE  - Line batches buffered between receive and metric update (default: 100)
+    EXPORTER_ECHO        - Console echo: batch, line or off (default: batch)
+    EXPORTER_MAX_LINE    - Longest accepted log line in bytes (default: 1 MiB)
+    EXPORTER_MAX_BODY    - Largest request body in bytes, 0 = no limit (default: 1 GiB)
+    EXPORTER_BATCH_LINES - Most lines per ingestion queue item (default: 1000)
 
 Usage:
-    python3 exporter.py &
+    python3 exporter.py [--port 8080] [--metrics-port 8000] &
     # Bridge sends logs to http://localhost:8080
     # Prometheus scrapes http://localhost:8000/metrics
 """
+import os
 import sys
 import json
+import zlib
+import queue
+import argparse
+import threading
 import http.server
-import socketserver
-from prometheus_client import Counter, Gauge, Histogram, start_http_server
+import collections
+from typing import Any, List
+from prometheus_client import Counter, Gauge, start_http_server
 
-# Prometheus Metrics
-TOKENS_SAVED = Counter(
-    'copilot_bridge_tokens_saved_total',
-    'Total tokens routed locally instead of cloud'
+# copilot_bridge_* request metrics (shared with the bridge's embedded mode)
+from bridge_metrics import (
+    CACHE_LOOKUPS, CACHE_TOKENS_SAVED, COST_SAVED, LOCAL_LATENCY,
+    REQUESTS_BY_MODEL, REQUESTS_BY_ROUTE, REQUESTS_BY_TASK,
+    TOKENS_IN, TOKENS_OUT, TOKENS_SAVED, observe_performance, parse_entry,
 )
 
-COST_SAVED = Counter(
-    'copilot_bridge_cost_saved_usd',
-    'Total USD saved by routing locally (baseline: $0.02/1K tokens)'
-)
+try:
+    import orjson
+    _loads = orjson.loads
+    ORJSON_AVAILABLE = True
+except ImportError:
+    _loads = json.loads
+    ORJSON_AVAILABLE = False
 
-REQUESTS_BY_ROUTE = Counter(
-    'copilot_bridge_requests_by_route',
-    'Request count by routing decision',
-    ['route']
-)
+QUEUE_SIZE = int(os.getenv("EXPORTER_QUEUE_SIZE", "100"))
+ECHO = os.getenv("EXPORTER_ECHO", "batch").lower()
+MAX_LINE = int(os.getenv("EXPORTER_MAX_LINE", str(1 << 20)))
+MAX_BODY = int(os.getenv("EXPORTER_MAX_BODY", str(1 << 30)))
+BATCH_LINES = int(os.getenv("EXPORTER_BATCH_LINES", "1000"))
+CHUNK_SIZE = 64 * 1024
 
-REQUESTS_BY_MODEL = Counter(
-    'copilot_bridge_requests_by_model',
-    'Request count by model',
-    ['model']
-)
+# Ingestion pipeline: receive threads -> bounded queue -> metrics worker
+INGEST_QUEUE: "queue.Queue[list]" = queue.Queue(maxsize=QUEUE_SIZE)
 
-REQUESTS_BY_TASK = Counter(
-    'copilot_bridge_requests_by_task',
-    'Request count by task type',
-    ['task']
+INGEST_QUEUE_DEPTH = Gauge(
+    'copilot_bridge_exporter_queue_depth',
+    'Log batches waiting for the metrics worker'
 )
+INGEST_QUEUE_DEPTH.set_function(INGEST_QUEUE.qsize)
 
-LOCAL_LATENCY = Histogram(
-    'copilot_bridge_local_latency_ms',
-    'Local inference latency in milliseconds',
-    buckets=[100, 500, 1000, 2000, 3000, 5000, 10000, 30000]
+INGEST_DROPPED_LINES = Counter(
+    'copilot_bridge_exporter_dropped_lines_total',
+    'Log lines dropped for exceeding EXPORTER_MAX_LINE bytes'
 )
 
-TOKENS_IN = Gauge(
-    'copilot_bridge_last_tokens_in',
-    'Last request input token count'
+INGEST_REJECTED = Counter(
+    'copilot_bridge_exporter_rejected_batches_total',
+    'Log batches answered with 503 because the ingestion queue was full'
 )
 
-TOKENS_OUT = Gauge(
-    'copilot_bridge_last_tokens_out',
-    'Last request output token count'
-)
+def decode_batch(lines: List[bytes]) -> List[Any]:
+    """
+    Decode NDJSON lines with one parser call for the whole batch.
+    
+    Falls back to line-by-line decoding (reporting and skipping bad lines)
+    when the batch as a whole is not valid JSON.
+    """
+    lines = [line for line in lines if line.strip()]
+    if not lines:
+        return []
+    try:
+        return _loads(b"[" + b",".join(lines) + b"]")
+    except ValueError:
+        pass
+    entries = []
+    for line in lines:
+        try:
+            entries.append(_loads(line))
+        except ValueError as e:
+            print(f"✗ Invalid JSON: {line[:100]!r}... | Error: {e}", file=sys.stderr, flush=True)
+    return entries
 
-def process_log_line(line: str):
+
+def process_log_batch(lines: List[bytes], echo: str = ECHO):
     """
-    Parse JSON log line and update metrics.
+    Parse a batch of JSON log lines and update metrics.
+    
+    Counts are aggregated per label combination locally and applied with
+    one inc(n) per label per batch; histograms still observe every entry.
     
-    Expected format:
+    Expected format (one object per line):
     {
       "ts": "2025-10-20T14:23:10Z",
       "route": "local",
@@ -79,89 +136,290 @@ def process_log_line(line: str):
       "latency_ms": 3500,
       "model": "qwen2.5-coder:7b",
       "task": "docstring",
-      "cost_saved_usd": 0.0296
+      "cost_saved_usd": 0.0296,
+      "ttft_ms": 180,          # streamed requests only
+      "itl_ms": 22.5,          # streamed requests only
+      "cache": "miss",         # "hit"/"semantic_hit" (route "cache") / "miss" when caching is on
+      "gpu_id": 0,             # dual-GPU routing only
+      "gen_tps": 48.2,         # local requests, from Ollama's eval/prompt_eval/load durations
+      "prompt_tps": 910.5,
+      "load_ms": 3.1,
+      "queue_wait_ms": 12.0    # dual-GPU routing only
     }
+    
+    The latency/throughput fields feed the per route/model/gpu_id
+    histograms (bridge_metrics.observe_performance); cloud entries also
+    feed copilot_bridge_cloud_latency_ms.
     """
-    try:
-        data = json.loads(line)
-        
-        route = data.get("route", "unknown")
-        tokens_in = data.get("tokens_in", 0)
-        tokens_out = data.get("tokens_out", 0)
-        total_tokens = data.get("total_tokens", 0)
-        latency_ms = data.get("latency_ms", 0)
-        model = data.get("model", "unknown")
-        task = data.get("task", "general")
-        cost_saved = data.get("cost_saved_usd", 0.0)
-        
-        # Update counters
-        REQUESTS_BY_ROUTE.labels(route=route).inc()
-        REQUESTS_BY_MODEL.labels(model=model).inc()
-        REQUESTS_BY_TASK.labels(task=task).inc()
-        
-        if route == "local":
-            TOKENS_SAVED.inc(total_tokens)
-            COST_SAVED.inc(cost_saved)
-            LOCAL_LATENCY.observe(latency_ms)
-        
-        # Update gauges (last values)
-        TOKENS_IN.set(tokens_in)
-        TOKENS_OUT.set(tokens_out)
-        
-        print(f"✓ Processed: {route} | {task} | {total_tokens} tokens | ${cost_saved:.4f} saved", flush=True)
-        
-    except json.JSONDecodeError as e:
-        print(f"✗ Invalid JSON: {line[:100]}... | Error: {e}", file=sys.stderr, flush=True)
-    except Exception as e:
-        print(f"✗ Error processing line: {e}", file=sys.stderr, flush=True)
+    routes, models, tasks, caches = collections.Counter(), collections.Counter(), collections.Counter(), collections.Counter()
+    tokens_saved = cost_saved_total = cache_tokens_saved = 0
+    local_latencies = []
+    last = None
+    
+    for data in decode_batch(lines):
+        try:
+            # Validated before anything is counted: the batch totals are
+            # applied outside this try, so a bad value must not reach them
+            counts = parse_entry(data)
+            route, model, task = counts["route"], counts["model"], counts["task"]
+            total_tokens, cost_saved = counts["total_tokens"], counts["cost_saved"]
+            tokens_in, tokens_out = counts["tokens_in"], counts["tokens_out"]
+            
+            routes[route] += 1
+            models[model] += 1
+            tasks[task] += 1
+            
+            if route in ("local", "cache"):
+                tokens_saved += total_tokens
+                cost_saved_total += cost_saved
+            if route == "local":
+                local_latencies.append(counts["latency_ms"])
+            
+            cache = counts["cache"]
+            if cache:
+                caches[cache] += 1
+                if cache in ("hit", "semantic_hit"):
+                    cache_tokens_saved += tokens_out
+            
+            # TTFT, tokens/sec, load time, queue wait, cloud latency
+            observe_performance(data, route, model)
+            
+            last = (tokens_in, tokens_out)
+            if echo == "line":
+                print(f"✓ Processed: {route} | {task} | {total_tokens} tokens | ${cost_saved:.4f} saved", flush=True)
+        except Exception as e:
+            print(f"✗ Error processing line: {e}", file=sys.stderr, flush=True)
+    
+    # Apply the batch: one inc(n) per label value
+    for route, n in routes.items():
+        REQUESTS_BY_ROUTE.labels(route=route).inc(n)
+    for model, n in models.items():
+        REQUESTS_BY_MODEL.labels(model=model).inc(n)
+    for task, n in tasks.items():
+        REQUESTS_BY_TASK.labels(task=task).inc(n)
+    for cache, n in caches.items():
+        CACHE_LOOKUPS.labels(result=cache).inc(n)
+    if tokens_saved:
+        TOKENS_SAVED.inc(tokens_saved)
+    if cost_saved_total:
+        COST_SAVED.inc(cost_saved_total)
+    if cache_tokens_saved:
+        CACHE_TOKENS_SAVED.inc(cache_tokens_saved)
+    for latency_ms in local_latencies:
+        LOCAL_LATENCY.observe(latency_ms)
+    
+    # Update gauges (last values)
+    if last is not None:
+        TOKENS_IN.set(last[0])
+        TOKENS_OUT.set(last[1])
+    
+    total = sum(routes.values())
+    if echo == "batch" and total:
+        mix = ", ".join(f"{route}={n}" for route, n in routes.items())
+        print(f"✓ Processed {total} lines: {mix} | {tokens_saved} tokens | ${cost_saved_total:.4f} saved",
+              flush=True)
+
+
+def process_log_line(line: str):
+    """Parse one JSON log line and update metrics (always echoed)."""
+    process_log_batch([line.encode("utf-8")], echo="line")
+
+
+def _gunzip(chunks):
+    """Stream-decompress gzip chunks without letting one chunk expand past CHUNK_SIZE."""
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    for data in chunks:
+        while data:
+            yield decoder.decompress(data, CHUNK_SIZE)
+            data = decoder.unconsumed_tail
+    tail = decoder.flush()
+    if tail:
+        yield tail
+    if not decoder.eof:
+        raise EOFError("truncated gzip body")
+
+
+def _drop_lines(n: int):
+    if n:
+        INGEST_DROPPED_LINES.inc(n)
+        print(f"✗ Dropped {n} line(s) over {MAX_LINE} bytes", file=sys.stderr, flush=True)
+
+
+def metrics_worker():
+    """Drain the ingestion queue into the Prometheus metrics (runs in a daemon thread)."""
+    while True:
+        lines = INGEST_QUEUE.get()
+        try:
+            process_log_batch(lines)
+        except Exception as e:
+            # One bad batch must never stop ingestion
+            print(f"✗ Error processing batch of {len(lines)} lines: {e}", file=sys.stderr, flush=True)
+        finally:
+            INGEST_QUEUE.task_done()
+
+
+class BodyTooLarge(Exception):
+    """Request body exceeded MAX_BODY bytes."""
+
 
 class LogHandler(http.server.BaseHTTPRequestHandler):
     """
     HTTP handler for receiving log lines.
     Expects POST requests with JSON log lines in body.
+    
+    The body is read from rfile in CHUNK_SIZE pieces and split into lines
+    incrementally, so memory stays flat whatever the body size; the
+    complete lines of each piece read go onto the ingestion queue right
+    away, split into batches of at most BATCH_LINES.
     """
+    protocol_version = "HTTP/1.1"  # keep-alive
+    
+    def iter_raw(self):
+        """Request body as it arrives on the wire, de-chunked."""
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            while True:
+                size = int(self.rfile.readline().split(b';')[0].strip(), 16)
+                if size == 0:
+                    # Skip trailers up to the blank line
+                    while self.rfile.readline() not in (b'\r\n', b'\n', b''):
+                        pass
+                    return
+                while size:
+                    data = self.rfile.read(min(size, CHUNK_SIZE))
+                    if not data:
+                        raise EOFError("connection closed mid-chunk")
+                    size -= len(data)
+                    yield data
+                self.rfile.readline()
+        else:
+            remaining = int(self.headers.get('Content-Length', 0))
+            while remaining:
+                data = self.rfile.read(min(remaining, CHUNK_SIZE))
+                if not data:
+                    raise EOFError("connection closed mid-body")
+                remaining -= len(data)
+                yield data
+    
+    def iter_body(self):
+        """Decoded body in pieces of at most CHUNK_SIZE bytes, gunzipped if needed."""
+        chunks = self.iter_raw()
+        if self.headers.get('Content-Encoding', '').lower() == 'gzip':
+            chunks = _gunzip(chunks)
+        total = 0
+        for data in chunks:
+            total += len(data)
+            if MAX_BODY and total > MAX_BODY:
+                raise BodyTooLarge(f"body exceeds {MAX_BODY} bytes")
+            yield data
+    
+    def iter_lines(self):
+        """Complete NDJSON lines, in lists; lines over MAX_LINE bytes are dropped."""
+        pending = bytearray()
+        skipping = False  # inside an oversized line, until its newline
+        for data in self.iter_body():
+            if skipping:
+                newline = data.find(b'\n')
+                if newline < 0:
+                    continue
+                data = data[newline + 1:]
+                skipping = False
+            pending += data
+            newline = pending.rfind(b'\n')
+            if newline >= 0:
+                lines = bytes(pending[:newline]).split(b'\n')
+                del pending[:newline + 1]
+                if newline > MAX_LINE:
+                    kept = [line for line in lines if len(line) <= MAX_LINE]
+                    _drop_lines(len(lines) - len(kept))
+                    lines = kept
+                yield lines
+            if len(pending) > MAX_LINE:
+                _drop_lines(1)
+                pending.clear()
+                skipping = True
+        if pending and not skipping:
+            yield [bytes(pending)]
+    
+    def reply(self, code: int, retry_after: int = 0):
+        self.send_response(code)
+        if retry_after:
+            self.send_header('Retry-After', str(retry_after))
+        if code != 204:
+            self.send_header('Content-Length', '0')
+        self.end_headers()
+    
     def do_POST(self):
-        content_length = int(self.headers.get('Content-Length', 0))
-        body = self.rfile.read(content_length).decode('utf-8')
+        if INGEST_QUEUE.full():
+            # Backpressure: the sender should retry later (body left unread)
+            INGEST_REJECTED.inc()
+            self.close_connection = True
+            self.reply(503, retry_after=1)
+            return
         
-        # Process each line (supports batch sending)
-        for line in body.strip().split('\n'):
-            if line:
-                process_log_line(line)
+        # Mid-body the put blocks instead, pushing back through TCP
+        try:
+            for lines in self.iter_lines():
+                # Queue each read's lines now: a client streaming over one
+                # chunked POST must not wait for BATCH_LINES to accumulate
+                for start in range(0, len(lines), BATCH_LINES):
+                    INGEST_QUEUE.put(lines[start:start + BATCH_LINES])
+        except BodyTooLarge as e:
+            print(f"✗ Request body too large: {e}", file=sys.stderr, flush=True)
+            self.close_connection = True
+            self.reply(413)
+            return
+        except (ValueError, OSError, EOFError, zlib.error) as e:
+            print(f"✗ Bad request body: {e}", file=sys.stderr, flush=True)
+            self.close_connection = True
+            self.reply(400)
+            return
         
-        # Return 204 No Content (success, no response body)
-        self.send_response(204)
-        self.end_headers()
+        # Return 204 No Content (accepted, no response body)
+        self.reply(204)
     
     def log_message(self, format, *args):
         # Suppress default HTTP logging (too verbose)
         pass
 
+
+class IngestServer(http.server.ThreadingHTTPServer):
+    """Thread-per-connection log ingestion server."""
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+def start_ingestion(port: int = 8080, host: str = "") -> IngestServer:
+    """Start the metrics worker and return the (not yet serving) ingestion server."""
+    threading.Thread(target=metrics_worker, name="exporter-metrics", daemon=True).start()
+    return IngestServer((host, port), LogHandler)
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Copilot Bridge Prometheus exporter")
+    parser.add_argument("--port", type=int, default=8080, help="Log ingestion port")
+    parser.add_argument("--metrics-port", type=int, default=8000, help="Prometheus /metrics port")
+    args = parser.parse_args()
+    
     print("╔" + "═"*76 + "╗")
     print("║" + " "*20 + "COPILOT BRIDGE PROMETHEUS EXPORTER" + " "*22 + "║")
     print("╚" + "═"*76 + "╝")
     print()
     
     # Start Prometheus metrics server
-    print("📊 Starting Prometheus metrics server on :8000/metrics")
-    start_http_server(8000)
+    print(f"📊 Starting Prometheus metrics server on :{args.metrics_port}/metrics")
+    start_http_server(args.metrics_port)
     
     # Start log ingestion server
-    print("📥 Starting log ingestion server on :8080 (POST JSON logs here)")
+    print(f"📥 Starting log ingestion server on :{args.port} (POST JSON logs here, queue {QUEUE_SIZE} batches)")
     print()
     print("🔗 URLs:")
-    print("   • Metrics:  http://localhost:8000/metrics")
-    print("   • Logs:     POST to http://localhost:8080")
+    print(f"   • Metrics:  http://localhost:{args.metrics_port}/metrics")
+    print(f"   • Logs:     POST to http://localhost:{args.port}")
     print()
     print("⏳ Waiting for log lines...")
     print("─"*78)
     
-    # Allow socket reuse (avoid 'address already in use' errors)
-    socketserver.TCPServer.allow_reuse_address = True
-    
     # Create and start server
-    with socketserver.TCPServer(("", 8080), LogHandler) as httpd:
+    with start_ingestion(args.port) as httpd:
         try:
             httpd.serve_forever()
         except KeyboardInterrupt:
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Compiled keyword classifier for routing decisions
+
+route_decision / should_route_local, classify_task, the cheap check in
+proxy.py and the cloud check in proxy_dual_gpu.py each used to lowercase
+the prompt and rescan it once per keyword. Here every keyword set is
+compiled into a single trie regex; the prompt is lowercased once and
+one pass over it returns all matched categories.
+
+Matching keeps the old `kw in text.lower()` substring semantics: the
+search resumes one character after each hit (overlapping keywords are
+all found) and a keyword that is a prefix of a longer match counts as
+matched too. The pattern is kept case-sensitive on purpose: re.IGNORECASE
+disables sre's first-character skip and is ~10x slower on large prompts.
+
+The last few prompts are memoized, so the several routing checks made
+for one request share a single scan.
+"""
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+# Keywords that trigger LOCAL routing (proxy_instrumented, proxy_dual_gpu_integrated)
+LOCAL_KEYWORDS = [
+    "docstring", "comment", "explain", "document", "lint",
+    "type hint", "format", "summarize", "rename", "simple"
+]
+
+# proxy.py cheap→LOCAL check
+CHEAP_KEYWORDS = ["docstring", "comment", "lint", "test", "rename"]
+
+# Requests only the cloud can serve (proxy_dual_gpu)
+CLOUD_KEYWORDS = [
+    "gpt-4", "claude", "latest model", "most advanced",
+    "proprietary", "openai"
+]
+
+# DualGPUOrchestrator.classify_task tiers
+SIMPLE_KEYWORDS = [
+    "docstring", "comment", "lint", "rename", "explain",
+    "document", "format", "style", "what does", "summarize"
+]
+COMPLEX_KEYWORDS = [
+    "implement", "create", "build", "design", "architect",
+    "refactor all", "rewrite", "optimize", "algorithm"
+]
+
+DEFAULT_CATEGORIES = {
+    "local": LOCAL_KEYWORDS,
+    "cheap": CHEAP_KEYWORDS,
+    "cloud": CLOUD_KEYWORDS,
+    "simple": SIMPLE_KEYWORDS,
+    "complex": COMPLEX_KEYWORDS,
+}
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Factor keywords into a prefix-trie alternation (longest match first)."""
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        terminal = "" in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            body = ("(?:" + body + ")?") if len(branches) == 1 else body + "?"
+        return body
+
+    return build(trie)
+
+
+class KeywordClassifier:
+    """
+    Single-pass multi-pattern matcher.
+
+    Args:
+        categories: category name -> keywords (case-insensitive substrings)
+        memo_size: number of recent texts whose result is remembered
+    """
+
+    def __init__(self, categories: Dict[str, Iterable[str]], memo_size: int = 256):
+        self.categories = {name: [kw.lower() for kw in kws] for name, kws in categories.items()}
+        keyword_categories: Dict[str, set] = {}
+        for name, kws in self.categories.items():
+            for kw in kws:
+                keyword_categories.setdefault(kw, set()).add(name)
+
+        # A match of "documentation" also means "document" matched at that position
+        self._categories_for: Dict[str, FrozenSet[str]] = {}
+        for kw in keyword_categories:
+            found = set()
+            for other, names in keyword_categories.items():
+                if kw.startswith(other):
+                    found |= names
+            self._categories_for[kw] = frozenset(found)
+
+        self._pattern = re.compile(_trie_pattern(keyword_categories))
+        self.memo_size = memo_size
+        self._memo: "OrderedDict[Tuple[int, int], FrozenSet[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _scan(self, text: str) -> FrozenSet[str]:
+        lowered = text.lower()
+        search = self._pattern.search
+        found: set = set()
+        remaining = len(self.categories)
+        match = search(lowered)
+        while match is not None:
+            found |= self._categories_for[match.group()]
+            if len(found) == remaining:
+                break
+            match = search(lowered, match.start() + 1)
+        return frozenset(found)
+
+    def classify(self, text: str, context: Optional[str] = None) -> FrozenSet[str]:
+        """Return every category with at least one keyword in text (or context)."""
+        found = self._classify_one(text)
+        if context:
+            found |= self._classify_one(context)
+        return found
+
+    def _classify_one(self, text: str) -> FrozenSet[str]:
+        key = (len(text), hash(text))
+        with self._lock:
+            cached = self._memo.get(key)
+            if cached is not None:
+                self._memo.move_to_end(key)
+                return cached
+        found = self._scan(text)
+        with self._lock:
+            self._memo[key] = found
+            if len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return found
+
+    def matches(self, text: str, category: str) -> bool:
+        return category in self.classify(text)
+
+
+classifier = KeywordClassifier(DEFAULT_CATEGORIES)
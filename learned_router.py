@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Learned routing model for Copilot Bridge
+
+The keyword rules misroute prompts whose keywords say little about the
+work involved ("explain" inside a long refactor prompt goes to the 1.5b
+model). This module learns the cheapest tier that still met quality from
+our own request logs:
+
+    SIMPLE < MODERATE < COMPLEX < CLOUD      (cost order)
+
+- Features: hashed word unigrams + bigrams of the prompt head and tail,
+  a log2 prompt-length bucket and the task type
+- Model: multinomial logistic regression, NumPy only, trained offline
+- Online: weights loaded once; predict() returns (tier, confidence) in
+  ~100-200 microseconds. Callers fall back to the keyword rules when
+  confidence is below BRIDGE_ROUTER_MIN_CONFIDENCE.
+
+Training data is the JSONL emitted by log_request with
+BRIDGE_LOG_PROMPTS=true (entries then carry a "prompt" excerpt and the
+full prompt's "prompt_tokens", counted like predict() counts online;
+the logged tokens_in is Ollama's count and is not used). Local entries
+without a "complexity" do not say which tier served them and are
+skipped. Entries
+with a "quality" / "audit_score" (0-10) teach the model which tier was
+good enough; entries without one are taken as acceptable. The audited
+path of dual-gpu-implementation/proxy_dual_gpu.py logs the audit's
+Relevance (1-10) grade of the draft as audit_score.
+
+Usage:
+    python3 learned_router.py train bridge.log --out router.npz
+    python3 learned_router.py predict --model router.npz "Explain this refactor ..."
+
+Environment variables:
+    BRIDGE_ROUTER_MODEL             - Path to trained weights (default: unset, rules only)
+    BRIDGE_ROUTER_MIN_CONFIDENCE    - Minimum confidence to override rules (default: 0.7)
+    BRIDGE_LOG_PROMPTS              - Include prompt excerpts in request logs (default: false)
+"""
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from token_counter import count_tokens
+
+TIERS = ("SIMPLE", "MODERATE", "COMPLEX", "CLOUD")
+
+# Characters of prompt head and tail used as features (the instruction is
+# almost always at one end; the middle is pasted code)
+EXCERPT_CHARS = 768
+
+DEFAULT_DIM = 1 << 16
+
+# Identifiers / words of 2+ chars and question marks; other punctuation is noise
+_WORD = re.compile(r"[a-z_][a-z0-9_]+|\?")
+_BIGRAM_MIX = 1000003
+
+
+def excerpt(prompt: str, chars: int = EXCERPT_CHARS) -> str:
+    """Head + tail of a prompt: what the features see, and what gets logged."""
+    if len(prompt) <= 2 * chars:
+        return prompt
+    return prompt[:chars] + "\n...\n" + prompt[-chars:]
+
+
+def log_prompts_enabled() -> bool:
+    return os.getenv("BRIDGE_LOG_PROMPTS", "false").lower() in ("true", "1", "yes")
+
+
+def prompt_log_fields(prompt: str) -> Dict[str, object]:
+    """Training fields for a log entry: the excerpt the features see and the prompt's local token count."""
+    return {"prompt": excerpt(prompt), "prompt_tokens": count_tokens(prompt)}
+
+
+def features(
+    prompt: str,
+    tokens_in: Optional[int] = None,
+    task: Optional[str] = None,
+    dim: int = DEFAULT_DIM
+) -> "np.ndarray":
+    """Sorted unique hashed feature indices for one prompt."""
+    words = _WORD.findall(excerpt(prompt).lower())
+    if tokens_in is not None:
+        words.append(f"__len:{int(math.log2(tokens_in + 1))}")
+    if task:
+        words.append(f"__task:{task}")
+    unigrams = np.fromiter((zlib.crc32(w.encode()) for w in words), dtype=np.int64, count=len(words))
+    # Bigram hashes are combined from the unigram hashes instead of re-hashing strings
+    bigrams = (unigrams[:-1] * _BIGRAM_MIX + unigrams[1:]) >> 7
+    return np.unique(np.concatenate((unigrams, bigrams)) % dim)
+
+
+def _softmax(logits: "np.ndarray") -> "np.ndarray":
+    z = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return z / z.sum(axis=-1, keepdims=True)
+
+
+class LearnedRouter:
+    """
+    Hashed n-gram logistic regression over routing tiers.
+
+    Args:
+        weights: (dim, len(classes)) float32
+        bias: (len(classes),) float32
+        classes: tier names, in column order
+        min_confidence: below this, predict() callers should use the rules
+    """
+
+    def __init__(
+        self,
+        weights: "np.ndarray",
+        bias: "np.ndarray",
+        classes: Iterable[str] = TIERS,
+        min_confidence: float = 0.7,
+        memo_size: int = 256
+    ):
+        self.weights = weights
+        self.bias = bias
+        self.classes = tuple(classes)
+        self.dim = weights.shape[0]
+        self.min_confidence = min_confidence
+        self.memo_size = memo_size
+        self._memo: "OrderedDict[Tuple[int, int, Optional[str]], Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str, min_confidence: float = 0.7) -> "LearnedRouter":
+        data = np.load(path)
+        return cls(data["weights"], data["bias"], [str(c) for c in data["classes"]], min_confidence)
+
+    def save(self, path: str):
+        np.savez(path, weights=self.weights, bias=self.bias, classes=np.array(self.classes))
+
+    @classmethod
+    def from_env(cls) -> Optional["LearnedRouter"]:
+        """Load BRIDGE_ROUTER_MODEL (None if unset, missing or NumPy is absent)."""
+        path = os.getenv("BRIDGE_ROUTER_MODEL")
+        if not path:
+            return None
+        if not NUMPY_AVAILABLE:
+            print("⚠️  numpy not installed, learned router disabled", file=sys.stderr)
+            return None
+        try:
+            return cls.load(path, float(os.getenv("BRIDGE_ROUTER_MIN_CONFIDENCE", "0.7")))
+        except (OSError, KeyError, ValueError) as e:
+            print(f"⚠️  Could not load router model {path}: {e}", file=sys.stderr)
+            return None
+
+    def predict_proba(self, prompt: str, tokens_in: Optional[int] = None, task: Optional[str] = None) -> "np.ndarray":
+        idx = features(prompt, tokens_in, task, self.dim)
+        logits = self.weights[idx].sum(axis=0) / math.sqrt(max(len(idx), 1)) + self.bias
+        return _softmax(logits)
+
+    def predict(self, prompt: str, tokens_in: Optional[int] = None, task: Optional[str] = None) -> Tuple[str, float]:
+        """(tier, confidence) for a prompt (tokens_in is counted if not given)."""
+        key = (len(prompt), hash(prompt), task)
+        with self._lock:
+            cached = self._memo.get(key)
+            if cached is not None:
+                self._memo.move_to_end(key)
+                return cached
+        if tokens_in is None:
+            tokens_in = count_tokens(prompt)
+        probs = self.predict_proba(prompt, tokens_in, task)
+        best = int(np.argmax(probs))
+        result = (self.classes[best], float(probs[best]))
+        with self._lock:
+            self._memo[key] = result
+            if len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return result
+
+    def decide(self, prompt: str, tokens_in: Optional[int] = None, task: Optional[str] = None) -> Optional[str]:
+        """Predicted tier if confident enough, else None (use the rules)."""
+        tier, confidence = self.predict(prompt, tokens_in, task)
+        return tier if confidence >= self.min_confidence else None
+
+
+# ============================================================================
+# TRAINING
+# ============================================================================
+
+def record_tier(entry: Dict) -> Optional[str]:
+    """Tier a logged request was served at (None for cache hits and local entries without a tier)."""
+    route = entry.get("route")
+    if route == "cloud":
+        return "CLOUD"
+    if route == "local":
+        complexity = entry.get("complexity")
+        return complexity if complexity in TIERS else None
+    return None
+
+
+def load_examples(paths: List[str], min_quality: float = 7.0) -> List[Tuple[str, Optional[int], Optional[str], str]]:
+    """
+    Read log_request JSONL and label each distinct prompt with the
+    cheapest tier that met min_quality. If no attempt met it, the label
+    is one tier above the most expensive attempt.
+
+    Returns:
+        [(prompt, tokens_in, task, tier), ...]
+    """
+    attempts: Dict[Tuple[str, Optional[str]], Dict] = {}
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line.startswith("{"):
+                    continue  # console output interleaved on stderr
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                tier = record_tier(entry)
+                if not entry.get("prompt") or tier is None:
+                    continue
+                quality = entry.get("quality", entry.get("audit_score"))
+                ok = quality is None or float(quality) >= min_quality
+                prompt_tokens = entry.get("prompt_tokens")
+                if prompt_tokens is None:
+                    # Older entries: exact unless the excerpt cut the prompt
+                    prompt_tokens = count_tokens(entry["prompt"])
+                slot = attempts.setdefault((entry["prompt"], entry.get("task")), {
+                    "tokens_in": prompt_tokens, "ok": [], "failed": []
+                })
+                slot["ok" if ok else "failed"].append(TIERS.index(tier))
+
+    examples = []
+    for (prompt, task), slot in attempts.items():
+        if slot["ok"]:
+            label = min(slot["ok"])
+        else:
+            label = min(max(slot["failed"]) + 1, len(TIERS) - 1)
+        examples.append((prompt, slot["tokens_in"], task, TIERS[label]))
+    return examples
+
+
+def train(
+    examples: List[Tuple[str, Optional[int], Optional[str], str]],
+    dim: int = DEFAULT_DIM,
+    epochs: int = 300,
+    lr: float = 2.0,
+    l2: float = 1e-5
+) -> LearnedRouter:
+    """Full-batch gradient descent on softmax cross-entropy (sparse features)."""
+    rows = [features(p, t, task, dim) for p, t, task, _ in examples]
+    y = np.array([TIERS.index(tier) for *_, tier in examples])
+    n, k = len(rows), len(TIERS)
+    lengths = np.array([len(r) for r in rows])
+    flat = np.concatenate(rows)
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    scale = 1.0 / np.sqrt(np.maximum(lengths, 1))[:, None]
+    onehot = np.eye(k)[y]
+
+    weights = np.zeros((dim, k))
+    bias = np.log(onehot.mean(axis=0) + 1e-9)
+    for _ in range(epochs):
+        logits = np.add.reduceat(weights[flat], offsets, axis=0) * scale + bias
+        grad = (_softmax(logits) - onehot) / n
+        per_feature = np.repeat(grad * scale, lengths, axis=0)
+        grad_w = np.stack([np.bincount(flat, per_feature[:, c], minlength=dim) for c in range(k)], axis=1)
+        weights -= lr * (grad_w + l2 * weights)
+        bias -= lr * grad.sum(axis=0)
+
+    return LearnedRouter(weights.astype(np.float32), bias.astype(np.float32), TIERS)
+
+
+def evaluate(router: LearnedRouter, examples) -> Dict[str, float]:
+    """Accuracy overall and on the confident subset (with its coverage)."""
+    correct = confident = confident_correct = 0
+    for prompt, tokens_in, task, tier in examples:
+        probs = router.predict_proba(prompt, tokens_in, task)
+        best = int(np.argmax(probs))
+        hit = router.classes[best] == tier
+        correct += hit
+        if probs[best] >= router.min_confidence:
+            confident += 1
+            confident_correct += hit
+    n = len(examples) or 1
+    return {
+        "accuracy": correct / n,
+        "coverage": confident / n,
+        "confident_accuracy": confident_correct / confident if confident else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train / query the learned router")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    t = sub.add_parser("train", help="Fit weights from log_request JSONL")
+    t.add_argument("logs", nargs="+", help="JSONL log files")
+    t.add_argument("--out", default="router.npz")
+    t.add_argument("--min-quality", type=float, default=7.0, help="Score (0-10) that counts as good enough")
+    t.add_argument("--holdout", type=float, default=0.2, help="Fraction kept back for evaluation")
+    t.add_argument("--epochs", type=int, default=300)
+    t.add_argument("--dim", type=int, default=DEFAULT_DIM)
+
+    p = sub.add_parser("predict", help="Classify a prompt")
+    p.add_argument("prompt")
+    p.add_argument("--model", default=os.getenv("BRIDGE_ROUTER_MODEL", "router.npz"))
+    p.add_argument("--task")
+    args = parser.parse_args()
+
+    if not NUMPY_AVAILABLE:
+        sys.exit("learned_router requires numpy")
+
+    if args.command == "predict":
+        tier, confidence = LearnedRouter.load(args.model).predict(args.prompt, task=args.task)
+        print(json.dumps({"tier": tier, "confidence": round(confidence, 4)}))
+        return
+
+    examples = load_examples(args.logs, args.min_quality)
+    if not examples:
+        sys.exit("No usable log entries (were they written with BRIDGE_LOG_PROMPTS=true?)")
+    rng = np.random.default_rng(0)
+    order = rng.permutation(len(examples))
+    cut = int(len(examples) * (1 - args.holdout))
+    train_set = [examples[i] for i in order[:cut]]
+    test_set = [examples[i] for i in order[cut:]]
+
+    counts = {tier: sum(1 for *_, t in examples if t == tier) for tier in TIERS}
+    print(f"📚 {len(examples)} labelled prompts: {counts}")
+    router = train(train_set, args.dim, args.epochs)
+    router.save(args.out)
+    print(f"💾 Saved {args.out}")
+    if test_set:
+        print(f"📊 Holdout: {json.dumps({k: round(v, 3) for k, v in evaluate(router, test_set).items()})}")
+
+
+router = LearnedRouter.from_env()
+
+if __name__ == "__main__":
+    main()
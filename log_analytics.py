@@ -0,0 +1,493 @@
+#!/usr/bin/env python3
+"""
+Offline analytics over log_request JSONL
+
+Replaces the jq pipelines in network-monitoring/monitoring-commands.sh
+for months of logs. Log files are ingested once into a columnar store
+(a directory of raw little-endian column files plus meta.json); queries
+memory-map only the columns they need and aggregate them with NumPy.
+
+- route, model, task, cache and source file are dictionary-encoded
+- Ingestion is incremental: meta.json records the byte offset reached in
+  every log file, so a re-run reads only what was appended since. A file
+  that shrank or was replaced (rotation) is read again from the start.
+- Lines that are not JSON objects with a "route" (the bridge's other
+  stderr output) are skipped; a trailing partial line waits for the
+  next run
+- Prompts are not copied: each row keeps its file and byte offset, and
+  "slow" re-reads just the top-N lines for their prompt excerpts
+- Timestamps are taken as UTC (log_request writes them in UTC)
+
+Usage:
+    python3 log_analytics.py ingest bridge.log [more.log ...]
+    python3 log_analytics.py summary
+    python3 log_analytics.py savings --by day|model|task|route
+    python3 log_analytics.py latency --by route|model|task|day [--route local]
+    python3 log_analytics.py slow --top 20 --since 2025-10-01
+    (filters: --since/--until YYYY-MM-DD, --route, --model, --task; --json for scripting)
+
+Environment variables:
+    BRIDGE_ANALYTICS_DIR - Column store directory (default: bridge-analytics)
+"""
+import argparse
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+STORE_DIR = os.getenv("BRIDGE_ANALYTICS_DIR", "bridge-analytics")
+READ_CHUNK = 32 << 20  # bytes of log read per ingest step
+SECONDS_PER_DAY = 86400
+
+# Column name -> dtype. Missing numbers are 0 (-1 for gpu_id, NaN for the
+# optional timings); missing strings are code 0 ("").
+COLUMNS = {
+    "ts": "<i8",             # epoch seconds (UTC)
+    "route": "u1",
+    "model": "<u2",
+    "task": "<u2",
+    "cache": "u1",
+    "gpu_id": "i1",
+    "tokens_in": "<i4",
+    "tokens_out": "<i4",
+    "latency_ms": "<f4",
+    "cost_saved_usd": "<f8",
+    "ttft_ms": "<f4",
+    "gen_tps": "<f4",
+    "source": "<u2",         # log file the row came from
+    "offset": "<i8",         # byte offset of its line in that file
+}
+DICT_COLUMNS = ("route", "model", "task", "cache", "source")
+SAVING_ROUTES = ("local", "cache")
+
+
+class ColumnStore:
+    """Append-only column files plus meta.json (rows, dictionaries, per-file offsets)."""
+
+    def __init__(self, path: str = STORE_DIR):
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("log_analytics requires numpy")
+        self.path = path
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+        else:
+            meta = {"rows": 0, "dicts": {name: [""] for name in DICT_COLUMNS}, "files": {}}
+        self.rows: int = meta["rows"]
+        self.dicts: Dict[str, List[str]] = meta["dicts"]
+        self.files: Dict[str, Dict[str, int]] = meta["files"]
+        self._index = {name: {v: i for i, v in enumerate(values)} for name, values in self.dicts.items()}
+
+    # ------------------------------------------------------------------
+    # Ingestion
+    # ------------------------------------------------------------------
+
+    def ingest(self, paths: Sequence[str]) -> Dict[str, int]:
+        """Append new lines of each log file; returns rows added and bytes read."""
+        os.makedirs(self.path, exist_ok=True)
+        self._truncate_to_rows()
+        added = read = 0
+        for path in paths:
+            key = os.path.abspath(path)
+            stat = os.stat(key)
+            state = self.files.get(key)
+            if state is None or stat.st_ino != state["inode"] or stat.st_size < state["offset"]:
+                state = {"inode": stat.st_ino, "offset": 0}
+            source = self._code("source", key)
+            with open(key, "rb") as f:
+                f.seek(state["offset"])
+                while True:
+                    data = f.read(READ_CHUNK)
+                    end = data.rfind(b"\n") + 1
+                    if not end:
+                        break  # nothing new, or one partial line still being written
+                    if end < len(data):
+                        f.seek(state["offset"] + end)
+                    added += self._append(data[:end], state["offset"], source)
+                    state["offset"] += end
+                    read += end
+                    self.files[key] = state
+                    self._save_meta()
+            self.files[key] = state
+        self._save_meta()
+        return {"rows_added": added, "bytes_read": read, "rows": self.rows}
+
+    def _append(self, data: bytes, base: int, source: int) -> int:
+        lines = data.split(b"\n")[:-1]
+        entries, offsets = [], []
+        position = base
+        candidates, candidate_offsets = [], []
+        for line in lines:
+            if line.startswith(b"{"):
+                candidates.append(line)
+                candidate_offsets.append(position)
+            position += len(line) + 1
+        for entry, offset in zip(_decode(candidates), candidate_offsets):
+            if isinstance(entry, dict) and "route" in entry:
+                entries.append(entry)
+                offsets.append(offset)
+        if not entries:
+            return 0
+
+        columns = {
+            "ts": _parse_ts([e.get("ts") for e in entries]),
+            "gpu_id": np.array([_or(e.get("gpu_id"), -1) for e in entries], dtype=COLUMNS["gpu_id"]),
+            "source": np.full(len(entries), source, dtype=COLUMNS["source"]),
+            "offset": np.array(offsets, dtype=COLUMNS["offset"]),
+        }
+        for name in ("route", "model", "task", "cache"):
+            columns[name] = self._codes(name, [e.get(name) for e in entries])
+        for name in ("tokens_in", "tokens_out", "latency_ms", "cost_saved_usd"):
+            columns[name] = np.array([_or(e.get(name), 0) for e in entries], dtype=COLUMNS[name])
+        for name in ("ttft_ms", "gen_tps"):
+            columns[name] = np.array([e.get(name) for e in entries], dtype=COLUMNS[name])
+
+        for name, dtype in COLUMNS.items():
+            with open(self._column_path(name), "ab") as f:
+                f.write(columns[name].astype(dtype, copy=False).tobytes())
+        self.rows += len(entries)
+        return len(entries)
+
+    def _code(self, name: str, value: Any) -> int:
+        value = "" if value is None else str(value)
+        index = self._index[name]
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(self.dicts[name])
+            self.dicts[name].append(value)
+        return code
+
+    def _codes(self, name: str, values: List[Any]) -> "np.ndarray":
+        index = self._index[name]
+        codes = [index.get(v) if v.__class__ is str else None for v in values]
+        for i, code in enumerate(codes):
+            if code is None:
+                codes[i] = self._code(name, values[i])
+        limit = np.iinfo(COLUMNS[name]).max
+        if len(self.dicts[name]) > limit:
+            raise ValueError(f"more than {limit} distinct {name} values")
+        return np.array(codes, dtype=COLUMNS[name])
+
+    def _column_path(self, name: str) -> str:
+        return os.path.join(self.path, f"{name}.col")
+
+    def _truncate_to_rows(self):
+        """Drop rows appended by a run that died before saving meta.json."""
+        for name, dtype in COLUMNS.items():
+            path = self._column_path(name)
+            size = self.rows * np.dtype(dtype).itemsize
+            if os.path.exists(path) and os.path.getsize(path) > size:
+                os.truncate(path, size)
+
+    def _save_meta(self):
+        tmp = os.path.join(self.path, "meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump({"rows": self.rows, "dicts": self.dicts, "files": self.files}, f)
+        os.replace(tmp, os.path.join(self.path, "meta.json"))
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def column(self, name: str) -> "np.ndarray":
+        """Memory-mapped column (read-only, first self.rows rows)."""
+        if not self.rows:
+            return np.empty(0, dtype=COLUMNS[name])
+        return np.memmap(self._column_path(name), dtype=COLUMNS[name], mode="r", shape=(self.rows,))
+
+    def code_of(self, name: str, value: str) -> int:
+        """Dictionary code of value (-1 if it never occurs)."""
+        return self._index[name].get(value, -1)
+
+    def line(self, source: int, offset: int) -> Optional[Dict[str, Any]]:
+        """Re-read one original log entry (None if the file is gone or changed)."""
+        try:
+            with open(self.dicts["source"][source], "rb") as f:
+                f.seek(offset)
+                return _loads(f.readline())
+        except (OSError, ValueError):
+            return None
+
+
+def _or(value: Any, default: Any) -> Any:
+    return default if value is None else value
+
+
+def _decode(lines: List[bytes]) -> List[Any]:
+    """Decode JSON lines with one parser call, falling back to per-line (None for bad lines)."""
+    if not lines:
+        return []
+    try:
+        return _loads(b"[" + b",".join(lines) + b"]")
+    except ValueError:
+        pass
+    entries = []
+    for line in lines:
+        try:
+            entries.append(_loads(line))
+        except ValueError:
+            entries.append(None)
+    return entries
+
+
+def _parse_ts(values: List[Any]) -> "np.ndarray":
+    """ISO-8601 timestamps to epoch seconds (0 when missing or unparseable)."""
+    trimmed = [v[:19] if v.__class__ is str else "NaT" for v in values]
+    try:
+        ts = np.array(trimmed, dtype="datetime64[s]")
+    except ValueError:
+        ts = np.empty(len(trimmed), dtype="datetime64[s]")
+        for i, v in enumerate(trimmed):
+            try:
+                ts[i] = np.datetime64(v, "s")
+            except ValueError:
+                ts[i] = np.datetime64("NaT")
+    out = ts.astype("<i8")
+    out[np.isnat(ts)] = 0
+    return out
+
+
+# ----------------------------------------------------------------------
+# Queries
+# ----------------------------------------------------------------------
+
+def _day_start(day: str) -> int:
+    return int(np.datetime64(day, "D").astype("datetime64[s]").astype("<i8"))
+
+
+def select(store: ColumnStore, since: Optional[str] = None, until: Optional[str] = None,
+           route: Optional[str] = None, model: Optional[str] = None, task: Optional[str] = None):
+    """Row mask for the filters (None when there are none: every row)."""
+    mask = None
+
+    def both(m):
+        return m if mask is None else mask & m
+
+    if since:
+        mask = both(store.column("ts") >= _day_start(since))
+    if until:
+        # --until is inclusive of that whole day
+        mask = both(store.column("ts") < _day_start(until) + SECONDS_PER_DAY)
+    for name, value in (("route", route), ("model", model), ("task", task)):
+        if value is not None:
+            mask = both(store.column(name) == store.code_of(name, value))
+    return mask
+
+
+def _take(store: ColumnStore, name: str, mask) -> "np.ndarray":
+    column = store.column(name)
+    return np.asarray(column) if mask is None else column[mask]
+
+
+def _group_keys(store: ColumnStore, by: str, mask):
+    """(integer key per row, label per key)."""
+    if by == "day":
+        days = _take(store, "ts", mask) // SECONDS_PER_DAY
+        first = int(days.min()) if len(days) else 0
+        keys = days - first
+        labels = [str(np.datetime64(first + k, "D")) for k in range(int(keys.max()) + 1 if len(keys) else 0)]
+        return keys, labels
+    return _take(store, by, mask), store.dicts[by]
+
+
+def summary(store: ColumnStore, mask=None) -> Dict[str, Any]:
+    route = _take(store, "route", mask)
+    n = len(route)
+    if not n:
+        return {"requests": 0}
+    ts = _take(store, "ts", mask)
+    tokens = _take(store, "tokens_in", mask).astype(np.int64) + _take(store, "tokens_out", mask)
+    saving = np.isin(route, [store.code_of("route", r) for r in SAVING_ROUTES])
+    p50, p99 = np.percentile(_take(store, "latency_ms", mask), (50, 99))
+    counts = np.bincount(route, minlength=len(store.dicts["route"]))
+    return {
+        "requests": n,
+        "first": str(np.datetime64(int(ts.min()), "s")),
+        "last": str(np.datetime64(int(ts.max()), "s")),
+        "routes": {store.dicts["route"][c]: {"requests": int(k), "share": round(k / n, 4)}
+                   for c, k in enumerate(counts) if k},
+        "tokens_total": int(tokens.sum()),
+        "tokens_saved": int(tokens[saving].sum()),
+        "cost_saved_usd": round(float(_take(store, "cost_saved_usd", mask).sum()), 4),
+        "latency_p50_ms": float(p50),
+        "latency_p99_ms": float(p99),
+    }
+
+
+def savings(store: ColumnStore, by: str = "day", mask=None) -> List[Dict[str, Any]]:
+    keys, labels = _group_keys(store, by, mask)
+    if not len(keys):
+        return []
+    size = len(labels)
+    route = _take(store, "route", mask)
+    saving = np.isin(route, [store.code_of("route", r) for r in SAVING_ROUTES])
+    tokens = _take(store, "tokens_in", mask).astype(np.int64) + _take(store, "tokens_out", mask)
+    requests = np.bincount(keys, minlength=size)
+    local = np.bincount(keys, weights=saving, minlength=size)
+    tokens_saved = np.bincount(keys, weights=tokens * saving, minlength=size)
+    cost = np.bincount(keys, weights=_take(store, "cost_saved_usd", mask), minlength=size)
+    return [
+        {by: labels[k], "requests": int(requests[k]), "saved_share": round(local[k] / requests[k], 4),
+         "tokens_saved": int(tokens_saved[k]), "cost_saved_usd": round(float(cost[k]), 4)}
+        for k in np.flatnonzero(requests)
+    ]
+
+
+def latency(store: ColumnStore, by: str = "route", mask=None) -> List[Dict[str, Any]]:
+    keys, labels = _group_keys(store, by, mask)
+    if not len(keys):
+        return []
+    values = _take(store, "latency_ms", mask)
+    ttft = _take(store, "ttft_ms", mask)
+    # Group rows with one stable sort of the (small integer) keys; percentiles
+    # then partition each group's slice
+    if keys.dtype.itemsize > 2 and keys.max() < 1 << 16:
+        keys = keys.astype(np.uint16)
+    order = np.argsort(keys, kind="stable")
+    keys, values, ttft = keys[order], values[order], ttft[order]
+    bounds = np.flatnonzero(np.diff(keys)) + 1
+    rows = []
+    for start, end in zip(np.r_[0, bounds], np.r_[bounds, len(keys)]):
+        group = values[start:end]
+        streamed = ttft[start:end]
+        streamed = streamed[~np.isnan(streamed)]
+        p50, p90, p99 = np.percentile(group, (50, 90, 99))
+        rows.append({
+            by: labels[keys[start]],
+            "requests": int(end - start),
+            "mean_ms": round(float(group.mean()), 1),
+            "p50_ms": float(p50),
+            "p90_ms": float(p90),
+            "p99_ms": float(p99),
+            "max_ms": float(group.max()),
+            "ttft_p50_ms": float(np.percentile(streamed, 50)) if len(streamed) else None,
+        })
+    return rows
+
+
+def slow(store: ColumnStore, top: int = 20, mask=None) -> List[Dict[str, Any]]:
+    values = _take(store, "latency_ms", mask)
+    if not len(values):
+        return []
+    rows_idx = np.arange(store.rows) if mask is None else np.flatnonzero(mask)
+    top = min(top, len(values))
+    best = np.argpartition(values, len(values) - top)[-top:]
+    best = best[np.argsort(values[best])[::-1]]
+    source, offset = store.column("source"), store.column("offset")
+    results = []
+    for i in best:
+        row = int(rows_idx[i])
+        entry = store.line(int(source[row]), int(offset[row])) or {}
+        results.append({
+            "latency_ms": float(values[i]),
+            "ts": entry.get("ts"),
+            "route": entry.get("route"),
+            "model": entry.get("model"),
+            "task": entry.get("task"),
+            "tokens_in": entry.get("tokens_in"),
+            "trace_id": entry.get("trace_id"),
+            "prompt": entry.get("prompt", "(not logged; set BRIDGE_LOG_PROMPTS=true)"),
+        })
+    return results
+
+
+# ----------------------------------------------------------------------
+# CLI
+# ----------------------------------------------------------------------
+
+def print_rows(rows: List[Dict[str, Any]]):
+    if not rows:
+        print("(no matching requests)")
+        return
+    columns = list(rows[0])
+    cells = [[_format(row[c]) for c in columns] for row in rows]
+    widths = [max(len(c), *(len(r[i]) for r in cells)) for i, c in enumerate(columns)]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    print("  ".join("─" * w for w in widths))
+    for r in cells:
+        print("  ".join(v.ljust(w) for v, w in zip(r, widths)))
+
+
+def _format(value: Any) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:,.4f}" if abs(value) < 1 else f"{value:,.1f}"
+    if isinstance(value, int):
+        return f"{value:,}"
+    text = str(value).replace("\n", " ")
+    return text if len(text) <= 80 else text[:77] + "..."
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analytics over log_request JSONL")
+    parser.add_argument("--store", default=STORE_DIR, help="Column store directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ingest = sub.add_parser("ingest", help="Add new lines of log files to the store")
+    ingest.add_argument("logs", nargs="+")
+
+    queries = {
+        "summary": sub.add_parser("summary", help="Totals, route mix, savings"),
+        "savings": sub.add_parser("savings", help="Savings grouped by day/model/task/route"),
+        "latency": sub.add_parser("latency", help="Latency percentiles per group"),
+        "slow": sub.add_parser("slow", help="Slowest requests with their prompts"),
+    }
+    queries["savings"].add_argument("--by", choices=("day", "model", "task", "route"), default="day")
+    queries["latency"].add_argument("--by", choices=("route", "model", "task", "day"), default="route")
+    queries["slow"].add_argument("--top", type=int, default=20)
+    for q in queries.values():
+        q.add_argument("--since", help="First day (YYYY-MM-DD, UTC)")
+        q.add_argument("--until", help="Last day, inclusive")
+        q.add_argument("--route")
+        q.add_argument("--model")
+        q.add_argument("--task")
+        q.add_argument("--json", action="store_true", help="JSON output")
+    args = parser.parse_args()
+
+    if not NUMPY_AVAILABLE:
+        sys.exit("log_analytics requires numpy")
+    store = ColumnStore(args.store)
+
+    if args.command == "ingest":
+        stats = store.ingest(args.logs)
+        print(f"📥 {stats['rows_added']:,} new requests ({stats['bytes_read'] / 1e6:,.1f} MB read), "
+              f"{stats['rows']:,} in {args.store}")
+        return
+
+    mask = select(store, args.since, args.until, args.route, args.model, args.task)
+    if args.command == "summary":
+        result = summary(store, mask)
+    elif args.command == "savings":
+        result = savings(store, args.by, mask)
+    elif args.command == "latency":
+        result = latency(store, args.by, mask)
+    else:
+        result = slow(store, args.top, mask)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    elif args.command == "summary":
+        routes = result.pop("routes", {})
+        for key, value in result.items():
+            print(f"{key:<16} {_format(value)}")
+        print_rows([{"route": r, **v} for r, v in routes.items()])
+    else:
+        print_rows(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Background log shipping from the bridge to exporter.py
+
+log_request() entries go onto an in-memory bounded queue and return
+immediately; a daemon thread batches them (by line count, bytes or
+time), gzip-compresses each batch and POSTs it as NDJSON to the
+exporter over the shared pooled client (backend_clients).
+
+- 503 from the exporter (its queue is full) and connection errors are
+  retried with exponential backoff
+- after BRIDGE_LOG_RETRIES failed attempts the exporter is considered
+  down: batches are appended to the spill file instead, and the next
+  batch after the backoff probes it again
+- once a POST succeeds, the spill file is replayed before new batches
+- if the in-memory queue itself is full, entries are dropped (and
+  counted) rather than blocking the request
+- other 4xx answers are not retried: the batch is counted as rejected
+
+Remaining entries are flushed at interpreter exit (up to 5 seconds).
+
+Usage:
+    from log_shipper import LogShipper
+
+    shipper = LogShipper("http://localhost:8080")
+    shipper.ship({"route": "local", ...})
+
+Environment variables:
+    BRIDGE_LOG_URL      - Exporter ingestion URL; enables shipping (default: off, JSON to stderr)
+    BRIDGE_LOG_BATCH    - Max lines per POST (default: 500)
+    BRIDGE_LOG_FLUSH    - Max seconds an entry waits for its batch to fill (default: 1.0)
+    BRIDGE_LOG_QUEUE    - Entries buffered in memory before dropping (default: 10000)
+    BRIDGE_LOG_RETRIES  - Attempts per batch before spilling (default: 3)
+    BRIDGE_LOG_SPILL    - Spill file while the exporter is down (default: bridge-logs.spill.ndjson)
+"""
+import atexit
+import gzip
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from backend_clients import backends
+
+MAX_BATCH_BYTES = 1 << 20
+MAX_BACKOFF_S = 30.0
+
+
+class LogShipper:
+    """Bounded, batching, retrying NDJSON shipper running in a daemon thread."""
+
+    def __init__(
+        self,
+        url: str,
+        batch_lines: int = 500,
+        flush_s: float = 1.0,
+        queue_size: int = 10000,
+        retries: int = 3,
+        spill_path: str = "bridge-logs.spill.ndjson",
+        timeout: float = 5.0
+    ):
+        self.url = url
+        self.batch_lines = batch_lines
+        self.flush_s = flush_s
+        self.retries = retries
+        self.spill_path = spill_path
+        self.timeout = timeout
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=queue_size)
+        self._down_until = 0.0
+        self._backoff = 0.5
+        self._closed = False
+        # Left over from an earlier run: replayed after the first successful POST
+        self._spill_pending = os.path.isfile(spill_path) and os.path.getsize(spill_path) > 0
+
+        self.sent = 0
+        self.batches = 0
+        self.retried = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.dropped = 0
+        self.rejected = 0
+
+        self._thread = threading.Thread(target=self._run, name="log-shipper", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_env(cls) -> Optional["LogShipper"]:
+        """A shipper for BRIDGE_LOG_URL, or None when it is unset."""
+        url = os.getenv("BRIDGE_LOG_URL")
+        if not url:
+            return None
+        shipper = cls(
+            url,
+            batch_lines=int(os.getenv("BRIDGE_LOG_BATCH", "500")),
+            flush_s=float(os.getenv("BRIDGE_LOG_FLUSH", "1.0")),
+            queue_size=int(os.getenv("BRIDGE_LOG_QUEUE", "10000")),
+            retries=int(os.getenv("BRIDGE_LOG_RETRIES", "3")),
+            spill_path=os.getenv("BRIDGE_LOG_SPILL", "bridge-logs.spill.ndjson")
+        )
+        atexit.register(shipper.close)
+        return shipper
+
+    # ------------------------------------------------------------------
+    # Producer side (request path)
+    # ------------------------------------------------------------------
+
+    def ship(self, entry: Dict[str, Any]) -> bool:
+        """Queue one log entry; never blocks. False if it had to be dropped."""
+        if self._closed:
+            return False
+        try:
+            self._queue.put_nowait(entry)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def close(self, timeout: float = 5.0):
+        """Flush what is queued (waiting up to timeout seconds) and stop the thread."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, int]:
+        """Entry counts; sent and replayed include any the exporter rejected (4xx)."""
+        return {
+            "queued": self._queue.qsize(),
+            "sent": self.sent,
+            "batches": self.batches,
+            "retried": self.retried,
+            "spilled": self.spilled,
+            "replayed": self.replayed,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+        }
+
+    # ------------------------------------------------------------------
+    # Shipping thread
+    # ------------------------------------------------------------------
+
+    def _next_batch(self) -> Optional[List[bytes]]:
+        """Block for the first entry, then collect until the batch is full or flush_s has passed."""
+        entry = self._queue.get()
+        if entry is None:
+            return None
+        lines = [json.dumps(entry).encode()]
+        size = len(lines[0])
+        deadline = time.monotonic() + self.flush_s
+        while len(lines) < self.batch_lines and size < MAX_BATCH_BYTES:
+            remaining = deadline - time.monotonic()
+            try:
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is None:
+                self._queue.put_nowait(None)  # finish this batch, then stop
+                break
+            line = json.dumps(entry).encode()
+            lines.append(line)
+            size += len(line)
+        return lines
+
+    def _run(self):
+        while True:
+            lines = self._next_batch()
+            if lines is None:
+                return
+            self._deliver(lines)
+
+    def _deliver(self, lines: List[bytes]):
+        if time.monotonic() < self._down_until:
+            self._spill(lines)
+            return
+        if not self._post_with_retries(lines):
+            self._spill(lines)
+            return
+        self.sent += len(lines)
+        self.batches += 1
+        if self._spill_pending:
+            self._replay()
+
+    def _post(self, lines: List[bytes]) -> Optional[float]:
+        """POST one batch. None on success, else seconds to wait before retrying."""
+        body = gzip.compress(b"\n".join(lines) + b"\n", compresslevel=1)
+        try:
+            response = backends.client(self.url).post(
+                self.url,
+                content=body,
+                headers={"Content-Type": "application/x-ndjson", "Content-Encoding": "gzip"},
+                timeout=self.timeout
+            )
+        except httpx.HTTPError:
+            return self._backoff
+        if response.status_code < 300:
+            return None
+        if 400 <= response.status_code < 500 and response.status_code not in (408, 429):
+            # The exporter will never take this batch; retrying or spilling it would loop
+            self.rejected += len(lines)
+            print(f"⚠️  Exporter rejected {len(lines)} log lines ({response.status_code})", file=sys.stderr)
+            return None
+        if response.status_code in (429, 503):
+            return float(response.headers.get("Retry-After", self._backoff))
+        return self._backoff
+
+    def _post_with_retries(self, lines: List[bytes]) -> bool:
+        for attempt in range(self.retries):
+            wait = self._post(lines)
+            if wait is None:
+                if self._down_until:
+                    print(f"✅ Log shipping to {self.url} resumed", file=sys.stderr)
+                self._down_until = 0.0
+                self._backoff = 0.5
+                return True
+            if attempt + 1 < self.retries:
+                self.retried += 1
+                time.sleep(min(wait, MAX_BACKOFF_S))
+                self._backoff = min(self._backoff * 2, MAX_BACKOFF_S)
+        if not self._down_until:
+            print(f"⚠️  Log shipping to {self.url} failing, spilling to {self.spill_path}", file=sys.stderr)
+        self._down_until = time.monotonic() + self._backoff
+        self._backoff = min(self._backoff * 2, MAX_BACKOFF_S)
+        return False
+
+    def _spill(self, lines: List[bytes]):
+        with open(self.spill_path, "ab") as f:
+            f.write(b"\n".join(lines) + b"\n")
+        self.spilled += len(lines)
+        self._spill_pending = True
+
+    def _replay(self):
+        """Send the spill file in batches; whatever fails stays spilled."""
+        if not os.path.isfile(self.spill_path):
+            # e.g. BRIDGE_LOG_SPILL=/dev/null: nothing to replay, never rename it
+            self._spill_pending = False
+            return
+        sending = self.spill_path + ".sending"
+        os.replace(self.spill_path, sending)
+        self._spill_pending = False
+        with open(sending, "rb") as f:
+            batch = []
+            for line in f:
+                batch.append(line.rstrip(b"\n"))
+                if len(batch) >= self.batch_lines:
+                    if not self._replay_batch(batch):
+                        break
+                    batch = []
+            else:
+                if not batch or self._replay_batch(batch):
+                    batch = []
+            # Re-spill the failed batch and everything after it
+            rest = batch + [line.rstrip(b"\n") for line in f]
+        os.remove(sending)
+        if rest:
+            self._spill(rest)
+            self.spilled -= len(rest)
+
+    def _replay_batch(self, batch: List[bytes]) -> bool:
+        if not self._post_with_retries(batch):
+            return False
+        self.replayed += len(batch)
+        return True
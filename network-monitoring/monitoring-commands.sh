@@ -77,6 +77,14 @@ echo -e "${GREEN}12. Show Latest 10 Requests${NC}"
 echo "    tail -10 copilot-metrics.jsonl | jq -s '.'"
 echo ""
 
+# 13. Large logs: column store instead of jq -s (which loads the whole file into memory)
+echo -e "${GREEN}13. Large Logs (months of requests)${NC}"
+echo "    python3 ../log_analytics.py ingest copilot-metrics.jsonl   # incremental: only new lines are read"
+echo "    python3 ../log_analytics.py summary"
+echo "    python3 ../log_analytics.py savings --by day"
+echo "    python3 ../log_analytics.py latency --by route"
+echo ""
+
 echo -e "${BLUE}════════════════════════════════════════════════════════════════${NC}"
 echo -e "${YELLOW}Tip: Install jq if not available: sudo apt install jq -y${NC}"
 echo -e "${BLUE}════════════════════════════════════════════════════════════════${NC}"
@@ -1,31 +1,336 @@
 #!/usr/bin/env python3
-import os, json, httpx, asyncio, sys, time
-LOCAL = "http://192.168.1.138:11434"
-GH    = "https://api.githubcopilot.com"
+"""
+Copilot Bridge proxy.
+
+  python3 proxy.py < payload.json          # one-shot: stdin → stdout, then exit
+  python3 proxy.py --serve [--port 11436]  # resident OpenAI-compatible server
+
+Server mode answers POST /v1/chat/completions from one process; upstream
+calls share the pooled clients in backend_clients.py (keep-alive to Ollama,
+HTTP/2 to Copilot) across all concurrent requests. Payloads with "stream": true are answered as
+OpenAI-style SSE deltas relayed token by token from Ollama.
+
+LOCAL generations run through a GPUScheduler (scheduler.py): at most
+BRIDGE_GPU_SLOTS at once, queued by the X-Bridge-Priority header
+(interactive | chat | batch, default chat). A request whose projected
+queue wait exceeds its deadline goes to GitHub instead (BRIDGE_OVERLOAD=cloud)
+or is answered 429 with Retry-After (BRIDGE_OVERLOAD=reject).
+
+Every request is logged through bridge_metrics.emit (route, model, tokens,
+latency, TTFT/ITL, queue wait, Ollama timings); with BRIDGE_METRICS_PORT
+the server records them in-process and serves /metrics itself.
+
+Upstream failures are not relayed as successes: a 4xx/5xx from Copilot or
+Ollama is answered with the same status (and Retry-After), and an Ollama
+{"error": ...} answer with 502, before any stream has started.
+
+The server listens on BRIDGE_HOST (default 127.0.0.1; it relays to your
+GitHub token, so bind other interfaces deliberately) and answers 413 to
+bodies over BRIDGE_MAX_BODY bytes (default 4 MiB) without reading them.
+"""
+import os, json, asyncio, sys, time, argparse
+from http import HTTPStatus
+from datetime import datetime, timezone
+import bridge_metrics
+from backend_clients import backends
+from keyword_classifier import classifier
+from scheduler import GPUScheduler, Overloaded, Priority, overload_action
+from streaming import SSE_DONE, SSE_HEADERS, TokenTimer, ollama_timings, parse_ndjson_line, sse_content, sse_delta
+from token_counter import usage_tokens
+LOCAL = os.getenv("OLLAMA_BASE", "http://192.168.1.138:11434")
+GH    = os.getenv("GITHUB_COPILOT_BASE", "https://api.githubcopilot.com")
 TOKEN = os.getenv("GITHUB_TOKEN") or sys.exit("export GITHUB_TOKEN")
+local_slots = GPUScheduler("local")
+OVERLOAD    = overload_action()
+MAX_BODY    = int(os.getenv("BRIDGE_MAX_BODY", str(4 << 20)))
+MODEL       = "qwen2.5-coder:7b-instruct"
+CLOUD_COST_PER_1K_TOKENS = 0.02
 
-async def main():
-    payload = json.load(sys.stdin)
+class UpstreamError(Exception):
+    """Copilot or Ollama answered with an error; status is what the client gets."""
+    def __init__(self, status, message, retry_after=None):
+        super().__init__(message)
+        self.status, self.retry_after = status, retry_after
+
+def upstream_error(r, body):
+    """UpstreamError for a failed response: its status (502 if it claimed success) and error message."""
+    try:
+        message = json.loads(body).get("error") or body
+    except (ValueError, AttributeError):
+        message = body
+    if isinstance(message, dict):
+        message = message.get("message") or json.dumps(message)
+    status = r.status_code if r.status_code >= 400 else 502
+    return UpstreamError(status, f"{r.request.url.host}: {str(message)[:500]}", r.headers.get("retry-after"))
+
+def log_request(route, model, msg, answer, latency_ms, result=None, timer=None, waited=None):
+    """One log_request entry per request: in-process metrics and/or sampled JSON (bridge_metrics.emit)."""
+    tokens_in, tokens_out = usage_tokens(msg, answer, result)
+    entry = {"ts": datetime.now(timezone.utc).isoformat(), "route": route,
+             "tokens_in": tokens_in, "tokens_out": tokens_out, "total_tokens": tokens_in + tokens_out,
+             "latency_ms": latency_ms, "model": model, "task": "general",
+             "cost_saved_usd": round((tokens_in + tokens_out) / 1000 * CLOUD_COST_PER_1K_TOKENS, 4)
+                               if route == "local" else 0.0}
+    entry.update(ollama_timings(result or {}))
+    if waited is not None:
+        entry["queue_wait_ms"] = round(waited * 1000, 2)
+    if timer is not None and timer.ttft_ms is not None:
+        entry["ttft_ms"], entry["itl_ms"] = timer.ttft_ms, timer.itl_ms
+    bridge_metrics.emit(entry)
+
+def overloaded(e):
+    """LOCAL queue is past its deadline: re-raise for a 429, or fall through to GITHUB."""
+    print(f"BUSY   {e}", file=sys.stderr)
+    if OVERLOAD == "reject":
+        raise e
+
+async def route(payload, priority=Priority.CHAT):
+    """Run the cheap→LOCAL / else→GITHUB routing for one payload; returns the response body."""
     msg     = payload.get("messages",[{}])[-1].get("content","")
-    cheap   = any(w in msg.lower() for w in ("docstring","comment","lint","test","rename"))
+    cheap   = "cheap" in classifier.classify(msg)
     t0      = time.time()
 
     if cheap:
         # LOCAL route
-        async with httpx.AsyncClient() as client:
-            r = await client.post(f"{LOCAL}/api/generate",
-                                  json={"model":"qwen2.5-coder:7b-instruct","prompt":msg,"stream":False},
-                                  timeout=30)
-        print(json.dumps({"choices":[{"delta":{"content":r.json()["response"]}}]}))
-        print(f"LOCAL  {len(msg.split())}w  {int((time.time()-t0)*1000)}ms", file=sys.stderr)
+        try:
+            async with local_slots.aslot(priority) as waited:
+                r = await backends.async_client(LOCAL).post(
+                    f"{LOCAL}/api/generate",
+                    json={"model":MODEL,"prompt":msg,"stream":False}, timeout=30)
+            try:
+                result = r.json()
+            except ValueError:
+                result = None
+            if r.status_code >= 400 or not isinstance(result, dict) or "response" not in result:
+                raise upstream_error(r, r.text)
+            body = json.dumps({"choices":[{"delta":{"content":result["response"]}}]})
+            ms = int((time.time()-t0)*1000)
+            print(f"LOCAL  {len(msg.split())}w  {ms}ms  queued={int(waited*1000)}ms", file=sys.stderr)
+            log_request("local", MODEL, msg, result["response"], ms, result, waited=waited)
+            return body
+        except Overloaded as e:
+            overloaded(e)
+    # GITHUB route
+    r = await backends.async_client(GH).post(
+        f"{GH}/chat/completions",
+        headers={"Authorization":f"Bearer {TOKEN}"}, json=payload, timeout=30)
+    ms = int((time.time()-t0)*1000)
+    print(f"GITHUB {len(msg.split())}w  {ms}ms  HTTP {r.status_code}", file=sys.stderr)
+    if r.status_code >= 400:
+        raise upstream_error(r, r.text)
+    try:
+        answer = r.json()["choices"][0]["message"]["content"] or ""
+    except (ValueError, KeyError, IndexError, TypeError):
+        answer = ""
+    log_request("cloud", payload.get("model", "github-copilot"), msg, answer, ms)
+    return r.text
+
+async def route_stream(payload, emit, priority=Priority.CHAT):
+    """Streaming variant of route(): `await emit(text)` is called with each SSE event as it arrives."""
+    msg     = payload.get("messages",[{}])[-1].get("content","")
+    cheap   = "cheap" in classifier.classify(msg)
+    timer   = TokenTimer()
+    parts   = []      # answer text, for the token counts
+    result  = None    # Ollama's final chunk (eval counts and durations)
+    waited  = None
+
+    if cheap:
+        try:
+            waited = await local_slots.aacquire(priority)   # before anything is emitted
+        except Overloaded as e:
+            overloaded(e)
+            cheap = False
+
+    if cheap:
+        # LOCAL route: Ollama NDJSON → OpenAI SSE deltas
+        model = MODEL
+        held  = time.monotonic()
+        try:
+            async with backends.async_client(LOCAL).stream(
+                    "POST", f"{LOCAL}/api/generate",
+                    json={"model":model,"prompt":msg,"stream":True}, timeout=30) as r:
+                if r.status_code >= 400:
+                    raise upstream_error(r, (await r.aread()).decode("utf-8", "replace"))
+                async for line in r.aiter_lines():
+                    chunk = parse_ndjson_line(line)
+                    if chunk is None:
+                        continue
+                    if chunk.get("error"):
+                        raise upstream_error(r, json.dumps(chunk))
+                    if chunk.get("response"):
+                        timer.tick()
+                        parts.append(chunk["response"])
+                        await emit(sse_delta(chunk["response"], model))
+                    if chunk.get("done"):
+                        result = chunk
+                        await emit(sse_delta("", model, finish_reason="stop"))
+        finally:
+            local_slots.release(time.monotonic() - held)
+        await emit(SSE_DONE)
+        label, route_name, answer = "LOCAL ", "local", "".join(parts)
     else:
-        # GITHUB route
-        async with httpx.AsyncClient() as client:
-            r = await client.post(f"{GH}/chat/completions",
-                                  headers={"Authorization":f"Bearer {TOKEN}"},
-                                  json=payload, timeout=30)
-        print(r.text)
-        print(f"GITHUB {len(msg.split())}w  {int((time.time()-t0)*1000)}ms", file=sys.stderr)
+        # GITHUB route: Copilot already speaks SSE, relay bytes untouched
+        async with backends.async_client(GH).stream(
+                "POST", f"{GH}/chat/completions",
+                headers={"Authorization":f"Bearer {TOKEN}"}, json=payload, timeout=30) as r:
+            if r.status_code >= 400:
+                raise upstream_error(r, (await r.aread()).decode("utf-8", "replace"))
+            async for text in r.aiter_text():
+                timer.tick()
+                parts.append(text)
+                await emit(text)
+        label, route_name, answer = "GITHUB", "cloud", sse_content("".join(parts))
+        model = payload.get("model", "github-copilot")
+    print(f"{label} {len(msg.split())}w  ttft={timer.ttft_ms}ms  itl={timer.itl_ms}ms  {timer.total_ms}ms",
+          file=sys.stderr)
+    log_request(route_name, model, msg, answer, timer.total_ms, result, timer, waited)
+
+async def main():
+    payload = json.load(sys.stdin)
+    try:
+        if payload.get("stream"):
+            async def emit(text):
+                sys.stdout.write(text)
+                sys.stdout.flush()
+            await route_stream(payload, emit)
+        else:
+            print(await route(payload))
+    except UpstreamError as e:
+        print(json.dumps({"error": str(e), "status": e.status}))
+    finally:
+        await backends.aclose()
+
+# ----------------------------------------------------------------------------
+# Server mode
+# ----------------------------------------------------------------------------
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large",
+           429: "Too Many Requests", 502: "Bad Gateway"}
+
+def respond(writer, status, body, keep_alive=True, extra=""):
+    """Write one HTTP/1.1 JSON response (not drained); extra is preformatted header lines."""
+    data = body.encode() if isinstance(body, str) else body
+    reason = REASONS.get(status) or (HTTPStatus(status).phrase if status in HTTPStatus._value2member_map_ else "Error")
+    writer.write((f"HTTP/1.1 {status} {reason}\r\n"
+                  f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n{extra}"
+                  f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode() + data)
+
+async def respond_stream(writer, payload, keep_alive=True, priority=Priority.CHAT):
+    """Answer one request as a chunked text/event-stream, flushing every event.
+
+    Headers go out with the first event, so an Overloaded rejection (raised
+    before anything is emitted) can still be answered with a plain 429.
+    """
+    started = False
+
+    async def emit(text):
+        nonlocal started
+        if not started:
+            headers = "".join(f"{k}: {v}\r\n" for k, v in SSE_HEADERS.items())
+            writer.write((f"HTTP/1.1 200 OK\r\n{headers}Transfer-Encoding: chunked\r\n"
+                          f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode())
+            started = True
+        data = text.encode()
+        writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+        await writer.drain()
+
+    try:
+        await route_stream(payload, emit, priority)
+    except Overloaded:
+        raise   # handle() answers 429
+    except UpstreamError as e:
+        if not started:
+            raise   # handle() answers with the upstream status
+        await emit(f"data: {json.dumps({'error': f'Upstream failed: {e}'})}\n\n")
+    except Exception as e:
+        await emit(f"data: {json.dumps({'error': f'Upstream failed: {e}'})}\n\n")
+    writer.write(b"0\r\n\r\n")
+
+async def handle(reader, writer):
+    """Serve requests on one client connection until it closes (HTTP/1.1 keep-alive)."""
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            method, path, _ = line.decode("latin-1").split(" ", 2)
+            headers = {}
+            while (h := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                k, _, v = h.decode("latin-1").partition(":")
+                headers[k.strip().lower()] = v.strip()
+            size = int(headers.get("content-length", 0))
+            if size > MAX_BODY:
+                # The unread body would be parsed as the next request: answer and close
+                respond(writer, 413, json.dumps({"error": f"Body of {size} bytes exceeds {MAX_BODY}"}), False)
+                await writer.drain()
+                break
+            raw  = await reader.readexactly(size)
+            keep = headers.get("connection", "").lower() != "close"
+
+            if method == "POST" and path.split("?")[0].rstrip("/") in ("/v1/chat/completions", "/chat/completions"):
+                try:
+                    payload  = json.loads(raw or b"{}")
+                    priority = Priority.parse(headers.get("x-bridge-priority"))
+                    if payload.get("stream"):
+                        await respond_stream(writer, payload, keep, priority)
+                        await writer.drain()
+                        if not keep:
+                            break
+                        continue
+                    status, body = 200, await route(payload, priority)
+                except json.JSONDecodeError as e:
+                    status, body = 400, json.dumps({"error": f"Invalid JSON: {e}"})
+                except UpstreamError as e:
+                    extra = f"Retry-After: {e.retry_after}\r\n" if e.retry_after else ""
+                    respond(writer, e.status, json.dumps({"error": str(e)}), keep, extra)
+                    await writer.drain()
+                    if not keep:
+                        break
+                    continue
+                except Overloaded as e:
+                    respond(writer, 429, json.dumps({"error": str(e)}), keep, f"Retry-After: {e.retry_after}\r\n")
+                    await writer.drain()
+                    if not keep:
+                        break
+                    continue
+                except Exception as e:
+                    status, body = 502, json.dumps({"error": f"Upstream failed: {e}"})
+            elif method == "GET" and path == "/health":
+                status, body = 200, '{"status": "ok"}'
+            else:
+                status, body = 404, json.dumps({"error": f"No route for {method} {path}"})
+
+            respond(writer, status, body, keep)
+            await writer.drain()
+            if not keep:
+                break
+    except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+async def serve(host, port):
+    bridge_metrics.serve_from_env()
+    server = await asyncio.start_server(handle, host, port, backlog=4096)
+    pool = backends.config_for(LOCAL)
+    print(f"🌉 Bridge listening on http://{host}:{port}/v1/chat/completions "
+          f"(LOCAL={LOCAL}, pool={pool.max_connections}x{pool.shards} shards)", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await backends.aclose()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Copilot Bridge proxy")
+    parser.add_argument("--serve", action="store_true", help="Run as a resident HTTP server")
+    parser.add_argument("--host", default=os.getenv("BRIDGE_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("BRIDGE_PORT", "11436")))
+    args = parser.parse_args()
+    if args.serve:
+        try:
+            asyncio.run(serve(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+    else:
+        asyncio.run(main())
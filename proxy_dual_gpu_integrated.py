@@ -17,21 +17,37 @@ Environment variables:
     GPU0_URL              - GPU 0 Ollama endpoint (default: http://localhost:11434)
     GPU1_URL              - GPU 1 Ollama endpoint (default: http://localhost:11434)
     OLLAMA_BASE           - Fallback Ollama URL if dual-GPU disabled
+    BRIDGE_CACHE*         - Response cache settings (see response_cache.py)
+    BRIDGE_ROUTER_MODEL   - Learned router weights (see learned_router.py)
+    BRIDGE_LOG_PROMPTS    - Log prompt excerpts for router training (default: false)
+    BRIDGE_GPU_SLOTS / BRIDGE_DEADLINE_* / BRIDGE_OVERLOAD
+                          - GPU queueing and admission control (see scheduler.py)
+    BRIDGE_METRICS_PORT   - Serve /metrics in-process instead of via exporter.py (see bridge_metrics.py)
+    BRIDGE_LOG_SAMPLE     - Fraction of requests logged as JSON to stderr
+    BRIDGE_TRACE_SAMPLE   - Fraction of requests traced to BRIDGE_TRACE_FILE (see tracing.py)
 """
 
 import os
 import sys
-import json
 import time
-import httpx
 import argparse
 from datetime import datetime, timezone
-from typing import Tuple, Optional
+from typing import Any, Dict, Tuple, Optional
+
+import bridge_metrics
+import tracing
+from backend_clients import backends
+from keyword_classifier import classifier
+from learned_router import log_prompts_enabled, prompt_log_fields, router
+from response_cache import ResponseCache, cache_key, cacheable
+from scheduler import Overloaded, Priority, overload_action
+from streaming import ollama_timings
+from token_counter import count_tokens, usage_tokens
 
 # Try to import dual-GPU orchestrator
 try:
     sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'dual-gpu-implementation'))
-    from dual_gpu_orchestrator import DualGPUOrchestrator, TaskComplexity
+    from dual_gpu_orchestrator import DualGPUOrchestrator, RoutingDecision, TaskComplexity
     DUAL_GPU_AVAILABLE = True
 except ImportError:
     DUAL_GPU_AVAILABLE = False
@@ -50,11 +66,14 @@ GITHUB_COPILOT_BASE = "https://api.githubcopilot.com"
 
 CLOUD_COST_PER_1K_TOKENS = 0.02  # $0.02 per 1K tokens baseline
 
-# Keywords that trigger LOCAL routing (vs cloud)
-LOCAL_KEYWORDS = [
-    "docstring", "comment", "explain", "document", "lint",
-    "type hint", "format", "summarize", "rename", "simple"
-]
+# Exact-match response cache (None when BRIDGE_CACHE=false)
+response_cache = ResponseCache.from_env()
+
+# Include prompt excerpts in logs (BRIDGE_LOG_PROMPTS=true)
+LOG_PROMPTS = log_prompts_enabled()
+
+# Embedded /metrics (BRIDGE_METRICS_PORT), including the dual_gpu_* metrics
+bridge_metrics.serve_from_env()
 
 # ============================================================================
 # DUAL-GPU ORCHESTRATOR INITIALIZATION
@@ -80,14 +99,14 @@ if ENABLE_DUAL_GPU and DUAL_GPU_AVAILABLE:
 # UTILITIES
 # ============================================================================
 
-def estimate_tokens(text: str) -> int:
-    """Rough token estimation: ~1.3 words per token"""
-    return int(len(text.split()) * 1.3)
-
-def should_route_local(prompt: str) -> bool:
-    """Determine if request should go LOCAL or CLOUD"""
-    prompt_lower = prompt.lower()
-    return any(kw in prompt_lower for kw in LOCAL_KEYWORDS)
+@tracing.traced("route_decision")
+def should_route_local(prompt: str, task: Optional[str] = None) -> bool:
+    """Determine if request should go LOCAL or CLOUD (learned router if confident, else LOCAL_KEYWORDS)"""
+    if router is not None:
+        tier = router.decide(prompt, task=task)
+        if tier is not None:
+            return tier != "CLOUD"
+    return "local" in classifier.classify(prompt)
 
 def log_request(
     route: str,
@@ -97,11 +116,28 @@ def log_request(
     model: str,
     task: str = "general",
     complexity: Optional[str] = None,
-    gpu_used: Optional[str] = None
+    gpu_used: Optional[str] = None,
+    cache: Optional[str] = None,
+    prompt: Optional[str] = None,
+    gpu_id: Optional[int] = None,
+    timings: Optional[Dict[str, Any]] = None,
+    retry_after: Optional[int] = None
 ):
-    """Emit structured JSON log for Prometheus ingestion"""
+    """
+    Emit structured JSON log for Prometheus ingestion (cache hits use route
+    "cache", requests refused because the GPUs are overloaded use route
+    "rejected" with the retry_after given to the client).
+    
+    With BRIDGE_METRICS_PORT the entry is recorded in-process instead and the
+    JSON log is sampled (see bridge_metrics.py).
+    
+    With BRIDGE_LOG_PROMPTS=true a prompt excerpt is included for learned_router.py.
+    
+    timings carries Ollama's gen_tps / prompt_tps / load_ms (and queue_wait_ms
+    on the dual-GPU path), observed per route/model/gpu_id by bridge_metrics.
+    """
     cost_saved = 0.0
-    if route == "local":
+    if route in ("local", "cache"):
         total_tokens = tokens_in + tokens_out
         cost_saved = (total_tokens / 1000) * CLOUD_COST_PER_1K_TOKENS
     
@@ -119,48 +155,87 @@ def log_request(
         "complexity": complexity,
         "gpu_used": gpu_used
     }
+    if gpu_id is not None:
+        log_entry["gpu_id"] = gpu_id
+    if retry_after is not None:
+        log_entry["retry_after_s"] = retry_after
+    if timings:
+        log_entry.update(timings)
+    trace_id = tracing.current_trace_id()
+    if trace_id:
+        log_entry["trace_id"] = trace_id
+        tracing.annotate(route=route, model=model, task=task, cache=cache,
+                         tokens_in=tokens_in, tokens_out=tokens_out)
+    if cache is not None:
+        log_entry["cache"] = cache
+    if prompt is not None and LOG_PROMPTS:
+        log_entry.update(prompt_log_fields(prompt))
     
-    print(json.dumps(log_entry), file=sys.stderr, flush=True)
+    bridge_metrics.emit(log_entry)
 
 # ============================================================================
 # ROUTING HANDLERS
 # ============================================================================
 
-def call_local_single_model(prompt: str, model: str = "qwen2.5-coder:7b-instruct-q8_0") -> Tuple[str, int, str]:
+@tracing.traced("call_model")
+def call_local_single_model(prompt: str, model: str = "qwen2.5-coder:7b-instruct-q8_0") -> Tuple[str, int, str, dict]:
     """
     Route request to local Ollama (single model, no dual-GPU).
-    Returns: (response_text, latency_ms, gpu_info)
+    Returns: (response_text, latency_ms, gpu_info, ollama_result)
     """
     start = time.time()
     
-    with httpx.Client(timeout=60.0) as client:
-        response = client.post(
-            f"{OLLAMA_BASE}/api/generate",
-            json={
-                "model": model,
-                "prompt": prompt,
-                "stream": False
-            }
-        )
-        result = response.json()
-        answer = result.get("response", "")
+    response = backends.client(OLLAMA_BASE).post(
+        f"{OLLAMA_BASE}/api/generate",
+        json={
+            "model": model,
+            "prompt": prompt,
+            "stream": False
+        },
+        timeout=60.0
+    )
+    result = response.json()
+    answer = result.get("response", "")
+    tracing.record_generation(int(start * 1e9), time.time_ns(), result, model=model)
     
     latency_ms = int((time.time() - start) * 1000)
-    return answer, latency_ms, "single-gpu"
+    return answer, latency_ms, "single-gpu", result
 
-def call_local_dual_gpu(prompt: str) -> Tuple[str, int, str, str, str]:
+def call_local_dual_gpu(
+    prompt: str,
+    priority: Priority = Priority.CHAT,
+    task: Optional[str] = None,
+    complexity: Optional["TaskComplexity"] = None
+) -> Tuple[str, int, str, str, str, dict]:
     """
-    Route request via dual-GPU orchestrator.
-    Returns: (response_text, latency_ms, complexity, gpu_info, model_used)
+    Route request via dual-GPU orchestrator (complexity is classified here
+    unless the caller already did).
+    Returns: (response_text, latency_ms, complexity, gpu_info, model_used, usage)
+    usage has Ollama's token counts plus gpu_id and timings for log_request.
+    Raises Overloaded when the selected GPU's queue is past its deadline.
     """
     start = time.time()
     
     # Classify task to determine complexity and routing
-    complexity = orchestrator.classify_task(prompt)
+    if complexity is None:
+        complexity = orchestrator.classify_task(prompt, task=task)
     gpu, model, reason = orchestrator.select_gpu_and_model(complexity)
+    # Recorded like asimple_generate(), so placement re-plans from this
+    # traffic and /history exports it
+    seq = orchestrator.routing_history.append(RoutingDecision(
+        task_type="simple_generation",
+        complexity=complexity,
+        selected_gpu=gpu.gpu_id,
+        model=model,
+        reason=reason,
+        timestamp=start
+    ))
     
     # Call the model
-    result = orchestrator.call_model(gpu, model, prompt)
+    result = orchestrator.call_model(gpu, model, prompt, priority=priority)
+    orchestrator.routing_history.set_latency(seq, time.time() - start)
+    if result.get("overloaded"):
+        raise result["overloaded"]
     
     latency_ms = int((time.time() - start) * 1000)
     
@@ -172,9 +247,16 @@ def call_local_dual_gpu(prompt: str) -> Tuple[str, int, str, str, str]:
         latency_ms,
         complexity_str,
         gpu_info,
-        model
+        model,
+        {
+            "prompt_eval_count": result.get("prompt_tokens"),
+            "eval_count": result.get("tokens"),
+            "gpu_id": gpu.gpu_id,
+            "timings": {**result.get("timings", {}), "queue_wait_ms": round(result.get("queue_wait", 0.0) * 1000, 2)}
+        }
     )
 
+@tracing.traced("route_to_cloud")
 def call_cloud(prompt: str) -> Tuple[str, int]:
     """
     Route request to GitHub Copilot cloud API.
@@ -191,34 +273,89 @@ def call_cloud(prompt: str) -> Tuple[str, int]:
     latency_ms = int((time.time() - start) * 1000)
     return answer, latency_ms
 
+# ============================================================================
+# RESPONSE CACHE
+# ============================================================================
+
+def cache_model_key(route_to_local: bool, complexity: Optional["TaskComplexity"] = None) -> str:
+    """
+    Model identity for the cache key.
+    
+    The dual-GPU path picks its model from the complexity tier, so the
+    tier (not the GPU that happened to serve it) identifies the answer.
+    """
+    if not route_to_local:
+        return "github-copilot"
+    if complexity is not None:
+        return f"dual-gpu:{complexity.name}"
+    return "qwen2.5-coder:7b-instruct-q8_0"
+
+def remember(key: Optional[str], answer: str, tokens_out: int, model: str, complexity: Optional[str] = None):
+    """Store a fresh answer in the response cache (errors and placeholders are never cached)."""
+    if key is not None and cacheable(answer):
+        response_cache.put(key, {
+            "text": answer,
+            "model": model,
+            "tokens_out": tokens_out,
+            "complexity": complexity
+        })
+
 # ============================================================================
 # MAIN REQUEST PROCESSOR
 # ============================================================================
 
-def process_request(prompt: str, task: str = "general") -> str:
+@tracing.traced("process_request")
+def process_request(prompt: str, task: str = "general", priority: Priority = Priority.CHAT) -> str:
     """
     Main request handler with dual-GPU smart routing and instrumentation.
     
     Flow:
-    1. Estimate input tokens
+    1. Count input tokens
     2. Decide local vs cloud
     3. If local + dual-GPU enabled → use orchestrator
     4. If local + dual-GPU disabled → use single model
     5. If cloud → route to GitHub Copilot
     6. Log metrics
+    
+    Repeated prompts short-circuit to the response cache (route "cache").
+    When the GPU queues are overloaded the request goes to the cloud
+    (BRIDGE_OVERLOAD=cloud) or is refused with an error (reject).
     """
-    tokens_in = estimate_tokens(prompt)
+    request_start = time.time()
+    tokens_in = count_tokens(prompt)
     
     # Step 1: Decide local vs cloud
-    route_to_local = should_route_local(prompt)
+    route_to_local = should_route_local(prompt, task)
+    # Classified once: the dual-GPU route and its cache key both use it
+    complexity = orchestrator.classify_task(prompt, task=task) if route_to_local and orchestrator else None
+    
+    # Serve repeats from the response cache
+    key, cache_state = None, None
+    if response_cache is not None:
+        start = time.time()
+        key = cache_key(prompt, cache_model_key(route_to_local, complexity))
+        cached = response_cache.get(key)
+        if cached is not None:
+            log_request(
+                route="cache",
+                tokens_in=tokens_in,
+                tokens_out=cached["tokens_out"],
+                latency_ms=int((time.time() - start) * 1000),
+                model=cached["model"],
+                task=task,
+                complexity=cached.get("complexity"),
+                cache="hit"
+            )
+            return cached["text"]
+        cache_state = "miss"
     
     if route_to_local:
         # LOCAL routing
         if orchestrator:
             # Use dual-GPU orchestrator
             try:
-                answer, latency_ms, complexity, gpu_info, model = call_local_dual_gpu(prompt)
-                tokens_out = estimate_tokens(answer)
+                answer, latency_ms, complexity, gpu_info, model, usage = call_local_dual_gpu(prompt, priority, task, complexity)
+                tokens_in, tokens_out = usage_tokens(prompt, answer, usage)
                 
                 log_request(
                     route="local",
@@ -228,20 +365,46 @@ def process_request(prompt: str, task: str = "general") -> str:
                     model=model,
                     task=task,
                     complexity=complexity,
-                    gpu_used=gpu_info
+                    gpu_used=gpu_info,
+                    cache=cache_state,
+                    prompt=prompt,
+                    gpu_id=usage["gpu_id"],
+                    timings=usage["timings"]
                 )
+                remember(key, answer, tokens_out, model, complexity)
                 
                 return answer
                 
+            except Overloaded as e:
+                print(f"⚠️  {e}", file=sys.stderr)
+                if overload_action() == "reject":
+                    log_request(
+                        route="rejected",
+                        tokens_in=tokens_in,
+                        tokens_out=0,
+                        latency_ms=int((time.time() - request_start) * 1000),
+                        model="dual-gpu",
+                        task=task,
+                        gpu_used=e.name,
+                        cache=cache_state,
+                        prompt=prompt,
+                        retry_after=e.retry_after
+                    )
+                    return f"[ERROR: local GPUs overloaded - retry in {e.retry_after}s]"
+                print(f"   Redirecting to cloud", file=sys.stderr)
+                # The cache key names the local tier; don't file a cloud answer under it
+                route_to_local, key = False, None
+                
             except Exception as e:
                 print(f"⚠️  Dual-GPU routing failed: {e}", file=sys.stderr)
                 print(f"   Falling back to single-model routing", file=sys.stderr)
                 # Fall through to single-model routing
-        
+    
+    if route_to_local:
         # Single-model fallback
         model = "qwen2.5-coder:7b-instruct-q8_0"
-        answer, latency_ms, gpu_info = call_local_single_model(prompt, model)
-        tokens_out = estimate_tokens(answer)
+        answer, latency_ms, gpu_info, result = call_local_single_model(prompt, model)
+        tokens_in, tokens_out = usage_tokens(prompt, answer, result)
         
         log_request(
             route="local",
@@ -250,26 +413,32 @@ def process_request(prompt: str, task: str = "general") -> str:
             latency_ms=latency_ms,
             model=model,
             task=task,
-            gpu_used=gpu_info
+            gpu_used=gpu_info,
+            cache=cache_state,
+            prompt=prompt,
+            timings=ollama_timings(result)
         )
+        remember(key, answer, tokens_out, model)
         
         return answer
     
-    else:
-        # CLOUD routing
-        answer, latency_ms = call_cloud(prompt)
-        tokens_out = estimate_tokens(answer)
-        
-        log_request(
-            route="cloud",
-            tokens_in=tokens_in,
-            tokens_out=tokens_out,
-            latency_ms=latency_ms,
-            model="github-copilot",
-            task=task
-        )
-        
-        return answer
+    # CLOUD routing (also taken when the local GPUs are overloaded)
+    answer, latency_ms = call_cloud(prompt)
+    tokens_out = count_tokens(answer)
+    
+    log_request(
+        route="cloud",
+        tokens_in=tokens_in,
+        tokens_out=tokens_out,
+        latency_ms=latency_ms,
+        model="github-copilot",
+        task=task,
+        cache=cache_state,
+        prompt=prompt
+    )
+    remember(key, answer, tokens_out, "github-copilot")
+    
+    return answer
 
 # ============================================================================
 # CLI INTERFACE
@@ -289,6 +458,8 @@ Examples:
     
     parser.add_argument("--prompt", type=str, help="Prompt to send to AI")
     parser.add_argument("--task", type=str, default="general", help="Task type (docstring, refactor, etc.)")
+    parser.add_argument("--priority", choices=[p.name.lower() for p in Priority], default="chat",
+                        help="Queue priority on the GPUs (default: chat)")
     parser.add_argument("--demo", action="store_true", help="Run demo with sample requests")
     
     args = parser.parse_args()
@@ -296,7 +467,7 @@ Examples:
     if args.demo:
         run_demo()
     elif args.prompt:
-        result = process_request(args.prompt, args.task)
+        result = process_request(args.prompt, args.task, Priority.parse(args.priority))
         print("\n" + "="*75)
         print("RESPONSE:")
         print("="*75)
@@ -4,49 +4,92 @@ Enhanced Copilot Bridge with Token-Savings Instrumentation
 
 Logs every request as JSON for Prometheus/Grafana monitoring.
 Tracks tokens saved, cost saved, latency, and routing decisions.
+With --stream, local answers are printed token by token and the log
+records time-to-first-token (ttft_ms) and inter-token latency (itl_ms)
+alongside the total latency. Local requests also log Ollama's own
+generation and prompt-eval throughput and model load time (gen_tps,
+prompt_tps, load_ms).
+
+Repeated prompts are answered from response_cache.py and logged with
+route "cache" (see BRIDGE_CACHE_* variables there). Near-duplicates can
+also be served by semantic_cache.py (BRIDGE_SEMANTIC_CACHE=true).
+
+With BRIDGE_METRICS_PORT set, the copilot_bridge_* metrics are kept
+in-process and served on that port, and the JSON log is sampled at
+BRIDGE_LOG_SAMPLE (see bridge_metrics.py).
+
+With BRIDGE_TRACE_SAMPLE set, sampled requests are traced (route
+decision, model call with Ollama's load / prompt eval / eval phases,
+cloud call) to an OTLP/JSON file and log entries carry the trace_id
+(see tracing.py).
 """
-import httpx
-import json
 import sys
 import time
 from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+import bridge_metrics
+import tracing
+from backend_clients import backends
+from keyword_classifier import classifier
+from learned_router import log_prompts_enabled, prompt_log_fields, router
+from response_cache import ResponseCache, cache_key, cacheable
+from semantic_cache import SemanticCache
+from streaming import TokenTimer, ollama_timings, parse_ndjson_line
+from token_counter import count_tokens, usage_tokens
 
 # Configuration
 OLLAMA_BASE = "http://192.168.1.138:11434"
 GITHUB_COPILOT_BASE = "https://api.githubcopilot.com"  # Placeholder
 CLOUD_COST_PER_1K_TOKENS = 0.02  # Baseline: $0.02/1K tokens
 
-# Keywords that trigger LOCAL routing
-LOCAL_KEYWORDS = [
-    "docstring", "comment", "explain", "document", "lint",
-    "type hint", "format", "summarize", "rename", "simple"
-]
+# Exact-match response cache (None when BRIDGE_CACHE=false)
+response_cache = ResponseCache.from_env()
 
-def estimate_tokens(text: str) -> int:
-    """
-    Rough token estimation: ~1.3 words per token for English.
-    This is conservative; actual count may vary.
-    """
-    return int(len(text.split()) * 1.3)
+# Near-duplicate cache over prompt embeddings (None unless BRIDGE_SEMANTIC_CACHE=true)
+semantic_cache = SemanticCache.from_env(OLLAMA_BASE)
 
-def route_decision(prompt: str) -> str:
+# Include prompt excerpts in logs (BRIDGE_LOG_PROMPTS=true)
+LOG_PROMPTS = log_prompts_enabled()
+
+# Embedded /metrics (BRIDGE_METRICS_PORT)
+bridge_metrics.serve_from_env()
+
+@tracing.traced("route_decision")
+def route_decision(prompt: str, task: Optional[str] = None) -> str:
     """
     Determine if request should go LOCAL or CLOUD.
     LOCAL: Simple, routine tasks (docstrings, comments, explanations)
     CLOUD: Complex, specialized tasks (refactoring, architecture, debugging)
+    
+    A trained learned_router (BRIDGE_ROUTER_MODEL) decides when it is
+    confident; otherwise LOCAL_KEYWORDS are matched by keyword_classifier.
     """
-    prompt_lower = prompt.lower()
-    if any(kw in prompt_lower for kw in LOCAL_KEYWORDS):
+    if router is not None:
+        tier = router.decide(prompt, task=task)
+        if tier is not None:
+            return "cloud" if tier == "CLOUD" else "local"
+    if "local" in classifier.classify(prompt):
         return "local"
     return "cloud"
 
-def log_request(route: str, tokens_in: int, tokens_out: int, latency_ms: int, model: str, task: str = "general"):
+def log_request(route: str, tokens_in: int, tokens_out: int, latency_ms: int, model: str, task: str = "general",
+                ttft_ms: Optional[int] = None, itl_ms: Optional[float] = None, cache: Optional[str] = None,
+                prompt: Optional[str] = None, timings: Optional[Dict[str, Any]] = None):
     """
     Emit structured JSON log for Prometheus ingestion.
-    Logs to stderr to keep stdout clean for actual responses.
+    Logs to stderr to keep stdout clean for actual responses; in embedded
+    metrics mode the entry is recorded in-process and the log is sampled.
+
+    ttft_ms / itl_ms are only present for streamed requests; cache is
+    "hit"/"semantic_hit"/"miss" when a response cache is enabled. Cache hits use
+    route "cache" and count as savings like local routes. timings holds
+    Ollama's gen_tps / prompt_tps / load_ms for local requests. With
+    BRIDGE_LOG_PROMPTS=true a prompt excerpt is included (training data
+    for learned_router.py).
     """
     cost_saved = 0.0
-    if route == "local":
+    if route in ("local", "cache"):
         # Calculate savings vs cloud baseline
         total_tokens = tokens_in + tokens_out
         cost_saved = (total_tokens / 1000) * CLOUD_COST_PER_1K_TOKENS
@@ -62,32 +105,88 @@ def log_request(route: str, tokens_in: int, tokens_out: int, latency_ms: int, mo
         "task": task,
         "cost_saved_usd": round(cost_saved, 4)
     }
+    if timings:
+        log_entry.update(timings)
+    trace_id = tracing.current_trace_id()
+    if trace_id:
+        log_entry["trace_id"] = trace_id
+        tracing.annotate(route=route, model=model, task=task, cache=cache,
+                         tokens_in=tokens_in, tokens_out=tokens_out)
+    if ttft_ms is not None:
+        log_entry["ttft_ms"] = ttft_ms
+        log_entry["itl_ms"] = itl_ms
+    if cache is not None:
+        log_entry["cache"] = cache
+    if prompt is not None and LOG_PROMPTS:
+        log_entry.update(prompt_log_fields(prompt))
     
-    # Write to stderr (can be piped to exporter or log aggregator)
-    print(json.dumps(log_entry), file=sys.stderr, flush=True)
+    # In-process metrics and/or sampled JSON to stderr (for exporter.py or a log aggregator)
+    bridge_metrics.emit(log_entry)
 
-def call_local(prompt: str, model: str = "qwen2.5-coder:7b-instruct-q8_0") -> tuple[str, int]:
+@tracing.traced("call_model")
+def call_local(prompt: str, model: str = "qwen2.5-coder:7b-instruct-q8_0") -> tuple[str, int, dict]:
     """
     Route request to local Ollama instance.
-    Returns: (response_text, latency_ms)
+    Returns: (response_text, latency_ms, ollama_result)
     """
     start = time.time()
     
-    with httpx.Client(timeout=60.0) as client:
-        response = client.post(
-            f"{OLLAMA_BASE}/api/generate",
-            json={
-                "model": model,
-                "prompt": prompt,
-                "stream": False
-            }
-        )
-        result = response.json()
-        answer = result.get("response", "")
+    response = backends.client(OLLAMA_BASE).post(
+        f"{OLLAMA_BASE}/api/generate",
+        json={
+            "model": model,
+            "prompt": prompt,
+            "stream": False
+        },
+        timeout=60.0
+    )
+    result = response.json()
+    answer = result.get("response", "")
+    tracing.record_generation(int(start * 1e9), time.time_ns(), result, model=model)
     
     latency_ms = int((time.time() - start) * 1000)
-    return answer, latency_ms
+    return answer, latency_ms, result
+
+@tracing.traced("call_model")
+def call_local_stream(
+    prompt: str,
+    model: str = "qwen2.5-coder:7b-instruct-q8_0",
+    on_token: Optional[Callable[[str], None]] = None
+) -> tuple[str, TokenTimer, dict]:
+    """
+    Stream a request from local Ollama, calling on_token(text) per chunk.
+    Returns: (full_response_text, timer with ttft/itl/total, final chunk)
+    """
+    timer = TokenTimer()
+    start_ns = time.time_ns()
+    parts = []
+    final = {}
+    
+    with backends.client(OLLAMA_BASE).stream(
+        "POST",
+        f"{OLLAMA_BASE}/api/generate",
+        json={
+            "model": model,
+            "prompt": prompt,
+            "stream": True
+        },
+        timeout=60.0
+    ) as response:
+        for line in response.iter_lines():
+            chunk = parse_ndjson_line(line)
+            if chunk and chunk.get("done"):
+                final = chunk
+            if not chunk or not chunk.get("response"):
+                continue
+            timer.tick()
+            parts.append(chunk["response"])
+            if on_token:
+                on_token(chunk["response"])
+    
+    tracing.record_generation(start_ns, time.time_ns(), final, model=model, ttft_ms=timer.ttft_ms)
+    return "".join(parts), timer, final
 
+@tracing.traced("route_to_cloud")
 def call_cloud(prompt: str, github_token: str = None) -> tuple[str, int]:
     """
     Route request to GitHub Copilot cloud API.
@@ -104,29 +203,79 @@ def call_cloud(prompt: str, github_token: str = None) -> tuple[str, int]:
     latency_ms = int((time.time() - start) * 1000)
     return answer, latency_ms
 
-def process_request(prompt: str, task: str = "general") -> str:
+@tracing.traced("process_request")
+def process_request(prompt: str, task: str = "general",
+                    on_token: Optional[Callable[[str], None]] = None) -> str:
     """
     Main request handler with instrumentation.
+
+    If on_token is given, local answers are streamed through it as they
+    are generated (cloud answers are delivered once, as a single chunk).
     """
-    # Estimate input tokens
-    tokens_in = estimate_tokens(prompt)
+    # Count input tokens
+    tokens_in = count_tokens(prompt)
     
     # Decide routing
-    route = route_decision(prompt)
+    route = route_decision(prompt, task)
+    model = "qwen2.5-coder:7b-instruct-q8_0" if route == "local" else "github-copilot-cloud"
+    
+    # Serve repeats from the response cache
+    key = None
+    if response_cache is not None:
+        start = time.time()
+        key = cache_key(prompt, model)
+        cached = response_cache.get(key)
+        if cached is not None:
+            if on_token:
+                on_token(cached["text"])
+            latency_ms = int((time.time() - start) * 1000)
+            log_request("cache", tokens_in, cached["tokens_out"], latency_ms, model, task, cache="hit")
+            return cached["text"]
+    
+    # Then near-duplicates (whitespace, renamed variables, rephrasing)
+    vector = None
+    if semantic_cache is not None:
+        start = time.time()
+        try:
+            cached, score, vector = semantic_cache.lookup(prompt, task, model)
+        except Exception as e:
+            print(f"⚠️  Semantic cache lookup failed: {e}", file=sys.stderr)
+            cached = None
+        if cached is not None:
+            if on_token:
+                on_token(cached["text"])
+            latency_ms = int((time.time() - start) * 1000)
+            log_request("cache", tokens_in, cached["tokens_out"], latency_ms, model, task, cache="semantic_hit")
+            return cached["text"]
     
     # Execute request
-    if route == "local":
-        model = "qwen2.5-coder:7b-instruct-q8_0"
-        answer, latency_ms = call_local(prompt, model)
+    ttft_ms = itl_ms = timings = None
+    result = None
+    if route == "local" and on_token:
+        answer, timer, result = call_local_stream(prompt, model, on_token)
+        latency_ms, ttft_ms, itl_ms = timer.total_ms, timer.ttft_ms, timer.itl_ms
+    elif route == "local":
+        answer, latency_ms, result = call_local(prompt, model)
     else:
-        model = "github-copilot-cloud"
         answer, latency_ms = call_cloud(prompt)
+        if on_token:
+            on_token(answer)
     
-    # Estimate output tokens
-    tokens_out = estimate_tokens(answer)
+    # Token counts and throughput (Ollama's own when it reports them)
+    tokens_in, tokens_out = usage_tokens(prompt, answer, result)
+    if result is not None:
+        timings = ollama_timings(result)
+    
+    entry = {"text": answer, "model": model, "route": route, "tokens_out": tokens_out}
+    if key is not None and cacheable(answer):
+        response_cache.put(key, entry)
+    if vector is not None and cacheable(answer):
+        semantic_cache.add(prompt, entry, task, model, vector)
     
     # Log for metrics
-    log_request(route, tokens_in, tokens_out, latency_ms, model, task)
+    caching = key is not None or semantic_cache is not None
+    log_request(route, tokens_in, tokens_out, latency_ms, model, task, ttft_ms, itl_ms,
+                cache="miss" if caching else None, prompt=prompt, timings=timings)
     
     return answer
 
@@ -137,9 +286,13 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Instrumented Copilot Bridge")
     parser.add_argument("--prompt", type=str, help="Prompt to send")
     parser.add_argument("--task", type=str, default="general", help="Task type (docstring, refactor, etc.)")
+    parser.add_argument("--stream", action="store_true", help="Print tokens as they are generated")
     args = parser.parse_args()
     
-    if args.prompt:
+    if args.prompt and args.stream:
+        process_request(args.prompt, args.task, on_token=lambda t: print(t, end="", flush=True))
+        print()
+    elif args.prompt:
         result = process_request(args.prompt, args.task)
         print(result)
     else:
@@ -5,13 +5,17 @@ Interactive Refactoring Quality Test Runner
 Tests local vs cloud models on realistic refactoring tasks.
 Shows token counts, asks for consent, measures quality.
 """
+import os
 import sys
 import time
 import json
 import argparse
 from datetime import datetime
 from pathlib import Path
-import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend_clients import backends
+from token_counter import count_tokens, usage_tokens
 
 # Import test samples
 from test_samples import ALL_SAMPLES, CORPUS_STATS, get_sample
@@ -22,10 +26,6 @@ LOCAL_MODEL = "qwen2.5-coder:7b-instruct-q8_0"
 RESULTS_DIR = Path(__file__).parent / "results"
 RESULTS_DIR.mkdir(exist_ok=True)
 
-def estimate_tokens(text: str) -> int:
-    """Estimate token count (~1.3 words per token)."""
-    return int(len(text.split()) * 1.3)
-
 def format_refactor_prompt(sample: dict) -> str:
     """Create refactoring prompt from sample."""
     goals_text = "\n".join(f"  {i+1}. {goal}" for i, goal in enumerate(sample["refactor_goals"]))
@@ -53,7 +53,7 @@ def show_test_info(sample: dict, model_name: str):
     prompt = format_refactor_prompt(sample)
     
     code_tokens = sample["tokens"]
-    prompt_tokens = estimate_tokens(prompt)
+    prompt_tokens = count_tokens(prompt)
     total_input = code_tokens + prompt_tokens
     expected_output = int(code_tokens * 1.2)  # Assume 20% longer with improvements
     total_tokens = total_input + expected_output
@@ -108,30 +108,33 @@ def run_local_refactor(sample: dict) -> dict:
     start_time = time.time()
     
     try:
-        with httpx.Client(timeout=120.0) as client:
-            response = client.post(
-                f"{OLLAMA_BASE}/api/generate",
-                json={
-                    "model": LOCAL_MODEL,
-                    "prompt": prompt,
-                    "stream": False
-                }
-            )
-            result = response.json()
-            refactored = result.get("response", "")
+        response = backends.client(OLLAMA_BASE).post(
+            f"{OLLAMA_BASE}/api/generate",
+            json={
+                "model": LOCAL_MODEL,
+                "prompt": prompt,
+                "stream": False
+            },
+            timeout=120.0
+        )
+        result = response.json()
+        refactored = result.get("response", "")
     except Exception as e:
         print(f"❌ Error: {e}")
         return None
     
     elapsed = time.time() - start_time
+    tokens_in, tokens_out = usage_tokens(prompt, refactored, result)
     
-    print(f"✅ Complete in {elapsed:.1f}s")
+    print(f"✅ Complete in {elapsed:.1f}s ({tokens_in} tokens in, {tokens_out} out)")
     print()
     
     return {
         "model": LOCAL_MODEL,
         "model_type": "local",
         "elapsed_seconds": elapsed,
+        "tokens_in": tokens_in,
+        "tokens_out": tokens_out,
         "refactored_code": refactored,
         "timestamp": datetime.now().isoformat()
     }
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Exact-match response cache for Copilot Bridge
+
+Developers resend identical prompts ("write a docstring for this
+function") across editor reloads. This cache sits in front of
+call_local / call_cloud and returns the previous answer instead of
+re-running inference.
+
+- Key: SHA-256 of normalized prompt + model + the generation options the
+  caller sets (temperature, max_tokens, ...). The bridges set none, so
+  they key on prompt + model; num_ctx is sized from the prompt and is
+  left out.
+- Stand-in answers (errors, the cloud placeholder) are never cached:
+  check cacheable() before put()
+- LRU eviction bounded by total bytes, plus per-entry TTL
+- Optional SQLite persistence so the cache survives restarts: memory
+  keeps the recently used entries, SQLite keeps the cache (same size
+  bound, LRU by last_access) and misses in memory are looked up there,
+  so opening a large file does not load it
+- Thread-safe; hit/miss/eviction counters for metrics
+
+Normalization is deliberately conservative: line endings and trailing
+whitespace are unified, but indentation is kept (it is significant in code).
+
+Environment variables:
+    BRIDGE_CACHE            - Enable the cache (default: true)
+    BRIDGE_CACHE_MAX_MB     - Size bound in MB, in memory and in SQLite (default: 64)
+    BRIDGE_CACHE_TTL        - Entry lifetime in seconds (default: 86400)
+    BRIDGE_CACHE_PATH       - SQLite file for persistence (default: memory only)
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# Hits update last_access in SQLite in one batch at most this often (seconds)
+TOUCH_INTERVAL = 5.0
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Unify line endings, drop trailing whitespace and surrounding blank lines."""
+    lines = prompt.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip("\n")
+
+
+# Answers that stand in for a real one
+UNCACHEABLE_PREFIXES = ("ERROR:", "[ERROR", "[CLOUD RESPONSE PLACEHOLDER]")
+
+
+def cacheable(answer: str) -> bool:
+    """Whether an answer may be cached (non-empty, not an error or placeholder)."""
+    return bool(answer) and not answer.lstrip().startswith(UNCACHEABLE_PREFIXES)
+
+
+def cache_key(prompt: str, model: str, options: Optional[Dict[str, Any]] = None) -> str:
+    """Stable hash of (normalized prompt, model, generation options)."""
+    material = json.dumps(
+        {"prompt": normalize_prompt(prompt), "model": model, "options": options or {}},
+        sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Byte-bounded LRU + TTL cache of generated responses.
+
+    Values are JSON-serializable dicts, typically
+    {"text": ..., "model": ..., "route": ..., "tokens_out": ...}.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: float = 86400.0,
+        path: Optional[str] = None
+    ):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self._entries: "OrderedDict[str, tuple[Dict[str, Any], float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._db_bytes = 0  # size of the values in SQLite
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._touched: Dict[str, float] = {}  # key -> last hit not yet written to SQLite
+        self._touch_flushed = time.time()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if path:
+            self._open_db(path)
+
+    @classmethod
+    def from_env(cls) -> Optional["ResponseCache"]:
+        """Build the cache from BRIDGE_CACHE_* variables (None if disabled)."""
+        if os.getenv("BRIDGE_CACHE", "true").lower() not in ("true", "1", "yes"):
+            return None
+        return cls(
+            max_bytes=int(float(os.getenv("BRIDGE_CACHE_MAX_MB", "64")) * 1024 * 1024),
+            ttl_seconds=float(os.getenv("BRIDGE_CACHE_TTL", "86400")),
+            path=os.getenv("BRIDGE_CACHE_PATH") or None
+        )
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _open_db(self, path: str):
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " expires REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+        self._db.execute("DELETE FROM responses WHERE expires <= ?", (time.time(),))
+        self._db_bytes = self._db.execute("SELECT COALESCE(SUM(LENGTH(value)), 0) FROM responses").fetchone()[0]
+        self._evict_db()
+
+    def _stored_size(self, key: str) -> int:
+        row = self._db.execute("SELECT LENGTH(value) FROM responses WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def _persist(self, key: str, raw: str, expires: float):
+        if self._db is not None:
+            old = self._stored_size(key)
+            self._touched.pop(key, None)
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires, last_access) VALUES (?, ?, ?, ?)",
+                (key, raw, expires, time.time())
+            )
+            self._db_bytes += len(raw) - old
+
+    def _unpersist(self, key: str):
+        if self._db is not None:
+            self._db_bytes -= self._stored_size(key)
+            self._touched.pop(key, None)
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def _load(self, key: str):
+        """Point lookup in SQLite for an entry not in memory; kept in memory if found."""
+        if self._db is None:
+            return None
+        row = self._db.execute("SELECT value, expires FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        raw, expires = row
+        self._store(key, json.loads(raw), expires, len(raw))
+        self._evict()
+        return self._entries.get(key)
+
+    def _touch(self, key: str, now: float):
+        """Record a hit's access time; written to SQLite in batches (TOUCH_INTERVAL)."""
+        if self._db is None:
+            return
+        self._touched[key] = now
+        if now - self._touch_flushed >= TOUCH_INTERVAL:
+            self._flush_touches()
+
+    def _flush_touches(self):
+        if self._db is not None and self._touched:
+            self._db.executemany(
+                "UPDATE responses SET last_access = ? WHERE key = ?",
+                [(at, key) for key, at in self._touched.items()]
+            )
+        self._touched.clear()
+        self._touch_flushed = time.time()
+
+    # ------------------------------------------------------------------
+    # Core operations
+    # ------------------------------------------------------------------
+
+    def _store(self, key: str, value: Dict[str, Any], expires: float, size: int):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[2]
+        self._entries[key] = (value, expires, size)
+        self._bytes += size
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._entries:
+            _, (_, _, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            if self._db is None:
+                self.evictions += 1
+        # With SQLite an entry dropped from memory is still cached on disk
+        self._evict_db()
+
+    def _evict_db(self):
+        """Delete least-recently-used rows until SQLite is within max_bytes."""
+        if self._db is None or self._db_bytes <= self.max_bytes:
+            return
+        self._flush_touches()
+        victims = []
+        cursor = self._db.execute("SELECT key, LENGTH(value) FROM responses ORDER BY last_access")
+        for key, size in cursor:
+            if self._db_bytes <= self.max_bytes:
+                break
+            victims.append((key,))
+            self._db_bytes -= size
+        cursor.close()
+        self._db.executemany("DELETE FROM responses WHERE key = ?", victims)
+        for (key,) in victims:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[2]
+        self.evictions += len(victims)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached value for key, or None (counts a hit or miss)."""
+        with self._lock:
+            entry = self._entries.get(key) or self._load(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires, size = entry
+            now = time.time()
+            if expires <= now:
+                del self._entries[key]
+                self._bytes -= size
+                self._unpersist(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._touch(key, now)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: Dict[str, Any], ttl_seconds: Optional[float] = None):
+        """Insert or replace an entry; evicts least-recently-used entries over max_bytes."""
+        raw = json.dumps(value)
+        size = len(raw)
+        if size > self.max_bytes:
+            return
+        expires = time.time() + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        with self._lock:
+            self._store(key, value, expires, size)
+            self._persist(key, raw, expires)
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._db_bytes = 0
+            self._touched.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+
+    def close(self):
+        if self._db is not None:
+            with self._lock:
+                self._flush_touches()
+            self._db.close()
+            self._db = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "db_bytes": self._db_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
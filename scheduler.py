@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Bounded-concurrency request scheduler for Copilot Bridge
+
+One GPUScheduler per Ollama endpoint caps how many generations run on it
+at once. Extra requests wait in a priority queue (interactive completions
+before chat before batch jobs, FIFO within a priority) instead of piling
+onto the GPU until they time out.
+
+Admission control: on arrival the scheduler projects the wait from the
+queue ahead of the request and the recent slot hold time. If that exceeds
+the request's deadline it is rejected immediately with Overloaded, so the
+caller can answer 429 or send the request to the cloud instead. A request
+whose deadline passes while queued is rejected the same way.
+
+Works from threads (acquire / slot) and from asyncio (aacquire / aslot).
+
+Environment variables:
+    BRIDGE_GPU_SLOTS            - Concurrent generations per endpoint (default: 2)
+    BRIDGE_DEADLINE_INTERACTIVE - Max queue wait for interactive requests, s (default: 5)
+    BRIDGE_DEADLINE_CHAT        - Max queue wait for chat requests, s (default: 30)
+    BRIDGE_DEADLINE_BATCH       - Max queue wait for batch requests, s (default: 0 = no limit)
+    BRIDGE_OVERLOAD             - What callers do on rejection: cloud | reject (default: cloud)
+"""
+import asyncio
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from enum import IntEnum
+from typing import Dict, Optional
+
+
+class Priority(IntEnum):
+    """Lower value is served first."""
+    INTERACTIVE = 0  # editor completions, a person is waiting
+    CHAT = 1
+    BATCH = 2        # refactor test runs, bulk jobs
+
+    @classmethod
+    def parse(cls, value: Optional[str], default: "Priority" = None) -> "Priority":
+        if value:
+            try:
+                return cls[value.strip().upper()]
+            except KeyError:
+                pass
+        return cls.CHAT if default is None else default
+
+
+def default_deadlines() -> Dict[Priority, Optional[float]]:
+    """Per-priority max queue wait from BRIDGE_DEADLINE_* (None = wait as long as needed)."""
+    defaults = {Priority.INTERACTIVE: "5", Priority.CHAT: "30", Priority.BATCH: "0"}
+    deadlines = {}
+    for priority, default in defaults.items():
+        value = float(os.getenv(f"BRIDGE_DEADLINE_{priority.name}", default))
+        deadlines[priority] = value if value > 0 else None
+    return deadlines
+
+
+def overload_action() -> str:
+    return os.getenv("BRIDGE_OVERLOAD", "cloud").lower()
+
+
+class Overloaded(Exception):
+    """Raised when a request would wait (or has waited) past its deadline."""
+
+    def __init__(self, name: str, priority: Priority, projected_wait: float, deadline: float):
+        self.name = name
+        self.priority = priority
+        self.projected_wait = projected_wait
+        self.deadline = deadline
+        super().__init__(
+            f"{name} overloaded: projected wait {projected_wait:.1f}s > "
+            f"{deadline:.1f}s deadline ({priority.name.lower()})"
+        )
+
+    @property
+    def retry_after(self) -> int:
+        """Seconds a client should wait before retrying (for Retry-After)."""
+        return max(1, int(self.projected_wait - self.deadline + 0.999))
+
+
+class _Waiter:
+    """A queued request; granted from release() on any thread."""
+
+    __slots__ = ("event", "future", "loop", "granted", "cancelled")
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.loop = loop
+        self.event = None if loop else threading.Event()
+        self.future = loop.create_future() if loop else None
+        self.granted = False
+        self.cancelled = False
+
+    def grant(self):
+        self.granted = True
+        if self.loop is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self):
+        if not self.future.done():
+            self.future.set_result(True)
+
+
+class GPUScheduler:
+    """
+    Priority-queued slots for one endpoint.
+
+    Args:
+        name: label for errors and metrics (e.g. "gpu0")
+        slots: concurrent generations allowed
+        deadlines: per-priority max wait (None entries never reject)
+        service_prior: assumed slot hold time (s) before any is measured
+    """
+
+    def __init__(
+        self,
+        name: str,
+        slots: Optional[int] = None,
+        deadlines: Optional[Dict[Priority, Optional[float]]] = None,
+        service_prior: float = 2.0
+    ):
+        self.name = name
+        self.slots = slots or int(os.getenv("BRIDGE_GPU_SLOTS", "2"))
+        self.deadlines = default_deadlines() if deadlines is None else deadlines
+        self.service_s = service_prior
+
+        self._lock = threading.Lock()
+        self._active = 0
+        self._heap: list = []
+        self._seq = itertools.count()
+        self._queued = {p: 0 for p in Priority}
+
+        self.admitted = {p: 0 for p in Priority}
+        self.rejected = {p: 0 for p in Priority}
+
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+
+    def depth(self, priority: Optional[Priority] = None) -> int:
+        """Queued (not yet running) requests, optionally for one priority."""
+        if priority is None:
+            return sum(self._queued.values())
+        return self._queued[priority]
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    def projected_wait(self, priority: Priority) -> float:
+        """Expected queue wait for a new request at this priority."""
+        ahead = sum(n for p, n in self._queued.items() if p <= priority)
+        if self._active < self.slots and ahead == 0:
+            return 0.0
+        return (ahead + 1) / self.slots * self.service_s
+
+    # ------------------------------------------------------------------
+    # Acquire / release
+    # ------------------------------------------------------------------
+
+    def _admit(self, priority: Priority, deadline: Optional[float], loop=None) -> Optional[_Waiter]:
+        """Take a slot (returns None) or enqueue (returns the waiter); raises Overloaded."""
+        with self._lock:
+            if self._active < self.slots and not self._heap:
+                self._active += 1
+                self.admitted[priority] += 1
+                return None
+            projected = self.projected_wait(priority)
+            if deadline is not None and projected > deadline:
+                self.rejected[priority] += 1
+                raise Overloaded(self.name, priority, projected, deadline)
+            waiter = _Waiter(loop)
+            heapq.heappush(self._heap, (priority, next(self._seq), waiter))
+            self._queued[priority] += 1
+            return waiter
+
+    def _abandon(self, waiter: _Waiter, priority: Priority, waited: float, deadline: float):
+        """Deadline passed while queued: drop out unless a slot arrived meanwhile."""
+        with self._lock:
+            if waiter.granted:
+                return False
+            waiter.cancelled = True
+            self._queued[priority] -= 1
+            self.rejected[priority] += 1
+        raise Overloaded(self.name, priority, waited, deadline)
+
+    def release(self, held_s: Optional[float] = None):
+        """Free a slot, handing it straight to the next queued request if any."""
+        with self._lock:
+            if held_s is not None:
+                self.service_s = 0.8 * self.service_s + 0.2 * held_s
+            while self._heap:
+                priority, _, waiter = heapq.heappop(self._heap)
+                if waiter.cancelled:
+                    continue
+                self._queued[priority] -= 1
+                self.admitted[priority] += 1
+                waiter.grant()
+                return
+            self._active -= 1
+
+    def acquire(self, priority: Priority = Priority.CHAT, deadline: Optional[float] = -1.0) -> float:
+        """
+        Block until a slot is free; returns seconds spent queued.
+
+        deadline defaults to the priority's configured deadline; pass None
+        to wait indefinitely.
+        """
+        if deadline == -1.0:
+            deadline = self.deadlines.get(priority)
+        start = time.monotonic()
+        waiter = self._admit(priority, deadline)
+        if waiter is not None and not waiter.event.wait(deadline):
+            # Raises unless the slot was granted just as the deadline passed
+            self._abandon(waiter, priority, time.monotonic() - start, deadline)
+        return time.monotonic() - start
+
+    async def aacquire(self, priority: Priority = Priority.CHAT, deadline: Optional[float] = -1.0) -> float:
+        """asyncio version of acquire()."""
+        if deadline == -1.0:
+            deadline = self.deadlines.get(priority)
+        start = time.monotonic()
+        waiter = self._admit(priority, deadline, asyncio.get_running_loop())
+        if waiter is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(waiter.future), deadline)
+            except asyncio.TimeoutError:
+                self._abandon(waiter, priority, time.monotonic() - start, deadline)
+            except asyncio.CancelledError:
+                # Caller went away: give the slot back if it was already granted
+                with self._lock:
+                    granted = waiter.granted
+                    if not granted:
+                        waiter.cancelled = True
+                        self._queued[priority] -= 1
+                if granted:
+                    self.release()
+                raise
+        return time.monotonic() - start
+
+    @contextmanager
+    def slot(self, priority: Priority = Priority.CHAT, deadline: Optional[float] = -1.0):
+        """`with scheduler.slot(priority) as waited:` runs the body holding a slot."""
+        waited = self.acquire(priority, deadline)
+        start = time.monotonic()
+        try:
+            yield waited
+        finally:
+            self.release(time.monotonic() - start)
+
+    @asynccontextmanager
+    async def aslot(self, priority: Priority = Priority.CHAT, deadline: Optional[float] = -1.0):
+        waited = await self.aacquire(priority, deadline)
+        start = time.monotonic()
+        try:
+            yield waited
+        finally:
+            self.release(time.monotonic() - start)
+
+    def stats(self) -> Dict:
+        return {
+            "name": self.name,
+            "slots": self.slots,
+            "active": self._active,
+            "queued": {p.name.lower(): n for p, n in self._queued.items()},
+            "admitted": {p.name.lower(): n for p, n in self.admitted.items()},
+            "rejected": {p.name.lower(): n for p, n in self.rejected.items()},
+            "service_s": round(self.service_s, 3),
+        }
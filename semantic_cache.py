@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Semantic (near-duplicate) response cache for Copilot Bridge
+
+Catches prompts the exact-match cache misses because they differ only by
+whitespace, variable names or phrasing. Prompts are embedded through
+Ollama's /api/embeddings endpoint and compared by cosine similarity
+against a fixed-size in-memory NumPy index.
+
+- Bounded memory: capacity x dim float32 matrix, allocated once
+- LRU eviction when full
+- Entries are partitioned by model + task type, each task type with its
+  own similarity threshold (a reused docstring is fine at 0.92; a reused
+  refactor must be near-identical)
+- Thread-safe
+
+Requires NumPy; from_env() returns None (cache disabled) without it.
+
+Environment variables:
+    BRIDGE_SEMANTIC_CACHE       - Enable the semantic cache (default: false)
+    BRIDGE_EMBED_MODEL          - Ollama embedding model (default: nomic-embed-text)
+    BRIDGE_SEMANTIC_CAPACITY    - Max entries (default: 10000)
+    BRIDGE_SEMANTIC_THRESHOLD   - Default cosine threshold (default: 0.95)
+    BRIDGE_SEMANTIC_THRESHOLDS  - Per-task thresholds merged over the defaults,
+                                  e.g. docstring=0.9,refactor=0.99
+                                  (default: docstring/comment 0.92, explain/summarize 0.94,
+                                  refactor/implement 0.985)
+"""
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Per-task similarity thresholds; unlisted tasks use the default threshold
+DEFAULT_TASK_THRESHOLDS = {
+    "docstring": 0.92,
+    "comment": 0.92,
+    "explain": 0.94,
+    "summarize": 0.94,
+    "refactor": 0.985,
+    "implement": 0.985,
+}
+
+
+def ollama_embedder(base_url: str, model: str = "nomic-embed-text") -> Callable[[str], "np.ndarray"]:
+    """Embedding function backed by Ollama's /api/embeddings endpoint."""
+    from backend_clients import backends
+
+    def embed(text: str) -> "np.ndarray":
+        response = backends.client(base_url).post(
+            f"{base_url}/api/embeddings",
+            json={"model": model, "prompt": text},
+            timeout=30.0
+        )
+        response.raise_for_status()
+        return np.asarray(response.json()["embedding"], dtype=np.float32)
+
+    return embed
+
+
+def parse_thresholds(spec: str) -> Dict[str, float]:
+    """task=threshold pairs from a BRIDGE_SEMANTIC_THRESHOLDS value."""
+    thresholds = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        task, _, value = item.partition("=")
+        if not task.strip() or not value.strip():
+            raise ValueError(f"expected task=threshold, got {item.strip()!r}")
+        thresholds[task.strip().lower()] = float(value)
+    return thresholds
+
+
+class SemanticCache:
+    """
+    Fixed-capacity cosine-similarity cache.
+
+    Args:
+        embed_fn: text -> 1-D vector
+        capacity: maximum number of entries
+        threshold: default minimum cosine similarity for a hit
+        task_thresholds: per-task overrides (merged over DEFAULT_TASK_THRESHOLDS)
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[str], "np.ndarray"],
+        capacity: int = 10000,
+        threshold: float = 0.95,
+        task_thresholds: Optional[Dict[str, float]] = None
+    ):
+        if not NUMPY_AVAILABLE:
+            raise ImportError("SemanticCache requires numpy")
+        self.embed_fn = embed_fn
+        self.capacity = capacity
+        self.threshold = threshold
+        self.task_thresholds = {**DEFAULT_TASK_THRESHOLDS, **(task_thresholds or {})}
+
+        self._vectors: Optional[np.ndarray] = None  # allocated on first insert
+        self._partition = np.full(capacity, -1, dtype=np.int32)
+        self._last_used = np.zeros(capacity, dtype=np.float64)
+        self._values: list = [None] * capacity
+        self._partition_ids: Dict[str, int] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls, ollama_base: str) -> Optional["SemanticCache"]:
+        """Build from BRIDGE_SEMANTIC_* variables (None if disabled or NumPy missing)."""
+        if os.getenv("BRIDGE_SEMANTIC_CACHE", "false").lower() not in ("true", "1", "yes"):
+            return None
+        if not NUMPY_AVAILABLE:
+            print("⚠️  numpy not installed, semantic cache disabled", file=sys.stderr)
+            return None
+        return cls(
+            embed_fn=ollama_embedder(ollama_base, os.getenv("BRIDGE_EMBED_MODEL", "nomic-embed-text")),
+            capacity=int(os.getenv("BRIDGE_SEMANTIC_CAPACITY", "10000")),
+            threshold=float(os.getenv("BRIDGE_SEMANTIC_THRESHOLD", "0.95")),
+            task_thresholds=parse_thresholds(os.getenv("BRIDGE_SEMANTIC_THRESHOLDS", ""))
+        )
+
+    def threshold_for(self, task: str) -> float:
+        return self.task_thresholds.get(task, self.threshold)
+
+    def embed(self, text: str) -> "np.ndarray":
+        """Embed and L2-normalize (so a dot product is the cosine similarity)."""
+        vector = np.asarray(self.embed_fn(text), dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+    def lookup(
+        self,
+        prompt: str,
+        task: str = "general",
+        model: str = "",
+        vector: Optional["np.ndarray"] = None
+    ) -> Tuple[Optional[Dict[str, Any]], float, "np.ndarray"]:
+        """
+        Find the closest cached prompt for the same model and task.
+
+        Returns:
+            (value or None, best similarity, query vector for a later add())
+        """
+        if vector is None:
+            vector = self.embed(prompt)
+        with self._lock:
+            pid = self._partition_ids.get(f"{model}|{task}")
+            if pid is None or self._size == 0:
+                self.misses += 1
+                return None, 0.0, vector
+            n = self._size
+            scores = self._vectors[:n] @ vector
+            scores[self._partition[:n] != pid] = -1.0
+            best = int(np.argmax(scores))
+            score = float(scores[best])
+            if score < self.threshold_for(task):
+                self.misses += 1
+                return None, score, vector
+            self._last_used[best] = time.monotonic()
+            self.hits += 1
+            return self._values[best], score, vector
+
+    def add(
+        self,
+        prompt: str,
+        value: Dict[str, Any],
+        task: str = "general",
+        model: str = "",
+        vector: Optional["np.ndarray"] = None
+    ):
+        """Insert an entry, evicting the least-recently-used one when full."""
+        if vector is None:
+            vector = self.embed(prompt)
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.capacity, vector.shape[0]), dtype=np.float32)
+            if self._size < self.capacity:
+                slot = self._size
+                self._size += 1
+            else:
+                slot = int(np.argmin(self._last_used))
+                self.evictions += 1
+            key = f"{model}|{task}"
+            pid = self._partition_ids.setdefault(key, len(self._partition_ids))
+            self._vectors[slot] = vector
+            self._partition[slot] = pid
+            self._last_used[slot] = time.monotonic()
+            self._values[slot] = value
+
+    def __len__(self) -> int:
+        return self._size
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the index arrays (values excluded)."""
+        vectors = self._vectors.nbytes if self._vectors is not None else 0
+        return vectors + self._partition.nbytes + self._last_used.nbytes
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": self._size,
+            "capacity": self.capacity,
+            "index_bytes": self.memory_bytes(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Streaming helpers for Copilot Bridge
+
+Ollama streams one JSON object per line:
+    {"model": "...", "response": "def", "done": false}
+    ...
+    {"model": "...", "response": "", "done": true, "eval_count": 42, ...}
+
+Editors expect OpenAI-style Server-Sent Events instead:
+    data: {"object": "chat.completion.chunk", "choices": [{"delta": {"content": "def"}}]}
+    data: [DONE]
+
+This module converts between the two and times the stream (time to first
+token and inter-token latency are tracked separately from total latency).
+The final object's own timings (eval/prompt-eval throughput and model
+load time) are read by ollama_timings().
+"""
+import json
+import time
+from typing import Any, Dict, Optional
+
+SSE_DONE = "data: [DONE]\n\n"
+
+SSE_HEADERS = {
+    "Content-Type": "text/event-stream",
+    "Cache-Control": "no-cache",
+}
+
+
+def sse_delta(content: str, model: str = "", finish_reason: Optional[str] = None) -> str:
+    """Format one OpenAI chat.completion.chunk as an SSE event."""
+    chunk = {
+        "object": "chat.completion.chunk",
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "delta": {"content": content} if content else {},
+            "finish_reason": finish_reason
+        }]
+    }
+    return f"data: {json.dumps(chunk)}\n\n"
+
+
+def parse_ndjson_line(line: str) -> Optional[Dict[str, Any]]:
+    """Decode one Ollama stream line; returns None for blank/invalid lines."""
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError:
+        return None
+
+
+def sse_content(events: str) -> str:
+    """The delta text carried by a run of OpenAI SSE events (what the client was sent)."""
+    parts = []
+    for line in events.splitlines():
+        if not line.startswith("data:") or line == SSE_DONE.strip():
+            continue
+        try:
+            choices = json.loads(line[5:]).get("choices") or [{}]
+        except (json.JSONDecodeError, AttributeError):
+            continue
+        parts.append((choices[0].get("delta") or {}).get("content") or "")
+    return "".join(parts)
+
+
+def ollama_timings(result: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Throughput and load time from the durations (nanoseconds) Ollama reports
+    with a finished generation:
+
+        gen_tps    - eval_count / eval_duration
+        prompt_tps - prompt_eval_count / prompt_eval_duration
+        load_ms    - load_duration
+
+    Fields Ollama omitted are left out (prompt_eval_* is missing when the
+    whole prompt came from its KV cache).
+    """
+    timings = {}
+    if result.get("eval_count") and result.get("eval_duration"):
+        timings["gen_tps"] = round(result["eval_count"] / result["eval_duration"] * 1e9, 2)
+    if result.get("prompt_eval_count") and result.get("prompt_eval_duration"):
+        timings["prompt_tps"] = round(result["prompt_eval_count"] / result["prompt_eval_duration"] * 1e9, 2)
+    if result.get("load_duration") is not None:
+        timings["load_ms"] = round(result["load_duration"] / 1e6, 2)
+    return timings
+
+
+class TokenTimer:
+    """
+    Latency breakdown for one streamed generation.
+
+    Call tick() each time a non-empty chunk arrives.
+    """
+
+    __slots__ = ("start", "first", "last", "chunks", "gap_total")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.first: Optional[float] = None
+        self.last: Optional[float] = None
+        self.chunks = 0
+        self.gap_total = 0.0
+
+    def tick(self):
+        now = time.perf_counter()
+        if self.first is None:
+            self.first = now
+        else:
+            self.gap_total += now - self.last
+        self.last = now
+        self.chunks += 1
+
+    @property
+    def ttft_ms(self) -> Optional[int]:
+        """Time to first token (None if nothing was streamed)."""
+        if self.first is None:
+            return None
+        return int((self.first - self.start) * 1000)
+
+    @property
+    def itl_ms(self) -> Optional[float]:
+        """Mean inter-token latency (None with fewer than two chunks)."""
+        if self.chunks < 2:
+            return None
+        return round(self.gap_total / (self.chunks - 1) * 1000, 2)
+
+    @property
+    def total_ms(self) -> int:
+        end = self.last if self.last is not None else time.perf_counter()
+        return int((end - self.start) * 1000)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"ttft_ms": self.ttft_ms, "itl_ms": self.itl_ms, "chunks": self.chunks}
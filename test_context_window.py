@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Quick test of adaptive num_ctx sizing.
+
+Checks bucket selection (smallest bucket that holds the request, within
+the cap), prompt/output truncation counting, the fixed mode, sticky
+buckets per loaded model, and what observe() learns from Ollama's
+counts. No Ollama needed.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from context_window import ContextSizer
+from token_counter import count_tokens
+
+MODEL = "qwen2.5-coder:7b-instruct-q8_0"
+
+
+def check(name, ok):
+    print(f"  {'✓' if ok else '✗'} {name}")
+    return ok
+
+
+def header(title):
+    print("\n" + "═"*78)
+    print(title)
+    print("═"*78)
+
+
+def prompt_of(tokens):
+    """A prompt of about `tokens` local tokens."""
+    return "word " * tokens
+
+
+def test_buckets():
+    header("TEST 1: Bucket selection")
+    sizer = ContextSizer()
+    short = sizer.size(prompt_of(50), MODEL)
+    long_answer = sizer.size(prompt_of(50), MODEL, max_tokens=6000)
+    long_prompt = sizer.size(prompt_of(10000), MODEL)
+    return all([
+        check("smallest bucket that holds the tokens", sizer.bucket(2048) == 2048 and sizer.bucket(2049) == 4096),
+        check("largest bucket when nothing holds them", sizer.bucket(100000) == 32768),
+        check("cap bounds the choice", sizer.bucket(20000, cap=8192) == 8192),
+        check("cap below every bucket gives the smallest", sizer.bucket(100, cap=1000) == 2048),
+        check(f"short prompt, default answer reserve: {short.num_ctx}", short.num_ctx == 2048 and not short.truncated),
+        check(f"short prompt, max_tokens=6000: {long_answer.num_ctx}", long_answer.num_ctx == 8192),
+        check(f"~10K token prompt: {long_prompt.num_ctx}", long_prompt.num_ctx == 16384 and not long_prompt.truncated),
+        check("requests counted per bucket", sizer.stats()["by_num_ctx"] == {"2048": 1, "8192": 1, "16384": 1}),
+    ])
+
+
+def test_truncation():
+    header("TEST 2: Truncation counting")
+    sizer = ContextSizer()
+    prompt_cut = sizer.size(prompt_of(10000), MODEL, cap=4096)
+    output_cut = sizer.size(prompt_of(3000), MODEL, max_tokens=2000, cap=4096)
+    fits = sizer.size(prompt_of(3000), MODEL, max_tokens=500, cap=4096)
+    fixed = ContextSizer(fixed=4096)
+    fixed_cut = fixed.size(prompt_of(6000), MODEL)
+    fixed_small = fixed.size(prompt_of(10), MODEL)
+    return all([
+        check("prompt over the cap: sent at the cap, counted as prompt",
+              prompt_cut.num_ctx == 4096 and prompt_cut.truncated == "prompt"),
+        check("prompt fits but the answer may not: counted as output",
+              output_cut.num_ctx == 4096 and output_cut.truncated == "output"),
+        check("request that fits is not counted", fits.truncated is None),
+        check("counts", sizer.stats()["truncations"] == {"prompt": 1, "output": 1}),
+        check("fixed mode always sends its size", fixed_cut.num_ctx == fixed_small.num_ctx == 4096),
+        check("fixed mode still counts truncations", fixed.stats()["truncations"] == {"prompt": 1}),
+    ])
+
+
+def test_sticky():
+    header("TEST 3: Sticky buckets per loaded model")
+    sizer = ContextSizer(sticky=1, shrink_after=3)
+    runner = (0, MODEL)
+    big = sizer.size(prompt_of(10000), MODEL, runner=runner).num_ctx
+    small = [sizer.size(prompt_of(10), MODEL, runner=runner).num_ctx for _ in range(3)]
+    near = ContextSizer(sticky=1, shrink_after=3)
+    near.size(prompt_of(2000), MODEL, runner=runner)
+    near_sizes = [near.size(prompt_of(10), MODEL, runner=runner).num_ctx for _ in range(5)]
+    return all([
+        check(f"loaded at {big}", big == 16384),
+        check(f"far smaller requests keep it until shrink_after: {small}", small == [16384, 16384, 2048]),
+        check("one num_ctx switch counted", sizer.stats()["num_ctx_switches"] == 1),
+        check(f"one bucket smaller never shrinks: {near_sizes}", near_sizes == [4096] * 5),
+        check("other runners unaffected", sizer.size(prompt_of(10), MODEL, runner=(1, MODEL)).num_ctx == 2048),
+    ])
+
+
+def test_observe():
+    header("TEST 4: Ollama's counts")
+    sizer = ContextSizer()
+    prompt = prompt_of(1000)
+    local = count_tokens(prompt)
+    size = sizer.size(prompt, MODEL)
+    sizer.observe(size, MODEL, prompt, {"prompt_eval_count": int(local * 1.5), "eval_count": 100})
+    scaled = sizer.prompt_tokens(prompt, MODEL)
+    full = sizer.size(prompt, MODEL, max_tokens=100)
+    observed = sizer.observe(full, MODEL, prompt, {"prompt_eval_count": full.num_ctx - 10, "eval_count": 10})
+    cut = sizer.size(prompt_of(10000), MODEL, cap=4096)
+    before = sizer.stats()["token_ratio"][MODEL]
+    sizer.observe(cut, MODEL, prompt_of(10000), {"prompt_eval_count": 4000, "eval_count": 96})
+    return all([
+        check(f"token ratio learnt: {local} local -> {scaled} model tokens", abs(scaled - local * 1.5) <= 1),
+        check("context filled although sized to fit: observed", observed == "observed"),
+        check("counted", sizer.stats()["truncations"].get("observed") == 1),
+        check("truncated requests do not calibrate", sizer.stats()["token_ratio"][MODEL] == before),
+        check("fill ratio tracked", 0 < sizer.stats()["fill"] <= 1),
+    ])
+
+
+if __name__ == "__main__":
+    print("╔" + "═"*76 + "╗")
+    print("║" + " "*25 + "CONTEXT WINDOW TEST SUITE" + " "*26 + "║")
+    print("╚" + "═"*76 + "╝")
+
+    results = [
+        ("Buckets", test_buckets()),
+        ("Truncation", test_truncation()),
+        ("Sticky buckets", test_sticky()),
+        ("Observe", test_observe()),
+    ]
+
+    print("\n" + "═"*78)
+    print("SUMMARY")
+    print("═"*78)
+    for name, passed in results:
+        print(f"{'✓ PASS' if passed else '✗ FAIL'}: {name}")
+
+    passed_count = sum(1 for _, p in results if p)
+    print(f"\nResults: {passed_count}/{len(results)} tests passed")
+    sys.exit(0 if passed_count == len(results) else 1)
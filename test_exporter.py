@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Quick test of the exporter's ingestion limits.
+
+Starts the ingestion server on a free port with small limits
+(EXPORTER_MAX_LINE=1024, EXPORTER_MAX_BODY=64 KiB) and checks that
+oversized lines are dropped and counted while the rest of the body is
+processed, and that oversized bodies (plain, chunked or gzipped) are
+answered with 413. No Ollama or Prometheus needed.
+"""
+import gzip
+import http.client
+import json
+import os
+import sys
+import threading
+
+os.environ["EXPORTER_MAX_LINE"] = "1024"
+os.environ["EXPORTER_MAX_BODY"] = str(64 * 1024)
+os.environ["EXPORTER_ECHO"] = "off"
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from prometheus_client import REGISTRY
+
+import exporter
+
+
+def check(name, ok):
+    print(f"  {'✓' if ok else '✗'} {name}")
+    return ok
+
+
+def header(title):
+    print("\n" + "═"*78)
+    print(title)
+    print("═"*78)
+
+
+def sample(name, labels=None):
+    return REGISTRY.get_sample_value(name, labels or {}) or 0.0
+
+
+def requests_counted():
+    return sample("copilot_bridge_requests_by_route_total", {"route": "local"})
+
+
+def entry(i):
+    return json.dumps({"route": "local", "model": "qwen2.5-coder:1.5b", "task": "docstring",
+                       "tokens_in": 10, "tokens_out": 20, "latency_ms": 5 + i}).encode()
+
+
+def post(port, body, headers=None, chunks=None):
+    """POST body (or the given chunks, chunked) and return the status code."""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    try:
+        if chunks is None:
+            conn.request("POST", "/", body=body, headers=headers or {})
+        else:
+            conn.putrequest("POST", "/")
+            conn.putheader("Transfer-Encoding", "chunked")
+            conn.endheaders()
+            for chunk in chunks:
+                conn.send(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            conn.send(b"0\r\n\r\n")
+        status = conn.getresponse().status
+    finally:
+        conn.close()
+    exporter.INGEST_QUEUE.join()
+    return status
+
+
+def test_long_lines(port):
+    header("TEST 1: Lines over EXPORTER_MAX_LINE")
+    before, dropped = requests_counted(), sample("copilot_bridge_exporter_dropped_lines_total")
+    long_line = json.dumps({"route": "local", "pad": "x" * 2000}).encode()
+    body = b"\n".join([entry(0), long_line, entry(1), entry(2)]) + b"\n"
+    status = post(port, body)
+    results = [
+        check("body accepted (204)", status == 204),
+        check("oversized line dropped and counted",
+              sample("copilot_bridge_exporter_dropped_lines_total") - dropped == 1),
+        check("the other lines processed", requests_counted() - before == 3),
+    ]
+
+    before, dropped = requests_counted(), sample("copilot_bridge_exporter_dropped_lines_total")
+    # The long line arrives in pieces, none of which holds its newline
+    pieces = [entry(3) + b"\n" + long_line[:600], long_line[600:1500], long_line[1500:] + b"\n" + entry(4) + b"\n"]
+    status = post(port, None, chunks=pieces)
+    results += [
+        check("chunked body accepted (204)", status == 204),
+        check("line split across reads dropped once",
+              sample("copilot_bridge_exporter_dropped_lines_total") - dropped == 1),
+        check("lines around it processed", requests_counted() - before == 2),
+    ]
+    return all(results)
+
+
+def test_large_bodies(port):
+    header("TEST 2: Bodies over EXPORTER_MAX_BODY")
+    line = entry(0) + b"\n"
+    big = line * (70 * 1024 // len(line))
+    fits = line * (60 * 1024 // len(line))
+    before = requests_counted()
+    results = [
+        check("body under the limit accepted (204)", post(port, fits) == 204),
+        check("all its lines processed", requests_counted() - before == fits.count(b"\n")),
+        check("Content-Length body over the limit rejected (413)", post(port, big) == 413),
+        check("chunked body over the limit rejected (413)",
+              post(port, None, chunks=[big[i:i + 8192] for i in range(0, len(big), 8192)]) == 413),
+    ]
+    bomb = gzip.compress(b"\n" * (1 << 20))
+    results.append(check(f"{len(bomb)}-byte gzip body inflating past the limit rejected (413)",
+                         post(port, bomb, {"Content-Encoding": "gzip"}) == 413))
+    results.append(check("bad gzip body rejected (400)",
+                         post(port, b"not gzip", {"Content-Encoding": "gzip"}) == 400))
+    return all(results)
+
+
+if __name__ == "__main__":
+    print("╔" + "═"*76 + "╗")
+    print("║" + " "*24 + "EXPORTER LIMITS TEST SUITE" + " "*26 + "║")
+    print("╚" + "═"*76 + "╝")
+
+    server = exporter.start_ingestion(0, "127.0.0.1")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+
+    results = [
+        ("Long lines", test_long_lines(port)),
+        ("Large bodies", test_large_bodies(port)),
+    ]
+    server.shutdown()
+
+    print("\n" + "═"*78)
+    print("SUMMARY")
+    print("═"*78)
+    for name, passed in results:
+        print(f"{'✓ PASS' if passed else '✗ FAIL'}: {name}")
+
+    passed_count = sum(1 for _, p in results if p)
+    print(f"\nResults: {passed_count}/{len(results)} tests passed")
+    sys.exit(0 if passed_count == len(results) else 1)
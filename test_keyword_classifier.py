@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Quick test of the compiled keyword classifier.
+
+Checks that one pass of KeywordClassifier finds exactly the categories
+the old per-keyword `kw in text.lower()` checks found: on the routing
+keyword sets, on prompts built to hit overlaps and prefixes, and on
+random text over a small alphabet. No Ollama needed.
+"""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from keyword_classifier import DEFAULT_CATEGORIES, KeywordClassifier, classifier
+
+
+def check(name, ok):
+    print(f"  {'✓' if ok else '✗'} {name}")
+    return ok
+
+
+def header(title):
+    print("\n" + "═"*78)
+    print(title)
+    print("═"*78)
+
+
+def old_checks(categories, text):
+    """What the routing code did before: lowercase and rescan per keyword."""
+    return {name for name, kws in categories.items() if any(kw.lower() in text.lower() for kw in kws)}
+
+
+def test_routing_prompts():
+    header("TEST 1: Routing prompts")
+    prompts = [
+        "Write a docstring for a function",
+        "Add DOCUMENTATION and a Comment",
+        "Implement a binary search tree",
+        "Refactor all handlers; what does this do?",
+        "Ask GPT-4 or Claude for the latest model",
+        "rename x to y, then run the tests",
+        "Explain the algorithm, then optimize it",
+        "Type hints and formatting only",
+        "plain prompt with no keywords at all",
+        "",
+        "documentdocstringcommentlint",
+        "i̇mplement (dotted capital I lowercases to two characters)",
+    ]
+    mismatches = [p for p in prompts if classifier.classify(p) != old_checks(DEFAULT_CATEGORIES, p)]
+    for prompt in mismatches:
+        print(f"    mismatch: {prompt!r}")
+    return all([
+        check(f"{len(prompts) - len(mismatches)}/{len(prompts)} prompts match the old checks", not mismatches),
+        check("context is matched too",
+              classifier.classify("Fix this", "please write a docstring") >= {"local", "simple"}),
+        check("matches() agrees", classifier.matches("Design a queue", "complex")),
+    ])
+
+
+def test_overlaps():
+    header("TEST 2: Overlapping and prefix keywords")
+    categories = {"a": ["ab"], "b": ["abc"], "c": ["bcd"], "d": ["b"], "e": ["cdx"]}
+    custom = KeywordClassifier(categories)
+    texts = ["abcd", "ABCDX", "xabx", "bcdx", "zzz", "abcabc", "cd", "abbcd"]
+    mismatches = [t for t in texts if custom.classify(t) != old_checks(categories, t)]
+    for text in mismatches:
+        print(f"    mismatch: {text!r}: {sorted(custom.classify(text))} vs {sorted(old_checks(categories, text))}")
+    return check(f"{len(texts) - len(mismatches)}/{len(texts)} texts match the old checks", not mismatches)
+
+
+def test_random_text():
+    header("TEST 3: Random text")
+    rng = random.Random(7)
+    categories = {
+        "x": ["aab", "ab", "ba a"],
+        "y": ["abab", "b b"],
+        "z": ["a", "bba"],
+        "w": ["aaaa", "ba"],
+    }
+    custom = KeywordClassifier(categories, memo_size=16)
+    mismatches = 0
+    for _ in range(5000):
+        text = "".join(rng.choice("aAbB ") for _ in range(rng.randint(0, 12)))
+        if custom.classify(text) != old_checks(categories, text):
+            mismatches += 1
+    routing = 0
+    words = [kw for kws in DEFAULT_CATEGORIES.values() for kw in kws] + ["x", " ", "doc", "refactor"]
+    for _ in range(2000):
+        text = "".join(rng.choice(words) for _ in range(rng.randint(0, 6)))
+        if rng.random() < 0.5:
+            text = text.upper()
+        if classifier.classify(text) != old_checks(DEFAULT_CATEGORIES, text):
+            routing += 1
+    return all([
+        check(f"5000 random texts, {mismatches} mismatches", mismatches == 0),
+        check(f"2000 keyword mashups, {routing} mismatches", routing == 0),
+    ])
+
+
+if __name__ == "__main__":
+    print("╔" + "═"*76 + "╗")
+    print("║" + " "*22 + "KEYWORD CLASSIFIER TEST SUITE" + " "*25 + "║")
+    print("╚" + "═"*76 + "╝")
+
+    results = [
+        ("Routing prompts", test_routing_prompts()),
+        ("Overlaps", test_overlaps()),
+        ("Random text", test_random_text()),
+    ]
+
+    print("\n" + "═"*78)
+    print("SUMMARY")
+    print("═"*78)
+    for name, passed in results:
+        print(f"{'✓ PASS' if passed else '✗ FAIL'}: {name}")
+
+    passed_count = sum(1 for _, p in results if p)
+    print(f"\nResults: {passed_count}/{len(results)} tests passed")
+    sys.exit(0 if passed_count == len(results) else 1)
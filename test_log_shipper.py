@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Quick test of the background log shipper.
+
+Runs a tiny collector standing in for exporter.py and checks that
+batches are spilled while it answers 503, replayed (once, in order)
+when it comes back, that a spill file left by an earlier run is
+replayed, that 4xx batches are rejected rather than spilled, and that a
+full queue drops instead of blocking. No Ollama or exporter needed.
+"""
+import gzip
+import http.server
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from log_shipper import LogShipper
+
+
+def check(name, ok):
+    print(f"  {'✓' if ok else '✗'} {name}")
+    return ok
+
+
+def header(title):
+    print("\n" + "═"*78)
+    print(title)
+    print("═"*78)
+
+
+class Collector(http.server.ThreadingHTTPServer):
+    """Answers `status` and keeps the entries of every 2xx batch."""
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), CollectorHandler)
+        self.status = 204
+        self.delay = 0.0
+        self.entries = []
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class CollectorHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = gzip.decompress(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(self.server.delay)
+        if self.server.status < 300:
+            self.server.entries += [json.loads(line) for line in body.splitlines() if line]
+        self.send_response(self.server.status)
+        if self.server.status == 503:
+            self.send_header("Retry-After", "0")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def spilled_lines(path):
+    if not os.path.isfile(path):
+        return 0
+    with open(path, "rb") as f:
+        return sum(1 for line in f if line.strip())
+
+
+def test_spill_and_replay(tmp):
+    header("TEST 1: Spill while the exporter is down, replay when it is back")
+    collector = Collector()
+    collector.status = 503
+    spill = os.path.join(tmp, "down.ndjson")
+    shipper = LogShipper(collector.url, flush_s=0.05, retries=2, spill_path=spill)
+    for i in range(5):
+        shipper.ship({"id": i})
+    results = [
+        check("all entries spilled", wait_for(lambda: shipper.spilled == 5)),
+        check("spill file holds them", spilled_lines(spill) == 5),
+        check("nothing delivered", collector.entries == []),
+        check("503 retried", shipper.retried >= 1),
+    ]
+
+    collector.status = 204
+    wait_for(lambda: time.monotonic() >= shipper._down_until)
+    shipper.ship({"id": 5})
+    results += [
+        check("new entry delivered", wait_for(lambda: shipper.sent == 1)),
+        check("spill replayed", wait_for(lambda: shipper.replayed == 5)),
+        check("each entry delivered once", sorted(e["id"] for e in collector.entries) == list(range(6))),
+        check("spilled entries in order", [e["id"] for e in collector.entries if e["id"] < 5] == list(range(5))),
+        check("spill file gone", not os.path.exists(spill) and not os.path.exists(spill + ".sending")),
+    ]
+    shipper.close()
+    collector.shutdown()
+    return all(results)
+
+
+def test_leftover_spill(tmp):
+    header("TEST 2: Spill file left by an earlier run")
+    collector = Collector()
+    spill = os.path.join(tmp, "leftover.ndjson")
+    with open(spill, "w") as f:
+        f.writelines(json.dumps({"id": i, "old": True}) + "\n" for i in range(3))
+    shipper = LogShipper(collector.url, flush_s=0.05, batch_lines=2, spill_path=spill)
+    shipper.ship({"id": 3})
+    results = [
+        check("replayed after the first successful POST", wait_for(lambda: shipper.replayed == 3)),
+        check("old and new entries delivered", sorted(e["id"] for e in collector.entries) == [0, 1, 2, 3]),
+        check("spill file gone", wait_for(lambda: not os.path.exists(spill))),
+    ]
+    shipper.close()
+    collector.shutdown()
+    return all(results)
+
+
+def test_rejected_and_dropped(tmp):
+    header("TEST 3: 4xx batches and a full queue")
+    collector = Collector()
+    collector.status = 400
+    spill = os.path.join(tmp, "rejected.ndjson")
+    shipper = LogShipper(collector.url, flush_s=0.05, spill_path=spill)
+    shipper.ship({"id": 0})
+    shipper.ship({"id": 1})
+    results = [
+        check("400 batch counted as rejected", wait_for(lambda: shipper.rejected == 2)),
+        check("not retried or spilled", shipper.retried == 0 and not os.path.exists(spill)),
+    ]
+    shipper.close()
+
+    collector.status = 204
+    collector.delay = 0.5
+    shipper = LogShipper(collector.url, flush_s=0.0, queue_size=2, spill_path=spill)
+    start = time.monotonic()
+    accepted = [shipper.ship({"id": i}) for i in range(20)]
+    elapsed = time.monotonic() - start
+    results += [
+        check("ship() never blocks", elapsed < 0.2),
+        check("overflow dropped and counted", shipper.dropped == accepted.count(False) > 0),
+    ]
+    shipper.close()
+    results.append(check("close() flushes what was queued",
+                         len(collector.entries) == accepted.count(True)))
+    collector.shutdown()
+    return all(results)
+
+
+if __name__ == "__main__":
+    print("╔" + "═"*76 + "╗")
+    print("║" + " "*26 + "LOG SHIPPER TEST SUITE" + " "*28 + "║")
+    print("╚" + "═"*76 + "╝")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [
+            ("Spill and replay", test_spill_and_replay(tmp)),
+            ("Leftover spill", test_leftover_spill(tmp)),
+            ("Rejected and dropped", test_rejected_and_dropped(tmp)),
+        ]
+
+    print("\n" + "═"*78)
+    print("SUMMARY")
+    print("═"*78)
+    for name, passed in results:
+        print(f"{'✓ PASS' if passed else '✗ FAIL'}: {name}")
+
+    passed_count = sum(1 for _, p in results if p)
+    print(f"\nResults: {passed_count}/{len(results)} tests passed")
+    sys.exit(0 if passed_count == len(results) else 1)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Quick test of the exact-match response cache.
+
+Checks TTL expiry, byte-bounded LRU eviction, SQLite persistence across
+a reopen, and which answers may be cached. No Ollama needed.
+"""
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from response_cache import ResponseCache, cache_key, cacheable
+
+
+def check(name, ok):
+    print(f"  {'✓' if ok else '✗'} {name}")
+    return ok
+
+
+def header(title):
+    print("\n" + "═"*78)
+    print(title)
+    print("═"*78)
+
+
+def value(text):
+    return {"text": text, "model": "qwen2.5-coder:1.5b", "route": "local", "tokens_out": 3}
+
+
+def test_keys():
+    header("TEST 1: Keys and cacheable answers")
+    results = [
+        check("CRLF and trailing whitespace share a key",
+              cache_key("def f():\r\n    pass  \r\n", "m") == cache_key("def f():\n    pass", "m")),
+        check("indentation changes the key",
+              cache_key("def f():\n    pass", "m") != cache_key("def f():\n  pass", "m")),
+        check("model changes the key", cache_key("p", "a") != cache_key("p", "b")),
+        check("options change the key", cache_key("p", "m", {"temperature": 0}) != cache_key("p", "m")),
+        check("a real answer is cacheable", cacheable("def f(): ...")),
+        check("an empty answer is not", not cacheable("")),
+        check("an error is not", not cacheable("ERROR: connection refused")),
+        check("the cloud placeholder is not", not cacheable("[CLOUD RESPONSE PLACEHOLDER] ...")),
+    ]
+    return all(results)
+
+
+def test_ttl():
+    header("TEST 2: TTL")
+    cache = ResponseCache(ttl_seconds=3600)
+    cache.put("fresh", value("a"))
+    cache.put("stale", value("b"), ttl_seconds=0)
+    results = [
+        check("fresh entry is a hit", cache.get("fresh") == value("a")),
+        check("expired entry is a miss", cache.get("stale") is None),
+        check("expired entry is dropped", len(cache) == 1),
+        check("hits/misses counted", (cache.hits, cache.misses) == (1, 1)),
+    ]
+    return all(results)
+
+
+def test_lru():
+    header("TEST 3: LRU eviction by bytes")
+    size = len(json.dumps(value("a")))
+    cache = ResponseCache(max_bytes=2 * size)
+    cache.put("a", value("a"))
+    cache.put("b", value("b"))
+    cache.get("a")              # a is now the most recently used
+    cache.put("c", value("c"))  # evicts b
+    results = [
+        check("least recently used entry evicted", cache.get("b") is None),
+        check("recently used entry kept", cache.get("a") is not None),
+        check("new entry kept", cache.get("c") is not None),
+        check("one eviction counted", cache.evictions == 1),
+        check("bytes within bound", cache.stats()["bytes"] <= cache.max_bytes),
+    ]
+    cache.put("huge", {"text": "x" * (3 * size)})
+    results.append(check("entry larger than the cache is not stored", cache.get("huge") is None))
+    return all(results)
+
+
+def test_sqlite_reload():
+    header("TEST 4: SQLite persistence")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.sqlite")
+        cache = ResponseCache(path=path)
+        for i in range(5):
+            cache.put(f"k{i}", value(str(i)))
+        cache.put("stale", value("old"), ttl_seconds=0)
+        cache.close()
+
+        reopened = ResponseCache(path=path)
+        results = [
+            check("reopen loads nothing into memory", len(reopened) == 0),
+            check("entry read back from SQLite", reopened.get("k3") == value("3")),
+            check("hit kept in memory", len(reopened) == 1),
+            check("expired row deleted on open", reopened.get("stale") is None),
+        ]
+        reopened.close()
+
+        size = len(json.dumps(value("0")))
+        small = ResponseCache(path=path, max_bytes=2 * size)
+        kept = [k for k in ("k0", "k1", "k2", "k3", "k4") if small.get(k) is not None]
+        results += [
+            check("smaller bound trims SQLite on open", small.stats()["db_bytes"] <= 2 * size),
+            check("most recently used rows survive", kept == ["k3", "k4"]),
+        ]
+        small.close()
+    return all(results)
+
+
+if __name__ == "__main__":
+    print("╔" + "═"*76 + "╗")
+    print("║" + " "*25 + "RESPONSE CACHE TEST SUITE" + " "*26 + "║")
+    print("╚" + "═"*76 + "╝")
+
+    results = [
+        ("Keys", test_keys()),
+        ("TTL", test_ttl()),
+        ("LRU", test_lru()),
+        ("SQLite reload", test_sqlite_reload()),
+    ]
+
+    print("\n" + "═"*78)
+    print("SUMMARY")
+    print("═"*78)
+    for name, passed in results:
+        print(f"{'✓ PASS' if passed else '✗ FAIL'}: {name}")
+
+    passed_count = sum(1 for _, p in results if p)
+    print(f"\nResults: {passed_count}/{len(results)} tests passed")
+    sys.exit(0 if passed_count == len(results) else 1)
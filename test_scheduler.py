@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Quick test of the GPU request scheduler.
+
+Checks admission control (Overloaded up front when the projected wait is
+past the deadline), rejection of requests whose deadline passes while
+queued, priority order, and that abandoned waiters never take a slot.
+No Ollama needed.
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from scheduler import GPUScheduler, Overloaded, Priority
+
+
+def check(name, ok):
+    print(f"  {'✓' if ok else '✗'} {name}")
+    return ok
+
+
+def header(title):
+    print("\n" + "═"*78)
+    print(title)
+    print("═"*78)
+
+
+def test_admission():
+    header("TEST 1: Admission control")
+    scheduler = GPUScheduler("gpu0", slots=1, deadlines={p: None for p in Priority}, service_prior=10.0)
+    scheduler.acquire(Priority.CHAT)
+    start = time.monotonic()
+    try:
+        scheduler.acquire(Priority.INTERACTIVE, deadline=1.0)
+        error = None
+    except Overloaded as e:
+        error = e
+    elapsed = time.monotonic() - start
+    results = [
+        check("rejected with Overloaded", error is not None),
+        check("rejected without waiting", elapsed < 0.1),
+        check("projected wait reported", error is not None and error.projected_wait == 10.0),
+        check("Retry-After covers the excess wait", error is not None and error.retry_after == 9),
+        check("rejection counted", scheduler.rejected[Priority.INTERACTIVE] == 1),
+        check("nothing left queued", scheduler.depth() == 0),
+    ]
+    scheduler.release()
+    results.append(check("slot freed", scheduler.active == 0))
+    return all(results)
+
+
+def test_deadline_while_queued():
+    header("TEST 2: Deadline passes while queued")
+    scheduler = GPUScheduler("gpu0", slots=1, deadlines={p: None for p in Priority}, service_prior=0.01)
+    scheduler.acquire()
+    start = time.monotonic()
+    try:
+        scheduler.acquire(Priority.CHAT, deadline=0.2)
+        error = None
+    except Overloaded as e:
+        error = e
+    waited = time.monotonic() - start
+    results = [
+        check("admitted, then rejected with Overloaded", error is not None),
+        check("waited about the deadline", 0.15 < waited < 1.0),
+        check("reported wait is the time queued", error is not None and error.projected_wait >= 0.2),
+        check("queue depth back to 0", scheduler.depth() == 0),
+    ]
+    scheduler.release()
+    results.append(check("abandoned waiter did not take the slot", scheduler.active == 0))
+    return all(results)
+
+
+def test_async_deadline():
+    header("TEST 3: asyncio deadline and cancellation")
+    scheduler = GPUScheduler("gpu0", slots=1, deadlines={p: None for p in Priority}, service_prior=0.01)
+
+    async def run():
+        await scheduler.aacquire()
+        try:
+            await scheduler.aacquire(Priority.CHAT, deadline=0.2)
+            timed_out = False
+        except Overloaded:
+            timed_out = True
+        task = asyncio.create_task(scheduler.aacquire(Priority.BATCH, deadline=None))
+        await asyncio.sleep(0.05)
+        queued = scheduler.depth(Priority.BATCH)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        scheduler.release()
+        return timed_out, queued
+
+    timed_out, queued = asyncio.run(run())
+    return all([
+        check("aacquire rejected past its deadline", timed_out),
+        check("waiter was queued", queued == 1),
+        check("cancelled waiter left the queue", scheduler.depth() == 0),
+        check("no slot leaked", scheduler.active == 0),
+    ])
+
+
+def test_priority_order():
+    header("TEST 4: Priority order")
+    scheduler = GPUScheduler("gpu0", slots=1, deadlines={p: None for p in Priority})
+    scheduler.acquire()
+    order = []
+
+    def worker(priority):
+        with scheduler.slot(priority):
+            order.append(priority)
+
+    threads = []
+    for priority in (Priority.BATCH, Priority.CHAT, Priority.INTERACTIVE):
+        thread = threading.Thread(target=worker, args=(priority,))
+        thread.start()
+        threads.append(thread)
+        while scheduler.depth(priority) == 0:
+            time.sleep(0.001)
+    scheduler.release()
+    for thread in threads:
+        thread.join(5)
+    return all([
+        check("interactive, then chat, then batch",
+              order == [Priority.INTERACTIVE, Priority.CHAT, Priority.BATCH]),
+        check("all admitted", sum(scheduler.admitted.values()) == 4),
+        check("slot freed", scheduler.active == 0),
+    ])
+
+
+if __name__ == "__main__":
+    print("╔" + "═"*76 + "╗")
+    print("║" + " "*27 + "SCHEDULER TEST SUITE" + " "*29 + "║")
+    print("╚" + "═"*76 + "╝")
+
+    results = [
+        ("Admission control", test_admission()),
+        ("Deadline while queued", test_deadline_while_queued()),
+        ("asyncio deadline", test_async_deadline()),
+        ("Priority order", test_priority_order()),
+    ]
+
+    print("\n" + "═"*78)
+    print("SUMMARY")
+    print("═"*78)
+    for name, passed in results:
+        print(f"{'✓ PASS' if passed else '✗ FAIL'}: {name}")
+
+    passed_count = sum(1 for _, p in results if p)
+    print(f"\nResults: {passed_count}/{len(results)} tests passed")
+    sys.exit(0 if passed_count == len(results) else 1)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Token counting for Copilot Bridge
+
+Replaces the `len(text.split()) * 1.3` / `chars // 4` estimates, which are
+badly off for code (operators, indentation and identifiers all tokenize
+differently from English words).
+
+Counting order of preference:
+1. Ollama's own counts (prompt_eval_count / eval_count) when a response
+   carries them - see usage_tokens()
+2. A BPE tokenizer (tiktoken, loaded lazily on first use)
+3. A regex pre-tokenizer modelled on cl100k's split rules, used when
+   tiktoken is not installed or its encoding file cannot be loaded
+   (offline hosts: point TIKTOKEN_CACHE_DIR at a pre-fetched copy)
+
+Counts are memoized per string hash, so the same prompt counted for the
+cache lookup, routing and logging is only tokenized once.
+
+Environment variables:
+    BRIDGE_TOKENIZER            - auto | tiktoken | regex (default: auto)
+    BRIDGE_TOKENIZER_ENCODING   - tiktoken encoding (default: cl100k_base)
+"""
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+# cl100k-style pre-tokenization: contractions, letter runs with one leading
+# non-letter, 1-3 digit groups, punctuation runs, newlines, whitespace
+_PRETOKEN = re.compile(
+    r"(?i:'s|'t|'re|'ve|'m|'ll|'d)"
+    r"|[^\r\n\w]?[^\W\d_]+"
+    r"|\d{1,3}"
+    r"| ?[^\s\w]+[\r\n]*"
+    r"|\s*[\r\n]+"
+    r"|\s+(?!\S)"
+    r"|\s+"
+)
+
+# Letter runs longer than this are split by BPE into several tokens
+_LONG_PIECE = 9
+
+
+def regex_token_count(text: str) -> int:
+    """Approximate BPE token count without a vocabulary."""
+    count = 0
+    for piece in _PRETOKEN.findall(text):
+        count += 1 + (len(piece) - 1) // _LONG_PIECE
+    return count
+
+
+class TokenCounter:
+    """
+    Memoizing token counter with a pluggable tokenizer.
+
+    Args:
+        tokenizer: text -> token count; None selects tiktoken or the regex fallback
+        encoding: tiktoken encoding name
+        backend: "auto", "tiktoken" or "regex" (ignored when tokenizer is given)
+        memo_size: number of distinct strings remembered
+    """
+
+    def __init__(
+        self,
+        tokenizer: Optional[Callable[[str], int]] = None,
+        encoding: str = "cl100k_base",
+        backend: str = "auto",
+        memo_size: int = 4096
+    ):
+        self.encoding = encoding
+        self.backend = "custom" if tokenizer else backend
+        self.memo_size = memo_size
+        self._tokenizer = tokenizer
+        self._memo: "OrderedDict[Tuple[int, int], int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "TokenCounter":
+        return cls(
+            encoding=os.getenv("BRIDGE_TOKENIZER_ENCODING", "cl100k_base"),
+            backend=os.getenv("BRIDGE_TOKENIZER", "auto").lower()
+        )
+
+    def _load(self) -> Callable[[str], int]:
+        """Pick the tokenizer on first use (loading a BPE takes ~100 ms)."""
+        if self.backend in ("auto", "tiktoken") and TIKTOKEN_AVAILABLE:
+            try:
+                encoder = tiktoken.get_encoding(self.encoding)
+                self.backend = f"tiktoken:{self.encoding}"
+                return lambda text: len(encoder.encode_ordinary(text))
+            except Exception as e:
+                print(f"⚠️  tiktoken encoding {self.encoding} unavailable ({e}), "
+                      f"using regex token counts", file=sys.stderr)
+        elif self.backend == "tiktoken":
+            print("⚠️  tiktoken not installed, using regex token counts", file=sys.stderr)
+        self.backend = "regex"
+        return regex_token_count
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        key = (len(text), hash(text))
+        with self._lock:
+            cached = self._memo.get(key)
+            if cached is not None:
+                self._memo.move_to_end(key)
+                return cached
+            if self._tokenizer is None:
+                self._tokenizer = self._load()
+        tokens = self._tokenizer(text)
+        with self._lock:
+            self._memo[key] = tokens
+            if len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return tokens
+
+
+token_counter = TokenCounter.from_env()
+
+
+def count_tokens(text: str) -> int:
+    """Token count of text using the shared counter."""
+    return token_counter.count(text)
+
+
+def usage_tokens(prompt: str, answer: str, result: Optional[Dict[str, Any]] = None) -> Tuple[int, int]:
+    """
+    (tokens_in, tokens_out) for a completed request.
+
+    Prefers the prompt_eval_count / eval_count Ollama reports; either may
+    be missing (prompt_eval_count is omitted when the prompt was served
+    from Ollama's KV cache), in which case that side is counted locally.
+    """
+    result = result or {}
+    tokens_in = result.get("prompt_eval_count") or count_tokens(prompt)
+    tokens_out = result.get("eval_count") or count_tokens(answer)
+    return tokens_in, tokens_out
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Request tracing for Copilot Bridge
+
+Lightweight spans following the OpenTelemetry data model (trace id, span
+id, parent, start/end in unix nanoseconds, attributes, status), without
+depending on the OpenTelemetry SDK. A sampled request is exported when
+its root span ends, as one OTLP/JSON ExportTraceServiceRequest per line:
+the format the OpenTelemetry Collector's file exporter writes and its
+otlpjsonfile receiver reads, so traces can be forwarded to Jaeger/Tempo
+or read with jq.
+
+    with tracing.span("process_request", task=task) as span:
+        span.set("route", route)
+
+    @tracing.traced("classify_task")
+    def classify_task(...): ...
+
+The current span lives in a contextvar, so it follows asyncio tasks and
+asyncio.to_thread(); bind() carries it into a coroutine that is run on
+another thread's event loop. current_trace_id() is what log_request()
+stamps on its JSON entries, to join logs and traces.
+
+Sampling is decided once per trace, at the root span. With
+BRIDGE_TRACE_SAMPLE=0 (the default) span() returns a shared no-op span
+without touching the clock or the contextvar, and traced() functions
+cost one extra call.
+
+Environment variables:
+    BRIDGE_TRACE_SAMPLE  - Fraction of requests traced, 0-1 (default: 0, off)
+    BRIDGE_TRACE_FILE    - OTLP/JSON lines output, or "stdout" / "stderr" (default: bridge-traces.otlp.jsonl)
+    BRIDGE_TRACE_SERVICE - service.name of the exported resource (default: copilot-bridge)
+"""
+import contextvars
+import functools
+import inspect
+import json
+import os
+import random
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+SAMPLE = float(os.getenv("BRIDGE_TRACE_SAMPLE", "0"))
+TRACE_FILE = os.getenv("BRIDGE_TRACE_FILE", "bridge-traces.otlp.jsonl")
+SERVICE_NAME = os.getenv("BRIDGE_TRACE_SERVICE", "copilot-bridge")
+
+# OTLP status codes
+STATUS_UNSET, STATUS_OK, STATUS_ERROR = 0, 1, 2
+# OTLP span kind INTERNAL
+KIND_INTERNAL = 1
+
+_enabled = SAMPLE > 0.0
+
+
+class Span:
+    """One timed operation; use as a context manager (or via traced())."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns",
+                 "attributes", "status", "message", "_root", "_children", "_token")
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: Dict[str, Any],
+                 start_ns: Optional[int] = None):
+        self.name = name
+        self.span_id = f"{random.getrandbits(64):016x}"
+        if parent is None:
+            self.trace_id = f"{random.getrandbits(128):032x}"
+            self.parent_id = None
+            self._root = self
+        else:
+            self.trace_id = parent.trace_id
+            self.parent_id = parent.span_id
+            self._root = parent._root
+        self.start_ns = time.time_ns() if start_ns is None else start_ns
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.status = STATUS_UNSET
+        self.message = ""
+        self._children: List["Span"] = []
+        self._token = None
+
+    def set(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def fail(self, message: str):
+        """Mark the span as an error (for failures that are returned, not raised)."""
+        self.status = STATUS_ERROR
+        self.message = message
+
+    def end(self, end_ns: Optional[int] = None):
+        self.end_ns = time.time_ns() if end_ns is None else end_ns
+        root = self._root
+        if root is self:
+            _export(self._children + [self])
+        elif root.end_ns is None:
+            root._children.append(self)
+        else:
+            # Outlived its root (e.g. a cancelled audit task finishing late)
+            _export([self])
+
+    def __enter__(self) -> "Span":
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None and self.status != STATUS_ERROR:
+            self.fail(f"{exc_type.__name__}: {exc}")
+        _current.reset(self._token)
+        self.end()
+        return False
+
+
+class _NoopSpan:
+    """Stand-in when tracing is off or the trace was not sampled."""
+
+    __slots__ = ()
+    trace_id = None
+
+    def set(self, key: str, value: Any):
+        pass
+
+    def fail(self, message: str):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _Unsampled:
+    """Root of a trace that was not sampled: its children are no-ops too."""
+
+    __slots__ = ("_token",)
+
+    def __enter__(self):
+        self._token = _current.set(_NOOP)
+        return _NOOP
+
+    def __exit__(self, exc_type, exc, tb):
+        _current.reset(self._token)
+        return False
+
+
+_current: "contextvars.ContextVar[Any]" = contextvars.ContextVar("bridge_span", default=None)
+
+
+# ----------------------------------------------------------------------
+# Instrumentation API
+# ----------------------------------------------------------------------
+
+def configure(sample: Optional[float] = None, output: Optional[str] = None):
+    """Change the sampling rate and/or output at runtime (overrides the env vars)."""
+    global SAMPLE, TRACE_FILE, _enabled
+    if sample is not None:
+        SAMPLE = sample
+        _enabled = sample > 0.0
+    if output is not None:
+        _writer.close()
+        TRACE_FILE = output
+
+
+def span(name: str, **attributes):
+    """A span under the current one, or a new (sampled) trace if there is none."""
+    if not _enabled:
+        return _NOOP
+    parent = _current.get()
+    if parent is _NOOP:
+        return _NOOP
+    if parent is None and SAMPLE < 1.0 and random.random() >= SAMPLE:
+        return _Unsampled()
+    return Span(name, parent, attributes)
+
+
+def traced(name: Optional[str] = None):
+    """Decorator: run the function (sync or async) inside span(name)."""
+    def decorate(fn: Callable) -> Callable:
+        span_name = name or fn.__name__
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if not _enabled:
+                    return await fn(*args, **kwargs)
+                with span(span_name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def current() -> Any:
+    """The active span (a no-op span when there is none)."""
+    if not _enabled:
+        return _NOOP
+    return _current.get() or _NOOP
+
+
+def annotate(**attributes):
+    """Add attributes to the active span, if any."""
+    if not _enabled:
+        return
+    active = _current.get()
+    if active is not None and active is not _NOOP:
+        active.attributes.update(attributes)
+
+
+def current_trace_id() -> Optional[str]:
+    """Trace id of the active span, for log entries (None when not traced)."""
+    if not _enabled:
+        return None
+    active = _current.get()
+    return active.trace_id if active is not None else None
+
+
+def record(name: str, start_ns: int, end_ns: int, parent: Any = None, **attributes) -> Any:
+    """
+    Add an already finished span (e.g. a phase timed by someone else)
+    under parent, default the active span. Returns it, or a no-op span
+    when there is no trace to add it to.
+    """
+    if not _enabled:
+        return _NOOP
+    if parent is None:
+        parent = _current.get()
+    if parent is None or parent is _NOOP:
+        return _NOOP
+    recorded = Span(name, parent, attributes, start_ns=start_ns)
+    recorded.end(end_ns)
+    return recorded
+
+
+def record_generation(start_ns: int, end_ns: int, result: Dict[str, Any], **attributes) -> Any:
+    """
+    Record an Ollama /api/generate call as a "generate" span with its
+    load, prompt_eval and eval phases as children, laid out backwards from
+    end_ns using the durations Ollama reports. What is left at the start
+    of the span is connection setup, queueing inside Ollama and transfer.
+    """
+    generate = record("generate", start_ns, end_ns, **attributes)
+    if generate is _NOOP:
+        return generate
+    cursor = end_ns
+    for phase, count in (("eval", "eval_count"), ("prompt_eval", "prompt_eval_count"), ("load", None)):
+        duration = result.get(f"{phase}_duration")
+        if not duration:
+            continue
+        phase_attrs = {"tokens": result[count]} if count and result.get(count) else {}
+        start = max(start_ns, cursor - duration)
+        record(f"ollama.{phase}", start, cursor, parent=generate, **phase_attrs)
+        cursor = start
+    return generate
+
+
+def bind(coro):
+    """Run coro under the active span even when another thread's event loop runs it."""
+    if not _enabled:
+        return coro
+    parent = _current.get()
+    if parent is None:
+        return coro
+    return _bound(parent, coro)
+
+
+async def _bound(parent: Any, coro):
+    # The task runs in its own copy of the context, so no reset is needed
+    _current.set(parent)
+    return await coro
+
+
+# ----------------------------------------------------------------------
+# OTLP/JSON export
+# ----------------------------------------------------------------------
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+def to_otlp(spans: List[Span]) -> Dict[str, Any]:
+    """One ExportTraceServiceRequest (OTLP/JSON) holding spans."""
+    encoded = []
+    for s in spans:
+        item = {
+            "traceId": s.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            "kind": KIND_INTERNAL,
+            "startTimeUnixNano": str(s.start_ns),
+            "endTimeUnixNano": str(s.end_ns),
+            "attributes": _otlp_attributes(s.attributes),
+            "status": {"code": s.status, "message": s.message} if s.message else {"code": s.status},
+        }
+        if s.parent_id:
+            item["parentSpanId"] = s.parent_id
+        encoded.append(item)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": SERVICE_NAME})},
+            "scopeSpans": [{"scope": {"name": "copilot-bridge.tracing"}, "spans": encoded}],
+        }]
+    }
+
+
+class _Writer:
+    """Appends one JSON line per exported trace to TRACE_FILE (thread-safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._file = None
+
+    def write(self, line: str):
+        with self._lock:
+            if TRACE_FILE == "stdout":
+                out = sys.stdout
+            elif TRACE_FILE == "stderr":
+                out = sys.stderr
+            else:
+                if self._file is None:
+                    self._file = open(TRACE_FILE, "a", encoding="utf-8")
+                out = self._file
+            out.write(line + "\n")
+            out.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+_writer = _Writer()
+
+
+def _export(spans: List[Span]):
+    try:
+        _writer.write(json.dumps(to_otlp(spans)))
+    except OSError as e:
+        print(f"⚠️  Trace export failed: {e}", file=sys.stderr)